@@ -74,6 +74,11 @@ def health():
     """Health check endpoint"""
     return jsonify({'status': 'ok', 'message': 'Burgeria Order Bot is running!'})
 
+@app.route('/metrics/storage')
+def storage_metrics():
+    """SQLite write lock wait / retry metrics"""
+    return jsonify(llm_bot.order_bot.getStorageMetrics())
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('DEBUG', 'False').lower() == 'true'
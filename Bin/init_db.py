@@ -5,6 +5,8 @@ SET.sql 파일을 읽어서 데이터베이스에 테이블과 데이터를 생
 """
 import sqlite3
 import os
+import z_burger  # puts Z_Burger_v01 on sys.path
+from migrations import run_migrations
 
 def init_database():
     """Initialize database with SET.sql"""
@@ -26,6 +28,9 @@ def init_database():
         # Execute SQL script
         cursor.executescript(sql_content)
         conn.commit()
+
+        # Schema migrations (embedding columns, hot-path indexes)
+        print(f"✅ 스키마 마이그레이션 적용: {run_migrations(conn)}")
         conn.close()
 
         print("✅ 데이터베이스 초기화 완료!")
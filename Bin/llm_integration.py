@@ -101,6 +101,7 @@ class BurgeriaLLMBot:
 
 **사용 가능한 함수:**
 - findProduct: 메뉴 검색 (모호한 키워드도 반드시 먼저 검색)
+- findSubstitutes: 품절 상품의 대체 메뉴 추천
 - addToCart: 장바구니 추가 (구체적 상품 확정 후에만)
 - getCartDetails: 장바구니 조회
 - clearCart: 장바구니 비우기
@@ -142,6 +143,27 @@ class BurgeriaLLMBot:
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "findSubstitutes",
+                    "description": "품절된 상품 대신 추천할 같은 종류의 비슷한 상품(재고 있음)을 찾습니다",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "product_id": {
+                                "type": "string",
+                                "description": "품절된 상품 ID (예: C00001)"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "추천 개수 제한 (기본값 5)"
+                            }
+                        },
+                        "required": ["product_id"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -312,6 +334,12 @@ class BurgeriaLLMBot:
                     limit=arguments.get("limit", 5)
                 )
             
+            elif function_name == "findSubstitutes":
+                return self.order_bot.findSubstitutes(
+                    product_id=arguments["product_id"],
+                    limit=arguments.get("limit", 5)
+                )
+            
             elif function_name == "addToCart":
                 return self.order_bot.addToCart(
                     session_id=arguments["session_id"],
@@ -3,136 +3,117 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import uuid
-from difflib import SequenceMatcher
+import threading
+import z_burger  # puts Z_Burger_v01 on sys.path
+from product_search import (
+    NgramIndex, ensure_catalog_version, get_catalog_versions, refresh_similarity_table, text_similarity
+)
+from search_diagnostics import SearchDiagnostics, log_diagnostics, stage
+from storage_config import connect, begin_write, get_lock_metrics
+from migrations import run_migrations
 
 class BurgeriaOrderBot:
     def __init__(self, db_path: str = "C:\\data\\BurgeriaDB.db"):
         self.db_path = db_path
+        self._search_index = None
+        self._catalog_ready = False
+        # Guards the version check / rebuild / stock refresh of the shared search index
+        self._index_lock = threading.Lock()
         self.init_database()
         
     def init_database(self):
         """Initialize database connection and create tables if needed"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create cart table for session management
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Cart (
-            cart_item_id TEXT PRIMARY KEY,
-            session_id TEXT NOT NULL,
-            product_id TEXT NOT NULL,
-            product_name TEXT NOT NULL,
-            order_type TEXT NOT NULL,
-            quantity INTEGER NOT NULL DEFAULT 1,
-            base_price INTEGER NOT NULL,
-            modifications TEXT,
-            line_total INTEGER NOT NULL,
-            special_requests TEXT,
-            set_group_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create orders table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Orders (
-            order_id TEXT PRIMARY KEY,
-            session_id TEXT NOT NULL,
-            total_amount INTEGER NOT NULL,
-            order_type TEXT NOT NULL,
-            customer_name TEXT,
-            customer_phone TEXT,
-            status TEXT DEFAULT 'pending',
-            estimated_time INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-
-        # Create order items table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Order_Items (
-            order_item_id TEXT PRIMARY KEY,
-            order_id TEXT NOT NULL,
-            product_id TEXT NOT NULL,
-            product_name TEXT NOT NULL,
-            order_type TEXT NOT NULL,
-            quantity INTEGER NOT NULL,
-            base_price INTEGER NOT NULL,
-            modifications TEXT,
-            line_total INTEGER NOT NULL,
-            special_requests TEXT,
-            set_group_id TEXT,
-            FOREIGN KEY(order_id) REFERENCES Orders(order_id)
-        )
-        ''')
+        conn = connect(self.db_path)
         
-        conn.commit()
+        # Cart / Orders / Order_Items tables and hot-path indexes (see Z_Burger_v01/migrations.py)
+        run_migrations(conn)
         conn.close()
         
-    def similarity(self, a: str, b: str) -> float:
-        """Calculate similarity score between two strings"""
-        return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-        
-    def findProduct(self, query: str, category: Optional[str] = None, limit: int = 5) -> Dict[str, Any]:
-        """Find products matching the query"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _get_search_index(self, conn: sqlite3.Connection) -> NgramIndex:
+        """Return the n-gram index, rebuilding it only when the catalog changed"""
+        with self._index_lock:
+            return self._sync_search_index(conn)
+
+    def _sync_search_index(self, conn: sqlite3.Connection) -> NgramIndex:
+        """Version check / rebuild / stock refresh of the index (caller holds _index_lock)"""
+        if not self._catalog_ready:
+            if not ensure_catalog_version(conn):
+                raise sqlite3.OperationalError("no such table: Products")
+            self._catalog_ready = True
+
+        versions = get_catalog_versions(conn)
+        index = self._search_index
+        if index is None or index.version[0] != versions[0]:
+            index = NgramIndex.load(conn)
+        elif index.version[1] != versions[1]:
+            index.refresh_stock(conn)
+        index.version = versions
+        self._search_index = index
+        return index
+
+    def findProduct(self, query: str, category: Optional[str] = None, limit: int = 5,
+                    explain: bool = False) -> Dict[str, Any]:
+        """
+        Find products matching the query
+
+        The query is normalized first ('감튀 두 개 주세요' -> '포테이토', see
+        QueryNormalizer); when that changes it, the result carries "normalized_query",
+        and a counted quantity in the query is returned as "requested_quantity".
+
+        With explain=True the result also carries a "diagnostics" dict: per-stage
+        timings (ms), candidate counts, the candidate score distribution and whether
+        the cached n-gram index was reused (Z_Burger_v01 SearchDiagnostics). Records
+        go to the same rotating SEARCH_DIAGNOSTICS_LOG as the other app's searches.
+        """
+        diagnostics = SearchDiagnostics() if explain else None
+        stats: Optional[Dict[str, Any]] = {} if explain else None
+        scored = []
+        conn = connect(self.db_path)
         
         try:
-            # Base query
-            sql = """
-            SELECT product_id, product_name, product_type, price, description, stock_quantity
-            FROM Products 
-            WHERE stock_quantity > 0
-            """
-            params = []
+            previous = self._search_index
+            previous_version = previous.version if previous is not None else None
+            with stage(diagnostics, "index"):
+                index = self._get_search_index(conn)
+            if diagnostics is not None:
+                if index is not previous:
+                    diagnostics.cache["search_index"] = "rebuilt"
+                elif index.version != previous_version:
+                    diagnostics.cache["search_index"] = "stock_refreshed"
+                else:
+                    diagnostics.cache["search_index"] = "hit"
             
-            # Add category filter if provided
-            if category:
-                sql += " AND product_type = ?"
-                params.append(category)
-                
-            cursor.execute(sql, params)
-            products = cursor.fetchall()
+            # Canonical query: filler, particles and quantity removed, synonyms applied
+            with stage(diagnostics, "normalize"):
+                normalized, quantity = index.normalizer.normalize(query)
             
-            # Calculate similarity scores
-            matches = []
-            for product in products:
-                product_id, product_name, product_type, price, description, stock_quantity = product
-                
-                # Calculate similarity with product name
-                name_score = self.similarity(query, product_name)
-                desc_score = self.similarity(query, description or "")
-                
-                # Use higher score
-                match_score = max(name_score, desc_score)
-                
-                # Only include if similarity is above threshold
-                if match_score > 0.3:
-                    matches.append({
-                        "product_id": product_id,
-                        "product_name": product_name,
-                        "product_type": product_type,
-                        "price": price,
-                        "description": description,
-                        "stock_quantity": stock_quantity,
-                        "match_score": round(match_score, 2)
-                    })
+            # Fix typos first ('양념감쟈' -> '양념감자'), choseong queries are handled by the index
+            with stage(diagnostics, "correct"):
+                corrected = index.correct(normalized)
             
-            # Sort by match score descending
-            matches.sort(key=lambda x: x["match_score"], reverse=True)
+            # Candidates come from the n-gram index; only in-stock products above 0.3 are returned
+            with stage(diagnostics, "search"):
+                scored = index.search(corrected or normalized, category, threshold=0.3, stats=stats)
             
-            # Limit results
-            matches = matches[:limit]
+            matches = [
+                dict(product, match_score=round(match_score, 2))
+                for product, match_score in scored[:limit]
+            ]
             
-            return {
+            result = {
                 "success": True,
                 "matches": matches,
                 "total_found": len(matches)
             }
+            if normalized != query.strip():
+                result["normalized_query"] = normalized
+            if quantity is not None:
+                result["requested_quantity"] = quantity
+            if corrected:
+                result["corrected_query"] = corrected
             
         except Exception as e:
-            return {
+            result = {
                 "success": False,
                 "error": str(e),
                 "matches": [],
@@ -140,10 +121,76 @@ class BurgeriaOrderBot:
             }
         finally:
             conn.close()
+        
+        if diagnostics is not None:
+            diagnostics.count("catalog_size", len(self._search_index.products) if self._search_index else 0)
+            diagnostics.count("candidates", stats.get("candidates", 0))
+            diagnostics.count("above_threshold", len(scored))
+            diagnostics.count("returned", len(result["matches"]))
+            diagnostics.record_scores("candidates", stats.get("candidate_scores", []), threshold=0.3)
+            result["diagnostics"] = diagnostics.to_dict()
+            log_diagnostics(
+                query, "success" if result["success"] else "error", result["diagnostics"],
+                category=category, product_ids=[match["product_id"] for match in result["matches"]]
+            )
+        
+        return result
+    
+    def findSubstitutes(self, product_id: str, limit: int = 5) -> Dict[str, Any]:
+        """Find in-stock alternatives of the same type from the precomputed similarity table"""
+        conn = connect(self.db_path)
+        
+        try:
+            # Same lock as the index refresh, so the staleness check and the
+            # rebuild see one index version
+            with self._index_lock:
+                refresh_similarity_table(conn, self._sync_search_index(conn))
+            
+            source = self.get_product_by_id(product_id)
+            if source is None:
+                return {
+                    "success": False,
+                    "error": f"Product {product_id} not found",
+                    "substitutes": [],
+                    "total_found": 0
+                }
+            
+            # One primary-key range scan on (product_id, rank), stock checked at read time
+            cursor = conn.execute("""
+            SELECT p.product_id, p.product_name, p.product_type, p.price, p.description, p.stock_quantity, s.score
+            FROM Ngram_Similarity s
+            JOIN Products p ON p.product_id = s.similar_product_id
+            WHERE s.product_id = ? AND p.stock_quantity > 0
+            ORDER BY s.rank
+            LIMIT ?
+            """, (product_id, limit))
+            
+            substitutes = [
+                dict(zip(("product_id", "product_name", "product_type", "price", "description", "stock_quantity"), row[:6]),
+                     match_score=round(row[6], 2))
+                for row in cursor.fetchall()
+            ]
+            
+            return {
+                "success": True,
+                "product": source,
+                "substitutes": substitutes,
+                "total_found": len(substitutes)
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "substitutes": [],
+                "total_found": 0
+            }
+        finally:
+            conn.close()
     
     def get_product_by_id(self, product_id: str) -> Optional[Dict[str, Any]]:
         """Get product details by ID"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -168,7 +215,7 @@ class BurgeriaOrderBot:
     
     def get_set_components(self, set_product_id: str) -> List[Dict[str, Any]]:
         """Get components of a set product"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -196,7 +243,7 @@ class BurgeriaOrderBot:
 
     def get_changeable_options(self, component_type: str) -> List[Dict[str, Any]]:
         """Get available options for component change (sides/beverages)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -275,7 +322,7 @@ class BurgeriaOrderBot:
         if modifications is None:
             modifications = []
             
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -373,6 +420,7 @@ class BurgeriaOrderBot:
                             component_modifications[new_component["product_type"]] = mod
 
                 # Save each component individually
+                begin_write(conn)
                 for comp_type, component in set_component_map.items():
                     comp_cart_item_id = str(uuid.uuid4())
                     comp_base_price = component["price"]
@@ -451,6 +499,7 @@ class BurgeriaOrderBot:
                 cart_item_id = str(uuid.uuid4())
 
                 # Insert into cart
+                begin_write(conn)
                 cursor.execute("""
                 INSERT INTO Cart (
                     cart_item_id, session_id, product_id, product_name, order_type,
@@ -494,7 +543,7 @@ class BurgeriaOrderBot:
     
     def getCartDetails(self, session_id: str) -> Dict[str, Any]:
         """Get current cart contents for a session"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -565,10 +614,11 @@ class BurgeriaOrderBot:
     def clearCart(self, session_id: str, cart_item_id: Optional[str] = None, 
                   clear_all: bool = False) -> Dict[str, Any]:
         """Clear cart completely or remove specific item"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
+            begin_write(conn)
             if clear_all:
                 # Remove all items for session
                 cursor.execute("SELECT COUNT(*) FROM Cart WHERE session_id = ?", (session_id,))
@@ -623,7 +673,7 @@ class BurgeriaOrderBot:
                       modifications: Optional[List[Dict]] = None,
                       action: str = "update_quantity") -> Dict[str, Any]:
         """Update cart item quantity or modifications"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -648,6 +698,7 @@ class BurgeriaOrderBot:
                 modification_cost = sum(mod.get("price_change", 0) for mod in current_mods)
                 new_line_total = (base_price + modification_cost) * new_quantity
                 
+                begin_write(conn)
                 cursor.execute("""
                 UPDATE Cart SET quantity = ?, line_total = ?
                 WHERE cart_item_id = ? AND session_id = ?
@@ -683,7 +734,7 @@ class BurgeriaOrderBot:
     def processOrder(self, session_id: str, customer_info: Optional[Dict[str, str]] = None,
                     order_type: str = "takeout") -> Dict[str, Any]:
         """Process final order from cart"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
         
         try:
@@ -699,7 +750,8 @@ class BurgeriaOrderBot:
             total_amount = cart_details["summary"]["total_amount"]
             
             # Generate order ID
-            order_id = f"ORD_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            # (random suffix: concurrent orders within the same second must not collide)
+            order_id = f"ORD_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:4].upper()}"
             
             # Calculate estimated time (base 10 minutes + 3 minutes per item)
             estimated_time = 10 + (len(cart_items) * 3)
@@ -709,6 +761,7 @@ class BurgeriaOrderBot:
             customer_phone = customer_info.get("phone", "") if customer_info else ""
             
             # Insert order
+            begin_write(conn)
             cursor.execute("""
             INSERT INTO Orders (
                 order_id, session_id, total_amount, order_type,
@@ -760,9 +813,16 @@ class BurgeriaOrderBot:
         finally:
             conn.close()
 
+    def getStorageMetrics(self) -> Dict[str, Any]:
+        """Lock wait time / retry counters for write transactions"""
+        return {
+            "success": True,
+            "metrics": get_lock_metrics()
+        }
+
     def getOrderDetails(self, order_id: str) -> Dict[str, Any]:
         """Get detailed information about a specific order"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         cursor = conn.cursor()
 
         try:
@@ -930,7 +990,7 @@ def simple_order_system():
             all_items = search_result["matches"]
             for item in all_items:
                 # 제품명 매칭
-                score = bot.similarity(order_input, item['product_name'])
+                score = text_similarity(order_input, item['product_name'])
                 if score > best_score:
                     best_score = score
                     best_match = item
@@ -960,7 +1020,7 @@ def simple_order_system():
 
                             # 음료 변경 매칭
                             for bev in beverage_options:
-                                if bot.similarity(change_input, bev['product_name']) > 0.5:
+                                if text_similarity(change_input, bev['product_name']) > 0.5:
                                     modifications.append({
                                         "type": "change_component",
                                         "target_product_id": components['beverage']['product_id'],
@@ -971,7 +1031,7 @@ def simple_order_system():
 
                             # 사이드 변경 매칭
                             for side in sides_options:
-                                if bot.similarity(change_input, side['product_name']) > 0.5:
+                                if text_similarity(change_input, side['product_name']) > 0.5:
                                     modifications.append({
                                         "type": "change_component",
                                         "target_product_id": components['sides']['product_id'],
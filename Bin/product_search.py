@@ -0,0 +1,388 @@
+import re
+import hashlib
+import sqlite3
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+import z_burger  # puts Z_Burger_v01 on sys.path
+from hangul import decompose_jamo, extract_choseong, is_choseong_text
+from typo_index import SymSpellIndex
+import catalog_schema
+from catalog_schema import NGRAM_SIMILARITY_SCHEMA, get_catalog_versions, split_variant
+from query_normalizer import QueryNormalizer, ensure_synonym_table, load_synonyms
+from storage_config import begin_write
+
+# The alias/version, similarity and synonym tables live in Z_Burger_v01
+# (catalog_schema.py, query_normalizer.py), so both apps share one BurgeriaDB.
+# This app has no embeddings, so similarity neighbours are scored with n-gram
+# Dice over base names instead and kept in their own Ngram_Similarity tables
+# (the embedding neighbours stay in Product_Similarity).
+SIMILARITY_MODEL = "ngram-dice"
+SIMILARITY_TOP_K = 20
+
+PRODUCT_FIELDS = ("product_id", "product_name", "product_type", "price", "description", "stock_quantity")
+
+NGRAM_SIZE = 2
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+# Typo correction limits (in jamo, Z_Burger_v01/typo_index.py SymSpellIndex): shorter
+# queries are not corrected, queries shorter than TYPO_LONG_LENGTH only allow one edit
+TYPO_MAX_DISTANCE = 2
+TYPO_MIN_LENGTH = 4
+TYPO_LONG_LENGTH = 8
+TYPO_PREFIX_LENGTH = 12
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, NFC-normalize and drop spaces/punctuation"""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return _NON_WORD.sub("", text)
+
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> Counter:
+    """Multiset of character n-grams of an already normalized string"""
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def text_similarity(a: str, b: str, n: int = NGRAM_SIZE) -> float:
+    """Dice coefficient on character n-grams of two raw strings (unigrams for short ones)"""
+    a, b = normalize_text(a), normalize_text(b)
+    if min(len(a), len(b)) < n:
+        n = 1
+    grams_a, grams_b = char_ngrams(a, n), char_ngrams(b, n)
+    total = sum(grams_a.values()) + sum(grams_b.values())
+    if not total:
+        return 0.0
+    return 2.0 * sum((grams_a & grams_b).values()) / total
+
+
+class NgramIndex:
+    """
+    Character n-gram inverted index over product names, descriptions and aliases.
+
+    Every searchable text is a document. A query only touches the posting lists of
+    its own n-grams, which gives the candidate documents together with their n-gram
+    overlap. Candidates are scored with the Dice coefficient on n-gram multisets,
+    2 * overlap / (|query grams| + |document grams|), which plays the same role as
+    SequenceMatcher.ratio() without comparing full strings. A product's score is the
+    best score over its documents.
+
+    Single-character queries have no bigrams, so a unigram index is kept as well.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]], aliases: List[Tuple[str, str]], n: int = NGRAM_SIZE,
+                 synonyms: Optional[Dict[str, str]] = None):
+        self.n = n
+        self.products = products
+        self.version = (0, 0)
+        self._position = {p["product_id"]: pos for pos, p in enumerate(products)}
+
+        # doc_id -> (product position, gram counts for n-grams and unigrams)
+        self._doc_product: List[int] = []
+        self._doc_sizes: List[Tuple[int, int]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._unigram_postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+        for pos, product in enumerate(products):
+            self._add_document(pos, product["product_name"])
+            self._add_document(pos, product["description"])
+
+        for alias, product_id in aliases:
+            if product_id in self._position:
+                self._add_document(self._position[product_id], alias)
+
+        # Base-name n-grams ("콜라 (미디움)" -> "콜라") for product-to-product similarity,
+        # so shared size/option suffixes do not outweigh the product itself
+        self._base_grams: List[Counter] = []
+        self._base_postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for pos, product in enumerate(products):
+            grams = char_ngrams(normalize_text(split_variant(product["product_name"])[0]), n)
+            self._base_grams.append(grams)
+            for gram, count in grams.items():
+                self._base_postings[gram].append((pos, count))
+
+        # Typo dictionary (symmetric delete over jamo) and choseong index,
+        # built from names and aliases
+        self._typo_terms: Dict[str, str] = {}
+        self._typo = SymSpellIndex(max_distance=TYPO_MAX_DISTANCE, prefix_length=TYPO_PREFIX_LENGTH)
+        self._choseong: Dict[str, set] = defaultdict(set)
+
+        names = [(p["product_name"], pos) for pos, p in enumerate(products)]
+        names += [(alias, self._position[pid]) for alias, pid in aliases if pid in self._position]
+        for text, pos in names:
+            key = normalize_text(text)
+            words = [w for w in re.split(r"[^\w]+", unicodedata.normalize("NFC", text).lower()) if len(w) >= 2]
+            for term in [key] + words:
+                self._add_typo_term(term)
+            if key:
+                self._choseong[extract_choseong(key)].add(pos)
+
+        name_texts = [text for text, _ in names]
+        self.normalizer = QueryNormalizer(
+            name_texts, name_texts + [p["description"] for p in products if p["description"]], synonyms
+        )
+
+    def _add_document(self, pos: int, text: Optional[str]) -> None:
+        text = normalize_text(text)
+        if not text:
+            return
+
+        doc_id = len(self._doc_product)
+        grams = char_ngrams(text, self.n)
+        unigrams = char_ngrams(text, 1)
+
+        self._doc_product.append(pos)
+        self._doc_sizes.append((sum(grams.values()), len(text)))
+        for gram, count in grams.items():
+            self._postings[gram].append((doc_id, count))
+        for gram, count in unigrams.items():
+            self._unigram_postings[gram].append((doc_id, count))
+
+    def _add_typo_term(self, term: str) -> None:
+        jamo = decompose_jamo(term)
+        if not jamo or jamo in self._typo_terms:
+            return
+        self._typo_terms[jamo] = term
+        self._typo.add(jamo)
+
+    def correct(self, query: str) -> Optional[str]:
+        """
+        Correct a misspelled query ('양념감쟈' -> '양념감자') with a symmetric-delete
+        lookup in jamo space. Returns None if the query is already a known term,
+        or if there is no single closest term.
+        """
+        jamo = decompose_jamo(normalize_text(query))
+        if len(jamo) < TYPO_MIN_LENGTH or jamo in self._typo_terms or is_choseong_text(jamo):
+            return None
+
+        max_distance = 1 if len(jamo) < TYPO_LONG_LENGTH else TYPO_MAX_DISTANCE
+        matches = self._typo.lookup(jamo, max_distance)
+        if not matches or (len(matches) > 1 and matches[1][1] == matches[0][1]):
+            return None
+        return self._typo_terms[matches[0][0]]
+
+    def _choseong_scores(self, query: str) -> Dict[int, float]:
+        """Products whose name/alias choseong starts with the query (score = coverage)"""
+        best: Dict[int, float] = {}
+        for choseong, positions in self._choseong.items():
+            if choseong.startswith(query):
+                for pos in positions:
+                    best[pos] = max(best.get(pos, 0.0), len(query) / len(choseong))
+        return best
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "NgramIndex":
+        """Build the index from every product (stock is checked at query time)"""
+        cursor = conn.cursor()
+        cursor.execute("""
+        SELECT product_id, product_name, product_type, price, description, stock_quantity
+        FROM Products
+        """)
+        products = [dict(zip(PRODUCT_FIELDS, row)) for row in cursor.fetchall()]
+
+        cursor.execute("SELECT alias, product_id FROM Product_Aliases")
+        aliases = cursor.fetchall()
+
+        return cls(products, aliases, synonyms=load_synonyms(conn))
+
+    def refresh_stock(self, conn: sqlite3.Connection) -> None:
+        """Reload stock quantities only"""
+        for product_id, stock_quantity in conn.execute("SELECT product_id, stock_quantity FROM Products"):
+            pos = self._position.get(product_id)
+            if pos is not None:
+                self.products[pos]["stock_quantity"] = stock_quantity
+
+    def search(self, query: str, category: Optional[str] = None, threshold: float = 0.3,
+               stats: Optional[Dict[str, Any]] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Score candidate products for the query.
+
+        If stats is given, it receives the number of candidate products touched by the
+        posting lists and their scores before the stock/category/threshold filter.
+
+        Returns:
+            [(product, score), ...] for in-stock products scoring above threshold,
+            sorted by score descending
+        """
+        query = normalize_text(query)
+        if not query:
+            return []
+
+        best = self._choseong_scores(query) if is_choseong_text(query) else self._dice_scores(query)
+        if stats is not None:
+            stats["candidates"] = len(best)
+            stats["candidate_scores"] = list(best.values())
+
+        return self._filter_results(best, category, threshold)
+
+    def _dice_scores(self, query: str) -> Dict[int, float]:
+        """Best Dice score per product position for a normalized query (stock not checked)"""
+        if len(query) >= self.n:
+            query_grams = char_ngrams(query, self.n)
+            postings, size_index = self._postings, 0
+        else:
+            query_grams = char_ngrams(query, 1)
+            postings, size_index = self._unigram_postings, 1
+        query_size = sum(query_grams.values())
+
+        # Candidate documents with their n-gram multiset overlap
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram, query_count in query_grams.items():
+            for doc_id, doc_count in postings.get(gram, ()):
+                overlap[doc_id] += min(query_count, doc_count)
+
+        best: Dict[int, float] = {}
+        for doc_id, common in overlap.items():
+            score = 2.0 * common / (query_size + self._doc_sizes[doc_id][size_index])
+            pos = self._doc_product[doc_id]
+            if score > best.get(pos, 0.0):
+                best[pos] = score
+
+        return best
+
+    def similar_products(self, product_id: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Products of the same type whose base name (size/option suffix dropped) is
+        closest to this product's, regardless of stock. The score is the Dice
+        coefficient of the two base names' n-grams, so it is symmetric.
+
+        Returns:
+            [(product_id, score), ...] sorted by score descending, at most top_k
+        """
+        pos = self._position.get(product_id)
+        if pos is None:
+            return []
+
+        grams = self._base_grams[pos]
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram, query_count in grams.items():
+            for other, count in self._base_postings[gram]:
+                overlap[other] += min(query_count, count)
+
+        product = self.products[pos]
+        size = sum(grams.values())
+        scored = [
+            (self.products[other]["product_id"], 2.0 * common / (size + sum(self._base_grams[other].values())))
+            for other, common in overlap.items()
+            if other != pos and self.products[other]["product_type"] == product["product_type"]
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:top_k]
+
+    def _filter_results(self, best: Dict[int, float], category: Optional[str], threshold: float) -> List[Tuple[Dict[str, Any], float]]:
+        results = []
+        for pos, score in best.items():
+            product = self.products[pos]
+            if score <= threshold or product["stock_quantity"] <= 0:
+                continue
+            if category and product["product_type"] != category:
+                continue
+            results.append((product, score))
+
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results
+
+
+def ensure_similarity_table(conn: sqlite3.Connection) -> None:
+    """Create the product-to-product similarity tables"""
+    conn.executescript(NGRAM_SIMILARITY_SCHEMA)
+
+
+def _similarity_content_hash(product: Dict[str, Any]) -> str:
+    text = "\x00".join(str(product[field] or "") for field in ("product_name", "product_type"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def refresh_similarity_table(conn: sqlite3.Connection, index: NgramIndex, top_k: int = SIMILARITY_TOP_K) -> int:
+    """
+    Bring Ngram_Similarity up to date with the index's catalog version.
+
+    Only products whose content hash changed, plus products whose stored list
+    contains a changed product or could now include one, are recomputed.
+    n-gram Dice is symmetric, so a changed product's own list also gives the
+    scores other products would assign to it.
+
+    Returns:
+        Number of products recomputed
+    """
+    ensure_similarity_table(conn)
+    build = conn.execute(
+        "SELECT catalog_version, model, top_k FROM Ngram_Similarity_Build WHERE id = 1"
+    ).fetchone()
+    full = build is None or build[1] != SIMILARITY_MODEL or build[2] != top_k
+    if not full and build[0] == index.version[0]:
+        return 0
+
+    hashes = {p["product_id"]: _similarity_content_hash(p) for p in index.products}
+    stored = dict(conn.execute("SELECT product_id, content_hash FROM Ngram_Similarity_State"))
+    stale = set(stored) - set(hashes)
+
+    if full:
+        affected = set(hashes)
+        stale = set(stored)
+    else:
+        dirty = {product_id for product_id, digest in hashes.items() if stored.get(product_id) != digest}
+        affected = set(dirty)
+        changed = dirty | stale
+
+        neighbours: Dict[str, set] = defaultdict(set)
+        kth_score: Dict[str, float] = {}
+        for product_id, similar_id, score in conn.execute(
+            "SELECT product_id, similar_product_id, score FROM Ngram_Similarity ORDER BY product_id, rank"
+        ):
+            neighbours[product_id].add(similar_id)
+            kth_score[product_id] = score
+
+        affected |= {product_id for product_id, ids in neighbours.items() if ids & changed and product_id in hashes}
+        for product_id in dirty:
+            for other_id, score in index.similar_products(product_id, len(index.products)):
+                if len(neighbours[other_id]) < top_k or score > kth_score.get(other_id, 0.0):
+                    affected.add(other_id)
+
+    # Write lock up front (BEGIN IMMEDIATE), like the other similarity writer
+    begin_write(conn)
+    try:
+        conn.executemany(
+            "DELETE FROM Ngram_Similarity WHERE product_id = ?",
+            [(product_id,) for product_id in affected | stale]
+        )
+        conn.executemany(
+            "DELETE FROM Ngram_Similarity_State WHERE product_id = ?",
+            [(product_id,) for product_id in stale]
+        )
+        for product_id in affected:
+            conn.executemany(
+                "INSERT INTO Ngram_Similarity (product_id, rank, similar_product_id, score) VALUES (?, ?, ?, ?)",
+                [
+                    (product_id, rank, similar_id, round(score, 6))
+                    for rank, (similar_id, score) in enumerate(index.similar_products(product_id, top_k), start=1)
+                ]
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO Ngram_Similarity_State (product_id, content_hash) VALUES (?, ?)",
+            [(product_id, hashes[product_id]) for product_id in affected]
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO Ngram_Similarity_Build (id, catalog_version, model, top_k) VALUES (1, ?, ?, ?)",
+            (index.version[0], SIMILARITY_MODEL, top_k)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return len(affected)
+
+
+def ensure_catalog_version(conn: sqlite3.Connection) -> bool:
+    """Create alias/version/synonym tables and triggers. Returns False if there is no Products table"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Products'"
+    ).fetchone()
+    if not exists:
+        return False
+
+    catalog_schema.ensure_catalog_version(conn)
+    ensure_synonym_table(conn)
+    return True
@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import z_burger  # puts Z_Burger_v01 on sys.path
+from db_fixtures import create_test_db, remove_db
+from order_bot import BurgeriaOrderBot
+from product_search import get_catalog_versions
+from catalog_schema import SIMILARITY_SCHEMA
+
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "국내산 한우로 만든 불고기 버거"),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "칠리 시즈닝 양념감자"),
+    ("B00005", "CAT_SIDES", "양념감자 (치즈)", "sides", 2600, 10, "치즈 시즈닝 양념감자"),
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 0, "시원한 콜라"),
+]
+
+
+def test_find_product():
+    """n-gram index search keeps the findProduct result structure"""
+    db_path = create_test_db(PRODUCTS)
+    bot = BurgeriaOrderBot(db_path)
+
+    print("=== findProduct n-gram 검색 테스트 ===")
+
+    result = bot.findProduct("양념감자")
+    print([(m["product_name"], m["match_score"]) for m in result["matches"]])
+    assert result["success"] and result["total_found"] == 2
+    assert {m["product_id"] for m in result["matches"]} == {"B00004", "B00005"}
+    assert set(result["matches"][0]) == {
+        "product_id", "product_name", "product_type", "price", "description", "stock_quantity", "match_score"
+    }
+
+    assert bot.findProduct("한우 불고기")["matches"][0]["product_id"] == "A00001", "spacing is ignored"
+    assert bot.findProduct("양념감자", category="burger")["total_found"] == 0, "category filter"
+    assert bot.findProduct("콜라")["total_found"] == 0, "out-of-stock products are skipped"
+    assert bot.findProduct("아메리카노")["total_found"] == 0, "nothing above the 0.3 threshold"
+
+    # Stock and alias changes are picked up without recreating the bot
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Products SET stock_quantity = 3 WHERE product_id = 'C00001'")
+    conn.execute("INSERT INTO Product_Aliases (alias, product_id) VALUES ('코크', 'C00001')")
+    conn.commit()
+    conn.close()
+
+    assert bot.findProduct("콜라")["matches"][0]["product_id"] == "C00001", "restocked product is found"
+    assert bot.findProduct("코크")["matches"][0]["match_score"] == 1.0, "alias match"
+
+    # Typo and choseong queries
+    result = bot.findProduct("한우불고기버가")
+    assert result["corrected_query"] == "한우불고기버거" and result["matches"][0]["product_id"] == "A00001"
+    assert bot.findProduct("양념감쟈")["total_found"] == 2, "jamo typo is corrected before scoring"
+    assert bot.findProduct("ㅎㅇㅂㄱㄱ")["matches"][0]["product_id"] == "A00001", "choseong prefix search"
+
+    # Query normalization: filler, quantity, particles, synonyms and spacing
+    result = bot.findProduct("한우 불고기 버거 하나 주세요")
+    assert result["normalized_query"] == "한우불고기버거" and result["requested_quantity"] == 1
+    assert result["matches"][0]["match_score"] == 1.0, "canonical form is an exact name match"
+    result = bot.findProduct("감튀 두 개 주세요", category="sides")
+    assert result["normalized_query"] == "포테이토" and result["requested_quantity"] == 2, "default synonym"
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT OR REPLACE INTO Query_Synonyms (term, canonical) VALUES ('감튀', '양념감자')")
+    conn.commit()
+    conn.close()
+    result = bot.findProduct("감튀 두 개 주세요", category="sides")
+    assert result["normalized_query"] == "양념감자" and result["total_found"] == 2, "synonym change rebuilds the index"
+    assert bot.findProduct("코크 주세요")["normalized_query"] == "코크", "an alias wins over a synonym"
+    assert bot.findProduct("치즈가 들어간 거")["normalized_query"] == "치즈 들어간 거", "particle stripped"
+    assert "normalized_query" not in bot.findProduct("양념감자")
+
+    # Substitutes: same type, in stock, refreshed after catalog changes
+    result = bot.findSubstitutes("B00004")
+    assert [s["product_id"] for s in result["substitutes"]] == ["B00005"], "same-type in-stock neighbour"
+    assert bot.findSubstitutes("A00001")["total_found"] == 0, "no other burger"
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    INSERT INTO Products (product_id, category_id, product_name, product_type, price, stock_quantity, description)
+    VALUES ('B00006', 'CAT_SIDES', '양념감자 (어니언)', 'sides', 2600, 10, '어니언 시즈닝 양념감자')
+    """)
+    conn.execute("UPDATE Products SET stock_quantity = 0 WHERE product_id = 'B00005'")
+    conn.commit()
+    conn.close()
+    assert [s["product_id"] for s in bot.findSubstitutes("B00004")["substitutes"]] == ["B00006"], \
+        "new product is added incrementally, sold-out neighbour is skipped"
+    assert not bot.findSubstitutes("Z99999")["success"]
+
+    # Opt-in diagnostics: stage timings, candidate counts, score distribution, index cache flag
+    result = bot.findProduct("양념감자", explain=True)
+    diagnostics = result["diagnostics"]
+    assert set(diagnostics["timings_ms"]) == {"index", "normalize", "correct", "search"}
+    assert diagnostics["cache"]["search_index"] == "hit"
+    assert diagnostics["counts"]["candidates"] >= diagnostics["counts"]["returned"] == result["total_found"]
+    assert round(diagnostics["scores"]["candidates"]["max"], 2) == result["matches"][0]["match_score"]
+    assert "diagnostics" not in bot.findProduct("양념감자"), "off by default"
+
+    # Concurrent searches while stock changes: the cached index ends on the latest versions
+    errors = []
+
+    def search():
+        for _ in range(20):
+            result = bot.findProduct("양념감자")
+            if not result["success"]:
+                errors.append(result)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    conn = sqlite3.connect(db_path)
+    for stock in range(1, 11):
+        conn.execute("UPDATE Products SET stock_quantity = ? WHERE product_id = 'B00004'", (stock,))
+        conn.commit()
+    for thread in threads:
+        thread.join()
+    bot.findProduct("양념감자")
+    assert not errors, errors
+    assert bot._search_index.version == get_catalog_versions(conn), "no stale version written back"
+
+    # Concurrent substitute lookups while the catalog changes: one rebuild at a time, no lock errors
+    def substitutes():
+        for _ in range(10):
+            result = bot.findSubstitutes("B00004")
+            if not result["success"]:
+                errors.append(result)
+
+    threads = [threading.Thread(target=substitutes) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for price in range(2601, 2606):
+        conn.execute("UPDATE Products SET price = ? WHERE product_id = 'B00006'", (price,))
+        conn.commit()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    assert [s["product_id"] for s in bot.findSubstitutes("B00004")["substitutes"]] == ["B00006"]
+    conn.close()
+
+    remove_db(db_path)
+
+    # Size suffixes do not decide substitutes, and the n-gram neighbours do not
+    # touch the embedding-based Product_Similarity rows of the other app
+    db_path = create_test_db([
+        ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 10, ""),
+        ("C00002", "CAT_BEVERAGE", "콜라 (라지)", "beverage", 2500, 10, ""),
+        ("C00003", "CAT_BEVERAGE", "사이다 (미디움)", "beverage", 2000, 10, ""),
+    ])
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SIMILARITY_SCHEMA)
+    conn.execute("INSERT INTO Product_Similarity_Build (id, catalog_version, model, top_k) VALUES (1, 0, 'embedding', 20)")
+    conn.commit()
+    bot = BurgeriaOrderBot(db_path)
+
+    substitutes = bot.findSubstitutes("C00001")["substitutes"]
+    print([(s["product_name"], s["match_score"]) for s in substitutes])
+    assert [s["product_id"] for s in substitutes][0] == "C00002", "콜라 (라지) ranks above 사이다 (미디움)"
+    assert "C00003" not in [s["product_id"] for s in substitutes], "a shared size suffix alone is not similar"
+    assert conn.execute("SELECT model FROM Product_Similarity_Build").fetchall() == [("embedding",)]
+    assert conn.execute("SELECT COUNT(*) FROM Product_Similarity").fetchone()[0] == 0
+    conn.close()
+
+    remove_db(db_path)
+    print("✅ 모든 테스트 통과!")
+
+
+if __name__ == "__main__":
+    test_find_product()
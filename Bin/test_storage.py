@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import threading
+import z_burger  # puts Z_Burger_v01 on sys.path
+from db_fixtures import create_test_db, remove_db
+from order_bot import BurgeriaOrderBot
+from storage_config import begin_write, get_storage_settings, lock_metrics
+import migrations
+from migrations import get_schema_version, LATEST_VERSION
+
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 100, "국내산 한우 불고기 버거"),
+]
+
+
+def test_storage():
+    """WAL pragmas, lock retry metrics and concurrent cart/order writes"""
+    db_path = create_test_db(PRODUCTS, set_items=[])
+    bot = BurgeriaOrderBot(db_path)
+
+    print("=== SQLite 저장소 설정 테스트 ===")
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal", "WAL is persisted in the file"
+    # One migration list for both apps (Z_Burger_v01/migrations.py)
+    assert os.path.dirname(os.path.abspath(migrations.__file__)) == z_burger.Z_BURGER_DIR
+    schema_version = get_schema_version(conn)
+    assert schema_version["applied"][-1] == LATEST_VERSION and not schema_version["pending"], schema_version
+    conn.close()
+
+    # A second connection holding the write lock: retries run out, then succeed once released
+    holder = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    conn = sqlite3.connect(db_path, timeout=0)
+    settings = dict(get_storage_settings(), busy_timeout_ms=0, backoff_ms=5, backoff_max_ms=20)
+    lock_metrics.reset()
+    try:
+        begin_write(conn, dict(settings, lock_retries=2))
+        assert False, "lock error after retries"
+    except sqlite3.OperationalError:
+        pass
+    timer = threading.Timer(0.03, holder.rollback)
+    timer.start()
+    begin_write(conn, dict(settings, lock_retries=50))
+    timer.join()
+    conn.rollback()
+    conn.close()
+    holder.close()
+    metrics = bot.getStorageMetrics()["metrics"]
+    print(metrics)
+    assert metrics["lock_failures"] == 1 and metrics["contended_transactions"] == 2
+    assert metrics["lock_retries"] > 2 and metrics["lock_wait_ms_max"] > 0
+
+    # Concurrent addToCart / updateCartItem / processOrder from several threads
+    errors = []
+
+    def worker(index):
+        session_id = f"session_{index}"
+        for _ in range(3):
+            result = bot.addToCart(session_id, "A00001")
+            if not result["success"]:
+                errors.append(result)
+        result = bot.updateCartItem(session_id, result.get("cart_item_id"), new_quantity=2)
+        if not result["success"]:
+            errors.append(result)
+        result = bot.processOrder(session_id)
+        if not result["success"]:
+            errors.append(result)
+
+    lock_metrics.reset()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM Orders").fetchone()[0] == 8
+    assert conn.execute("SELECT COUNT(*) FROM Cart").fetchone()[0] == 0
+    conn.close()
+    metrics = bot.getStorageMetrics()["metrics"]
+    print(metrics)
+    assert metrics["write_transactions"] == 8 * 5 and metrics["lock_failures"] == 0
+
+    remove_db(db_path)
+    print("✅ 모든 테스트 통과!")
+
+
+if __name__ == "__main__":
+    test_storage()
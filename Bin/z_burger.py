@@ -0,0 +1,15 @@
+"""
+Access to the shared modules in Z_Burger_v01
+
+Bin and Z_Burger_v01 run against the same BurgeriaDB, so code both apps need
+(schema, storage settings, Korean text helpers, test fixtures) lives once in
+Z_Burger_v01. Importing this module appends that directory to sys.path; Bin's
+own modules still take precedence.
+"""
+import os
+import sys
+
+Z_BURGER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Z_Burger_v01")
+
+if Z_BURGER_DIR not in sys.path:
+    sys.path.append(Z_BURGER_DIR)
@@ -213,3 +213,23 @@ INSERT INTO Set_Items (set_product_id, component_product_id, is_default, quantit
 ('G00018', 'A00018', 1, 1), ('G00018', 'B00001', 1, 1), ('G00018', 'C00001', 1, 1),
 ('G00019', 'A00019', 1, 1), ('G00019', 'B00001', 1, 1), ('G00019', 'C00001', 1, 1);
 
+
+-- 4. Product_Aliases 데이터 INSERT
+-- 상품명 외에 고객이 자주 부르는 이름 (findProduct 정확 일치 검색에 사용)
+CREATE TABLE IF NOT EXISTS Product_Aliases (
+    alias TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    PRIMARY KEY (alias, product_id),
+    FOREIGN KEY(product_id) REFERENCES Products(product_id)
+);
+
+INSERT INTO Product_Aliases (alias, product_id) VALUES
+('한우버거', 'A00001'),
+('새우버거', 'A00006'),
+('치즈버거', 'A00009'),
+('더블엑스투', 'A00016'),
+('모짜렐라버거', 'A00017'),
+('티렉스버거', 'A00019'),
+('콜슬로', 'B00009'),
+('아아', 'C00012'),
+('뜨아', 'C00011');
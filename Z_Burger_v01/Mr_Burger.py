@@ -9,7 +9,7 @@ import io
 import json
 from openai import OpenAI
 from dotenv import load_dotenv
-from db_functions import findProduct, addToCart, getSetComposition
+from db_functions import findProduct, findProducts, browseProducts, findSubstitutes, addToCart, getSetComposition
 
 # Windows 인코딩 문제 해결
 if sys.platform == 'win32':
@@ -46,6 +46,99 @@ tools = [
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "findProducts",
+            "description": "여러 메뉴를 한 번에 검색합니다. 고객이 한 문장에 여러 메뉴를 말할 때 findProduct를 여러 번 호출하는 대신 사용합니다. (예: '불고기버거 2개랑 콜라 하나, 양념감자 칠리')",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "description": "검색할 메뉴 목록 (수량은 제외하고 메뉴명만)",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "query": {
+                                    "type": "string",
+                                    "description": "검색할 메뉴명 (예: 불고기버거, 콜라)"
+                                },
+                                "category": {
+                                    "type": "string",
+                                    "description": "카테고리 필터 (선택사항)",
+                                    "enum": ["burger", "sides", "beverage", "set"]
+                                }
+                            },
+                            "required": ["query"]
+                        }
+                    }
+                },
+                "required": ["queries"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "browseProducts",
+            "description": "가격/카테고리 조건으로 메뉴를 찾고 정렬합니다. 특정 메뉴명이 아니라 조건으로 묻는 경우에 사용합니다. (예: '5000원 이하 버거 뭐 있어?', '제일 싼 음료')",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "category": {
+                        "type": "string",
+                        "description": "카테고리 필터 (선택사항)",
+                        "enum": ["burger", "sides", "beverage", "set"]
+                    },
+                    "min_price": {
+                        "type": "integer",
+                        "description": "최소 가격 (원, 이상)"
+                    },
+                    "max_price": {
+                        "type": "integer",
+                        "description": "최대 가격 (원, 이하)"
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "description": "정렬 기준 (기본값: query가 있으면 relevance, 없으면 price_asc)",
+                        "enum": ["price_asc", "price_desc", "name", "relevance"]
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "최대 결과 개수 (기본값: 10, '제일 싼'이면 1)",
+                        "default": 10
+                    },
+                    "query": {
+                        "type": "string",
+                        "description": "함께 적용할 검색어 (선택사항, 예: '매콤한')"
+                    }
+                }
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "findSubstitutes",
+            "description": "품절된 메뉴 대신 주문할 수 있는 비슷한 메뉴(같은 종류, 재고 있음)를 유사도 순으로 찾습니다. addToCart가 품절로 실패했을 때 사용합니다.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "product_id": {
+                        "type": "string",
+                        "description": "기준 상품 ID (예: C00001)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "최대 추천 개수 (기본값: 5)",
+                        "default": 5
+                    }
+                },
+                "required": ["product_id"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -110,7 +203,27 @@ def execute_function(function_name: str, arguments: dict) -> dict:
     if function_name == "findProduct":
         return findProduct(
             query=arguments["query"],
-            category=arguments.get("category")
+            category=arguments.get("category"),
+            session_id=arguments.get("session_id")
+        )
+    elif function_name == "findProducts":
+        return findProducts(
+            queries=arguments["queries"],
+            session_id=arguments.get("session_id")
+        )
+    elif function_name == "browseProducts":
+        return browseProducts(
+            category=arguments.get("category"),
+            min_price=arguments.get("min_price"),
+            max_price=arguments.get("max_price"),
+            sort_by=arguments.get("sort_by"),
+            limit=arguments.get("limit", 10),
+            query=arguments.get("query")
+        )
+    elif function_name == "findSubstitutes":
+        return findSubstitutes(
+            product_id=arguments["product_id"],
+            limit=arguments.get("limit", 5)
         )
     elif function_name == "addToCart":
         return addToCart(
@@ -146,15 +259,19 @@ def chat_with_llm(user_message: str, conversation_history: list, session_id: str
     - product_id를 임의로 추측하거나 변경하지 마세요
     - 고객이 수량을 명시하면 (예: "2개", "3개") addToCart의 quantity 파라미터에 정확히 반영하세요
     - 수량 언급이 없으면 기본값 1개로 처리하세요
+    - findProduct 결과에 requested_quantity가 있으면 검색어에 들어 있던 수량이므로 quantity로 사용하세요
 
     **주문 프로세스:**
     1. 고객이 메뉴를 요청하면 findProduct로 검색
+       (한 번에 여러 메뉴를 말하면 findProducts로 한 번에 검색, 결과는 queries 순서와 같음)
+       (가격/카테고리 조건으로 물으면 browseProducts 사용, 예: "5000원 이하 버거" → max_price=5000, category="burger")
     2. findProduct 결과의 status 확인:
        - "FOUND": 명확한 1개 결과 → 바로 진행
        - "AMBIGUOUS": 여러 후보 존재 → 고객에게 선택지 제시 (아래 참고)
        - "NOT_FOUND": 검색 실패 → 다른 메뉴 추천
     3. 고객에게 가격과 정보를 안내
     4. 고객이 주문을 확정하면 addToCart 호출
+    5. addToCart가 품절로 실패하면 findSubstitutes(product_id)로 비슷한 메뉴를 찾아 추천
 
     **모호한 검색 처리 (Task 3.2 - AMBIGUOUS 상태):**
     findProduct 결과의 status가 "AMBIGUOUS"이면 여러 유사한 상품이 있다는 의미입니다.
@@ -269,8 +386,8 @@ def chat_with_llm(user_message: str, conversation_history: list, session_id: str
                 function_name = tool_call.function.name
                 arguments = json.loads(tool_call.function.arguments)
 
-                # addToCart 함수 호출 시 session_id 자동 주입
-                if function_name == "addToCart" and session_id:
+                # addToCart / 검색 함수 호출 시 session_id 자동 주입 (검색 로그의 선택 상품 연결용)
+                if function_name in ("addToCart", "findProduct", "findProducts") and session_id:
                     arguments["session_id"] = session_id
 
                 print(f"[DEBUG] 함수 호출: {function_name}({arguments})")
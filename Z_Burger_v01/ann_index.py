@@ -0,0 +1,251 @@
+"""
+근사 최근접 이웃 (ANN) 인덱스 - IVF (Inverted File)
+
+상품 수가 수만 개로 늘어나면 전체 행렬을 매번 곱하는 정확 검색은 지연 시간이 커진다.
+IVF 는 k-means 로 상품 벡터를 n_lists 개 군집으로 나누고, 검색 시
+쿼리와 가까운 nprobe 개 군집의 상품만 점수를 계산한다.
+
+- nprobe 가 클수록 재현율(recall) ↑, 지연 시간 ↑ (nprobe = n_lists 이면 정확 검색과 동일)
+- recall_report() 로 정확 검색 대비 재현율/지연 시간을 nprobe 별로 확인할 수 있다.
+
+순수 NumPy 구현이며, 벡터는 L2 정규화되어 있다고 가정한다 (내적 = 코사인 유사도).
+
+환경변수 설정:
+    VECTOR_INDEX  = "exact" (기본값) | "ivf"
+    IVF_NPROBE    = 검색할 군집 수 (기본값: 8)
+    IVF_MIN_SIZE  = 이 상품 수 미만이면 정확 검색 사용 (기본값: 1000)
+"""
+
+import os
+import time
+import numpy as np
+from typing import Dict, Any, Optional, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_NPROBE = 8
+DEFAULT_MIN_SIZE = 1000
+KMEANS_ITERATIONS = 15
+
+# k-means 할당 단계에서 한 번에 곱할 행 수 (메모리 사용량 제한)
+_ASSIGN_CHUNK = 8192
+
+
+def get_ann_settings() -> Optional[Dict[str, int]]:
+    """환경변수로 ANN 사용 여부/파라미터 조회. 정확 검색이면 None"""
+    if os.getenv('VECTOR_INDEX', 'exact').lower() != "ivf":
+        return None
+
+    return {
+        "nprobe": int(os.getenv('IVF_NPROBE', str(DEFAULT_NPROBE))),
+        "min_size": int(os.getenv('IVF_MIN_SIZE', str(DEFAULT_MIN_SIZE)))
+    }
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """각 벡터를 가장 가까운(내적이 가장 큰) 중심에 할당"""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = vectors[start:start + _ASSIGN_CHUNK]
+        labels[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    iterations: int = KMEANS_ITERATIONS,
+    seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    코사인 유사도 기준 k-means (중심도 매 반복 L2 정규화)
+
+    Returns:
+        (centroids (k, D), labels (N,))
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, min(n_clusters, len(vectors)))
+
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    labels = _assign(vectors, centroids)
+
+    for _ in range(iterations):
+        # 군집별 벡터 합 → 정규화 = 새 중심
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_clusters)
+
+        # 빈 군집은 현재 중심과 가장 먼 벡터로 다시 시드
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            best = np.einsum("ij,ij->i", vectors, centroids[labels])
+            far = np.argsort(best)[:len(empty)]
+            sums[empty] = vectors[far]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32, copy=False)
+
+        new_labels = _assign(vectors, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    return centroids, labels
+
+
+class IVFIndex:
+    """
+    IVF 근사 검색 인덱스
+
+    - centroids: (n_lists, D) 군집 중심
+    - order: 군집 순으로 정렬된 원래 행 번호
+    - offsets: 군집 l 의 행은 order[offsets[l]:offsets[l + 1]]
+    - vectors: order 순서로 재배치한 벡터 (군집별로 연속 메모리)
+    """
+
+    def __init__(self, centroids: np.ndarray, labels: np.ndarray, matrix: np.ndarray, nprobe: int = DEFAULT_NPROBE):
+        self.centroids = centroids
+        self.order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=len(centroids))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.vectors = np.ascontiguousarray(matrix[self.order])
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        n_lists: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        정규화된 행렬로 IVF 인덱스 생성
+
+        n_lists 를 지정하지 않으면 sqrt(N) 개 군집을 사용한다.
+        """
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(matrix)))
+        centroids, labels = spherical_kmeans(matrix, n_lists, seed=seed)
+        return cls(centroids, labels, matrix, nprobe)
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        쿼리와 가까운 nprobe 개 군집의 후보 행 번호와 유사도
+
+        Returns:
+            (원래 행 번호 배열, 유사도 배열)
+        """
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            lists = np.arange(self.n_lists)
+
+        slices = [slice(self.offsets[l], self.offsets[l + 1]) for l in lists]
+        vectors = np.concatenate([self.vectors[s] for s in slices])
+        rows = np.concatenate([self.order[s] for s in slices])
+        return rows, vectors @ query
+
+    def search(self, query: np.ndarray, limit: int, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """임계값/재고 필터 없이 상위 limit개 (재현율 측정용)"""
+        rows, scores = self.candidates(query, nprobe)
+        k = min(limit, len(rows))
+        if k == 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def recall_report(
+        self,
+        matrix: np.ndarray,
+        queries: np.ndarray,
+        k: int = 5,
+        nprobes: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        정확 검색 대비 recall@k 와 쿼리당 평균 지연 시간을 nprobe 별로 측정
+
+        Args:
+            matrix: 인덱스를 만든 정규화 행렬 (정확 검색 기준)
+            queries: (Q, D) 정규화된 쿼리 벡터
+            k: 비교할 상위 개수
+            nprobes: 측정할 nprobe 값 목록 (기본값: 1, 2, 4, ... n_lists)
+        """
+        if nprobes is None:
+            nprobes = []
+            n = 1
+            while n < self.n_lists:
+                nprobes.append(n)
+                n *= 2
+            nprobes.append(self.n_lists)
+
+        # 정확 검색 결과 (기준, IVF 와 같이 쿼리 1개씩 측정)
+        k = min(k, matrix.shape[0])
+        start = time.perf_counter()
+        exact = []
+        for query in queries:
+            scores = matrix @ query
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            exact.append(set(top.tolist()))
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        report = []
+        for nprobe in nprobes:
+            start = time.perf_counter()
+            approx = [self.search(query, k, nprobe) for query in queries]
+            elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+            hits = sum(len(truth & {row for row, _ in found}) for truth, found in zip(exact, approx))
+            report.append({
+                "nprobe": nprobe,
+                "recall": round(hits / (k * len(queries)), 4),
+                "latency_ms": round(elapsed_ms, 4),
+                "exact_latency_ms": round(exact_ms, 4)
+            })
+
+        return report
+
+
+def main():
+    """현재 DB 카탈로그로 IVF 인덱스를 만들고 nprobe 별 재현율/지연 시간 출력"""
+    from db_functions import get_default_db_path
+    from search_index import get_catalog_index
+    from embedding_providers import get_embedding_provider
+
+    db_path = get_default_db_path()
+    index = get_catalog_index(db_path, get_embedding_provider().model)
+    print(f"DB 경로: {db_path}")
+    print(f"상품 수: {len(index)}")
+
+    if len(index) < 2:
+        print("❌ 임베딩이 있는 상품이 부족합니다. setup_embeddings.py 를 먼저 실행하세요.")
+        return
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(index.matrix)
+    print(f"IVF 생성: {ivf.n_lists}개 군집, {(time.perf_counter() - start) * 1000:.1f}ms\n")
+
+    # 상품 벡터에 잡음을 섞은 쿼리로 측정
+    rng = np.random.default_rng(0)
+    sample = index.matrix[rng.choice(len(index), min(200, len(index)), replace=False)]
+    queries = sample + rng.normal(scale=0.05, size=sample.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"{'nprobe':>8} {'recall@5':>10} {'ivf(ms)':>10} {'exact(ms)':>10}")
+    for row in ivf.recall_report(index.matrix, queries):
+        print(f"{row['nprobe']:>8} {row['recall']:>10.4f} {row['latency_ms']:>10.4f} {row['exact_latency_ms']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+임베딩 압축 표현 벤치마크
+
+전체 정밀도(float32, 전체 차원) 인덱스와 비교하여 각 압축 표현의
+메모리 / 쿼리당 지연 시간 / top-1 일치율을 출력한다.
+
+- float32 전체 차원 (기준)
+- int8 양자화 (+ 상위 후보 float 재계산)
+- Matryoshka 512 / 256 차원 (float32, int8)
+
+쿼리는 상품 임베딩에 잡음을 섞어 만든다. (API 호출 없음)
+메모리는 검색 시 스캔하는 표현(전체 + 파티션) 기준이며,
+int8 모드에서 재계산용으로 유지하는 float 행렬은 포함하지 않는다.
+
+사용법:
+    python benchmark_vectors.py          # 현재 DB 카탈로그
+    python benchmark_vectors.py 20000    # 카탈로그를 잡음 복제로 20000개까지 늘려 측정
+"""
+
+import sys
+import io
+import time
+import numpy as np
+from db_functions import get_default_db_path
+from search_index import CatalogIndex, get_catalog_index
+from embedding_providers import get_embedding_provider
+
+# Windows 인코딩 문제 해결
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+CONFIGURATIONS = [
+    ("float32 / 전체", {"dims": None, "quantization": "float32"}),
+    ("int8 / 전체", {"dims": None, "quantization": "int8"}),
+    ("float32 / 512", {"dims": 512, "quantization": "float32"}),
+    ("int8 / 512", {"dims": 512, "quantization": "int8"}),
+    ("float32 / 256", {"dims": 256, "quantization": "float32"}),
+    ("int8 / 256", {"dims": 256, "quantization": "int8"}),
+]
+
+QUERY_COUNT = 200
+QUERY_NOISE = 0.05
+LIMIT = 5
+
+
+def expand_catalog(index: CatalogIndex, size: int, rng: np.random.Generator):
+    """상품/벡터를 잡음 섞인 복제본으로 size 개까지 늘림"""
+    picks = rng.integers(0, len(index), size - len(index))
+    noise = rng.normal(scale=QUERY_NOISE, size=(len(picks), index.matrix.shape[1]))
+    extra = index.matrix[picks] + noise.astype(np.float32)
+
+    products = list(index.products) + [
+        dict(index.products[pos], product_id=f"{index.products[pos]['product_id']}-{n}")
+        for n, pos in enumerate(picks)
+    ]
+    return products, np.vstack([index.matrix, extra]).astype(np.float32)
+
+
+def measure(index: CatalogIndex, queries: np.ndarray):
+    """쿼리당 평균 지연 시간(ms)과 top-1 행 번호"""
+    top1 = []
+    start = time.perf_counter()
+    for query in queries:
+        ranked, _ = index.search(query, LIMIT, similarity_threshold=-1.0)
+        top1.append(ranked[0][0] if ranked else -1)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    return elapsed_ms, np.array(top1)
+
+
+def main():
+    """메인 실행 함수"""
+    print("=" * 72)
+    print("임베딩 압축 표현 벤치마크")
+    print("=" * 72)
+
+    db_path = get_default_db_path()
+    base = get_catalog_index(db_path, get_embedding_provider().model)
+    print(f"DB 경로: {db_path}")
+
+    if len(base) < 2:
+        print("❌ 임베딩이 있는 상품이 부족합니다. setup_embeddings.py 를 먼저 실행하세요.")
+        return
+
+    rng = np.random.default_rng(0)
+    products, matrix = base.products, base.matrix
+    if len(sys.argv) > 1 and int(sys.argv[1]) > len(base):
+        products, matrix = expand_catalog(base, int(sys.argv[1]), rng)
+
+    # 재고 필터가 결과에 영향을 주지 않도록 모두 재고 있음으로 측정
+    products = [dict(p, stock_quantity=max(p["stock_quantity"], 1)) for p in products]
+
+    picks = rng.choice(len(matrix), min(QUERY_COUNT, len(matrix)), replace=False)
+    queries = matrix[picks] + rng.normal(scale=QUERY_NOISE, size=(len(picks), matrix.shape[1])).astype(np.float32)
+    print(f"상품 수: {len(matrix)}, 차원: {matrix.shape[1]}, 쿼리 수: {len(queries)}\n")
+
+    print(f"{'표현':<16} {'메모리(KB)':>12} {'지연(ms)':>10} {'top-1 일치':>12}")
+    print("-" * 72)
+
+    baseline_top1 = None
+    for label, compression in CONFIGURATIONS:
+        if compression["dims"] and compression["dims"] >= matrix.shape[1]:
+            continue
+
+        index = CatalogIndex(products, matrix, version=0, compression=compression)
+        elapsed_ms, top1 = measure(index, queries)
+        if baseline_top1 is None:
+            baseline_top1 = top1
+
+        agreement = float(np.mean(top1 == baseline_top1))
+        print(f"{label:<16} {index.vector_nbytes / 1024:>12.1f} {elapsed_ms:>10.4f} {agreement:>12.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+열 지향(columnar) 상품 카탈로그 (가격/카테고리/재고 조건 검색)
+
+"5000원 이하 버거 뭐 있어?", "제일 싼 음료" 같은 질문은 유사도 검색이 아니라
+속성 필터 + 정렬 문제이므로, 전체 상품의 속성을 NumPy 배열로 보관하고
+불리언 마스크 조합과 argsort 로 바로 답한다. (상품 수천 개에서도 수십 마이크로초)
+
+- price / stock: int64 배열
+- product_type / category_id: object 배열 (== 비교로 마스크)
+- vector_row: 벡터 행렬의 행 번호 (임베딩이 없으면 -1, 시맨틱 점수 결합용)
+
+search_index.CatalogIndex 가 로드할 때 함께 만들고, 재고만 바뀌면 stock 배열만 갱신한다.
+"""
+
+import numpy as np
+from typing import Dict, Any, Optional, List, Tuple
+
+SORT_OPTIONS = ("price_asc", "price_desc", "name", "relevance")
+
+
+class ColumnarCatalog:
+    """전체 상품 속성의 열 배열 (행 순서 = products 순서)"""
+
+    def __init__(self, products: List[Dict[str, Any]], vector_rows: Optional[Dict[str, int]] = None):
+        vector_rows = vector_rows or {}
+        self.products = products
+        self.product_ids = np.array([p["product_id"] for p in products], dtype=object)
+        self.names = np.array([p["product_name"] for p in products], dtype=object)
+        self.price = np.array([p["price"] for p in products], dtype=np.int64)
+        self.product_types = np.array([p["product_type"] for p in products], dtype=object)
+        self.category_ids = np.array([p.get("category_id") for p in products], dtype=object)
+        self.stock = np.array([p["stock_quantity"] for p in products], dtype=np.int64)
+        self.vector_row = np.array([vector_rows.get(p["product_id"], -1) for p in products], dtype=np.int64)
+        self._position = {p["product_id"]: pos for pos, p in enumerate(products)}
+        # 이름 정렬은 자주 쓰이지 않으므로 처음 요청 시 계산
+        self._name_order: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def update_stock(self, product_id: str, stock_quantity: int) -> None:
+        pos = self._position.get(product_id)
+        if pos is not None:
+            self.stock[pos] = stock_quantity
+
+    def mask(
+        self,
+        category: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        category_id: Optional[str] = None,
+        in_stock: bool = True
+    ) -> np.ndarray:
+        """조건을 모두 만족하는 행의 불리언 마스크"""
+        mask = np.ones(len(self), dtype=bool)
+        if in_stock:
+            mask &= self.stock > 0
+        if category:
+            mask &= self.product_types == category
+        if category_id:
+            mask &= self.category_ids == category_id
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price <= max_price
+        return mask
+
+    def order(self, positions: np.ndarray, sort_by: str, scores: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        positions 를 sort_by 기준으로 정렬 (동점은 상품 순서 유지)
+
+        relevance 는 scores (positions 와 같은 길이) 내림차순
+        """
+        if sort_by == "price_asc":
+            return positions[np.argsort(self.price[positions], kind="stable")]
+        if sort_by == "price_desc":
+            return positions[np.argsort(-self.price[positions], kind="stable")]
+        if sort_by == "name":
+            if self._name_order is None:
+                rank = np.empty(len(self), dtype=np.int64)
+                rank[np.argsort(self.names.astype(str), kind="stable")] = np.arange(len(self))
+                self._name_order = rank
+            return positions[np.argsort(self._name_order[positions], kind="stable")]
+        if sort_by == "relevance":
+            if scores is None:
+                raise ValueError("relevance 정렬에는 검색어가 필요합니다.")
+            return positions[np.argsort(-scores, kind="stable")]
+        raise ValueError(f"알 수 없는 정렬 기준입니다: {sort_by}")
+
+    def select(
+        self,
+        category: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        sort_by: str = "price_asc",
+        limit: int = 10,
+        category_id: Optional[str] = None,
+        score_fn=None,
+        min_score: Optional[float] = None
+    ) -> Tuple[List[Tuple[Dict[str, Any], Optional[float]]], int]:
+        """
+        조건 검색 + 정렬
+
+        Args:
+            score_fn: vector_row 배열 -> 점수 배열 (시맨틱 점수 결합 시, -1 행은 -inf 로 처리)
+            min_score: score_fn 점수가 이 값 미만인 상품 제외
+
+        Returns:
+            ([(상품, 점수 or None), ...] 최대 limit 개, 조건을 만족하는 전체 상품 수)
+        """
+        positions = np.flatnonzero(self.mask(category, min_price, max_price, category_id))
+
+        scores = None
+        if score_fn is not None:
+            scores = np.full(len(positions), -np.inf, dtype=np.float32)
+            has_vector = self.vector_row[positions] >= 0
+            if has_vector.any():
+                scores[has_vector] = score_fn(self.vector_row[positions[has_vector]])
+            if min_score is not None:
+                keep = scores >= min_score
+                positions, scores = positions[keep], scores[keep]
+
+        total_found = len(positions)
+        if sort_by == "relevance" and scores is not None and 0 < limit < total_found:
+            # 상위 limit 개만 부분 정렬
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            positions, scores = positions[top], scores[top]
+
+        ordered = self.order(positions, sort_by, scores)
+        score_by_pos = dict(zip(positions.tolist(), scores.tolist())) if scores is not None else {}
+
+        return [
+            (self.products[pos], score_by_pos.get(int(pos)))
+            for pos in ordered[:limit]
+        ], total_found
@@ -0,0 +1,151 @@
+"""
+카탈로그 공용 스키마 (Z_Burger_v01 / Bin 공용)
+
+두 앱이 같은 BurgeriaDB 를 쓰므로 별칭/카탈로그 버전 테이블과 트리거,
+상품 간 유사도 테이블 정의, 상품명 변형 분리 규칙을 한 곳에 둔다.
+(검색어 동의어 테이블은 query_normalizer.QUERY_SYNONYMS_SCHEMA)
+
+Products 내용이 바뀌면 'products' 버전, 재고만 바뀌면 'stock' 버전이 증가한다.
+"""
+
+import re
+import sqlite3
+from typing import Optional, Tuple
+
+# 상품 별칭 테이블 + Products/별칭 변경 감지용 버전 테이블 + 트리거
+CATALOG_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Product_Aliases (
+    alias TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    PRIMARY KEY (alias, product_id),
+    FOREIGN KEY(product_id) REFERENCES Products(product_id)
+);
+
+CREATE TABLE IF NOT EXISTS Catalog_Version (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO Catalog_Version (name, version) VALUES ('products', 0);
+INSERT OR IGNORE INTO Catalog_Version (name, version) VALUES ('stock', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_products_version_insert
+AFTER INSERT ON Products
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+DROP TRIGGER IF EXISTS trg_products_version_update;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_content_update
+AFTER UPDATE OF product_id, category_id, product_name, product_type, price, description, embedding
+ON Products
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_stock_update
+AFTER UPDATE OF stock_quantity ON Products
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'stock';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_version_delete
+AFTER DELETE ON Products
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aliases_version_insert
+AFTER INSERT ON Product_Aliases
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aliases_version_delete
+AFTER DELETE ON Product_Aliases
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+"""
+
+# 상품 간 유사도 (product_id 별 상위 k개) + 증분 갱신용 내용 해시 + 마지막 빌드 정보
+# model 은 점수를 계산한 임베딩 모델, 다르면 전체 재계산
+SIMILARITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Product_Similarity (
+    product_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    similar_product_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (product_id, rank)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS Product_Similarity_State (
+    product_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Product_Similarity_Build (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    catalog_version INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    top_k INTEGER NOT NULL
+);
+"""
+
+# Bin 의 n-gram Dice 상품 간 유사도 (구조는 SIMILARITY_SCHEMA 와 같음)
+# 테이블을 나눠 두 앱이 서로의 행을 다시 계산하지 않도록 한다.
+NGRAM_SIMILARITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Ngram_Similarity (
+    product_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    similar_product_id TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (product_id, rank)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS Ngram_Similarity_State (
+    product_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Ngram_Similarity_Build (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    catalog_version INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    top_k INTEGER NOT NULL
+);
+"""
+
+
+def ensure_catalog_version(conn: sqlite3.Connection) -> None:
+    """Catalog_Version 테이블과 Products 변경 트리거 생성 (이미 있으면 무시)"""
+    conn.executescript(CATALOG_VERSION_SCHEMA)
+
+
+def get_catalog_version(conn: sqlite3.Connection) -> int:
+    """현재 Products 카탈로그 버전 조회"""
+    row = conn.execute(
+        "SELECT version FROM Catalog_Version WHERE name = 'products'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def get_catalog_versions(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """(카탈로그 버전, 재고 버전) 조회"""
+    versions = dict(conn.execute(
+        "SELECT name, version FROM Catalog_Version WHERE name IN ('products', 'stock')"
+    ).fetchall())
+    return versions.get("products", 0), versions.get("stock", 0)
+
+
+# "양념감자 (칠리)", "양념너겟(튀김)" → 기본 이름 + 변형
+_VARIANT_PATTERN = re.compile(r"^(?P<base>.+?)\s*\((?P<variant>[^()]+)\)\s*$")
+
+
+def split_variant(product_name: str) -> Tuple[str, Optional[str]]:
+    """상품명을 (기본 이름, 변형) 으로 분리 (변형이 없으면 (상품명, None))"""
+    match = _VARIANT_PATTERN.match(product_name.strip())
+    if not match:
+        return product_name.strip(), None
+    return match.group("base").strip(), match.group("variant").strip()
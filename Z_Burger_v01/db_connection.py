@@ -0,0 +1,75 @@
+"""
+SQLite 연결 관리 (스레드별 영구 연결)
+
+db_functions 의 공개 함수들은 db_path 인자만 받으므로, 호출마다 연결을 열고 닫는 대신
+get_connection(db_path) 로 현재 스레드의 연결을 재사용한다.
+
+- 연결은 (스레드, db_path) 별로 하나 (sqlite3 연결은 만든 스레드에서만 사용 가능)
+- PRAGMA 는 연결을 만들 때 한 번만 적용 (WAL, busy_timeout 등 storage_config 참고)
+- 연결을 만들 때 미적용 스키마 마이그레이션 실행 (migrations 참고)
+- sqlite3 의 준비된 문장 캐시(cached_statements)를 크게 잡아, 같은 SQL 은 다시 컴파일하지 않음
+- DB 파일이 지워지거나 다른 파일로 바뀌면 (장치, inode 비교) 새로 연결
+
+연결을 닫지 않으므로 쓰기 함수는 오류 시 반드시 rollback() 하여
+열린 트랜잭션이 다음 호출로 넘어가지 않게 한다.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+from storage_config import connect
+from migrations import run_migrations
+
+# 연결별 준비된 문장 캐시 크기 (sqlite3 기본값 128)
+STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE_SIZE", "256"))
+
+_local = threading.local()
+
+
+def _file_identity(db_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def _connections() -> Dict[str, Tuple[sqlite3.Connection, Optional[Tuple[int, int]]]]:
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    return connections
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+    run_migrations(conn)
+    return conn
+
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    현재 스레드의 db_path 연결 반환 (없으면 생성)
+
+    반환된 연결은 닫지 않는다. (close_connections 참고)
+    """
+    connections = _connections()
+    identity = _file_identity(db_path)
+    cached = connections.get(db_path)
+    if cached is not None:
+        conn, cached_identity = cached
+        if identity == cached_identity:  # ":memory:" 는 둘 다 None
+            return conn
+        conn.close()
+
+    conn = _open(db_path)
+    connections[db_path] = (conn, _file_identity(db_path))
+    return conn
+
+
+def close_connections(db_path: Optional[str] = None) -> None:
+    """현재 스레드의 연결 닫기 (db_path가 없으면 전체)"""
+    connections = _connections()
+    for path in [path for path in connections if db_path is None or path == db_path]:
+        connections.pop(path)[0].close()
@@ -0,0 +1,83 @@
+"""
+테스트용 임시 DB (test_*.py 공용)
+
+Products 테이블 DDL 과 삽입 루프를 테스트 파일마다 복사하지 않도록 한 곳에 둔다.
+Cart / Orders / Order_Items 는 db_connection 으로 연결할 때 마이그레이션이 만든다.
+"""
+
+import os
+import json
+import sqlite3
+import tempfile
+from typing import Iterable, Optional, Sequence
+
+PRODUCTS_SCHEMA = """
+CREATE TABLE Products (
+    product_id TEXT PRIMARY KEY,
+    category_id TEXT NOT NULL,
+    product_name TEXT NOT NULL UNIQUE,
+    product_type TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    stock_quantity INTEGER NOT NULL DEFAULT 0,
+    description TEXT,
+    embedding TEXT
+)
+"""
+
+SET_ITEMS_SCHEMA = """
+CREATE TABLE Set_Items (
+    set_product_id TEXT NOT NULL,
+    component_product_id TEXT NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    is_default BOOLEAN NOT NULL DEFAULT 1
+)
+"""
+
+
+def create_test_db(products: Iterable[Sequence] = (),
+                   set_items: Optional[Iterable[Sequence]] = None,
+                   extra_sql: str = "") -> str:
+    """
+    임시 DB 생성
+
+    Args:
+        products: (product_id, category_id, product_name, product_type, price, stock_quantity
+                   [, description [, embedding]]) - description 기본 "", embedding 은 벡터(JSON 저장) 또는 None
+        set_items: (set_product_id, component_product_id, quantity, is_default) - None 이면 Set_Items 테이블 없음
+        extra_sql: 추가로 실행할 SQL (테스트 전용 테이블 등)
+
+    Returns:
+        DB 파일 경로 (remove_db 로 삭제)
+    """
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(PRODUCTS_SCHEMA)
+    for row in products:
+        row = tuple(row) + ("", None)[len(row) - 6:]
+        embedding = row[7]
+        if embedding is not None and not isinstance(embedding, (str, bytes)):
+            embedding = json.dumps([float(x) for x in embedding])
+        conn.execute("""
+        INSERT INTO Products (product_id, category_id, product_name, product_type,
+                              price, stock_quantity, description, embedding)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, row[:7] + (embedding,))
+
+    if set_items is not None:
+        conn.execute(SET_ITEMS_SCHEMA)
+        conn.executemany("INSERT INTO Set_Items VALUES (?, ?, ?, ?)", [tuple(row) for row in set_items])
+
+    if extra_sql:
+        conn.executescript(extra_sql)
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def remove_db(db_path: str) -> None:
+    """DB 파일과 WAL 보조 파일 삭제"""
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
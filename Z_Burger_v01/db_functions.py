@@ -12,20 +12,34 @@ Phase 3 검색 고도화 및 사용자 경험 개선 (장바구니 관리 포함
 Phase 4 주문 완료 및 시스템 안정화
 """
 
-import sqlite3
 import uuid
 import platform
 import os
-import json
+import time
 import numpy as np
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from openai import OpenAI
 from dotenv import load_dotenv
-
-# 환경변수 로드 (OpenAI API 키)
+from db_connection import get_connection
+from storage_config import begin_write, get_lock_metrics
+from set_signatures import get_set_composition_index
+from search_index import get_catalog_index
+from catalog_columns import SORT_OPTIONS
+from embedding_cache import EmbeddingCache, normalize_query_text
+from embedding_providers import get_embedding_provider
+from fts_index import RRF_K, get_search_mode, lexical_search, reciprocal_rank_fusion
+from product_similarity import find_substitutes
+from search_diagnostics import SearchDiagnostics, StageTimings, log_diagnostics, stage
+from search_log import is_search_log_enabled, record_searches, record_choice
+
+# 환경변수 로드 (EMBEDDING_PROVIDER, OpenAI API 키 등)
 load_dotenv()
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+# 쿼리 임베딩 캐시 (메모리 LRU + SQLite 영구 캐시)
+embedding_cache = EmbeddingCache(
+    max_size=int(os.getenv('EMBEDDING_CACHE_SIZE', '1024')),
+    ttl_seconds=float(os.getenv('EMBEDDING_CACHE_TTL', '3600'))
+)
 
 
 def get_default_db_path() -> str:
@@ -37,18 +51,67 @@ def get_default_db_path() -> str:
         return os.path.expanduser("/Users/juno/Desktop/claude/Burgeria/BurgeriaDB.db")
 
 
-def _get_embedding(text: str, model: str = "text-embedding-3-small") -> Optional[List[float]]:
-    """텍스트의 임베딩 벡터 생성"""
+def _get_embeddings(
+    texts: List[str],
+    db_path: str = None,
+    diagnostics: Optional[SearchDiagnostics] = None
+) -> Optional[List[List[float]]]:
+    """
+    여러 텍스트의 임베딩 벡터 생성 (설정된 임베딩 제공자 사용)
+
+    네트워크 제공자(OpenAI)는 같은 검색어(정규화 기준)를 캐시에서 반환하고,
+    캐시에 없는 검색어만 모아 한 번의 요청으로 생성한다.
+    db_path가 주어지면 SQLite 영구 캐시도 사용한다.
+    diagnostics가 주어지면 검색어별 캐시 적중 여부와 제공자 호출 시간을 기록한다.
+    """
+    provider = get_embedding_provider()
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+
+    if provider.cacheable:
+        with stage(diagnostics, "embedding_cache"):
+            for i, text in enumerate(texts):
+                embeddings[i] = embedding_cache.get(text, provider.model, db_path)
+
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if diagnostics is not None:
+        diagnostics.cache["embedding_cacheable"] = provider.cacheable
+        diagnostics.cache["embedding_hits"] = [embedding is not None for embedding in embeddings]
+    if not missing:
+        return embeddings
+
     try:
-        response = client.embeddings.create(
-            input=text,
-            model=model
-        )
-        return response.data[0].embedding
+        with stage(diagnostics, "embedding_api"):
+            created = provider.embed([normalize_query_text(texts[i]) for i in missing])
     except Exception as e:
         print(f"임베딩 생성 오류: {e}")
         return None
 
+    for i, embedding in zip(missing, created):
+        embeddings[i] = embedding
+        if provider.cacheable:
+            try:
+                embedding_cache.put(texts[i], provider.model, embedding, db_path)
+            except Exception as e:
+                print(f"임베딩 캐시 저장 오류: {e}")
+
+    return embeddings
+
+
+def _get_embedding(text: str, db_path: str = None) -> Optional[List[float]]:
+    """텍스트 1개의 임베딩 벡터 생성 (캐시 사용)"""
+    embeddings = _get_embeddings([text], db_path)
+    return embeddings[0] if embeddings else None
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """쿼리 임베딩 캐시 적중/미스 통계 조회"""
+    return embedding_cache.stats()
+
+
+def get_storage_metrics() -> Dict[str, Any]:
+    """쓰기 트랜잭션 잠금 대기 지표 (대기 시간 ms, 재시도 횟수, 실패 횟수)"""
+    return get_lock_metrics()
+
 
 def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """두 벡터 간의 코사인 유사도 계산"""
@@ -64,17 +127,502 @@ def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     return dot_product / (norm_vec1 * norm_vec2)
 
 
+def _search_error(message: str) -> Dict[str, Any]:
+    """검색 실패(ERROR) 결과"""
+    return {
+        "success": False,
+        "status": "ERROR",
+        "product": None,
+        "matches": [],
+        "total_found": 0,
+        "message": message
+    }
+
+
+def _exact_match_result(exact_match: Dict[str, Any]) -> Dict[str, Any]:
+    """어휘 인덱스 정확 일치 결과 (FOUND)"""
+    product = dict(exact_match)
+    product["match_score"] = 1.0
+    return {
+        "success": True,
+        "status": "FOUND",
+        "product": product,
+        "matches": [product],
+        "total_found": 1,
+        "message": f"'{product['product_name']}' 상품을 찾았습니다."
+    }
+
+
+def _ranked_search_result(
+    query: str,
+    index,
+    ranked: List,
+    total_found: int,
+    ambiguity_threshold: float
+) -> Dict[str, Any]:
+    """유사도 순위 결과를 FOUND / AMBIGUOUS / NOT_FOUND 로 판정"""
+    top_matches = []
+    for pos, similarity in ranked:
+        match = dict(index.products[pos])
+        match["match_score"] = round(similarity, 4)
+        top_matches.append(match)
+
+    return _matches_result(query, top_matches, total_found, ambiguity_threshold)
+
+
+def _matches_result(
+    query: str,
+    top_matches: List[Dict[str, Any]],
+    total_found: int,
+    ambiguity_threshold: float,
+    score_key: str = "match_score"
+) -> Dict[str, Any]:
+    """
+    점수 내림차순 후보 목록을 FOUND / AMBIGUOUS / NOT_FOUND 로 판정
+
+    score_key: 후보 순서를 정한 점수 (1위와 2위의 차이를 이 점수로 계산)
+    """
+    if not top_matches:
+        return {
+            "success": True,
+            "status": "NOT_FOUND",
+            "product": None,
+            "matches": [],
+            "total_found": 0,
+            "message": f"'{query}'와 유사한 상품을 찾을 수 없습니다."
+        }
+
+    # 모호성 판단
+    # 상위 2개 이상의 결과가 있고, 점수 차이가 작으면 AMBIGUOUS
+    if len(top_matches) >= 2:
+        score_diff = top_matches[0][score_key] - top_matches[1][score_key]
+
+        if score_diff <= ambiguity_threshold:
+            return {
+                "success": True,
+                "status": "AMBIGUOUS",
+                "product": None,
+                "matches": top_matches,
+                "total_found": total_found,
+                "message": f"'{query}'와 유사한 상품이 {len(top_matches)}개 있습니다. 구체적으로 말씀해주세요."
+            }
+
+    # 명확한 1개 결과 (FOUND)
+    best_match = top_matches[0]
+
+    return {
+        "success": True,
+        "status": "FOUND",
+        "product": best_match,
+        "matches": top_matches,
+        "total_found": total_found,
+        "message": f"'{best_match['product_name']}' 상품을 찾았습니다."
+    }
+
+
+def _family_result(query: str, members: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """
+    패밀리 이름 검색 결과 (미리 계산된 구성원을 그대로 후보로 반환)
+
+    재고 있는 구성원이 하나뿐이면 FOUND, 여러 개면 AMBIGUOUS
+    """
+    if len(members) == 1:
+        return _exact_match_result(members[0])
+
+    top_matches = [dict(product, match_score=1.0) for product in members[:limit]]
+    return {
+        "success": True,
+        "status": "AMBIGUOUS",
+        "product": None,
+        "matches": top_matches,
+        "total_found": len(members),
+        "message": f"'{query}'와 유사한 상품이 {len(top_matches)}개 있습니다. 구체적으로 말씀해주세요."
+    }
+
+
+def _choseong_result(query: str, choseong_matches: List[tuple], limit: int) -> Dict[str, Any]:
+    """
+    초성 검색 결과 판정
+
+    초성은 정보가 적으므로 후보가 하나이거나, 초성 전체가 일치하는 상품이
+    하나일 때만 FOUND 이고 나머지는 AMBIGUOUS
+    """
+    top_matches = [
+        dict(product, match_score=round(score, 4))
+        for product, score in choseong_matches[:limit]
+    ]
+    full_matches = [m for m, (_, score) in zip(top_matches, choseong_matches) if score == 1.0]
+
+    if len(choseong_matches) == 1 or len(full_matches) == 1:
+        best_match = full_matches[0] if full_matches else top_matches[0]
+        return {
+            "success": True,
+            "status": "FOUND",
+            "product": best_match,
+            "matches": top_matches,
+            "total_found": len(choseong_matches),
+            "message": f"'{best_match['product_name']}' 상품을 찾았습니다."
+        }
+
+    return {
+        "success": True,
+        "status": "AMBIGUOUS",
+        "product": None,
+        "matches": top_matches,
+        "total_found": len(choseong_matches),
+        "message": f"'{query}'와 유사한 상품이 {len(top_matches)}개 있습니다. 구체적으로 말씀해주세요."
+    }
+
+
+def _search_products(
+    requests: List[tuple],
+    limit: int,
+    db_path: str,
+    similarity_threshold: float,
+    ambiguity_threshold: float,
+    search_mode: str = "semantic",
+    diagnostics: Optional[SearchDiagnostics] = None,
+    resolutions: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    (검색어, 카테고리) 목록을 한 번에 검색 (findProduct / findProducts 공통)
+
+    0. 검색어 정규화 ("감튀 두 개 주세요" → "포테이토", 수량 2)
+       이후 모든 단계(캐시 키, 임베딩 포함)는 정규화된 검색어를 사용한다.
+    1. 초성만 입력한 검색어는 초성 인덱스 접두어 일치로 판정
+    2. 자모 편집 거리로 오타 교정 (교정된 검색어로 이후 단계 진행)
+    3. 상품명/별칭 정확 일치 또는 유일한 상품명 접두어 일치 → 임베딩 없이 바로 FOUND
+       패밀리 이름("양념감자")과 일치 → 미리 계산된 구성원을 바로 AMBIGUOUS 후보로
+    4. 나머지 검색어는 검색 모드에 따라
+       - semantic: 임베딩을 한 번에 생성하고 행렬-행렬 곱 1회로 유사도 계산
+       - lexical: FTS5 BM25 순위 (임베딩 호출 없음)
+       - hybrid: BM25 순위와 임베딩 순위를 RRF 로 결합
+
+    diagnostics가 주어지면 단계별 시간, 후보 수, 점수 분포, 캐시 적중 여부를 기록한다.
+    resolutions 리스트가 주어지면 검색어별 결정 단계를 채운다. (검색 로그용)
+    """
+    # 카탈로그 인덱스 조회 (Products 변경 시에만 재구성)
+    index_started = time.perf_counter()
+    with stage(diagnostics, "index"):
+        index = get_catalog_index(db_path, get_embedding_provider().model)
+    if diagnostics is not None:
+        _record_index_diagnostics(diagnostics, index, index_started)
+
+    # 검색어 정규화 (조사/요청 표현/수량 제거, 동의어, 띄어쓰기 표준화)
+    with stage(diagnostics, "normalize"):
+        normalized = [index.normalizer.normalize(query) for query, _ in requests]
+    original_queries = [query for query, _ in requests]
+    requests = [(text, category) for (text, _), (_, category) in zip(normalized, requests)]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    pending = []
+    corrections = {}
+    resolved_by = {}
+    with stage(diagnostics, "lexical"):
+        for i, (query, category) in enumerate(requests):
+            # 초성 검색 ("ㅎㅇㅂㄱㄱ")
+            choseong_matches = index.typo.choseong_matches(query, category)
+            if choseong_matches:
+                results[i] = _choseong_result(query, choseong_matches, limit)
+                resolved_by[i] = "choseong"
+                continue
+
+            # 자모 오타 교정 ("양념감쟈" → "양념감자")
+            corrected = index.typo.correct(query)
+            if corrected:
+                corrections[i] = corrected
+
+            exact_match = index.lexical.lookup(corrected or query, category)
+            if exact_match is not None:
+                results[i] = _exact_match_result(exact_match)
+                resolved_by[i] = "exact"
+                continue
+
+            # 패밀리 이름 ("양념감자" → 양념감자 4종)
+            family = index.family_members(corrected or query, category)
+            if family:
+                results[i] = _family_result(query, family, limit)
+                resolved_by[i] = "family"
+            else:
+                pending.append(i)
+                resolved_by[i] = search_mode
+
+    if diagnostics is not None:
+        diagnostics.details["resolved_by"] = [resolved_by[i] for i in range(len(requests))]
+    if resolutions is not None:
+        resolutions.extend(resolved_by[i] for i in range(len(requests)))
+
+    if pending:
+        search_pending = {
+            "semantic": _search_pending,
+            "lexical": _lexical_search_pending,
+            "hybrid": _hybrid_search_pending
+        }[search_mode]
+        search_pending(
+            requests, pending, corrections, results, index, limit,
+            db_path, similarity_threshold, ambiguity_threshold, diagnostics
+        )
+
+    # 정규화 / 교정된 검색어와 검색어에서 분리한 수량은 결과에 함께 표시
+    for i, ((text, quantity), original) in enumerate(zip(normalized, original_queries)):
+        if text != original.strip():
+            results[i]["normalized_query"] = text
+        if quantity is not None:
+            results[i]["requested_quantity"] = quantity
+    for i, corrected in corrections.items():
+        results[i]["corrected_query"] = corrected
+
+    return results
+
+
+def _record_index_diagnostics(diagnostics: SearchDiagnostics, index, started: float) -> None:
+    """카탈로그 인덱스 재사용 여부 (재구성 시 DB 조회 / 디코딩 시간 포함)"""
+    if index.built_at >= started:
+        diagnostics.cache["catalog_index"] = "rebuilt"
+        diagnostics.details["index_load_ms"] = dict(index.load_timings)
+    elif index.stock_refreshed_at >= started:
+        diagnostics.cache["catalog_index"] = "stock_refreshed"
+    else:
+        diagnostics.cache["catalog_index"] = "hit"
+    diagnostics.count("catalog_size", len(index))
+
+
+def _record_semantic_scores(
+    diagnostics: SearchDiagnostics,
+    index,
+    embedding: List[float],
+    category: Optional[str],
+    similarity_threshold: float
+) -> None:
+    """검색 대상(카테고리 파티션 또는 전체) 전체의 유사도 분포 (진단 모드에서만 추가 계산)"""
+    if category:
+        rows = index.partitions[category][0] if category in index.partitions else np.zeros(0, dtype=np.int64)
+    else:
+        rows = np.arange(len(index))
+    scores = index.row_scores(embedding, rows)
+    diagnostics.record_scores("semantic", [] if scores is None else scores, similarity_threshold)
+
+
+def _search_pending(
+    requests: List[tuple],
+    pending: List[int],
+    corrections: Dict[int, str],
+    results: List[Optional[Dict[str, Any]]],
+    index,
+    limit: int,
+    db_path: str,
+    similarity_threshold: float,
+    ambiguity_threshold: float,
+    diagnostics: Optional[SearchDiagnostics] = None
+) -> None:
+    """어휘/오타 단계에서 결정되지 않은 검색어를 임베딩 유사도로 검색 (results 를 채움)"""
+    search_texts = [corrections.get(i, requests[i][0]) for i in pending]
+    with stage(diagnostics, "embedding"):
+        embeddings = _get_embeddings(search_texts, db_path=db_path, diagnostics=diagnostics)
+    if embeddings is None:
+        for i in pending:
+            results[i] = _search_error("임베딩 생성에 실패했습니다.")
+        return
+
+    with stage(diagnostics, "scoring"):
+        ranked_list = index.search_many(
+            embeddings,
+            limit=limit,
+            similarity_threshold=similarity_threshold,
+            categories=[requests[i][1] for i in pending]
+        )
+
+    if diagnostics is not None:
+        for i, embedding, (_, total_found) in zip(pending, embeddings, ranked_list):
+            diagnostics.count("candidates", total_found)
+            _record_semantic_scores(diagnostics, index, embedding, requests[i][1], similarity_threshold)
+
+    for i, (ranked, total_found) in zip(pending, ranked_list):
+        results[i] = _ranked_search_result(
+            requests[i][0], index, ranked, total_found, ambiguity_threshold
+        )
+
+
+def _lexical_search_pending(
+    requests: List[tuple],
+    pending: List[int],
+    corrections: Dict[int, str],
+    results: List[Optional[Dict[str, Any]]],
+    index,
+    limit: int,
+    db_path: str,
+    similarity_threshold: float,
+    ambiguity_threshold: float,
+    diagnostics: Optional[SearchDiagnostics] = None
+) -> None:
+    """FTS5 BM25 만으로 검색 (match_score = 최상위 BM25 대비 비율)"""
+    lexical_requests = [(corrections.get(i, requests[i][0]), requests[i][1]) for i in pending]
+    with stage(diagnostics, "fts"):
+        lexical_ranked = lexical_search(db_path, lexical_requests, limit)
+
+    if diagnostics is not None:
+        for ranked in lexical_ranked:
+            diagnostics.count("candidates", len(ranked))
+            diagnostics.record_scores("bm25", [-bm25 for _, bm25 in ranked])
+
+    for i, ranked in zip(pending, lexical_ranked):
+        top_score = ranked[0][1] if ranked and ranked[0][1] < 0 else -1.0
+        top_matches = []
+        for product_id, bm25 in ranked:
+            product = index.get_product(product_id)
+            if product is not None:
+                top_matches.append(dict(product, match_score=round(bm25 / top_score, 4)))
+
+        results[i] = _matches_result(requests[i][0], top_matches, len(top_matches), ambiguity_threshold)
+
+
+# 하이브리드 모드에서 각 검색기가 RRF 에 넘기는 후보 수
+HYBRID_CANDIDATES = 20
+# BM25 2위 점수가 1위의 이 비율 이하여야 어휘 검색 1위가 분명하다고 판단
+HYBRID_LEXICAL_MARGIN = 0.9
+# RRF 1위가 2위보다 이만큼 넘게 앞서야 FOUND (한 검색기에서 두 순위 넘게 앞선 만큼)
+# 1위의 유사도가 similarity_threshold 미만이면 점수 차이와 무관하게 후보가 2개 이상이면 AMBIGUOUS
+HYBRID_RRF_MARGIN = 1.0 / (RRF_K + 1) - 1.0 / (RRF_K + 3)
+
+
+def _hybrid_search_pending(
+    requests: List[tuple],
+    pending: List[int],
+    corrections: Dict[int, str],
+    results: List[Optional[Dict[str, Any]]],
+    index,
+    limit: int,
+    db_path: str,
+    similarity_threshold: float,
+    ambiguity_threshold: float,
+    diagnostics: Optional[SearchDiagnostics] = None
+) -> None:
+    """
+    BM25 순위와 임베딩 순위를 RRF 로 결합
+
+    두 검색기가 모두 같은 상품을 분명한 1위로 꼽으면 유사도 차이와 무관하게 FOUND,
+    그 외에는 반환 순서를 정한 RRF 점수(rrf_score)의 1, 2위 차이로 FOUND / AMBIGUOUS 판정
+    (match_score 는 코사인 유사도라 RRF 순서와 다를 수 있음)
+    BM25 점수가 같은 상품(2글자 단어 LIKE 일치)은 같은 순위로 결합하고,
+    1위의 유사도가 similarity_threshold 미만이면 FOUND 로 판정하지 않는다.
+    """
+    search_texts = [corrections.get(i, requests[i][0]) for i in pending]
+    with stage(diagnostics, "embedding"):
+        embeddings = _get_embeddings(search_texts, db_path=db_path, diagnostics=diagnostics)
+    if embeddings is None:
+        for i in pending:
+            results[i] = _search_error("임베딩 생성에 실패했습니다.")
+        return
+
+    candidates = max(limit, HYBRID_CANDIDATES)
+    categories = [requests[i][1] for i in pending]
+    with stage(diagnostics, "scoring"):
+        semantic_ranked = index.search_many(
+            embeddings,
+            limit=candidates,
+            similarity_threshold=similarity_threshold,
+            categories=categories
+        )
+    with stage(diagnostics, "fts"):
+        lexical_ranked = lexical_search(db_path, list(zip(search_texts, categories)), candidates)
+
+    if diagnostics is not None:
+        for embedding, category, (_, total_found), lexical in zip(embeddings, categories, semantic_ranked, lexical_ranked):
+            diagnostics.count("candidates", total_found)
+            diagnostics.count("lexical_candidates", len(lexical))
+            _record_semantic_scores(diagnostics, index, embedding, category, similarity_threshold)
+            diagnostics.record_scores("bm25", [-bm25 for _, bm25 in lexical])
+
+    fusion_started = time.perf_counter()
+    for i, embedding, (ranked, _), lexical in zip(pending, embeddings, semantic_ranked, lexical_ranked):
+        semantic_ids = [index.products[pos]["product_id"] for pos, _ in ranked]
+        lexical = [(product_id, bm25) for product_id, bm25 in lexical if index.get_product(product_id)]
+        lexical_ids = [product_id for product_id, _ in lexical]
+        fused = reciprocal_rank_fusion(
+            [semantic_ids, lexical_ids], scores=[None, [bm25 for _, bm25 in lexical]]
+        )
+
+        fused_ids = [product_id for product_id, _ in fused]
+        similarities = index.similarities(embedding, fused_ids[:limit])
+
+        top_matches = []
+        for (product_id, rrf_score), similarity in zip(fused, similarities):
+            match = dict(index.get_product(product_id))
+            match["match_score"] = round(similarity or 0.0, 4)
+            match["rrf_score"] = round(rrf_score, 6)
+            top_matches.append(match)
+
+        lexical_decisive = len(lexical) == 1 or (
+            len(lexical) > 1 and lexical[0][1] < 0 and lexical[1][1] / lexical[0][1] <= HYBRID_LEXICAL_MARGIN
+        )
+        if top_matches and semantic_ids and lexical_decisive and semantic_ids[0] == lexical_ids[0] == fused_ids[0]:
+            best_match = top_matches[0]
+            results[i] = {
+                "success": True,
+                "status": "FOUND",
+                "product": best_match,
+                "matches": top_matches,
+                "total_found": len(fused),
+                "message": f"'{best_match['product_name']}' 상품을 찾았습니다."
+            }
+        else:
+            margin = HYBRID_RRF_MARGIN
+            if top_matches and top_matches[0]["match_score"] < similarity_threshold:
+                margin = float("inf")
+            results[i] = _matches_result(
+                requests[i][0], top_matches, len(fused), margin, score_key="rrf_score"
+            )
+
+    if diagnostics is not None:
+        diagnostics.add_timing("fusion", (time.perf_counter() - fusion_started) * 1000)
+
+
+def _log_searches(
+    db_path: str,
+    requests: List[tuple],
+    results: List[Dict[str, Any]],
+    resolutions: List[str],
+    search_mode: str,
+    session_id: Optional[str] = None
+) -> None:
+    """SEARCH_QUERY_LOG 설정 시 검색 결과를 Search_Log 에 기록 (실패해도 검색 결과에는 영향 없음)"""
+    try:
+        record_searches(
+            db_path, requests, results, resolutions,
+            get_embedding_provider().model, search_mode, session_id
+        )
+    except Exception as e:
+        print(f"검색 로그 기록 오류: {e}")
+
+
+def _log_choice(db_path: str, product_id: str, session_id: Optional[str] = None) -> None:
+    """SEARCH_QUERY_LOG 설정 시 장바구니에 담긴 상품을 같은 세션의 최근 검색의 선택 상품으로 기록"""
+    if not is_search_log_enabled():
+        return
+    try:
+        record_choice(db_path, product_id, session_id)
+    except Exception as e:
+        print(f"검색 로그 기록 오류: {e}")
+
+
 def findProduct(
     query: str,
     category: Optional[str] = None,
     limit: int = 5,
     db_path: str = None,
     similarity_threshold: float = 0.50,
-    ambiguity_threshold: float = 0.08
+    ambiguity_threshold: float = 0.08,
+    search_mode: Optional[str] = None,
+    explain: bool = False,
+    session_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     임베딩 기반 시맨틱 검색을 사용한 상품 검색 (Task 3.1)
 
+    상품명/별칭과 정확히 일치하거나 유일한 상품명 접두어로 일치하면 임베딩 호출 없이 바로 FOUND를 반환하고,
+    그 외에는 시맨틱 검색을 수행한다.
+    검색어는 먼저 정규화한다. ("감튀 두 개 주세요" → "포테이토", query_normalizer 참고)
+
     Args:
         query: 검색할 메뉴명 (예: '한우불고기버거', '매콤한 감자')
         category: 카테고리 필터 (선택사항: 'burger', 'sides', 'beverage', 'set' 등)
@@ -82,6 +630,10 @@ def findProduct(
         db_path: 데이터베이스 경로
         similarity_threshold: 유사도 임계값 (이 값 이상만 매칭으로 간주)
         ambiguity_threshold: 모호성 임계값 (상위 결과들 간 유사도 차이가 이 값 이하면 AMBIGUOUS)
+        search_mode: "semantic" | "lexical" | "hybrid" (기본값: SEARCH_MODE 환경변수, 없으면 semantic)
+        explain: True면 단계별 시간/후보 수/점수 분포/캐시 적중 여부를 "diagnostics"로 함께 반환
+                 (SEARCH_DIAGNOSTICS_LOG 설정 시 순환 로그 파일에도 기록, search_diagnostics 참고)
+        session_id: 검색한 사용자 세션 ID (SEARCH_QUERY_LOG 설정 시 장바구니 선택과 연결, 선택사항)
 
     Returns:
         {
@@ -90,7 +642,10 @@ def findProduct(
             "product": {...} or None,  # FOUND일 때만
             "matches": [...],           # AMBIGUOUS일 때 여러 후보 반환
             "total_found": int,
-            "message": str
+            "message": str,
+            "normalized_query": str,    # 정규화로 검색어가 바뀐 경우만
+            "requested_quantity": int,  # 검색어에 수량 표현이 있던 경우만
+            "diagnostics": {...}        # explain=True 일 때만
         }
 
     Examples:
@@ -106,122 +661,234 @@ def findProduct(
     if db_path is None:
         db_path = get_default_db_path()
 
+    diagnostics = SearchDiagnostics() if explain else None
+    resolutions = [] if is_search_log_enabled() else None
+
     try:
-        # 1. 쿼리의 임베딩 생성
-        query_embedding = _get_embedding(query)
+        mode = get_search_mode(search_mode)
+        result = _search_products(
+            [(query, category)], limit, db_path,
+            similarity_threshold, ambiguity_threshold,
+            mode, diagnostics, resolutions
+        )[0]
+        if resolutions is not None:
+            _log_searches(db_path, [(query, category)], [result], resolutions, mode, session_id)
 
-        if query_embedding is None:
-            return {
-                "success": False,
-                "status": "ERROR",
-                "product": None,
-                "matches": [],
-                "total_found": 0,
-                "message": "임베딩 생성에 실패했습니다."
-            }
+    except Exception as e:
+        mode = search_mode
+        result = _search_error(f"검색 중 오류 발생: {str(e)}")
+
+    if diagnostics is not None:
+        diagnostics.count("returned", len(result["matches"]))
+        result["diagnostics"] = diagnostics.to_dict()
+        log_diagnostics(
+            query, result["status"], result["diagnostics"],
+            category=category, search_mode=mode,
+            product_id=result["product"]["product_id"] if result["product"] else None
+        )
 
-        # 2. DB에서 모든 상품과 임베딩 조회
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+    return result
 
-        sql = """
-        SELECT product_id, product_name, product_type, price, description,
-               stock_quantity, category_id, embedding
-        FROM Products
-        WHERE stock_quantity > 0 AND embedding IS NOT NULL
-        """
-        params = []
 
-        # 카테고리 필터 추가
-        if category:
-            sql += " AND product_type = ?"
-            params.append(category)
+def findProducts(
+    queries: List[Any],
+    limit: int = 5,
+    db_path: str = None,
+    similarity_threshold: float = 0.50,
+    ambiguity_threshold: float = 0.08,
+    search_mode: Optional[str] = None,
+    session_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    여러 메뉴를 한 번에 검색 (예: "불고기버거 2개랑 콜라 하나, 양념감자 칠리")
 
-        cursor.execute(sql, params)
-        all_products = cursor.fetchall()
-        conn.close()
+    모든 검색어의 임베딩을 한 번의 요청으로 생성하고, 행렬-행렬 곱 1회로 점수를 계산한다.
+    각 결과는 findProduct 결과와 같은 형식이다.
 
-        if not all_products:
-            return {
-                "success": True,
-                "status": "NOT_FOUND",
-                "product": None,
-                "matches": [],
-                "total_found": 0,
-                "message": f"'{query}' 상품을 찾을 수 없습니다."
-            }
+    Args:
+        queries: 검색어 목록. 문자열 또는 {"query": str, "category": str} 형식
+        limit: 검색어별 최대 반환 결과 수 (기본값: 5)
+        db_path: 데이터베이스 경로
+        similarity_threshold: 유사도 임계값
+        ambiguity_threshold: 모호성 임계값
+        search_mode: "semantic" | "lexical" | "hybrid" (findProduct 와 동일)
+        session_id: 검색한 사용자 세션 ID (findProduct 와 동일)
 
-        # 3. 각 상품과의 유사도 계산
-        similarities = []
-        for product in all_products:
-            product_embedding = json.loads(product[7])  # embedding 컬럼
-            similarity = _cosine_similarity(query_embedding, product_embedding)
-
-            if similarity >= similarity_threshold:
-                similarities.append({
-                    "product_id": product[0],
-                    "product_name": product[1],
-                    "product_type": product[2],
-                    "price": product[3],
-                    "description": product[4],
-                    "stock_quantity": product[5],
-                    "category_id": product[6],
-                    "match_score": round(similarity, 4)
-                })
-
-        # 4. 유사도 내림차순 정렬
-        similarities.sort(key=lambda x: x["match_score"], reverse=True)
-
-        # 5. 상위 limit개만 선택
-        top_matches = similarities[:limit]
-
-        if not top_matches:
-            return {
-                "success": True,
-                "status": "NOT_FOUND",
-                "product": None,
-                "matches": [],
-                "total_found": 0,
-                "message": f"'{query}'와 유사한 상품을 찾을 수 없습니다."
-            }
+    Returns:
+        {
+            "success": bool,
+            "queries": [str, ...],
+            "results": [findProduct 결과, ...],  # queries와 같은 순서
+            "total_queries": int,
+            "message": str
+        }
 
-        # 6. 모호성 판단
-        # 상위 2개 이상의 결과가 있고, 점수 차이가 작으면 AMBIGUOUS
-        if len(top_matches) >= 2:
-            score_diff = top_matches[0]["match_score"] - top_matches[1]["match_score"]
+    Examples:
+        >>> findProducts(["불고기버거", {"query": "콜라", "category": "beverage"}, "양념감자 칠리"])
+        {"success": True, "results": [{...}, {...}, {...}], "total_queries": 3, ...}
+    """
+    if db_path is None:
+        db_path = get_default_db_path()
 
-            if score_diff <= ambiguity_threshold:
-                return {
-                    "success": True,
-                    "status": "AMBIGUOUS",
-                    "product": None,
-                    "matches": top_matches,
-                    "total_found": len(similarities),
-                    "message": f"'{query}'와 유사한 상품이 {len(top_matches)}개 있습니다. 구체적으로 말씀해주세요."
-                }
+    requests = []
+    for item in queries:
+        if isinstance(item, dict):
+            requests.append((item.get("query", ""), item.get("category")))
+        else:
+            requests.append((str(item), None))
 
-        # 7. 명확한 1개 결과 (FOUND)
-        best_match = top_matches[0]
+    query_texts = [query for query, _ in requests]
 
+    if not requests:
         return {
-            "success": True,
-            "status": "FOUND",
-            "product": best_match,
-            "matches": top_matches,
-            "total_found": len(similarities),
-            "message": f"'{best_match['product_name']}' 상품을 찾았습니다."
+            "success": False,
+            "queries": [],
+            "results": [],
+            "total_queries": 0,
+            "message": "검색어가 없습니다."
         }
 
+    resolutions = [] if is_search_log_enabled() else None
+
+    try:
+        mode = get_search_mode(search_mode)
+        results = _search_products(
+            requests, limit, db_path,
+            similarity_threshold, ambiguity_threshold,
+            mode, resolutions=resolutions
+        )
+        if resolutions is not None:
+            _log_searches(db_path, requests, results, resolutions, mode, session_id)
+
     except Exception as e:
+        error = _search_error(f"검색 중 오류 발생: {str(e)}")
         return {
             "success": False,
-            "status": "ERROR",
-            "product": None,
-            "matches": [],
-            "total_found": 0,
-            "message": f"검색 중 오류 발생: {str(e)}"
+            "queries": query_texts,
+            "results": [dict(error) for _ in requests],
+            "total_queries": len(requests),
+            "message": error["message"]
+        }
+
+    found_count = sum(1 for result in results if result["status"] == "FOUND")
+
+    return {
+        "success": all(result["success"] for result in results),
+        "queries": query_texts,
+        "results": results,
+        "total_queries": len(requests),
+        "message": f"{len(requests)}개 검색어 중 {found_count}개 상품을 바로 찾았습니다."
+    }
+
+
+def _browse_error(message: str) -> Dict[str, Any]:
+    """조건 검색 실패 결과"""
+    return {
+        "success": False,
+        "products": [],
+        "total_found": 0,
+        "message": message
+    }
+
+
+def browseProducts(
+    category: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    sort_by: Optional[str] = None,
+    limit: int = 10,
+    query: Optional[str] = None,
+    category_id: Optional[str] = None,
+    similarity_threshold: Optional[float] = None,
+    db_path: str = None
+) -> Dict[str, Any]:
+    """
+    가격/카테고리 조건 검색 (예: "5000원 이하 버거 뭐 있어?", "제일 싼 음료")
+
+    카탈로그 인덱스의 열 배열(가격/타입/카테고리/재고)에 마스크를 조합해 재고 있는 상품만 고르고
+    sort_by 기준으로 정렬한다. query 가 주어지면 조건을 만족하는 상품에 한해
+    시맨틱 유사도를 계산하여 relevance 정렬에 사용한다. (임베딩 호출 1회)
+
+    Args:
+        category: 상품 타입 필터 ('burger', 'sides', 'beverage', 'set' 등)
+        min_price: 최소 가격 (이상)
+        max_price: 최대 가격 (이하)
+        sort_by: "price_asc" | "price_desc" | "name" | "relevance"
+                 (기본값: query 가 있으면 relevance, 없으면 price_asc)
+        limit: 최대 반환 결과 수 (기본값: 10)
+        query: 함께 적용할 검색어 (예: '매콤한')
+        category_id: 세부 카테고리 필터 (예: 'CAT_COFFEE')
+        similarity_threshold: query 유사도가 이 값 미만인 상품 제외 (기본값: 제외하지 않음)
+        db_path: 데이터베이스 경로
+
+    Returns:
+        {
+            "success": bool,
+            "products": [...],   # 정렬 순, query 가 있으면 각 항목에 match_score 포함
+            "total_found": int,  # 조건을 만족하는 전체 상품 수
+            "message": str
         }
 
+    Examples:
+        >>> browseProducts(category="burger", max_price=5000)
+        {"success": True, "products": [가격 오름차순 버거], ...}
+
+        >>> browseProducts(category="beverage", sort_by="price_asc", limit=1)
+        {"success": True, "products": [가장 싼 음료], ...}
+    """
+    if db_path is None:
+        db_path = get_default_db_path()
+
+    if sort_by is None:
+        sort_by = "relevance" if query else "price_asc"
+    if sort_by not in SORT_OPTIONS:
+        return _browse_error(f"알 수 없는 정렬 기준입니다: {sort_by} (가능한 값: {', '.join(SORT_OPTIONS)})")
+    if sort_by == "relevance" and not query:
+        return _browse_error("relevance 정렬에는 검색어(query)가 필요합니다.")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        return _browse_error("최소 가격이 최대 가격보다 큽니다.")
+
+    try:
+        index = get_catalog_index(db_path, get_embedding_provider().model)
+
+        score_fn = None
+        if query:
+            embedding = _get_embedding(query, db_path=db_path)
+            if embedding is None:
+                return _browse_error("임베딩 생성에 실패했습니다.")
+
+            def score_fn(rows):
+                scores = index.row_scores(embedding, rows)
+                return np.full(len(rows), -np.inf, dtype=np.float32) if scores is None else scores
+
+        selected, total_found = index.columns.select(
+            category=category, min_price=min_price, max_price=max_price,
+            sort_by=sort_by, limit=limit, category_id=category_id,
+            score_fn=score_fn, min_score=similarity_threshold
+        )
+
+        products = []
+        for product, score in selected:
+            item = dict(product)
+            if score is not None:
+                item["match_score"] = round(score, 4) if np.isfinite(score) else None
+            products.append(item)
+
+        if not products:
+            message = "조건에 맞는 상품이 없습니다."
+        else:
+            message = f"조건에 맞는 상품 {total_found}개 중 {len(products)}개를 찾았습니다."
+
+        return {
+            "success": True,
+            "products": products,
+            "total_found": total_found,
+            "message": message
+        }
+
+    except Exception as e:
+        return _browse_error(f"조건 검색 중 오류 발생: {str(e)}")
+
 
 def addToCart(
     session_id: str,
@@ -264,7 +931,7 @@ def addToCart(
         db_path = get_default_db_path()
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
 
         # 1. 상품 정보 조회
@@ -277,7 +944,6 @@ def addToCart(
         product = cursor.fetchone()
 
         if not product:
-            conn.close()
             return {
                 "success": False,
                 "cart_item_id": None,
@@ -288,21 +954,24 @@ def addToCart(
 
         # 2. 재고 확인
         if stock <= 0:
-            conn.close()
             return {
                 "success": False,
                 "cart_item_id": None,
-                "message": f"'{prod_name}'는 품절되었습니다."
+                "message": f"'{prod_name}'는 품절되었습니다. findSubstitutes로 대체 메뉴를 추천할 수 있습니다."
             }
 
         # 3. 세트 메뉴 처리 (Task 2.2)
         if prod_type == 'set':
-            return _addSetToCart(
+            result = _addSetToCart(
                 cursor, conn, session_id, prod_id, prod_name, price,
                 quantity, special_requests, db_path
             )
+            if result["success"]:
+                _log_choice(db_path, prod_id, session_id)
+            return result
 
         # 4. 단품 메뉴 처리 (Task 1.3)
+        begin_write(conn)
         cart_item_id = f"CART_{uuid.uuid4().hex[:8].upper()}"
         order_type = "single"
         base_price = price
@@ -320,7 +989,7 @@ def addToCart(
         ))
 
         conn.commit()
-        conn.close()
+        _log_choice(db_path, prod_id, session_id)
 
         return {
             "success": True,
@@ -335,7 +1004,7 @@ def addToCart(
 
     except Exception as e:
         if 'conn' in locals():
-            conn.close()
+            conn.rollback()
         return {
             "success": False,
             "cart_item_id": None,
@@ -343,6 +1012,42 @@ def addToCart(
         }
 
 
+def findSubstitutes(product_id: str, limit: int = 5, db_path: str = None) -> Dict[str, Any]:
+    """
+    품절 상품 등의 대체 메뉴 추천 (같은 종류의 비슷한 재고 있는 상품)
+
+    미리 계산된 상품 간 유사도 테이블(product_similarity)에서 인덱스 조회 1회로 찾는다.
+    상품이 바뀌었으면 조회 전에 바뀐 부분만 유사도 테이블을 갱신한다.
+
+    Args:
+        product_id: 기준 상품 ID (예: 'C00001')
+        limit: 최대 반환 결과 수 (기본값: 5)
+        db_path: 데이터베이스 경로
+
+    Returns:
+        {
+            "success": bool,
+            "product": {...} or None,   # 기준 상품
+            "substitutes": [...],       # 유사도 순, 각 항목에 similarity 포함
+            "total_found": int,
+            "message": str
+        }
+    """
+    if db_path is None:
+        db_path = get_default_db_path()
+
+    try:
+        return find_substitutes(db_path, product_id, limit, get_embedding_provider().model)
+    except Exception as e:
+        return {
+            "success": False,
+            "product": None,
+            "substitutes": [],
+            "total_found": 0,
+            "message": f"대체 메뉴 조회 중 오류 발생: {str(e)}"
+        }
+
+
 def _addSetToCart(
     cursor, conn, session_id: str, set_product_id: str,
     set_name: str, set_price: int, quantity: int,
@@ -354,11 +1059,10 @@ def _addSetToCart(
     세트의 모든 구성품을 동일한 set_group_id로 묶어서 Cart에 추가
     """
     try:
-        # 1. 세트 구성품 조회
-        set_composition = getSetComposition(set_product_id, db_path)
+        # 1. 세트 구성품 조회 (같은 연결로)
+        set_composition = _query_set_composition(cursor, set_product_id)
 
         if not set_composition['success']:
-            conn.close()
             return {
                 "success": False,
                 "cart_item_id": None,
@@ -368,7 +1072,6 @@ def _addSetToCart(
         components = set_composition['items']
 
         if not components:
-            conn.close()
             return {
                 "success": False,
                 "cart_item_id": None,
@@ -376,6 +1079,7 @@ def _addSetToCart(
             }
 
         # 2. 세트 그룹 ID 생성
+        begin_write(conn)
         set_group_id = f"SET_{uuid.uuid4().hex[:8].upper()}"
 
         # 3. 각 구성품을 Cart에 추가
@@ -403,7 +1107,6 @@ def _addSetToCart(
             cart_item_ids.append(cart_item_id)
 
         conn.commit()
-        conn.close()
 
         # 4. 세트 총액 계산
         set_total = set_price * quantity
@@ -422,7 +1125,7 @@ def _addSetToCart(
         }
 
     except Exception as e:
-        conn.close()
+        conn.rollback()
         return {
             "success": False,
             "cart_item_id": None,
@@ -475,97 +1178,96 @@ def getSetComposition(set_product_id: str, db_path: str = None) -> Dict[str, Any
         db_path = get_default_db_path()
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # 1. 세트 상품 정보 확인
-        cursor.execute("""
-        SELECT product_name, product_type
-        FROM Products
-        WHERE product_id = ?
-        """, (set_product_id,))
+        return _query_set_composition(get_connection(db_path).cursor(), set_product_id)
 
-        set_info = cursor.fetchone()
+    except Exception as e:
+        return {
+            "success": False,
+            "set_product_id": set_product_id,
+            "set_name": None,
+            "items": [],
+            "message": f"세트 구성품 조회 중 오류 발생: {str(e)}"
+        }
 
-        if not set_info:
-            conn.close()
-            return {
-                "success": False,
-                "set_product_id": set_product_id,
-                "set_name": None,
-                "items": [],
-                "message": f"세트 상품 ID '{set_product_id}'를 찾을 수 없습니다."
-            }
 
-        set_name, product_type = set_info
+def _query_set_composition(cursor, set_product_id: str) -> Dict[str, Any]:
+    """세트 구성품 조회 (getSetComposition 본문, 호출한 쪽의 연결을 그대로 사용)"""
+    # 1. 세트 상품 정보 확인
+    cursor.execute("""
+    SELECT product_name, product_type
+    FROM Products
+    WHERE product_id = ?
+    """, (set_product_id,))
 
-        # 2. 세트 메뉴인지 확인
-        if product_type != 'set':
-            conn.close()
-            return {
-                "success": False,
-                "set_product_id": set_product_id,
-                "set_name": set_name,
-                "items": [],
-                "message": f"'{set_name}'는 세트 메뉴가 아닙니다. (타입: {product_type})"
-            }
+    set_info = cursor.fetchone()
 
-        # 3. 세트 구성품 조회 (Set_Items + Products JOIN)
-        cursor.execute("""
-        SELECT
-            p.product_id,
-            p.product_name,
-            p.category_id,
-            p.product_type,
-            p.price,
-            si.quantity
-        FROM Set_Items si
-        JOIN Products p ON si.component_product_id = p.product_id
-        WHERE si.set_product_id = ? AND si.is_default = 1
-        ORDER BY p.product_type
-        """, (set_product_id,))
-
-        components = cursor.fetchall()
-        conn.close()
-
-        if not components:
-            return {
-                "success": False,
-                "set_product_id": set_product_id,
-                "set_name": set_name,
-                "items": [],
-                "message": f"'{set_name}' 세트의 구성품 정보가 없습니다."
-            }
+    if not set_info:
+        return {
+            "success": False,
+            "set_product_id": set_product_id,
+            "set_name": None,
+            "items": [],
+            "message": f"세트 상품 ID '{set_product_id}'를 찾을 수 없습니다."
+        }
 
-        # 4. 구성품 리스트 구성
-        items = []
-        for comp in components:
-            items.append({
-                "product_id": comp[0],
-                "product_name": comp[1],
-                "category_id": comp[2],
-                "product_type": comp[3],
-                "price": comp[4],
-                "quantity": comp[5]
-            })
+    set_name, product_type = set_info
 
+    # 2. 세트 메뉴인지 확인
+    if product_type != 'set':
         return {
-            "success": True,
+            "success": False,
             "set_product_id": set_product_id,
             "set_name": set_name,
-            "items": items,
-            "message": f"세트 구성품 {len(items)}개를 조회했습니다."
+            "items": [],
+            "message": f"'{set_name}'는 세트 메뉴가 아닙니다. (타입: {product_type})"
         }
 
-    except Exception as e:
+    # 3. 세트 구성품 조회 (Set_Items + Products JOIN)
+    cursor.execute("""
+    SELECT
+        p.product_id,
+        p.product_name,
+        p.category_id,
+        p.product_type,
+        p.price,
+        si.quantity
+    FROM Set_Items si
+    JOIN Products p ON si.component_product_id = p.product_id
+    WHERE si.set_product_id = ? AND si.is_default = 1
+    ORDER BY p.product_type
+    """, (set_product_id,))
+
+    components = cursor.fetchall()
+
+    if not components:
         return {
             "success": False,
             "set_product_id": set_product_id,
-            "set_name": None,
+            "set_name": set_name,
             "items": [],
-            "message": f"세트 구성품 조회 중 오류 발생: {str(e)}"
+            "message": f"'{set_name}' 세트의 구성품 정보가 없습니다."
         }
 
+    # 4. 구성품 리스트 구성
+    items = []
+    for comp in components:
+        items.append({
+            "product_id": comp[0],
+            "product_name": comp[1],
+            "category_id": comp[2],
+            "product_type": comp[3],
+            "price": comp[4],
+            "quantity": comp[5]
+        })
+
+    return {
+        "success": True,
+        "set_product_id": set_product_id,
+        "set_name": set_name,
+        "items": items,
+        "message": f"세트 구성품 {len(items)}개를 조회했습니다."
+    }
+
 
 def getCartDetails(session_id: str, db_path: str = None) -> Dict[str, Any]:
     """
@@ -614,7 +1316,7 @@ def getCartDetails(session_id: str, db_path: str = None) -> Dict[str, Any]:
         db_path = get_default_db_path()
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
 
         # 장바구니 조회
@@ -629,7 +1331,6 @@ def getCartDetails(session_id: str, db_path: str = None) -> Dict[str, Any]:
         """, (session_id,))
 
         cart_rows = cursor.fetchall()
-        conn.close()
 
         if not cart_rows:
             return {
@@ -727,7 +1428,7 @@ def updateCartItem(cart_item_id: str, quantity: int, db_path: str = None) -> Dic
         db_path = get_default_db_path()
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
 
         # 1. 기존 장바구니 항목 조회
@@ -740,7 +1441,6 @@ def updateCartItem(cart_item_id: str, quantity: int, db_path: str = None) -> Dic
         cart_item = cursor.fetchone()
 
         if not cart_item:
-            conn.close()
             return {
                 "success": False,
                 "cart_item_id": cart_item_id,
@@ -755,11 +1455,12 @@ def updateCartItem(cart_item_id: str, quantity: int, db_path: str = None) -> Dic
         old_quantity = cart_item[1]
         base_price = cart_item[2]
 
+        begin_write(conn)
+
         # 2. 수량이 0이면 삭제
         if quantity == 0:
             cursor.execute("DELETE FROM Cart WHERE cart_item_id = ?", (cart_item_id,))
             conn.commit()
-            conn.close()
 
             return {
                 "success": True,
@@ -781,7 +1482,6 @@ def updateCartItem(cart_item_id: str, quantity: int, db_path: str = None) -> Dic
         """, (quantity, new_line_total, cart_item_id))
 
         conn.commit()
-        conn.close()
 
         return {
             "success": True,
@@ -795,7 +1495,7 @@ def updateCartItem(cart_item_id: str, quantity: int, db_path: str = None) -> Dic
 
     except Exception as e:
         if 'conn' in locals():
-            conn.close()
+            conn.rollback()
         return {
             "success": False,
             "cart_item_id": cart_item_id,
@@ -836,8 +1536,9 @@ def clearCart(session_id: str, db_path: str = None) -> Dict[str, Any]:
         db_path = get_default_db_path()
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
+        begin_write(conn)
 
         # 1. 삭제할 항목 수 확인
         cursor.execute("SELECT COUNT(*) FROM Cart WHERE session_id = ?", (session_id,))
@@ -847,7 +1548,6 @@ def clearCart(session_id: str, db_path: str = None) -> Dict[str, Any]:
         cursor.execute("DELETE FROM Cart WHERE session_id = ?", (session_id,))
 
         conn.commit()
-        conn.close()
 
         if count == 0:
             return {
@@ -866,7 +1566,7 @@ def clearCart(session_id: str, db_path: str = None) -> Dict[str, Any]:
 
     except Exception as e:
         if 'conn' in locals():
-            conn.close()
+            conn.rollback()
         return {
             "success": False,
             "session_id": session_id,
@@ -934,23 +1634,31 @@ def getSetMenusInCart(
         db_path = get_default_db_path()
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
 
-        # 1. 세트 그룹 ID 목록 조회
-        sql = """
-        SELECT DISTINCT set_group_id, MIN(created_at) as created_at
+        # 1. 세션의 세트 구성품 행을 한 번에 조회 (세트 그룹별로 묶음)
+        cursor.execute("""
+        SELECT set_group_id, cart_item_id, product_id, product_name, quantity, base_price, line_total, created_at
         FROM Cart
         WHERE session_id = ? AND set_group_id IS NOT NULL
-        """
-        params = [session_id]
-        sql += " GROUP BY set_group_id ORDER BY created_at ASC"
+        ORDER BY set_group_id, cart_item_id
+        """, (session_id,))
 
-        cursor.execute(sql, params)
-        set_groups = cursor.fetchall()
+        groups = {}
+        for set_group_id, cart_item_id, product_id, product_name, quantity, base_price, line_total, created_at in cursor.fetchall():
+            group = groups.setdefault(set_group_id, {"items": [], "total_price": 0, "created_at": created_at})
+            group["items"].append({
+                "cart_item_id": cart_item_id,
+                "product_id": product_id,
+                "product_name": product_name,
+                "quantity": quantity,
+                "base_price": base_price
+            })
+            group["total_price"] += line_total
+            group["created_at"] = min(group["created_at"], created_at)
 
-        if not set_groups:
-            conn.close()
+        if not groups:
             return {
                 "success": True,
                 "sets": [],
@@ -958,93 +1666,26 @@ def getSetMenusInCart(
                 "message": "장바구니에 세트 메뉴가 없습니다."
             }
 
-        # 2. 각 세트의 상세 정보 조회
+        # 2. 구성품 조합으로 세트 상품 찾기 (세트 구성 시그니처 인덱스, 사전 조회)
+        composition_index = get_set_composition_index(db_path)
         sets = []
-        for set_group_id, created_at in set_groups:
-            # 세트 항목들 조회
-            cursor.execute("""
-            SELECT cart_item_id, product_id, product_name, quantity, base_price, line_total
-            FROM Cart
-            WHERE session_id = ? AND set_group_id = ?
-            ORDER BY cart_item_id
-            """, (session_id, set_group_id))
-
-            items = []
-            total_price = 0
-            set_name = None
-            found_set_product_id = None
-
-            for row in cursor.fetchall():
-                items.append({
-                    "cart_item_id": row[0],
-                    "product_id": row[1],
-                    "product_name": row[2],
-                    "quantity": row[3],
-                    "base_price": row[4]
-                })
-                total_price += row[5]  # line_total
-
-            # 세트 상품 ID 찾기: 모든 구성품이 일치하는 세트 찾기
-            if items:
-                # 현재 세트의 모든 product_id 수집
-                cart_product_ids = set(item['product_id'] for item in items)
-
-                # Set_Items에서 이 구성품들로 이루어진 세트 찾기
-                cursor.execute("""
-                SELECT DISTINCT p.product_id, p.product_name
-                FROM Products p
-                WHERE p.product_type = 'set'
-                """)
-
-                potential_sets = cursor.fetchall()
-
-                best_match = None
-                max_match_count = 0
-
-                # 각 세트의 구성품과 비교하여 가장 일치하는 세트 찾기
-                for potential_set_id, potential_set_name in potential_sets:
-                    cursor.execute("""
-                    SELECT component_product_id
-                    FROM Set_Items
-                    WHERE set_product_id = ? AND is_default = TRUE
-                    """, (potential_set_id,))
-
-                    default_components = set(row[0] for row in cursor.fetchall())
-
-                    # 구성품 개수가 다르면 건너뛰기
-                    if len(default_components) != len(cart_product_ids):
-                        continue
-
-                    # 일치하는 구성품 개수 계산
-                    match_count = len(cart_product_ids.intersection(default_components))
-
-                    # 더 많이 일치하는 세트로 업데이트
-                    if match_count > max_match_count:
-                        max_match_count = match_count
-                        best_match = (potential_set_id, potential_set_name)
-
-                # 가장 잘 일치하는 세트 선택
-                if best_match:
-                    found_set_product_id, set_name = best_match
-                else:
-                    set_name = "세트 메뉴"
+        for set_group_id, group in sorted(groups.items(), key=lambda entry: (entry[1]["created_at"], entry[0])):
+            match = composition_index.match(item["product_id"] for item in group["items"])
+            found_set_product_id, set_name = match if match else (None, "세트 메뉴")
 
             # set_product_id 필터링 (지정된 경우)
             if set_product_id and found_set_product_id != set_product_id:
-                # 필터 조건에 맞지 않으면 건너뛰기
                 continue
 
             sets.append({
                 "set_group_id": set_group_id,
                 "set_product_id": found_set_product_id,
                 "set_name": set_name,
-                "items": items,
-                "total_price": total_price,
-                "created_at": created_at
+                "items": group["items"],
+                "total_price": group["total_price"],
+                "created_at": group["created_at"]
             })
 
-        conn.close()
-
         return {
             "success": True,
             "sets": sets,
@@ -1054,7 +1695,7 @@ def getSetMenusInCart(
 
     except Exception as e:
         if 'conn' in locals():
-            conn.close()
+            conn.rollback()
         return {
             "success": False,
             "sets": [],
@@ -1213,7 +1854,7 @@ def updateSetItem(
         target_set_group_id = target_set['set_group_id']
 
         # 3. 새 상품 정보 조회
-        conn = sqlite3.connect(db_path)
+        conn = get_connection(db_path)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -1224,7 +1865,6 @@ def updateSetItem(
 
         new_product_row = cursor.fetchone()
         if not new_product_row:
-            conn.close()
             return {
                 "status": "ERROR",
                 "success": False,
@@ -1247,7 +1887,6 @@ def updateSetItem(
 
         old_product_row = cursor.fetchone()
         if not old_product_row:
-            conn.close()
             return {
                 "status": "ERROR",
                 "success": False,
@@ -1270,6 +1909,7 @@ def updateSetItem(
         price_difference = new_product_info['price'] - old_product_info['price']
 
         # 7. Cart 테이블에서 기존 상품을 새 상품으로 교체
+        begin_write(conn)
         cursor.execute("""
         UPDATE Cart
         SET
@@ -1293,7 +1933,7 @@ def updateSetItem(
         rows_updated = cursor.rowcount
 
         if rows_updated == 0:
-            conn.close()
+            conn.rollback()
             return {
                 "status": "ERROR",
                 "success": False,
@@ -1301,7 +1941,6 @@ def updateSetItem(
             }
 
         conn.commit()
-        conn.close()
 
         # 8. 성공 메시지 생성
         if price_difference > 0:
@@ -1331,7 +1970,7 @@ def updateSetItem(
 
     except Exception as e:
         if conn:
-            conn.close()
+            conn.rollback()
         return {
             "status": "ERROR",
             "success": False,
@@ -1344,17 +1983,22 @@ def processOrder(
     customer_name: str = "",
     customer_phone: str = "",
     order_type: str = "takeout",
-    db_path: str = None
+    db_path: str = None,
+    explain: bool = False
 ) -> Dict[str, Any]:
     """
     장바구니 내용을 기반으로 주문 생성 (Task 4.1)
 
+    장바구니 조회부터 비우기까지 하나의 BEGIN IMMEDIATE 트랜잭션에서 처리한다.
+    합계는 SQL 로 계산하고, 주문 항목은 INSERT INTO Order_Items SELECT ... FROM Cart 로 한 번에 복사한다.
+
     Args:
         session_id: 사용자 세션 ID
         customer_name: 고객 이름 (선택사항)
         customer_phone: 고객 전화번호 (선택사항)
         order_type: 주문 유형 ("takeout", "delivery", "dine-in") 기본값: "takeout"
         db_path: 데이터베이스 경로
+        explain: True면 단계별 소요 시간을 "diagnostics"로 함께 반환
 
     Returns:
         {
@@ -1364,7 +2008,8 @@ def processOrder(
             "total_items": int,
             "total_price": int,
             "created_at": str,
-            "message": str
+            "message": str,
+            "diagnostics": {...}        # explain=True 일 때만
         }
 
     Examples:
@@ -1382,22 +2027,41 @@ def processOrder(
     if db_path is None:
         db_path = get_default_db_path()
 
+    diagnostics = StageTimings() if explain else None
+    result = _process_order(session_id, customer_name, customer_phone, order_type, db_path, diagnostics)
+    if diagnostics is not None:
+        result["diagnostics"] = diagnostics.to_dict()
+    return result
+
+
+def _process_order(
+    session_id: str,
+    customer_name: str,
+    customer_phone: str,
+    order_type: str,
+    db_path: str,
+    diagnostics: Optional[StageTimings]
+) -> Dict[str, Any]:
+    """processOrder 본문 (diagnostics가 있으면 단계별 시간 기록)"""
     try:
-        # 1. 장바구니 조회
-        cart = getCartDetails(session_id, db_path)
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
 
-        if not cart['success']:
-            return {
-                "success": False,
-                "order_id": None,
-                "order_number": None,
-                "total_items": 0,
-                "total_price": 0,
-                "created_at": None,
-                "message": f"장바구니 조회 실패: {cart['message']}"
-            }
+        # 1. 쓰기 잠금 (조회한 장바구니가 저장 전에 바뀌지 않도록 처음부터)
+        with stage(diagnostics, "lock"):
+            begin_write(conn)
+
+        # 2. 장바구니 항목 수 / 합계
+        with stage(diagnostics, "cart"):
+            cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(line_total), 0)
+            FROM Cart
+            WHERE session_id = ?
+            """, (session_id,))
+            total_items, total_price = cursor.fetchone()
 
-        if cart['total_items'] == 0:
+        if total_items == 0:
+            conn.rollback()
             return {
                 "success": False,
                 "order_id": None,
@@ -1408,84 +2072,75 @@ def processOrder(
                 "message": "장바구니가 비어 있습니다. 상품을 먼저 담아주세요."
             }
 
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # 2. 주문 ID 생성
+        # 3. 주문 ID / 주문 번호 생성 (오늘의 주문 카운트 + 1)
         order_id = f"ORD_{uuid.uuid4().hex[:8].upper()}"
-
-        # 3. 주문 번호 생성 (오늘의 주문 카운트 + 1)
-        cursor.execute("""
-        SELECT COUNT(*) FROM Orders
-        WHERE DATE(created_at) = DATE('now')
-        """)
-        today_order_count = cursor.fetchone()[0]
-        order_number = today_order_count + 1
+        with stage(diagnostics, "order_number"):
+            cursor.execute("""
+            SELECT COUNT(*) FROM Orders
+            WHERE DATE(created_at) = DATE('now')
+            """)
+            order_number = cursor.fetchone()[0] + 1
 
         # 4. Orders 테이블에 주문 생성
-        cursor.execute("""
-        INSERT INTO Orders (
-            order_id, session_id, total_amount, order_type,
-            customer_name, customer_phone, status, estimated_time
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            order_id,
-            session_id,
-            cart['total_price'],
-            order_type,
-            customer_name if customer_name else "",
-            customer_phone if customer_phone else "",
-            "pending",
-            15  # 예상 소요 시간 15분
-        ))
-
-        # 5. Order_Items 테이블에 주문 항목들 저장
-        for item in cart['items']:
-            order_item_id = f"OITEM_{uuid.uuid4().hex[:8].upper()}"
+        with stage(diagnostics, "order"):
+            cursor.execute("""
+            INSERT INTO Orders (
+                order_id, session_id, total_amount, order_type,
+                customer_name, customer_phone, status, estimated_time
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                order_id,
+                session_id,
+                total_price,
+                order_type,
+                customer_name if customer_name else "",
+                customer_phone if customer_phone else "",
+                "pending",
+                15  # 예상 소요 시간 15분
+            ))
+            cursor.execute("SELECT created_at FROM Orders WHERE order_id = ?", (order_id,))
+            created_at = cursor.fetchone()[0]
 
+        # 5. 장바구니 항목을 Order_Items 로 한 번에 복사
+        with stage(diagnostics, "items"):
             cursor.execute("""
             INSERT INTO Order_Items (
                 order_item_id, order_id, product_id, product_name, order_type,
                 quantity, base_price, modifications, line_total,
                 special_requests, set_group_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                order_item_id,
-                order_id,
-                item['product_id'],
-                item['product_name'],
-                item['order_type'],
-                item['quantity'],
-                item['base_price'],
-                "",  # modifications
-                item['line_total'],
-                item['special_requests'],
-                item['set_group_id']
-            ))
+            )
+            SELECT
+                'OITEM_' || hex(randomblob(4)), ?, product_id, product_name, order_type,
+                quantity, base_price, '', line_total,
+                COALESCE(special_requests, ''), set_group_id
+            FROM Cart
+            WHERE session_id = ?
+            ORDER BY created_at
+            """, (order_id, session_id))
 
-        # 6. 주문 생성 시간 조회
-        cursor.execute("SELECT created_at FROM Orders WHERE order_id = ?", (order_id,))
-        created_at = cursor.fetchone()[0]
+        # 6. 장바구니 비우기
+        with stage(diagnostics, "clear_cart"):
+            cursor.execute("DELETE FROM Cart WHERE session_id = ?", (session_id,))
 
-        # 7. 장바구니 비우기
-        cursor.execute("DELETE FROM Cart WHERE session_id = ?", (session_id,))
+        with stage(diagnostics, "commit"):
+            conn.commit()
 
-        conn.commit()
-        conn.close()
+        if diagnostics is not None:
+            diagnostics.count("items", total_items)
 
         return {
             "success": True,
             "order_id": order_id,
             "order_number": order_number,
-            "total_items": cart['total_items'],
-            "total_price": cart['total_price'],
+            "total_items": total_items,
+            "total_price": total_price,
             "created_at": created_at,
             "message": f"주문이 완료되었습니다. 주문번호: {order_number}"
         }
 
     except Exception as e:
         if 'conn' in locals():
-            conn.close()
+            conn.rollback()
         return {
             "success": False,
             "order_id": None,
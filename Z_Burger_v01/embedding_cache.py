@@ -0,0 +1,181 @@
+"""
+쿼리 임베딩 캐시 (_get_embedding 앞단)
+
+키오스크에서 반복되는 검색어("콜라", "양념감자" 등)가 매번 OpenAI API를
+호출하지 않도록 2단계 캐시를 둔다.
+
+1단계: 프로세스 내 LRU (최대 크기 + TTL)
+2단계: SQLite Embedding_Cache 테이블 (재시작 후에도 유지)
+
+캐시 키는 정규화된 검색어 + 모델 이름이다.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional, List
+from embedding_codec import encode_embedding, decode_embedding
+from db_connection import get_connection
+
+
+EMBEDDING_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Embedding_Cache (
+    cache_key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    query_text TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """캐시 키용 검색어 정규화 (NFC, 소문자, 연속 공백 축약)"""
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def make_cache_key(text: str, model: str) -> str:
+    """정규화된 검색어 + 모델 이름으로 캐시 키 생성"""
+    return f"{model}:{normalize_query_text(text)}"
+
+
+class EmbeddingCache:
+    """
+    쿼리 임베딩 2단계 캐시
+
+    Args:
+        max_size: 메모리 LRU 최대 항목 수
+        ttl_seconds: 메모리 LRU 항목 유효 시간 (초)
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready_dbs = set()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    # ---------- 1단계: 메모리 LRU ----------
+
+    def _get_memory(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+
+            vector, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._memory[key]
+                return None
+
+            self._memory.move_to_end(key)
+            return vector
+
+    def _put_memory(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._memory[key] = (vector, time.monotonic())
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    # ---------- 2단계: SQLite 영구 캐시 ----------
+
+    def _ensure_table(self, conn: sqlite3.Connection, db_path: str) -> None:
+        if db_path not in self._ready_dbs:
+            conn.execute(EMBEDDING_CACHE_SCHEMA)
+            conn.commit()
+            self._ready_dbs.add(db_path)
+
+    def _get_persistent(self, key: str, db_path: str) -> Optional[np.ndarray]:
+        conn = get_connection(db_path)
+        try:
+            self._ensure_table(conn, db_path)
+            row = conn.execute(
+                "SELECT embedding FROM Embedding_Cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        except Exception:
+            conn.rollback()
+            raise
+
+        if row is None:
+            return None
+
+        vector, _model = decode_embedding(row[0])
+        return vector
+
+    def _put_persistent(self, key: str, text: str, model: str, vector: np.ndarray, db_path: str) -> None:
+        conn = get_connection(db_path)
+        try:
+            self._ensure_table(conn, db_path)
+            conn.execute("""
+            INSERT OR REPLACE INTO Embedding_Cache (cache_key, model, query_text, embedding)
+            VALUES (?, ?, ?, ?)
+            """, (key, model, normalize_query_text(text), encode_embedding(vector, model)))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    # ---------- 공개 인터페이스 ----------
+
+    def get(self, text: str, model: str, db_path: Optional[str] = None) -> Optional[np.ndarray]:
+        """캐시 조회 (메모리 → SQLite 순). 없으면 None"""
+        key = make_cache_key(text, model)
+
+        vector = self._get_memory(key)
+        if vector is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return vector
+
+        if db_path is not None:
+            vector = self._get_persistent(key, db_path)
+            if vector is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                self._put_memory(key, vector)
+                return vector
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, model: str, vector: List[float], db_path: Optional[str] = None) -> np.ndarray:
+        """캐시 저장 (메모리 + SQLite)"""
+        key = make_cache_key(text, model)
+        vector = np.asarray(vector, dtype=np.float32)
+
+        self._put_memory(key, vector)
+        if db_path is not None:
+            self._put_persistent(key, text, model, vector, db_path)
+        return vector
+
+    def clear_memory(self) -> None:
+        """메모리 캐시 비우기 (SQLite 캐시는 유지)"""
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스 카운터"""
+        with self._lock:
+            memory_hits, persistent_hits, misses = self.memory_hits, self.persistent_hits, self.misses
+            memory_size = len(self._memory)
+        lookups = memory_hits + persistent_hits + misses
+        hits = memory_hits + persistent_hits
+        return {
+            "memory_hits": memory_hits,
+            "persistent_hits": persistent_hits,
+            "misses": misses,
+            "memory_size": memory_size,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,69 @@
+"""
+상품 임베딩 바이너리 저장 포맷
+
+Products.embedding 에 JSON 문자열 대신 다음 형식의 BLOB을 저장한다.
+
+    [magic 4B "BEMB"][format version 1B][dim uint32 LE][model 길이 1B][model UTF-8]
+    [float32 little-endian x dim]
+
+1536차원 기준 JSON(약 30KB) 대비 약 6KB로 줄어들고,
+읽을 때는 np.frombuffer 로 파싱 없이 바로 벡터를 얻는다.
+기존 JSON 행도 decode_embedding 에서 그대로 읽을 수 있다.
+"""
+
+import json
+import struct
+import numpy as np
+from typing import List, Optional, Tuple, Union
+
+
+EMBEDDING_MAGIC = b"BEMB"
+EMBEDDING_FORMAT_VERSION = 1
+
+# magic, format version, dim, model 이름 길이
+_HEADER = struct.Struct("<4sBIB")
+_FLOAT32_LE = np.dtype("<f4")
+
+
+def encode_embedding(vector: Union[List[float], np.ndarray], model: str) -> bytes:
+    """임베딩 벡터를 헤더 + float32 LE BLOB 으로 인코딩"""
+    values = np.asarray(vector, dtype=_FLOAT32_LE).ravel()
+    model_bytes = model.encode("utf-8")
+
+    if len(model_bytes) > 255:
+        raise ValueError(f"모델 이름이 너무 깁니다: {model}")
+
+    header = _HEADER.pack(
+        EMBEDDING_MAGIC, EMBEDDING_FORMAT_VERSION, values.size, len(model_bytes)
+    )
+    return header + model_bytes + values.tobytes()
+
+
+def is_binary_embedding(value) -> bool:
+    """바이너리 포맷으로 저장된 임베딩인지 확인"""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:4]) == EMBEDDING_MAGIC
+
+
+def decode_embedding(value: Union[bytes, str]) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    저장된 임베딩을 (float32 벡터, 모델 이름) 으로 디코딩
+
+    - BLOB: np.frombuffer 로 복사 없이 읽음 (읽기 전용 배열)
+    - 기존 JSON TEXT: json.loads 후 float32 변환, 모델 이름은 None
+    """
+    if isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=np.float32), None
+
+    if not is_binary_embedding(value):
+        raise ValueError("알 수 없는 임베딩 포맷입니다.")
+
+    magic, format_version, dim, model_len = _HEADER.unpack_from(value, 0)
+    if format_version != EMBEDDING_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 임베딩 포맷 버전입니다: {format_version}")
+
+    offset = _HEADER.size
+    model = bytes(value[offset:offset + model_len]).decode("utf-8")
+    offset += model_len
+
+    vector = np.frombuffer(value, dtype=_FLOAT32_LE, count=dim, offset=offset)
+    return vector, model
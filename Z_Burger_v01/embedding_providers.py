@@ -0,0 +1,158 @@
+"""
+임베딩 제공자 (Embedding Provider)
+
+findProduct 와 setup_embeddings 가 사용하는 임베딩 생성 백엔드를 교체할 수 있도록
+공통 인터페이스를 둔다.
+
+- OpenAIEmbeddingProvider: OpenAI API (text-embedding-3-small 등)
+- HashedNgramEmbeddingProvider: 네트워크 없이 동작하는 결정적(deterministic) 로컬 벡터화
+  (음절 n-gram + 자모 n-gram 을 해싱, 한글 오타에 강함)
+
+환경변수 설정:
+    EMBEDDING_PROVIDER = "openai" (기본값) | "local"
+    EMBEDDING_MODEL    = OpenAI 모델 이름 (기본값: text-embedding-3-small)
+    LOCAL_EMBEDDING_DIM = 로컬 벡터 차원 (기본값: 512)
+"""
+
+import os
+import re
+import zlib
+import unicodedata
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from dotenv import load_dotenv
+from hangul import decompose_jamo
+
+load_dotenv()
+
+DEFAULT_OPENAI_MODEL = "text-embedding-3-small"
+
+
+class EmbeddingProvider(ABC):
+    """
+    임베딩 제공자 공통 인터페이스
+
+    Attributes:
+        name: 제공자 이름 ("openai", "local")
+        model: 저장/캐시 키에 기록되는 모델 이름
+        cacheable: 쿼리 임베딩을 캐시할 가치가 있는지 (네트워크 호출 여부)
+    """
+
+    name = "base"
+    model = ""
+    cacheable = True
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트를 한 번에 임베딩 (입력 순서대로 반환)"""
+
+    def embed_one(self, text: str) -> List[float]:
+        """텍스트 1개 임베딩"""
+        return self.embed([text])[0]
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI Embeddings API 제공자 (클라이언트는 첫 호출 시 생성)"""
+
+    name = "openai"
+
+    def __init__(self, model: str = DEFAULT_OPENAI_MODEL, api_key: Optional[str] = None):
+        self.model = model
+        self._api_key = api_key
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self._api_key or os.getenv('OPENAI_API_KEY'))
+        return self._client
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(
+            input=list(texts),
+            model=self.model
+        )
+        # API 응답은 index 기준으로 입력 순서와 매칭
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in ordered]
+
+
+class HashedNgramEmbeddingProvider(EmbeddingProvider):
+    """
+    해시 기반 문자 n-gram 로컬 임베딩
+
+    - 공백을 제거한 음절 1~3-gram (띄어쓰기 차이에 강함)
+    - 자모 분해 문자열의 3-gram (받침/모음 오타에 강함)
+    을 crc32 로 dim 개 버킷에 해싱(부호 해싱 포함)한 뒤 L2 정규화한다.
+    같은 입력은 프로세스/머신과 무관하게 항상 같은 벡터를 만든다.
+    """
+
+    name = "local"
+    cacheable = False
+
+    SYLLABLE_WEIGHT = 1.0
+    JAMO_WEIGHT = 0.5
+
+    _non_word = re.compile(r"[^\w]+")
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.model = f"hashed-ngram-v1-{dim}"
+
+    def _features(self, text: str):
+        text = unicodedata.normalize("NFC", text).lower()
+        compact = self._non_word.sub("", text)
+
+        for n in (1, 2, 3):
+            for i in range(len(compact) - n + 1):
+                yield f"s{n}:{compact[i:i + n]}", self.SYLLABLE_WEIGHT
+
+        jamo = decompose_jamo(compact)
+        for i in range(len(jamo) - 2):
+            yield f"j3:{jamo[i:i + 3]}", self.JAMO_WEIGHT
+
+    def _vectorize(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if (h >> 31) == 0 else -1.0
+            vector[h % self.dim] += sign * weight
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._vectorize(text) for text in texts]
+
+
+_provider: Optional[EmbeddingProvider] = None
+
+
+def create_embedding_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """이름(또는 EMBEDDING_PROVIDER 환경변수)으로 제공자 생성"""
+    name = (name or os.getenv('EMBEDDING_PROVIDER', 'openai')).lower()
+
+    if name == "openai":
+        return OpenAIEmbeddingProvider(model=os.getenv('EMBEDDING_MODEL', DEFAULT_OPENAI_MODEL))
+    if name == "local":
+        return HashedNgramEmbeddingProvider(dim=int(os.getenv('LOCAL_EMBEDDING_DIM', '512')))
+
+    raise ValueError(f"알 수 없는 임베딩 제공자입니다: {name}")
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """현재 설정된 임베딩 제공자 (프로세스 내 1개 공유)"""
+    global _provider
+    if _provider is None:
+        _provider = create_embedding_provider()
+    return _provider
+
+
+def set_embedding_provider(provider: EmbeddingProvider) -> None:
+    """임베딩 제공자 교체 (테스트, 오프라인 매장 등)"""
+    global _provider
+    _provider = provider
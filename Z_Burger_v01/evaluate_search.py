@@ -0,0 +1,121 @@
+"""
+검색 모드 평가 (semantic / lexical / hybrid)
+
+test_task_3_1_semantic_search.py 의 검색어를 각 검색 모드로 실행하여
+모드별 상태 분포, 되묻기(AMBIGUOUS) 비율, 정확도, 평균 지연 시간을 출력한다.
+
+정확도 기준 (검색어별):
+    expected_status: 허용되는 상태 목록
+    expected_terms: FOUND 상품명 또는 AMBIGUOUS 후보 전체에 포함되어야 하는 단어 (하나라도)
+
+사용법:
+    python evaluate_search.py                  # 세 모드 모두
+    python evaluate_search.py lexical hybrid   # 지정한 모드만
+"""
+
+import sys
+import io
+import time
+from typing import Dict, Any, List
+from db_functions import findProduct, get_default_db_path
+from fts_index import SEARCH_MODES
+
+# Windows 인코딩 문제 해결
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+EVALUATION_QUERIES = [
+    {"query": "한우불고기버거", "category": None,
+     "expected_status": ["FOUND"], "expected_terms": ["한우불고기버거"]},
+    {"query": "매콤한 감자", "category": None,
+     "expected_status": ["FOUND", "AMBIGUOUS"], "expected_terms": ["칠리", "양념감자"]},
+    {"query": "양념감자", "category": None,
+     "expected_status": ["AMBIGUOUS"], "expected_terms": ["양념감자"]},
+    {"query": "감자", "category": "sides",
+     "expected_status": ["FOUND", "AMBIGUOUS"], "expected_terms": ["감자"]},
+    {"query": "콜라", "category": "beverage",
+     "expected_status": ["FOUND", "AMBIGUOUS"], "expected_terms": ["콜라"]},
+    {"query": "한우불고기버거 세트", "category": "set",
+     "expected_status": ["FOUND"], "expected_terms": ["세트"]},
+    {"query": "피자", "category": None,
+     "expected_status": ["NOT_FOUND"], "expected_terms": []},
+    {"query": "치즈가 들어간 버거", "category": "burger",
+     "expected_status": ["FOUND", "AMBIGUOUS"], "expected_terms": ["치즈"]},
+]
+
+REPEATS = 5
+
+
+def is_correct(case: Dict[str, Any], result: Dict[str, Any]) -> bool:
+    """검색 결과가 기대 상태/상품명 조건을 만족하는지"""
+    if result["status"] not in case["expected_status"]:
+        return False
+    if not case["expected_terms"]:
+        return True
+
+    if result["status"] == "FOUND":
+        names = [result["product"]["product_name"]]
+    else:
+        names = [match["product_name"] for match in result["matches"]]
+
+    return bool(names) and all(any(term in name for term in case["expected_terms"]) for name in names)
+
+
+def evaluate_mode(mode: str, db_path: str) -> Dict[str, Any]:
+    """한 검색 모드로 모든 검색어 실행 (첫 호출로 인덱스/캐시를 데운 뒤 REPEATS 회 측정)"""
+    statuses: Dict[str, int] = {}
+    correct = 0
+    latencies: List[float] = []
+    rows = []
+
+    for case in EVALUATION_QUERIES:
+        result = findProduct(case["query"], case["category"], db_path=db_path, search_mode=mode)
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            findProduct(case["query"], case["category"], db_path=db_path, search_mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000 / REPEATS)
+
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        ok = is_correct(case, result)
+        correct += ok
+
+        top = result["product"] or (result["matches"][0] if result["matches"] else None)
+        rows.append((case["query"], result["status"], top["product_name"] if top else "-", ok))
+
+    return {
+        "mode": mode,
+        "statuses": statuses,
+        "accuracy": correct / len(EVALUATION_QUERIES),
+        "ambiguous_rate": statuses.get("AMBIGUOUS", 0) / len(EVALUATION_QUERIES),
+        "latency_ms": sum(latencies) / len(latencies),
+        "rows": rows
+    }
+
+
+def main():
+    modes = [mode for mode in sys.argv[1:] if mode in SEARCH_MODES] or list(SEARCH_MODES)
+    db_path = get_default_db_path()
+    print(f"DB 경로: {db_path}")
+    print(f"검색어 수: {len(EVALUATION_QUERIES)}, 반복: {REPEATS}\n")
+
+    reports = []
+    for mode in modes:
+        report = evaluate_mode(mode, db_path)
+        reports.append(report)
+
+        print(f"[{mode}]")
+        for query, status, top_name, ok in report["rows"]:
+            print(f"  {'✅' if ok else '❌'} {query:<20} {status:<10} {top_name}")
+        print()
+
+    print(f"{'모드':<10} {'정확도':>8} {'AMBIGUOUS':>10} {'지연(ms)':>10}  상태 분포")
+    print("-" * 72)
+    for report in reports:
+        distribution = ", ".join(f"{status}={count}" for status, count in sorted(report["statuses"].items()))
+        print(f"{report['mode']:<10} {report['accuracy']:>8.0%} {report['ambiguous_rate']:>10.0%} "
+              f"{report['latency_ms']:>10.2f}  {distribution}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+SQLite FTS5 어휘 검색 백엔드 + 하이브리드 순위 결합
+
+Products.product_name / description 에 대한 FTS5 가상 테이블(Products_FTS)을 만들고
+트리거로 Products 와 동기화한다. 검색은 SQLite 안에서 BM25 로 순위를 매긴다.
+
+- 한국어 복합어("양념감자" 안의 "감자")도 찾을 수 있도록 trigram 토크나이저를 사용한다.
+- trigram 으로 찾을 수 없는 2글자 단어("콜라", "칠리")는 LIKE 부분 일치 개수로 점수를 더한다.
+- 하이브리드 모드는 BM25 순위와 임베딩 순위를 Reciprocal Rank Fusion 으로 합친다.
+  (2글자 단어는 LIKE 일치 상품이 모두 같은 점수이므로 같은 점수는 같은 순위로 본다)
+
+검색 모드 (findProduct 의 search_mode 또는 SEARCH_MODE 환경변수):
+    "semantic" (기본값): 임베딩 유사도
+    "lexical": FTS5 BM25 만 사용 (임베딩 API 호출 없음)
+    "hybrid": BM25 + 임베딩 순위 결합
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+from dotenv import load_dotenv
+from db_connection import get_connection
+
+load_dotenv()
+
+SEARCH_MODES = ("semantic", "lexical", "hybrid")
+
+# RRF 상수 (순위 1위와 2위의 가중치 차이를 완만하게)
+RRF_K = 60
+
+# BM25 열 가중치 (상품명, 설명)
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# trigram 토크나이저로 검색 가능한 최소 단어 길이 (더 짧은 단어는 LIKE 로 검색)
+MIN_TERM_LENGTH = 3
+MIN_SHORT_TERM_LENGTH = 2
+
+# 2글자 단어 점수와 합치기 전에 MATCH 에서 가져올 후보 수 = limit * 배수
+MATCH_CANDIDATE_FACTOR = 4
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS Products_FTS USING fts5(
+    product_name,
+    description,
+    content='Products',
+    content_rowid='rowid',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_insert
+AFTER INSERT ON Products
+BEGIN
+    INSERT INTO Products_FTS (rowid, product_name, description)
+    VALUES (new.rowid, new.product_name, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_delete
+AFTER DELETE ON Products
+BEGIN
+    INSERT INTO Products_FTS (Products_FTS, rowid, product_name, description)
+    VALUES ('delete', old.rowid, old.product_name, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_fts_update
+AFTER UPDATE OF product_name, description ON Products
+BEGIN
+    INSERT INTO Products_FTS (Products_FTS, rowid, product_name, description)
+    VALUES ('delete', old.rowid, old.product_name, old.description);
+    INSERT INTO Products_FTS (rowid, product_name, description)
+    VALUES (new.rowid, new.product_name, new.description);
+END;
+"""
+
+_ready_dbs = set()
+_ready_lock = threading.Lock()
+
+_TERM_SPLIT = re.compile(r"[^\w]+")
+
+
+def get_search_mode(search_mode: Optional[str] = None) -> str:
+    """검색 모드 결정 (인자 → SEARCH_MODE 환경변수 → semantic)"""
+    mode = (search_mode or os.getenv('SEARCH_MODE', 'semantic')).lower()
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"알 수 없는 검색 모드입니다: {mode}")
+    return mode
+
+
+def ensure_fts_index(conn: sqlite3.Connection) -> None:
+    """Products_FTS 가상 테이블과 동기화 트리거 생성 (처음 만들 때 기존 상품 색인)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Products_FTS'"
+    ).fetchone()
+
+    conn.executescript(FTS_SCHEMA)
+    if not exists:
+        conn.execute("INSERT INTO Products_FTS (Products_FTS) VALUES ('rebuild')")
+    conn.commit()
+
+
+def split_terms(query: str) -> Tuple[List[str], List[str]]:
+    """검색어를 (3글자 이상 단어, 2글자 단어) 로 분리 (중복 제거)"""
+    terms = list(dict.fromkeys(_TERM_SPLIT.split(query.lower())))
+    long_terms = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+    short_terms = [term for term in terms if MIN_SHORT_TERM_LENGTH <= len(term) < MIN_TERM_LENGTH]
+    return long_terms, short_terms
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    사용자 검색어를 FTS5 MATCH 식으로 변환
+
+    3글자 이상 단어를 각각 구문(phrase)으로 감싸 OR 로 연결한다.
+    검색 가능한 단어가 없으면 None
+    """
+    long_terms, _ = split_terms(query)
+    if not long_terms:
+        return None
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in long_terms)
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def lexical_search(
+    db_path: str,
+    requests: List[Tuple[str, Optional[str]]],
+    limit: int
+) -> List[List[Tuple[str, float]]]:
+    """
+    (검색어, 카테고리) 목록을 BM25 로 검색 (연결 1회)
+
+    3글자 이상 단어는 FTS5 MATCH 의 BM25 점수, 2글자 단어는 상품명/설명 LIKE 일치에
+    열 가중치만큼 점수를 빼서 더한다.
+
+    Returns:
+        검색어 순서대로 [(product_id, 점수), ...] (점수는 음수, 작을수록 관련도 높음)
+    """
+    conn = get_connection(db_path)
+    try:
+        with _ready_lock:
+            if db_path not in _ready_dbs:
+                ensure_fts_index(conn)
+                _ready_dbs.add(db_path)
+
+        results = []
+        for query, category in requests:
+            scores: Dict[str, float] = {}
+            category_sql = " AND p.product_type = ?" if category else ""
+            category_params = [category] if category else []
+
+            match_query = build_match_query(query)
+            if match_query is not None:
+                rows = conn.execute(f"""
+                SELECT p.product_id, bm25(Products_FTS, ?, ?)
+                FROM Products_FTS
+                JOIN Products p ON p.rowid = Products_FTS.rowid
+                WHERE Products_FTS MATCH ? AND p.stock_quantity > 0{category_sql}
+                ORDER BY 2
+                LIMIT ?
+                """, [NAME_WEIGHT, DESCRIPTION_WEIGHT, match_query] + category_params + [limit * MATCH_CANDIDATE_FACTOR])
+                scores.update(rows.fetchall())
+
+            _, short_terms = split_terms(query)
+            for term in short_terms:
+                pattern = _like_pattern(term)
+                rows = conn.execute(f"""
+                SELECT p.product_id,
+                       (p.product_name LIKE ? ESCAPE '\\') * ? + (COALESCE(p.description, '') LIKE ? ESCAPE '\\') * ?
+                FROM Products p
+                WHERE p.stock_quantity > 0{category_sql}
+                  AND (p.product_name LIKE ? ESCAPE '\\' OR p.description LIKE ? ESCAPE '\\')
+                """, [pattern, NAME_WEIGHT, pattern, DESCRIPTION_WEIGHT] + category_params + [pattern, pattern])
+                for product_id, hits in rows:
+                    scores[product_id] = scores.get(product_id, 0.0) - hits
+
+            ranked = sorted(scores.items(), key=lambda item: item[1])
+            results.append(ranked[:limit])
+
+        return results
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def shared_ranks(scores: List[float]) -> List[int]:
+    """정렬된 점수 목록의 순위 (같은 점수는 같은 순위: [-11, -11, -1] → [1, 1, 3])"""
+    ranks = []
+    for position, score in enumerate(scores, start=1):
+        ranks.append(ranks[-1] if ranks and score == scores[position - 2] else position)
+    return ranks
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]],
+    k: int = RRF_K,
+    scores: Optional[List[Optional[List[float]]]] = None
+) -> List[Tuple[str, float]]:
+    """
+    여러 순위 목록을 RRF 로 결합: score(d) = Σ 1 / (k + rank(d))
+
+    Args:
+        scores: 순위 목록별 점수 (같은 점수는 같은 순위, None 이면 목록 순서대로)
+
+    Returns:
+        [(키, RRF 점수), ...] 점수 내림차순 (동점이면 먼저 나온 순서)
+    """
+    fused: Dict[str, float] = {}
+    for i, ranking in enumerate(rankings):
+        ranking_scores = scores[i] if scores else None
+        ranks = shared_ranks(ranking_scores) if ranking_scores else range(1, len(ranking) + 1)
+        for rank, key in zip(ranks, ranking):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def invalidate_fts_cache(db_path: Optional[str] = None) -> None:
+    """FTS 테이블 준비 여부 캐시 초기화 (테스트용)"""
+    with _ready_lock:
+        if db_path is None:
+            _ready_dbs.clear()
+        else:
+            _ready_dbs.discard(db_path)
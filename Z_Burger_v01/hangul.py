@@ -0,0 +1,63 @@
+"""
+한글 처리 유틸리티
+
+완성형 한글 음절(가~힣)을 초성/중성/종성 자모로 분해한다.
+오타에 강한 검색(임베딩 n-gram, 오타 교정, 초성 검색)에서 공통으로 사용한다.
+"""
+
+from typing import List
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+
+CHOSEONG = [
+    "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"
+]
+JUNGSEONG = [
+    "ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅘ",
+    "ㅙ", "ㅚ", "ㅛ", "ㅜ", "ㅝ", "ㅞ", "ㅟ", "ㅠ", "ㅡ", "ㅢ", "ㅣ"
+]
+JONGSEONG = [
+    "", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ",
+    "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"
+]
+
+
+def is_hangul_syllable(char: str) -> bool:
+    """완성형 한글 음절인지 확인"""
+    return HANGUL_BASE <= ord(char) <= HANGUL_LAST
+
+
+def split_syllable(char: str) -> List[str]:
+    """한글 음절 1개를 [초성, 중성, (종성)] 으로 분해. 한글이 아니면 그대로 반환"""
+    if not is_hangul_syllable(char):
+        return [char]
+
+    offset = ord(char) - HANGUL_BASE
+    cho, rest = divmod(offset, 21 * 28)
+    jung, jong = divmod(rest, 28)
+
+    jamo = [CHOSEONG[cho], JUNGSEONG[jung]]
+    if jong:
+        jamo.append(JONGSEONG[jong])
+    return jamo
+
+
+def decompose_jamo(text: str) -> str:
+    """문자열 전체를 자모 단위로 분해 (예: '감자' → 'ㄱㅏㅁㅈㅏ')"""
+    return "".join("".join(split_syllable(char)) for char in text)
+
+
+_CHOSEONG_SET = frozenset(CHOSEONG)
+
+
+def extract_choseong(text: str) -> str:
+    """문자열의 초성만 추출 (예: '한우불고기버거' → 'ㅎㅇㅂㄱㄱㅂㄱ'). 한글이 아니면 그대로"""
+    return "".join(split_syllable(char)[0] for char in text)
+
+
+def is_choseong_text(text: str) -> bool:
+    """초성(자음)만으로 이루어진 문자열인지 확인 (예: 'ㅎㅇㅂㄱㄱ')"""
+    return bool(text) and all(char in _CHOSEONG_SET for char in text)
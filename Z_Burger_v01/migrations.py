@@ -0,0 +1,275 @@
+"""
+스키마 마이그레이션 (번호 순서대로, schema_version 테이블에 적용 기록)
+
+스키마가 SET.sql, Bin/init_db.py, BurgeriaOrderBot.init_database, setup_embeddings 의
+ALTER TABLE 로 흩어져 있고 보조 인덱스가 없어 장바구니/주문 조회가 모두 전체 스캔이었다.
+여기 MIGRATIONS 에 번호를 붙여 추가하고, 연결을 만들 때 (db_connection) 적용되지 않은 것만 실행한다.
+
+- 이미 적용된 번호는 건너뜀 (시작할 때마다 실행해도 안전)
+- 필요한 테이블이 아직 없으면 (카탈로그 적재 전 등) 기록하지 않고 다음 연결 때 다시 시도
+- 적용은 BEGIN IMMEDIATE 트랜잭션 안에서 (여러 워커가 동시에 시작해도 한 번만)
+- Bin 도 이 모듈을 그대로 사용 (두 앱이 같은 DB 를 공유, Bin/z_burger.py 참고)
+
+explain_hot_queries() 는 자주 실행되는 조회의 EXPLAIN QUERY PLAN 을 모아 인덱스 사용 여부를 보고한다.
+
+사용법:
+    python migrations.py [DB 경로]   # 마이그레이션 적용 + 쿼리 계획 보고
+"""
+
+import sys
+import sqlite3
+from typing import Dict, List, Any, Callable, Sequence, Tuple, Union
+from storage_config import begin_write
+
+SCHEMA_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def _add_embedding_columns(conn: sqlite3.Connection) -> None:
+    """Products 에 embedding / embedding_hash 컬럼 추가 (이미 있으면 건너뜀)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(Products)")}
+    if "embedding" not in columns:
+        conn.execute("ALTER TABLE Products ADD COLUMN embedding BLOB")
+    if "embedding_hash" not in columns:
+        conn.execute("ALTER TABLE Products ADD COLUMN embedding_hash TEXT")
+
+
+# (번호, 이름, 필요한 테이블, SQL 목록 또는 함수) - 순서대로, 적용된 항목은 수정하지 말고 새 번호로 추가
+MIGRATIONS: List[Tuple[int, str, Tuple[str, ...], Union[Sequence[str], Callable[[sqlite3.Connection], None]]]] = [
+    (1, "cart_and_order_tables", (), [
+        """
+        CREATE TABLE IF NOT EXISTS Cart (
+            cart_item_id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            product_name TEXT NOT NULL,
+            order_type TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 1,
+            base_price INTEGER NOT NULL,
+            modifications TEXT,
+            line_total INTEGER NOT NULL,
+            special_requests TEXT,
+            set_group_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Orders (
+            order_id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            total_amount INTEGER NOT NULL,
+            order_type TEXT NOT NULL,
+            customer_name TEXT,
+            customer_phone TEXT,
+            status TEXT DEFAULT 'pending',
+            estimated_time INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Order_Items (
+            order_item_id TEXT PRIMARY KEY,
+            order_id TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            product_name TEXT NOT NULL,
+            order_type TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            base_price INTEGER NOT NULL,
+            modifications TEXT,
+            line_total INTEGER NOT NULL,
+            special_requests TEXT,
+            set_group_id TEXT,
+            FOREIGN KEY(order_id) REFERENCES Orders(order_id)
+        )
+        """,
+    ]),
+    (2, "products_embedding_columns", ("Products",), _add_embedding_columns),
+    (3, "cart_indexes", ("Cart",), [
+        # getCartDetails / clearCart / processOrder (정렬까지 인덱스로)
+        "CREATE INDEX IF NOT EXISTS idx_cart_session_created ON Cart(session_id, created_at)",
+        # getSetMenusInCart / updateSetItem (세트 그룹 단위 조회)
+        "CREATE INDEX IF NOT EXISTS idx_cart_session_set_group ON Cart(session_id, set_group_id, created_at)",
+    ]),
+    (4, "order_indexes", ("Orders", "Order_Items"), [
+        "CREATE INDEX IF NOT EXISTS idx_order_items_order ON Order_Items(order_id)",
+        # 오늘 주문 수 (주문 번호) - WHERE DATE(created_at) = DATE('now')
+        "CREATE INDEX IF NOT EXISTS idx_orders_created_date ON Orders(DATE(created_at))",
+    ]),
+    (5, "set_items_index", ("Set_Items",), [
+        # 세트 구성품 조회 (테이블을 읽지 않는 커버링 인덱스)
+        "CREATE INDEX IF NOT EXISTS idx_set_items_set_default "
+        "ON Set_Items(set_product_id, is_default, component_product_id, quantity)",
+    ]),
+    (6, "set_items_version", ("Set_Items",), [
+        # Set_Items 변경 시 세트 버전 증가 (set_signatures 인덱스 재구성)
+        "CREATE TABLE IF NOT EXISTS Catalog_Version (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)",
+        "INSERT OR IGNORE INTO Catalog_Version (name, version) VALUES ('sets', 0)",
+        "CREATE TRIGGER IF NOT EXISTS trg_set_items_version_insert AFTER INSERT ON Set_Items "
+        "BEGIN UPDATE Catalog_Version SET version = version + 1 WHERE name = 'sets'; END",
+        "CREATE TRIGGER IF NOT EXISTS trg_set_items_version_update AFTER UPDATE ON Set_Items "
+        "BEGIN UPDATE Catalog_Version SET version = version + 1 WHERE name = 'sets'; END",
+        "CREATE TRIGGER IF NOT EXISTS trg_set_items_version_delete AFTER DELETE ON Set_Items "
+        "BEGIN UPDATE Catalog_Version SET version = version + 1 WHERE name = 'sets'; END",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _existing_tables(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _applied_versions(conn: sqlite3.Connection, tables: set) -> set:
+    if "schema_version" not in tables:
+        return set()
+    return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def _pending(conn: sqlite3.Connection) -> List[Tuple]:
+    """미적용 마이그레이션 중 지금 적용할 수 있는 (필요한 테이블이 있는) 것"""
+    tables = _existing_tables(conn)
+    applied = _applied_versions(conn, tables)
+    return [
+        migration for migration in MIGRATIONS
+        if migration[0] not in applied and all(table in tables for table in migration[2])
+    ]
+
+
+def run_migrations(conn: sqlite3.Connection) -> List[int]:
+    """
+    미적용 마이그레이션 실행
+
+    Returns:
+        이번에 적용한 번호 목록 (없으면 [])
+    """
+    if not _pending(conn):
+        return []
+
+    begin_write(conn)
+    try:
+        # 잠금을 잡은 뒤 다시 확인 (다른 워커가 먼저 적용했을 수 있음)
+        conn.execute(SCHEMA_VERSION_SCHEMA)
+        applied = []
+        done = _applied_versions(conn, _existing_tables(conn))
+        for version, name, requires, apply in MIGRATIONS:
+            # 앞 번호가 만든 테이블도 보이도록 단계마다 다시 확인
+            if version in done or not all(table in _existing_tables(conn) for table in requires):
+                continue
+            if callable(apply):
+                apply(conn)
+            else:
+                for sql in apply:
+                    conn.execute(sql)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+            applied.append(version)
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def get_schema_version(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """적용된 마이그레이션 번호와 아직 적용되지 않은 번호"""
+    applied = _applied_versions(conn, _existing_tables(conn))
+    return {
+        "applied": sorted(applied),
+        "pending": [version for version, _, _, _ in MIGRATIONS if version not in applied],
+        "latest": LATEST_VERSION
+    }
+
+
+# 자주 실행되는 조회 (이름: (SQL, 예시 파라미터)) - db_functions / Bin/order_bot 과 같은 형태
+HOT_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "cart_by_session": (
+        "SELECT cart_item_id, product_id, product_name, order_type, quantity, base_price, line_total, "
+        "special_requests, set_group_id, created_at FROM Cart WHERE session_id = ? ORDER BY created_at ASC",
+        ("SESSION",)
+    ),
+    "cart_count_by_session": ("SELECT COUNT(*) FROM Cart WHERE session_id = ?", ("SESSION",)),
+    "cart_set_rows": (
+        "SELECT set_group_id, cart_item_id, product_id, product_name, quantity, base_price, line_total, created_at "
+        "FROM Cart WHERE session_id = ? AND set_group_id IS NOT NULL ORDER BY set_group_id, cart_item_id",
+        ("SESSION",)
+    ),
+    "set_composition": (
+        "SELECT p.product_id, p.product_name, p.category_id, p.product_type, p.price, si.quantity "
+        "FROM Set_Items si JOIN Products p ON si.component_product_id = p.product_id "
+        "WHERE si.set_product_id = ? AND si.is_default = 1 ORDER BY p.product_type",
+        ("G00001",)
+    ),
+    "set_default_components": (
+        "SELECT component_product_id FROM Set_Items WHERE set_product_id = ? AND is_default = TRUE",
+        ("G00001",)
+    ),
+    # Bin/order_bot 전용 조회
+    "cart_item_by_session": (
+        "SELECT product_id, product_name, base_price, modifications FROM Cart "
+        "WHERE cart_item_id = ? AND session_id = ?",
+        ("CART_ITEM", "SESSION")
+    ),
+    "set_components": (
+        "SELECT si.component_product_id, p.product_name, p.product_type, p.price, si.quantity, si.is_default "
+        "FROM Set_Items si JOIN Products p ON si.component_product_id = p.product_id "
+        "WHERE si.set_product_id = ?",
+        ("G00001",)
+    ),
+    "order_items_by_order": (
+        "SELECT order_item_id, product_id, product_name, quantity, line_total FROM Order_Items "
+        "WHERE order_id = ? ORDER BY set_group_id, order_item_id",
+        ("ORDER",)
+    ),
+    "orders_today_count": ("SELECT COUNT(*) FROM Orders WHERE DATE(created_at) = DATE('now')", ()),
+}
+
+
+def explain_hot_queries(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    HOT_QUERIES 의 EXPLAIN QUERY PLAN
+
+    Returns:
+        [{"name": str, "plan": [str, ...], "full_scan": bool, "error": str (실패 시)}, ...]
+        full_scan: 인덱스 없이 테이블 전체를 읽는 단계가 있으면 True
+    """
+    report = []
+    for name, (sql, params) in HOT_QUERIES.items():
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error as e:
+            report.append({"name": name, "plan": [], "full_scan": None, "error": str(e)})
+            continue
+        report.append({
+            "name": name,
+            "plan": plan,
+            "full_scan": any(step.startswith("SCAN ") and "INDEX" not in step for step in plan)
+        })
+    return report
+
+
+def main():
+    from db_connection import get_connection
+    from db_functions import get_default_db_path
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else get_default_db_path()
+    conn = get_connection(db_path)  # 연결 시 마이그레이션 적용
+    version = get_schema_version(conn)
+    print(f"스키마 버전: 적용 {version['applied']} / 대기 {version['pending']} (최신 {version['latest']})")
+
+    print("\n=== EXPLAIN QUERY PLAN ===")
+    for entry in explain_hot_queries(conn):
+        mark = "❌" if entry["full_scan"] or entry.get("error") else "✅"
+        print(f"{mark} {entry['name']}")
+        for step in entry["plan"]:
+            print(f"     {step}")
+        if entry.get("error"):
+            print(f"     오류: {entry['error']}")
+
+
+if __name__ == "__main__":
+    main()
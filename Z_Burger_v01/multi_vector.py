@@ -0,0 +1,130 @@
+"""
+상품별 다중 벡터 (상품명 / 설명 / 별칭) max-sim 점수
+
+상품 하나에 대표 임베딩("{이름}. {설명} ({타입})") 외에 필드별 임베딩을 여러 개 두고,
+상품 점수 = max(대표 벡터 유사도, 필드 벡터 유사도들) 로 계산한다.
+짧은 상품명 검색어가 긴 설명에 희석되지 않도록 하기 위함이다.
+
+필드 벡터는 상품별로 개수가 다르므로 하나의 평평한 행렬에 모아 두고,
+각 행의 소유 상품(owner) 배열로 구분한다. owner 순으로 정렬해 두면
+(쿼리 수, 필드 벡터 수) 점수 행렬에 np.maximum.reduceat 한 번으로 상품별 최댓값을 구할 수 있다.
+
+필드 벡터는 setup_embeddings.py 가 Product_Vectors 테이블에 저장한다.
+"""
+
+import numpy as np
+from typing import Optional
+from vector_compression import truncate_embeddings
+
+# 필드 종류 (Product_Vectors.field)
+FIELD_NAME = "name"
+FIELD_DESCRIPTION = "description"
+FIELD_ALIAS = "alias"
+FIELDS = (FIELD_NAME, FIELD_DESCRIPTION, FIELD_ALIAS)
+
+# 필드별 임베딩 테이블 (바뀌면 카탈로그 버전 증가 → 검색 인덱스 재로드)
+PRODUCT_VECTORS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Product_Vectors (
+    product_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    text TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    PRIMARY KEY (product_id, field, text),
+    FOREIGN KEY(product_id) REFERENCES Products(product_id)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_product_vectors_version_insert
+AFTER INSERT ON Product_Vectors
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_product_vectors_version_delete
+AFTER DELETE ON Product_Vectors
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+"""
+
+
+class MultiVectorIndex:
+    """
+    owner 순으로 정렬된 필드 벡터 행렬
+
+    - matrix: (M, D) float32, 행별 L2 정규화
+    - owners: (M,) 각 행의 소유 상품 행 번호 (오름차순)
+    - starts: 상품별 구간 시작 위치 (reduceat 인덱스)
+    - segment_rows: 구간별 소유 상품 행 번호 (starts 와 같은 길이)
+    """
+
+    def __init__(self, matrix: np.ndarray, owners: np.ndarray):
+        order = np.argsort(owners, kind="stable")
+        self.matrix = np.ascontiguousarray(matrix[order], dtype=np.float32)
+        self.owners = np.asarray(owners, dtype=np.int64)[order]
+
+        if len(self.owners):
+            boundaries = np.flatnonzero(np.diff(self.owners)) + 1
+            self.starts = np.concatenate(([0], boundaries)).astype(np.int64)
+        else:
+            self.starts = np.zeros(0, dtype=np.int64)
+        self.segment_rows = self.owners[self.starts]
+
+    def __len__(self) -> int:
+        return len(self.owners)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.owners.nbytes + self.starts.nbytes
+
+    def subset(self, rows: np.ndarray) -> "MultiVectorIndex":
+        """
+        부분 행렬(파티션) 기준으로 다시 번호를 매긴 인덱스
+
+        rows: 파티션에 속한 상품 행 번호 (오름차순). owner 는 rows 안의 위치로 바뀐다.
+        """
+        mask = np.isin(self.owners, rows)
+        return MultiVectorIndex(self.matrix[mask], np.searchsorted(rows, self.owners[mask]))
+
+    def max_scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        (쿼리 수, 구간 수) 상품별 필드 벡터 최대 유사도
+
+        queries 는 정규화된 (Q, D) 행렬. 열 순서는 segment_rows 와 같다.
+        """
+        return np.maximum.reduceat(queries @ self.matrix.T, self.starts, axis=1)
+
+    def apply(self, scores: np.ndarray, queries: np.ndarray) -> None:
+        """
+        대표 벡터 점수 행렬 (Q, N) 을 필드 벡터와의 max-sim 으로 제자리 갱신
+        """
+        if len(self) == 0:
+            return
+        columns = self.segment_rows
+        scores[:, columns] = np.maximum(scores[:, columns], self.max_scores(queries))
+
+    def row_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """지정한 상품 행들의 필드 벡터 최대 유사도 (필드 벡터가 없으면 -inf)"""
+        result = np.full(len(rows), -np.inf, dtype=np.float32)
+        if len(self) == 0:
+            return result
+
+        positions = np.searchsorted(self.segment_rows, rows)
+        positions = np.minimum(positions, len(self.segment_rows) - 1)
+        present = self.segment_rows[positions] == rows
+        if present.any():
+            segment_max = self.max_scores(query[None, :])[0]
+            result[present] = segment_max[positions[present]]
+        return result
+
+
+def build_multi_vector_index(
+    vectors: list,
+    owners: list,
+    dims: Optional[int] = None
+) -> Optional[MultiVectorIndex]:
+    """필드 벡터 목록으로 인덱스 생성 (차원 축소 + 정규화, 벡터가 없으면 None)"""
+    if not vectors:
+        return None
+    matrix = truncate_embeddings(np.vstack(vectors).astype(np.float32, copy=False), dims)
+    return MultiVectorIndex(matrix, np.asarray(owners, dtype=np.int64))
+
@@ -0,0 +1,216 @@
+"""
+상품 패밀리 사전 계산 (한 기본 상품의 맛/사이즈 변형 묶음)
+
+"양념감자 (칠리)", "양념감자 (치즈)", ... 처럼 같은 기본 이름에 변형이 붙은 상품들을
+오프라인에서 미리 묶어 Product_Families 테이블에 저장한다.
+"양념감자" 처럼 패밀리 이름으로 검색하면 findProduct 는 전체 정렬/모호성 판정 없이
+인덱스에서 바로 패밀리 구성원을 AMBIGUOUS 후보로 반환한다.
+
+묶는 기준:
+1. 이름 구조: 같은 product_type 에서 "기본 이름 (변형)" 의 기본 이름이 같은 상품
+2. 임베딩 유사도: 패밀리 중심 벡터와의 코사인 유사도가 min_similarity 미만인 상품은 제외
+   (이름만 비슷하고 실제로는 다른 상품이 섞이지 않도록)
+
+상품 임베딩이 바뀌면 setup_embeddings.py (또는 이 스크립트)를 다시 실행한다.
+Product_Families 가 바뀌면 트리거가 카탈로그 버전을 올려 검색 인덱스가 다시 로드된다.
+"""
+
+import sqlite3
+import sys
+import io
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Any, Optional, List, Tuple
+from embedding_codec import decode_embedding
+from embedding_providers import get_embedding_provider
+from db_functions import get_default_db_path
+from search_index import LEGACY_EMBEDDING_MODEL, ensure_catalog_version, normalize_product_key
+from storage_config import connect, begin_write
+from catalog_schema import split_variant
+
+# Windows 인코딩 문제 해결
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# 패밀리 중심 벡터와의 최소 코사인 유사도
+DEFAULT_MIN_SIMILARITY = 0.5
+
+FAMILY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Product_Families (
+    product_id TEXT PRIMARY KEY,
+    family_id INTEGER NOT NULL,
+    family_name TEXT NOT NULL,
+    similarity REAL,
+    FOREIGN KEY(product_id) REFERENCES Products(product_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_product_families_family ON Product_Families(family_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_families_version_insert
+AFTER INSERT ON Product_Families
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_families_version_delete
+AFTER DELETE ON Product_Families
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+"""
+
+
+def ensure_family_table(conn: sqlite3.Connection) -> None:
+    """Product_Families 테이블과 버전 트리거 생성 (이미 있으면 무시)"""
+    ensure_catalog_version(conn)
+    conn.executescript(FAMILY_SCHEMA)
+
+
+def compute_product_families(
+    products: List[Dict[str, Any]],
+    vectors: Dict[str, np.ndarray],
+    min_similarity: float = DEFAULT_MIN_SIMILARITY
+) -> List[Dict[str, Any]]:
+    """
+    상품 목록으로 패밀리 계산
+
+    Args:
+        products: product_id / product_name / product_type 을 가진 상품 목록
+        vectors: product_id -> 정규화된 임베딩 (없는 상품은 이름 구조만으로 판단)
+        min_similarity: 패밀리 중심 벡터와의 최소 코사인 유사도
+
+    Returns:
+        [{"family_name": str, "product_type": str, "members": [(product_id, 유사도 or None), ...]}, ...]
+        구성원이 2개 이상인 패밀리만, 패밀리 이름 순
+    """
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+    base_names: Dict[Tuple[str, str], str] = {}
+    for product in products:
+        base, variant = split_variant(product["product_name"])
+        if variant is None:
+            continue
+        key = (product["product_type"], normalize_product_key(base))
+        groups[key].append(product)
+        base_names.setdefault(key, base)
+
+    families = []
+    for key, members in groups.items():
+        if len(members) < 2:
+            continue
+
+        # 임베딩이 있는 구성원끼리 중심 벡터를 구하고, 중심에서 먼 구성원 제외
+        embedded = [m["product_id"] for m in members if m["product_id"] in vectors]
+        similarity_by_id: Dict[str, Optional[float]] = {m["product_id"]: None for m in members}
+        if len(embedded) >= 2:
+            matrix = np.vstack([vectors[product_id] for product_id in embedded])
+            centroid = matrix.mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            if norm > 0:
+                scores = matrix @ (centroid / norm)
+                similarity_by_id.update(zip(embedded, (float(s) for s in scores)))
+
+        kept = [
+            (m["product_id"], similarity_by_id[m["product_id"]])
+            for m in members
+            if similarity_by_id[m["product_id"]] is None or similarity_by_id[m["product_id"]] >= min_similarity
+        ]
+        if len(kept) >= 2:
+            families.append({"family_name": base_names[key], "product_type": key[0], "members": kept})
+
+    families.sort(key=lambda family: (family["family_name"], family["product_type"]))
+    return families
+
+
+def build_product_families(
+    db_path: str,
+    model: Optional[str] = None,
+    min_similarity: float = DEFAULT_MIN_SIMILARITY
+) -> Dict[str, Any]:
+    """
+    Products 에서 패밀리를 계산하여 Product_Families 테이블을 다시 만든다
+
+    Args:
+        db_path: 데이터베이스 경로
+        model: 사용할 임베딩 모델 (기본값: 현재 임베딩 제공자의 모델)
+        min_similarity: 패밀리 중심 벡터와의 최소 코사인 유사도
+
+    Returns:
+        {"success": bool, "families": [...], "family_count": int, "product_count": int, "message": str}
+    """
+    if model is None:
+        model = get_embedding_provider().model
+
+    conn = connect(db_path)
+    try:
+        ensure_family_table(conn)
+
+        products = []
+        vectors = {}
+        for product_id, product_name, product_type, embedding in conn.execute(
+            "SELECT product_id, product_name, product_type, embedding FROM Products ORDER BY product_id"
+        ):
+            products.append({"product_id": product_id, "product_name": product_name, "product_type": product_type})
+            if embedding is None:
+                continue
+
+            vector, row_model = decode_embedding(embedding)
+            if (row_model or LEGACY_EMBEDDING_MODEL) != model:
+                continue
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vectors[product_id] = np.asarray(vector, dtype=np.float32) / norm
+
+        families = compute_product_families(products, vectors, min_similarity)
+
+        begin_write(conn)
+        conn.execute("DELETE FROM Product_Families")
+        conn.executemany(
+            "INSERT INTO Product_Families (product_id, family_id, family_name, similarity) VALUES (?, ?, ?, ?)",
+            [
+                (product_id, family_id, family["family_name"], similarity)
+                for family_id, family in enumerate(families, start=1)
+                for product_id, similarity in family["members"]
+            ]
+        )
+        conn.commit()
+
+        product_count = sum(len(family["members"]) for family in families)
+        return {
+            "success": True,
+            "families": families,
+            "family_count": len(families),
+            "product_count": product_count,
+            "message": f"상품 패밀리 {len(families)}개 ({product_count}개 상품)를 저장했습니다."
+        }
+
+    except Exception as e:
+        conn.rollback()
+        return {
+            "success": False,
+            "families": [],
+            "family_count": 0,
+            "product_count": 0,
+            "message": f"상품 패밀리 생성 중 오류가 발생했습니다: {str(e)}"
+        }
+
+    finally:
+        conn.close()
+
+
+def main():
+    """현재 DB 의 상품 패밀리를 다시 계산하고 출력"""
+    db_path = get_default_db_path()
+    print(f"DB 경로: {db_path}")
+
+    result = build_product_families(db_path)
+    print(result["message"])
+    for family in result["families"]:
+        members = ", ".join(
+            product_id if similarity is None else f"{product_id}({similarity:.2f})"
+            for product_id, similarity in family["members"]
+        )
+        print(f"  {family['family_name']} [{family['product_type']}]: {members}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+상품 간 유사도 테이블 (품절 상품 대체 메뉴 추천)
+
+각 상품마다 같은 product_type 의 유사 상품 상위 k개를 미리 계산하여
+Product_Similarity 테이블에 (product_id, rank) 순서로 저장한다.
+대체 메뉴 조회는 인덱스 조회 1회 + 재고 필터로 끝난다.
+
+점수 = 임베딩 코사인 유사도 + (같은 category_id 이면 CATEGORY_BONUS)
+
+Products 가 바뀌면 (카탈로그 버전 증가) 다음 조회 시 점진적으로 갱신한다.
+- 상품별 내용 해시(임베딩, 타입, 카테고리)를 비교하여 바뀐/추가된/삭제된 상품을 찾고
+- 바뀐 상품 자신의 목록과, 바뀐 상품이 목록에 있었거나 새로 들어갈 수 있는 상품의 목록만 다시 계산한다.
+재고(stock_quantity) 변경은 테이블에 영향을 주지 않는다. (조회 시 재고 필터)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from typing import Dict, Any, Optional, List, Set, Tuple
+from embedding_codec import decode_embedding
+from embedding_providers import get_embedding_provider
+from search_index import LEGACY_EMBEDDING_MODEL, ensure_catalog_version, get_catalog_version
+from catalog_schema import SIMILARITY_SCHEMA
+from storage_config import begin_write
+from db_connection import get_connection
+
+# 상품당 저장할 유사 상품 수 (품절 상품을 걸러도 충분히 남도록 넉넉하게)
+DEFAULT_TOP_K = 20
+
+# 같은 category_id 일 때 더하는 점수
+CATEGORY_BONUS = 0.1
+
+# 점수 행렬을 이 행 수만큼씩 나눠 계산 (N x N 행렬을 한 번에 만들지 않도록)
+SCORE_CHUNK_ROWS = 1024
+
+_refresh_lock = threading.Lock()
+
+
+def ensure_similarity_table(conn: sqlite3.Connection) -> None:
+    """유사도 테이블 생성 (이미 있으면 무시)"""
+    ensure_catalog_version(conn)
+    conn.executescript(SIMILARITY_SCHEMA)
+
+
+def _content_hash(embedding, product_type: str, category_id: str) -> str:
+    """유사도에 영향을 주는 내용의 해시"""
+    digest = hashlib.sha256()
+    digest.update(embedding if isinstance(embedding, bytes) else str(embedding).encode("utf-8"))
+    digest.update(f"\x00{product_type}\x00{category_id}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _load_catalog(conn: sqlite3.Connection, model: str):
+    """
+    임베딩이 있는 상품만 (id 배열, 타입 배열, 카테고리 배열, 정규화 행렬, 해시 dict) 로 로드
+    """
+    ids, types, categories, vectors, hashes = [], [], [], [], {}
+    for product_id, product_type, category_id, embedding in conn.execute(
+        "SELECT product_id, product_type, category_id, embedding FROM Products "
+        "WHERE embedding IS NOT NULL ORDER BY product_id"
+    ):
+        vector, row_model = decode_embedding(embedding)
+        if (row_model or LEGACY_EMBEDDING_MODEL) != model:
+            continue
+        ids.append(product_id)
+        types.append(product_type)
+        categories.append(category_id)
+        vectors.append(vector)
+        hashes[product_id] = _content_hash(embedding, product_type, category_id)
+
+    if vectors:
+        matrix = np.vstack(vectors).astype(np.float32, copy=False)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+
+    return (
+        np.array(ids, dtype=object), np.array(types, dtype=object),
+        np.array(categories, dtype=object), matrix, hashes
+    )
+
+
+def _score_rows(rows: np.ndarray, types: np.ndarray, categories: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    rows 상품들과 전체 상품의 점수 행렬 (len(rows), N)
+
+    다른 product_type 과 자기 자신은 -inf
+    """
+    scores = matrix[rows] @ matrix.T
+    scores += CATEGORY_BONUS * (categories[rows][:, None] == categories[None, :])
+    scores[types[rows][:, None] != types[None, :]] = -np.inf
+    scores[np.arange(len(rows)), rows] = -np.inf
+    return scores
+
+
+def _top_k_rows(scores: np.ndarray, top_k: int) -> List[List[Tuple[int, float]]]:
+    """점수 행렬의 각 행에서 상위 top_k (열 번호, 점수), 점수 내림차순"""
+    result = []
+    k = min(top_k, scores.shape[1])
+    for row in scores:
+        if k == 0:
+            result.append([])
+            continue
+        positions = np.argpartition(-row, k - 1)[:k]
+        positions = positions[np.argsort(-row[positions], kind="stable")]
+        result.append([(int(pos), float(row[pos])) for pos in positions if np.isfinite(row[pos])])
+    return result
+
+
+def refresh_similarity_table(
+    db_path: str,
+    model: Optional[str] = None,
+    top_k: int = DEFAULT_TOP_K,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Product_Similarity 테이블을 현재 카탈로그에 맞게 갱신
+
+    카탈로그 버전/모델/top_k 가 마지막 갱신 때와 같으면 아무것도 하지 않는다.
+    모델이나 top_k 가 바뀌었거나 force=True 면 전체를 다시 계산하고,
+    그 외에는 내용 해시가 바뀐 상품과 그 영향을 받는 상품만 다시 계산한다.
+
+    Returns:
+        {"success": bool, "refreshed": int (다시 계산한 상품 수), "total": int, "message": str}
+    """
+    if model is None:
+        model = get_embedding_provider().model
+
+    with _refresh_lock:
+        conn = get_connection(db_path)
+        try:
+            ensure_similarity_table(conn)
+            version = get_catalog_version(conn)
+            build = conn.execute(
+                "SELECT catalog_version, model, top_k FROM Product_Similarity_Build WHERE id = 1"
+            ).fetchone()
+            full = force or build is None or build[1] != model or build[2] != top_k
+            if not full and build[0] == version:
+                return {"success": True, "refreshed": 0, "total": None, "message": "유사도 테이블이 최신입니다."}
+
+            ids, types, categories, matrix, hashes = _load_catalog(conn, model)
+            position = {product_id: pos for pos, product_id in enumerate(ids)}
+
+            if full:
+                affected = set(range(len(ids)))
+                stale_ids = {row[0] for row in conn.execute("SELECT product_id FROM Product_Similarity_State")}
+            else:
+                affected, stale_ids = _affected_rows(conn, ids, types, categories, matrix, hashes, position, top_k)
+
+            rows = np.array(sorted(affected), dtype=np.int64)
+            neighbours = []
+            for start in range(0, len(rows), SCORE_CHUNK_ROWS):
+                chunk = rows[start:start + SCORE_CHUNK_ROWS]
+                neighbours.extend(_top_k_rows(_score_rows(chunk, types, categories, matrix), top_k))
+
+            begin_write(conn)
+            refresh_ids = [ids[row] for row in rows]
+            conn.executemany(
+                "DELETE FROM Product_Similarity WHERE product_id = ?",
+                [(product_id,) for product_id in set(refresh_ids) | stale_ids]
+            )
+            conn.executemany(
+                "DELETE FROM Product_Similarity_State WHERE product_id = ?",
+                [(product_id,) for product_id in stale_ids]
+            )
+            conn.executemany(
+                "INSERT INTO Product_Similarity (product_id, rank, similar_product_id, score) VALUES (?, ?, ?, ?)",
+                [
+                    (product_id, rank, ids[pos], round(score, 6))
+                    for product_id, ranked in zip(refresh_ids, neighbours)
+                    for rank, (pos, score) in enumerate(ranked, start=1)
+                ]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO Product_Similarity_State (product_id, content_hash) VALUES (?, ?)",
+                [(product_id, hashes[product_id]) for product_id in refresh_ids]
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO Product_Similarity_Build (id, catalog_version, model, top_k) "
+                "VALUES (1, ?, ?, ?)",
+                (version, model, top_k)
+            )
+            conn.commit()
+
+            return {
+                "success": True,
+                "refreshed": len(rows),
+                "total": len(ids),
+                "message": f"유사도 테이블을 갱신했습니다. ({len(rows)}/{len(ids)}개 상품)"
+            }
+
+        except Exception as e:
+            conn.rollback()
+            return {"success": False, "refreshed": 0, "total": None, "message": f"유사도 테이블 갱신 중 오류 발생: {str(e)}"}
+
+
+def _affected_rows(
+    conn: sqlite3.Connection,
+    ids: np.ndarray,
+    types: np.ndarray,
+    categories: np.ndarray,
+    matrix: np.ndarray,
+    hashes: Dict[str, str],
+    position: Dict[str, int],
+    top_k: int
+) -> Tuple[Set[int], Set[str]]:
+    """
+    점진 갱신 대상 행 번호와 (더 이상 임베딩이 없는) 삭제 대상 상품 ID
+
+    1. 내용 해시가 바뀌었거나 새로 추가된 상품 (dirty)
+    2. 목록에 dirty 또는 삭제된 상품이 들어 있는 상품
+    3. dirty 상품과의 새 점수가 현재 목록의 마지막 점수보다 높은 상품 (또는 목록이 덜 찬 상품)
+    """
+    stored = dict(conn.execute("SELECT product_id, content_hash FROM Product_Similarity_State"))
+    stale_ids = set(stored) - set(hashes)
+    dirty_ids = {product_id for product_id, digest in hashes.items() if stored.get(product_id) != digest}
+    if not dirty_ids and not stale_ids:
+        return set(), set()
+
+    affected = {position[product_id] for product_id in dirty_ids}
+    changed = dirty_ids | stale_ids
+
+    # 현재 목록의 이웃과 마지막(k번째) 점수
+    neighbour_ids: Dict[str, Set[str]] = {}
+    kth_score: Dict[str, float] = {}
+    for product_id, rank, similar_id, score in conn.execute(
+        "SELECT product_id, rank, similar_product_id, score FROM Product_Similarity ORDER BY product_id, rank"
+    ):
+        neighbour_ids.setdefault(product_id, set()).add(similar_id)
+        kth_score[product_id] = score
+    for product_id, neighbours in neighbour_ids.items():
+        if product_id in position and neighbours & changed:
+            affected.add(position[product_id])
+
+    if dirty_ids:
+        dirty_rows = np.array(sorted(position[product_id] for product_id in dirty_ids), dtype=np.int64)
+        # (dirty, N) 점수를 뒤집어 각 상품 입장에서 dirty 상품이 받을 최고 점수
+        best_new = np.full(len(ids), -np.inf, dtype=np.float32)
+        for start in range(0, len(dirty_rows), SCORE_CHUNK_ROWS):
+            chunk = dirty_rows[start:start + SCORE_CHUNK_ROWS]
+            best_new = np.maximum(best_new, _score_rows(chunk, types, categories, matrix).max(axis=0))
+        for pos, product_id in enumerate(ids):
+            if not np.isfinite(best_new[pos]):
+                continue
+            if len(neighbour_ids.get(product_id, ())) < top_k or best_new[pos] > kth_score.get(product_id, -np.inf):
+                affected.add(pos)
+
+    return affected, stale_ids
+
+
+def find_substitutes(
+    db_path: str,
+    product_id: str,
+    limit: int = 5,
+    model: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    product_id 와 비슷한 재고 있는 상품 (유사도 테이블 인덱스 조회 1회)
+
+    Returns:
+        {"success": bool, "product": {...} or None, "substitutes": [...], "total_found": int, "message": str}
+    """
+    refresh = refresh_similarity_table(db_path, model)
+    if not refresh["success"]:
+        return {"success": False, "product": None, "substitutes": [], "total_found": 0, "message": refresh["message"]}
+
+    conn = get_connection(db_path)
+    try:
+        product = conn.execute(
+            "SELECT product_id, product_name, product_type, price, stock_quantity FROM Products WHERE product_id = ?",
+            (product_id,)
+        ).fetchone()
+        if not product:
+            return {
+                "success": False,
+                "product": None,
+                "substitutes": [],
+                "total_found": 0,
+                "message": f"상품 ID '{product_id}'를 찾을 수 없습니다."
+            }
+
+        rows = conn.execute("""
+        SELECT p.product_id, p.product_name, p.product_type, p.price, p.description, p.stock_quantity, s.score
+        FROM Product_Similarity s
+        JOIN Products p ON p.product_id = s.similar_product_id
+        WHERE s.product_id = ? AND p.stock_quantity > 0
+        ORDER BY s.rank
+        LIMIT ?
+        """, (product_id, limit)).fetchall()
+
+        substitutes = [
+            {
+                "product_id": row[0],
+                "product_name": row[1],
+                "product_type": row[2],
+                "price": row[3],
+                "description": row[4],
+                "stock_quantity": row[5],
+                "similarity": round(row[6], 4)
+            }
+            for row in rows
+        ]
+        source = dict(zip(("product_id", "product_name", "product_type", "price", "stock_quantity"), product))
+
+        if substitutes:
+            names = ", ".join(s["product_name"] for s in substitutes)
+            message = f"'{source['product_name']}' 대신 주문할 수 있는 메뉴: {names}"
+        else:
+            message = f"'{source['product_name']}'와 비슷한 재고 있는 메뉴가 없습니다."
+
+        return {
+            "success": True,
+            "product": source,
+            "substitutes": substitutes,
+            "total_found": len(substitutes),
+            "message": message
+        }
+
+    except Exception:
+        conn.rollback()
+        raise
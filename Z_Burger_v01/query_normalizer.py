@@ -0,0 +1,236 @@
+"""
+검색어 정규화 (findProduct 앞단)
+
+"감튀 두 개 주세요", "감자튀김 하나", "포테이토" 처럼 같은 상품을 가리키는 표현이
+서로 다른 캐시 키 / 임베딩 호출이 되지 않도록 검색 전에 표준 검색어로 바꾼다.
+
+1. NFC + 소문자, 기호 제거
+2. 수량 표현 분리 ("두 개", "2잔", "하나" → 수량 2 / 2 / 1)
+3. 높임/요청 표현 제거 ("주세요", "좀", "할게요")
+4. 조사 제거 ("치즈가" → "치즈") — 남는 말이 카탈로그 어휘일 때만
+5. 동의어 치환 (Query_Synonyms 테이블: "감튀" → "포테이토", "코크" → "콜라")
+6. 띄어쓰기 표준화: 붙여 쓴 형태가 상품명/별칭과 같으면 붙여 쓴 형태로
+   ("한우 불고기 버거" → "한우불고기버거")
+
+Query_Synonyms 가 바뀌면 트리거가 카탈로그 버전을 올려 인덱스(정규화기 포함)를 다시 만든다.
+상품 하나를 직접 가리키는 별칭은 Product_Aliases, 검색어 일부를 바꾸는 동의어는 Query_Synonyms 에 둔다.
+"""
+
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+QUERY_SYNONYMS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Query_Synonyms (
+    term TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_query_synonyms_version_insert
+AFTER INSERT ON Query_Synonyms
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_query_synonyms_version_update
+AFTER UPDATE ON Query_Synonyms
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_query_synonyms_version_delete
+AFTER DELETE ON Query_Synonyms
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE name = 'products';
+END;
+"""
+
+# 테이블을 처음 만들 때 넣는 기본 동의어 (표현 → 카탈로그 표기)
+DEFAULT_SYNONYMS = [
+    ("감튀", "포테이토"),
+    ("감자튀김", "포테이토"),
+    ("프렌치프라이", "포테이토"),
+    ("후렌치후라이", "포테이토"),
+    ("코크", "콜라"),
+    ("코카콜라", "콜라"),
+    ("제로콜라", "제로슈거콜라"),
+    ("스프라이트", "사이다"),
+    ("레모네이드", "레몬에이드"),
+    ("라떼", "카페라떼"),
+    ("미디엄", "미디움"),
+    ("중간", "미디움"),
+    ("큰거", "라지"),
+]
+
+# 단독으로 쓰이면 제거하는 요청/높임 표현
+FILLER_WORDS = {
+    "주세요", "줘", "줘요", "주실래요", "주시겠어요", "주문", "주문할게요", "주문이요",
+    "할게요", "할래요", "할께요", "부탁해요", "부탁합니다", "부탁드려요", "좀", "요",
+    "그리고", "또", "있어요", "있나요", "있어", "먹을게요", "먹고", "싶어요",
+}
+
+# 단어 끝에 붙은 조사/요청 표현 (긴 것부터 시도, 남는 말이 어휘에 있을 때만 제거)
+SUFFIXES = sorted([
+    "주세요", "주실래요", "줘요", "할게요", "할래요", "으로요", "이랑", "하고", "으로",
+    "이요", "랑", "로", "요", "이", "가", "을", "를", "은", "는", "도", "만", "에",
+], key=len, reverse=True)
+
+# 고유어 수사 (수량 단위와 함께 쓰일 때)
+NATIVE_NUMBERS = {
+    "한": 1, "두": 2, "세": 3, "네": 4, "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+}
+# 단독으로 쓰이는 수량 표현
+STANDALONE_NUMBERS = {"하나": 1, "둘": 2, "셋": 3, "넷": 4, "다섯": 5, "하나만": 1}
+COUNTERS = "개|잔|병|캔|인분|조각|봉지|봉|피스"
+# 수량 뒤에 붙어 다음 상품으로 이어지는 조사 ("2개랑 콜라", "하나하고")
+QUANTITY_PARTICLES = ("이랑", "랑", "하고")
+
+_QUANTITY = re.compile(
+    rf"(?:(?<=\s)|^)(?:(\d+)|({'|'.join(NATIVE_NUMBERS)}))\s*(?:{COUNTERS})"
+    rf"(?:요|만|씩|{'|'.join(QUANTITY_PARTICLES)})?(?=\s|$)"
+)
+_NON_WORD = re.compile(r"[^\w\s]+")
+_TOKEN = re.compile(r"\S+")
+_SPACES = re.compile(r"\s+")
+
+
+def _strip_quantity_particle(token: str) -> str:
+    """"하나랑" → "하나" (수량 뒤 조사 제거, 없으면 그대로)"""
+    for particle in QUANTITY_PARTICLES:
+        if token.endswith(particle) and len(token) > len(particle):
+            return token[:-len(particle)]
+    return token
+
+
+def normalize_term(text: str) -> str:
+    """어휘/동의어 키 정규화 (NFC, 소문자, 공백/기호 제거)"""
+    text = unicodedata.normalize("NFC", text).lower()
+    return re.sub(r"[^\w]+", "", text)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """NFC + 소문자 + 기호 제거 후 공백 기준 분리"""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFC", text).lower()
+    return _NON_WORD.sub(" ", text).split()
+
+
+def ensure_synonym_table(conn: sqlite3.Connection) -> None:
+    """Query_Synonyms 테이블과 트리거 생성 (처음 만들 때만 기본 동의어 추가)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Query_Synonyms'"
+    ).fetchone()
+    conn.executescript(QUERY_SYNONYMS_SCHEMA)
+    if not exists:
+        conn.executemany(
+            "INSERT OR IGNORE INTO Query_Synonyms (term, canonical) VALUES (?, ?)",
+            DEFAULT_SYNONYMS
+        )
+        conn.commit()
+
+
+def load_synonyms(conn: sqlite3.Connection) -> Dict[str, str]:
+    """정규화된 표현 -> 표준 표기 (테이블이 없으면 빈 dict)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Query_Synonyms'"
+    ).fetchone()
+    if not exists:
+        return {}
+    return {
+        normalize_term(term): canonical
+        for term, canonical in conn.execute("SELECT term, canonical FROM Query_Synonyms")
+        if normalize_term(term)
+    }
+
+
+class QueryNormalizer:
+    """
+    카탈로그 어휘 + 동의어 기반 검색어 정규화기
+
+    Args:
+        names: 상품명/별칭 (띄어쓰기 표준화 기준)
+        texts: 어휘를 모을 텍스트 (상품명, 별칭, 설명)
+        synonyms: 정규화된 표현 -> 표준 표기
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] = (),
+        texts: Iterable[str] = (),
+        synonyms: Optional[Dict[str, str]] = None
+    ):
+        self.synonyms = dict(synonyms or {})
+        names = list(names)
+        self._name_keys = {normalize_term(name) for name in names} - {""}
+        # 상품명/별칭 단어 (그대로 두는 기준) / 설명까지 포함한 어휘 (조사를 뗀 말의 기준)
+        # 설명에는 "치즈가" 처럼 조사가 붙은 단어가 있으므로 그대로 두는 기준에는 쓰지 않는다.
+        self._name_vocabulary = {token for name in names for token in tokenize(name)}
+        self.vocabulary = set(self._name_vocabulary)
+        for text in texts:
+            self.vocabulary.update(token for token in tokenize(text) if len(token) >= 2)
+        for canonical in self.synonyms.values():
+            self.vocabulary.update(tokenize(canonical))
+
+    def _known(self, token: str) -> bool:
+        return token in self.vocabulary or token in self.synonyms
+
+    def _strip_suffix(self, token: str) -> str:
+        """상품명/별칭 단어가 아니면 조사/요청 표현을 떼어 어휘가 되는 형태로 ("콜라랑요" 처럼 2개까지)"""
+        if token in self._name_vocabulary or token in self.synonyms:
+            return token
+        for suffix in SUFFIXES:
+            stem = token[:-len(suffix)]
+            if not token.endswith(suffix) or len(stem) < 2:
+                continue
+            if self._known(stem):
+                return stem
+            for inner in SUFFIXES:
+                inner_stem = stem[:-len(inner)]
+                if stem.endswith(inner) and len(inner_stem) >= 2 and self._known(inner_stem):
+                    return inner_stem
+        return token
+
+    def normalize(self, query: str) -> Tuple[str, Optional[int]]:
+        """
+        표준 검색어와 수량 반환
+
+        Returns:
+            (표준 검색어, 수량 or None). 정규화 후 남는 말이 없으면 원래 검색어(공백 정리)를 그대로 반환
+        """
+        text = unicodedata.normalize("NFC", query).lower()
+        text = _NON_WORD.sub(" ", text)
+
+        # 수량 표현은 모두 제거하고, 검색어에서 가장 앞에 나온 수량을 반환
+        quantities = [
+            (match.start(), int(match.group(1)) if match.group(1) else NATIVE_NUMBERS[match.group(2)])
+            for match in _QUANTITY.finditer(text)
+        ]
+        text = _QUANTITY.sub(lambda match: " " * len(match.group(0)), text)
+
+        tokens = []
+        for match in _TOKEN.finditer(text):
+            token = match.group(0)
+            number = _strip_quantity_particle(token)
+            if number in STANDALONE_NUMBERS:
+                quantities.append((match.start(), STANDALONE_NUMBERS[number]))
+                continue
+            if token in FILLER_WORDS:
+                continue
+            token = self._strip_suffix(token)
+            key = normalize_term(token)
+            # 상품명/별칭 자체인 단어는 동의어보다 우선
+            tokens.append(token if key in self._name_keys else self.synonyms.get(key, token))
+
+        quantity = min(quantities)[1] if quantities else None
+
+        if not tokens:
+            return _SPACES.sub(" ", query).strip(), quantity
+
+        joined = normalize_term("".join(tokens))
+        if joined in self.synonyms and joined not in self._name_keys:
+            return self.synonyms[joined], quantity
+        if len(tokens) > 1 and joined in self._name_keys:
+            return joined, quantity
+        return " ".join(tokens), quantity
@@ -0,0 +1,158 @@
+"""
+검색 진단(explain) 정보 수집 및 기록
+
+findProduct(..., explain=True) 로 호출하면 한 번의 검색에 대해
+- 단계별 소요 시간 (인덱스 조회, 어휘/오타 단계, 쿼리 임베딩, 점수 계산, FTS5 등, ms)
+- 후보 수 (카탈로그 크기, 임계값을 넘은 후보 수, 반환 수)
+- 점수 분포 (최댓값, 백분위수, 1-2위 차이)
+- 캐시 적중 여부 (카탈로그 인덱스 재사용, 쿼리 임베딩 캐시)
+를 모아 결과의 "diagnostics" 키로 반환한다.
+processOrder(..., explain=True) 처럼 검색이 아닌 작업은 단계별 시간과 개수만
+모으는 StageTimings 를 쓴다.
+
+SEARCH_DIAGNOSTICS_LOG 환경변수에 파일 경로를 지정하면 진단 결과를 JSON 한 줄씩
+크기 기준으로 순환(rotate)되는 로그 파일에 함께 기록한다. (오프라인 분석용)
+- SEARCH_DIAGNOSTICS_LOG_MAX_BYTES: 파일 하나의 최대 크기 (기본값: 5MB)
+- SEARCH_DIAGNOSTICS_LOG_BACKUPS: 보관할 이전 파일 수 (기본값: 5)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, Optional
+
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 5
+
+# 점수 분포에 포함할 백분위수
+SCORE_PERCENTILES = (50, 90, 99)
+
+_logger = logging.getLogger("burgeria.search_diagnostics")
+_logger.propagate = False
+_log_path: Optional[str] = None
+_log_lock = threading.Lock()
+
+
+class StageTimings:
+    """작업 1회의 단계별 시간 / 개수 기록 (주문 처리 등 검색이 아닌 작업용)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """with 블록의 소요 시간을 단계 이름으로 누적 (ms)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+    def add_timing(self, name: str, milliseconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + milliseconds
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = (time.perf_counter() - self.started) * 1000
+        return {
+            "timings_ms": {name: round(value, 3) for name, value in self.timings.items()},
+            "total_ms": round(total, 3),
+            "counts": dict(self.counts)
+        }
+
+
+class SearchDiagnostics(StageTimings):
+    """검색 1회의 단계별 시간 / 후보 수 / 점수 분포 / 캐시 적중 기록"""
+
+    def __init__(self):
+        super().__init__()
+        self.cache: Dict[str, Any] = {}
+        self.scores: Dict[str, Any] = {}
+        self.details: Dict[str, Any] = {}
+
+    def record_scores(self, name: str, scores, threshold: Optional[float] = None) -> None:
+        """점수 배열의 분포 요약 (최댓값, 백분위수, 1-2위 차이, 임계값 이상 개수)"""
+        values = np.asarray(scores, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        summary: Dict[str, Any] = {"count": int(len(values))}
+        if len(values):
+            summary["max"] = round(float(values.max()), 4)
+            summary["mean"] = round(float(values.mean()), 4)
+            for percentile in SCORE_PERCENTILES:
+                summary[f"p{percentile}"] = round(float(np.percentile(values, percentile)), 4)
+            if len(values) >= 2:
+                top_two = np.partition(values, len(values) - 2)[-2:]
+                summary["top_gap"] = round(float(top_two[1] - top_two[0]), 4)
+            if threshold is not None:
+                summary["above_threshold"] = int((values >= threshold).sum())
+        self.scores[name] = summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **super().to_dict(),
+            "scores": dict(self.scores),
+            "cache": dict(self.cache),
+            **self.details
+        }
+
+
+def _configure_logger() -> bool:
+    """SEARCH_DIAGNOSTICS_LOG 경로로 순환 파일 핸들러 설정 (경로가 바뀌면 다시 설정)"""
+    global _log_path
+
+    path = os.getenv("SEARCH_DIAGNOSTICS_LOG")
+    if not path:
+        return False
+    if path == _log_path:
+        return True
+
+    with _log_lock:
+        if path != _log_path:
+            for handler in list(_logger.handlers):
+                _logger.removeHandler(handler)
+                handler.close()
+
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=int(os.getenv("SEARCH_DIAGNOSTICS_LOG_MAX_BYTES", str(DEFAULT_LOG_MAX_BYTES))),
+                backupCount=int(os.getenv("SEARCH_DIAGNOSTICS_LOG_BACKUPS", str(DEFAULT_LOG_BACKUPS))),
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+            _log_path = path
+    return True
+
+
+def log_diagnostics(query: str, status: str, diagnostics: Dict[str, Any], **fields) -> None:
+    """진단 결과를 로그 파일에 JSON 한 줄로 기록 (SEARCH_DIAGNOSTICS_LOG 미설정 시 무시)"""
+    try:
+        if not _configure_logger():
+            return
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "query": query,
+            "status": status,
+            **fields,
+            "diagnostics": diagnostics
+        }
+        _logger.info(json.dumps(record, ensure_ascii=False))
+    except Exception as e:
+        print(f"검색 진단 로그 기록 오류: {e}")
+
+
+def stage(diagnostics: Optional[StageTimings], name: str):
+    """진단 객체가 있으면 단계 시간 측정, 없으면 아무것도 하지 않는 컨텍스트"""
+    return diagnostics.stage(name) if diagnostics is not None else nullcontext()
@@ -0,0 +1,637 @@
+"""
+카탈로그 벡터 인덱스 (findProduct 시맨틱 검색 가속)
+
+Products 테이블의 임베딩을 한 번만 로드하여 정규화된 float32 행렬로 보관하고,
+검색 시 행렬-벡터 곱 1회 + argpartition 으로 상위 k개를 구한다.
+
+상품명/별칭으로 만든 어휘(lexical) 인덱스도 함께 보관하여, 정확한 이름이나
+유일한 상품명 접두어로 검색하면 임베딩 호출 없이 바로 찾을 수 있게 한다.
+오타("양념감쟈")와 초성("ㅎㅇㅂㄱㄱ") 입력은 typo_index.TypoIndex 로 먼저 교정한다.
+
+벡터 행렬은 product_type 별로 파티션(부분 행렬)을 미리 만들어 두어,
+카테고리 필터 검색은 해당 파티션만 계산한다.
+
+EMBEDDING_DIMS / VECTOR_QUANTIZATION 으로 차원 축소, int8 양자화 표현을 선택할 수 있다.
+(vector_compression 참고)
+
+VECTOR_INDEX=ivf 로 설정하면 상품 수가 많은 파티션(및 전체 행렬)에 IVF 근사 인덱스
+(ann_index.IVFIndex)를 함께 만들어, 가까운 군집의 상품만 점수를 계산한다.
+
+Products / Product_Aliases 테이블이 변경되면 트리거(catalog_schema)가 Catalog_Version 을 증가시키고,
+다음 검색에서 버전이 달라진 것을 감지했을 때만 인덱스를 다시 만든다.
+재고(stock_quantity)만 바뀐 경우에는 별도 버전('stock')만 증가하며,
+인덱스 재구성 없이 재고 마스크만 갱신한다.
+
+상품명/설명/별칭별 필드 벡터(multi_vector.Product_Vectors)가 있으면 함께 로드하여,
+상품 점수를 대표 벡터와 필드 벡터 중 최대 유사도(max-sim)로 계산한다.
+(IVF 근사 검색은 대표 벡터로 고른 군집 후보에만 적용)
+
+미리 계산된 상품 패밀리(product_families.Product_Families)도 함께 로드하여,
+패밀리 이름("양념감자")으로 검색하면 구성원을 바로 반환한다.
+
+가격/타입/카테고리/재고 조건 검색(browseProducts)은 전체 상품의 속성 열 배열
+(catalog_columns.ColumnarCatalog)로 처리하며, 검색어가 있으면 벡터 점수와 결합한다.
+
+검색어 정규화기(query_normalizer.QueryNormalizer)도 카탈로그 어휘와 Query_Synonyms 로
+함께 만들어 두어, 동의어 변경 시에도 카탈로그 버전으로 다시 만든다.
+"""
+
+import re
+import bisect
+import sqlite3
+import threading
+import time
+import unicodedata
+import numpy as np
+from typing import Dict, Any, Optional, List, Tuple
+from embedding_codec import decode_embedding
+from typo_index import TypoIndex
+from ann_index import IVFIndex, get_ann_settings
+from vector_compression import (
+    Int8Matrix, get_compression_settings, rescore_count, truncate_embeddings
+)
+from multi_vector import MultiVectorIndex, build_multi_vector_index
+from catalog_columns import ColumnarCatalog
+from query_normalizer import QueryNormalizer, ensure_synonym_table, load_synonyms
+from catalog_schema import ensure_catalog_version, get_catalog_version, get_catalog_versions
+from db_connection import get_connection
+
+# 모델 정보가 없는 기존 JSON 임베딩은 이 모델로 생성된 것으로 간주
+LEGACY_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+# 인덱스에 보관하는 상품 메타데이터 컬럼 (findProduct 결과 스키마와 동일한 순서)
+PRODUCT_FIELDS = (
+    "product_id", "product_name", "product_type", "price",
+    "description", "stock_quantity", "category_id"
+)
+
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_product_key(text: str) -> str:
+    """어휘 인덱스 키 정규화 (NFC, 소문자, 공백/괄호 등 기호 제거)"""
+    text = unicodedata.normalize("NFC", text).lower()
+    return _NON_WORD.sub("", text)
+
+
+class LexicalIndex:
+    """
+    상품명 + 별칭 기반 정확/접두어 매칭 인덱스
+
+    - 정규화된 키 -> 상품 목록 dict (상품명 + 별칭, 정확 일치용)
+    - 정렬된 상품명 키 리스트 (bisect 로 접두어 범위 탐색, 별칭은 접두어 매칭하지 않음)
+
+    접두어가 유일해도 다른 상품명에 검색어가 들어 있으면 ("새우" → 리아 새우버거 /
+    리아 더블 사각새우버거) 한 상품을 가리킨다고 볼 수 없으므로 매칭하지 않는다.
+    """
+
+    # 이보다 짧은 검색어는 접두어 매칭을 하지 않음 (한 글자 오매칭 방지)
+    MIN_PREFIX_LENGTH = 2
+
+    def __init__(
+        self,
+        names: List[Tuple[str, Dict[str, Any]]],
+        aliases: List[Tuple[str, Dict[str, Any]]] = ()
+    ):
+        self._products_by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._names_by_key: Dict[str, List[Dict[str, Any]]] = {}
+        for text, product in names:
+            self._add(self._products_by_key, text, product)
+            self._add(self._names_by_key, text, product)
+        for text, product in aliases:
+            self._add(self._products_by_key, text, product)
+        self._keys = sorted(self._names_by_key)
+
+    @staticmethod
+    def _add(products_by_key: Dict[str, List[Dict[str, Any]]], text: str, product: Dict[str, Any]) -> None:
+        key = normalize_product_key(text)
+        if not key:
+            return
+        bucket = products_by_key.setdefault(key, [])
+        if all(p["product_id"] != product["product_id"] for p in bucket):
+            bucket.append(product)
+
+    @staticmethod
+    def _filter(products: List[Dict[str, Any]], category: Optional[str]) -> List[Dict[str, Any]]:
+        """재고가 있고 카테고리가 일치하는 상품만"""
+        return [
+            p for p in products
+            if p["stock_quantity"] > 0 and (not category or p["product_type"] == category)
+        ]
+
+    def lookup(self, query: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        정확히 일치하거나 유일한 접두어로 일치하는 상품 1개 반환
+
+        후보가 없거나 여러 개면 None (시맨틱 검색으로 넘김)
+        """
+        key = normalize_product_key(query)
+        if not key:
+            return None
+
+        # 1. 정확 일치 (상품명 또는 별칭)
+        exact = self._filter(self._products_by_key.get(key, []), category)
+        if len(exact) == 1:
+            return exact[0]
+        if exact:
+            return None
+
+        # 2. 유일한 접두어 일치 (상품명만)
+        if len(key) < self.MIN_PREFIX_LENGTH:
+            return None
+
+        candidates: Dict[str, Dict[str, Any]] = {}
+        start = bisect.bisect_left(self._keys, key)
+        for candidate_key in self._keys[start:]:
+            if not candidate_key.startswith(key):
+                break
+            for product in self._filter(self._names_by_key[candidate_key], category):
+                candidates[product["product_id"]] = product
+            if len(candidates) > 1:
+                return None
+
+        if len(candidates) != 1:
+            return None
+
+        # 3. 검색어가 다른 상품명 중간에 들어 있으면 유일하지 않음
+        product = next(iter(candidates.values()))
+        for name_key, products in self._names_by_key.items():
+            if key in name_key and not name_key.startswith(key) and any(
+                p["product_id"] != product["product_id"] for p in self._filter(products, category)
+            ):
+                return None
+        return product
+
+
+class CatalogIndex:
+    """
+    정규화된 임베딩 행렬 + 병렬 메타데이터 배열
+
+    - matrix: (N, D) float32, 각 행은 L2 정규화되어 있어 내적 = 코사인 유사도
+    - product_ids / product_types: 행 순서와 동일한 numpy 배열
+    - products: 행 순서와 동일한 상품 메타데이터 dict 리스트
+    - available: 행 순서와 동일한 재고 여부 마스크 (stock_quantity > 0)
+    - partitions: product_type -> (행 번호 배열, 부분 행렬 또는 int8 부분 행렬)
+    - quantized: int8 모드일 때 전체 행렬의 int8 표현 (float 행렬은 재계산용)
+    - dims: 차원 축소 시 남긴 차원 수 (쿼리도 같은 차원으로 자름)
+    - ann: 카테고리(None = 전체) -> IVF 근사 인덱스 (설정 시, 큰 파티션만)
+    - model: 인덱스에 포함된 임베딩의 모델 이름 (쿼리 임베딩과 같아야 함)
+    - lexical: 전체 상품의 이름/별칭 인덱스 (조회 시 재고 확인)
+    - typo: 이름/별칭 자모 오타 교정 + 초성 인덱스
+    - families: 정규화된 패밀리 이름 -> 구성원 상품 목록
+    - multi: 상품명/설명/별칭 필드 벡터 (max-sim, 없으면 None)
+    - multi_partitions: product_type -> 파티션 기준으로 번호를 다시 매긴 필드 벡터
+    - normalizer: 검색어 정규화기 (카탈로그 어휘 + Query_Synonyms)
+    - columns: 임베딩이 없는 상품까지 포함한 가격/타입/카테고리/재고 열 배열
+    - built_at / stock_refreshed_at: 생성 / 재고 갱신 시각 (perf_counter, 검색 진단용)
+    - load_timings: load() 단계별 소요 시간 (ms, DB 조회 / 임베딩 디코딩 / 인덱스 생성)
+    """
+
+    def __init__(
+        self,
+        products: List[Dict[str, Any]],
+        matrix: np.ndarray,
+        version: int,
+        model: Optional[str] = None,
+        lexical: Optional[LexicalIndex] = None,
+        typo: Optional[TypoIndex] = None,
+        stock_version: int = 0,
+        all_products: Optional[Dict[str, Dict[str, Any]]] = None,
+        ann_settings: Optional[Dict[str, int]] = None,
+        compression: Optional[Dict[str, Any]] = None,
+        families: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        field_vectors: Optional[Tuple[List[np.ndarray], List[int]]] = None,
+        normalizer: Optional[QueryNormalizer] = None
+    ):
+        compression = compression or {}
+        self.dims = compression.get("dims")
+        self.quantization = compression.get("quantization", "float32")
+        if self.dims and len(matrix):
+            matrix = truncate_embeddings(matrix, self.dims)
+
+        self.products = products
+        self.matrix = matrix
+        self.version = version
+        self.stock_version = stock_version
+        self.model = model
+        self.lexical = lexical or LexicalIndex([])
+        self.typo = typo or TypoIndex([])
+        self.families = families or {}
+        self.normalizer = normalizer or QueryNormalizer()
+        self.built_at = time.perf_counter()
+        self.stock_refreshed_at = self.built_at
+        self.load_timings: Dict[str, float] = {}
+        self.product_ids = np.array([p["product_id"] for p in products], dtype=object)
+        self.product_types = np.array([p["product_type"] for p in products], dtype=object)
+        self.available = np.array([p["stock_quantity"] > 0 for p in products], dtype=bool)
+
+        # 임베딩이 없는 상품까지 포함한 전체 상품 (재고 갱신용)
+        self._all_products = all_products if all_products is not None else {
+            p["product_id"]: p for p in products
+        }
+        self._row_by_id = {p["product_id"]: row for row, p in enumerate(products)}
+        self.columns = ColumnarCatalog(list(self._all_products.values()), self._row_by_id)
+
+        # product_type 별 파티션 (부분 행렬은 연속 메모리로 복사해 둠)
+        quantize = self.quantization == "int8"
+        self.quantized = Int8Matrix(matrix) if quantize else None
+        self.partitions: Dict[str, Tuple[np.ndarray, Any]] = {}
+        for product_type in set(self.product_types):
+            rows = np.flatnonzero(self.product_types == product_type)
+            view = Int8Matrix(matrix[rows]) if quantize else np.ascontiguousarray(matrix[rows])
+            self.partitions[product_type] = (rows, view)
+
+        # 필드 벡터 (owner = 행 번호), 파티션별로도 미리 잘라 둠
+        self.multi: Optional[MultiVectorIndex] = None
+        self.multi_partitions: Dict[str, MultiVectorIndex] = {}
+        if field_vectors and len(matrix):
+            self.multi = build_multi_vector_index(field_vectors[0], field_vectors[1], self.dims)
+            for product_type, (rows, _) in self.partitions.items():
+                self.multi_partitions[product_type] = self.multi.subset(rows)
+
+        # IVF 근사 인덱스 (min_size 이상인 행렬만, 작은 파티션은 정확 검색이 더 빠름)
+        self.ann: Dict[Optional[str], IVFIndex] = {}
+        if ann_settings:
+            views = [(None, matrix)] + [(t, matrix[rows]) for t, (rows, _) in self.partitions.items()]
+            for category, view in views:
+                if len(view) >= max(ann_settings["min_size"], 2):
+                    self.ann[category] = IVFIndex.build(view, nprobe=ann_settings["nprobe"])
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @property
+    def vector_nbytes(self) -> int:
+        """검색 시 스캔하는 벡터 표현의 메모리 (전체 + 파티션, bytes)"""
+        scanned = self.quantized if self.quantized is not None else self.matrix
+        total = scanned.nbytes + sum(view.nbytes for _, view in self.partitions.values())
+        if self.multi is not None:
+            total += self.multi.nbytes + sum(multi.nbytes for multi in self.multi_partitions.values())
+        return total
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, model: Optional[str] = None) -> "CatalogIndex":
+        """
+        DB에서 상품을 읽어 인덱스 생성
+
+        벡터 행렬에는 임베딩이 있는 상품만, 어휘 인덱스에는 모든 상품이 들어간다.
+        재고는 available 마스크로 관리하므로 품절 상품도 행렬에 포함된다.
+        model이 주어지면 해당 모델로 생성된 임베딩만 포함한다.
+        (다른 제공자의 벡터와는 차원/공간이 달라 비교할 수 없음)
+        """
+        started = time.perf_counter()
+        version, stock_version = get_catalog_versions(conn)
+
+        rows = conn.execute("""
+        SELECT product_id, product_name, product_type, price, description,
+               stock_quantity, category_id, embedding
+        FROM Products
+        ORDER BY product_id
+        """).fetchall()
+        fetched = time.perf_counter()
+
+        products = []
+        vectors = []
+        name_entries = []
+        alias_entries = []
+        product_by_id = {}
+        for row in rows:
+            product = dict(zip(PRODUCT_FIELDS, row[:7]))
+            product_by_id[product["product_id"]] = product
+            name_entries.append((product["product_name"], product))
+
+            if row[7] is None:
+                continue
+
+            vector, row_model = decode_embedding(row[7])
+            if model is not None and (row_model or LEGACY_EMBEDDING_MODEL) != model:
+                continue
+
+            products.append(product)
+            vectors.append(vector)
+
+        for alias, product_id in conn.execute("SELECT alias, product_id FROM Product_Aliases"):
+            if product_id in product_by_id:
+                alias_entries.append((alias, product_by_id[product_id]))
+        lexical_entries = name_entries + alias_entries
+
+        families: Dict[str, List[Dict[str, Any]]] = {}
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Product_Families'"
+        ).fetchone():
+            for family_name, product_id in conn.execute(
+                "SELECT family_name, product_id FROM Product_Families ORDER BY family_id, product_id"
+            ):
+                if product_id in product_by_id:
+                    families.setdefault(normalize_product_key(family_name), []).append(product_by_id[product_id])
+
+        decoded = time.perf_counter()
+        field_vectors = _load_field_vectors(conn, model, {p["product_id"]: row for row, p in enumerate(products)})
+        field_loaded = time.perf_counter()
+
+        if vectors:
+            matrix = _normalize_rows(np.vstack(vectors).astype(np.float32, copy=False))
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        names = [name for name, _ in lexical_entries]
+        normalizer = QueryNormalizer(
+            names,
+            names + list(families) + [p["description"] for p in product_by_id.values() if p["description"]],
+            load_synonyms(conn)
+        )
+
+        index = cls(
+            products, matrix, version, model,
+            LexicalIndex(name_entries, alias_entries), TypoIndex(lexical_entries),
+            stock_version=stock_version, all_products=product_by_id,
+            ann_settings=get_ann_settings(), compression=get_compression_settings(),
+            families=families, field_vectors=field_vectors, normalizer=normalizer
+        )
+        index.load_timings = {
+            "fetch_ms": round((fetched - started) * 1000, 3),
+            "decode_ms": round((decoded - fetched) * 1000, 3),
+            "field_vectors_ms": round((field_loaded - decoded) * 1000, 3),
+            "build_ms": round((time.perf_counter() - field_loaded) * 1000, 3)
+        }
+        return index
+
+    def family_members(self, query: str, category: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        검색어가 패밀리 이름과 일치하면 재고 있는 구성원 목록 (카테고리 필터 적용)
+
+        패밀리 이름이 아니면 None
+        """
+        members = self.families.get(normalize_product_key(query))
+        if members is None:
+            return None
+        return LexicalIndex._filter(members, category)
+
+    def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """상품 ID로 메타데이터 조회 (임베딩이 없는 상품 포함)"""
+        return self._all_products.get(product_id)
+
+    def similarities(self, query_embedding: List[float], product_ids: List[str]) -> List[Optional[float]]:
+        """쿼리 벡터와 지정한 상품들의 코사인 유사도 (임베딩이 없는 상품은 None)"""
+        rows = [self._row_by_id.get(product_id) for product_id in product_ids]
+        present = np.array([row for row in rows if row is not None], dtype=np.int64)
+        scores = self.row_scores(query_embedding, present)
+        if scores is None:
+            return [None] * len(product_ids)
+
+        scores_by_row = dict(zip(present.tolist(), scores.tolist()))
+        return [None if row is None else float(scores_by_row[row]) for row in rows]
+
+    def row_scores(self, query_embedding: List[float], rows: np.ndarray) -> Optional[np.ndarray]:
+        """
+        쿼리 벡터와 지정한 행들의 유사도 배열 (필드 벡터 max-sim 포함)
+
+        인덱스가 비었거나 쿼리 차원이 맞지 않으면 None
+        """
+        query = truncate_embeddings(np.asarray(query_embedding, dtype=np.float32), self.dims)
+        if len(self) == 0 or query.shape[-1] != self.matrix.shape[1]:
+            return None
+
+        scores = self.matrix[rows] @ query
+        if self.multi is not None:
+            scores = np.maximum(scores, self.multi.row_scores(query, rows))
+        return scores
+
+    def refresh_stock(self, conn: sqlite3.Connection, stock_version: int) -> None:
+        """재고 수량만 다시 읽어 available 마스크와 상품 메타데이터 갱신 (행렬은 그대로)"""
+        for product_id, stock_quantity in conn.execute(
+            "SELECT product_id, stock_quantity FROM Products"
+        ):
+            product = self._all_products.get(product_id)
+            if product is None:
+                continue
+
+            product["stock_quantity"] = stock_quantity
+            self.columns.update_stock(product_id, stock_quantity)
+            row = self._row_by_id.get(product_id)
+            if row is not None:
+                self.available[row] = stock_quantity > 0
+
+        self.stock_version = stock_version
+        self.stock_refreshed_at = time.perf_counter()
+
+    def search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        similarity_threshold: float,
+        category: Optional[str] = None,
+        nprobe: Optional[int] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        쿼리 벡터와 가장 유사한 상품 검색
+
+        IVF 인덱스가 있으면 nprobe 개 군집만 검색한다. (None 이면 인덱스 기본값)
+        이 경우 전체 상품 수는 검색한 군집 안에서 센 값이다.
+
+        Returns:
+            ([(행 번호, 유사도), ...] 유사도 내림차순, 임계값 이상인 전체 상품 수)
+        """
+        return self.search_many(
+            [query_embedding], limit, similarity_threshold, [category], nprobe
+        )[0]
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        limit: int,
+        similarity_threshold: float,
+        categories: Optional[List[Optional[str]]] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[List[Tuple[int, float]], int]]:
+        """
+        여러 쿼리 벡터를 한 번에 검색
+
+        같은 카테고리의 쿼리끼리 묶어, 카테고리별 부분 행렬(없으면 전체 행렬)과
+        행렬-행렬 곱 1회로 점수를 계산한다. IVF 인덱스가 있는 행렬은 쿼리별로
+        가까운 군집의 후보만 계산한다. (필드 벡터 max-sim 도 후보에만 적용)
+
+        Returns:
+            쿼리 순서대로 search() 와 같은 (순위 목록, 전체 상품 수) 리스트
+        """
+        if categories is None:
+            categories = [None] * len(query_embeddings)
+
+        results: List[Tuple[List[Tuple[int, float]], int]] = [([], 0) for _ in query_embeddings]
+        if len(self) == 0 or not query_embeddings:
+            return results
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if self.dims and queries.ndim == 2 and queries.shape[1] > self.dims:
+            queries = queries[:, :self.dims]
+        if queries.ndim != 2 or queries.shape[1] != self.matrix.shape[1]:
+            return results
+
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        valid = norms[:, 0] > 0
+        norms[~valid] = 1.0
+        queries = queries / norms
+
+        # 카테고리별로 쿼리 묶기
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, category in enumerate(categories):
+            if valid[i]:
+                groups.setdefault(category or None, []).append(i)
+
+        for category, query_rows in groups.items():
+            if category is None:
+                rows = None
+                matrix = self.quantized if self.quantized is not None else self.matrix
+            elif category in self.partitions:
+                rows, matrix = self.partitions[category]
+            else:
+                continue  # 해당 카테고리 상품 없음
+
+            available = self.available if rows is None else self.available[rows]
+
+            ivf = self.ann.get(category)
+            if ivf is not None:
+                for i in query_rows:
+                    candidates, scores = ivf.candidates(queries[i], nprobe)
+                    view_rows = candidates if rows is None else rows[candidates]
+                    # 필드 벡터 max-sim (후보 행만)
+                    if self.multi is not None:
+                        scores = np.maximum(scores, self.multi.row_scores(queries[i], view_rows))
+                    ranked, total_found = self._top_k(
+                        scores, available[candidates], limit, similarity_threshold
+                    )
+                    results[i] = ([(int(view_rows[pos]), score) for pos, score in ranked], total_found)
+                continue
+
+            # (쿼리 수, 파티션 상품 수) 유사도 행렬
+            if isinstance(matrix, Int8Matrix):
+                score_matrix = matrix.scores(queries[query_rows])
+                for i, scores in zip(query_rows, score_matrix):
+                    self._rescore(scores, rows, queries[i], limit)
+            else:
+                score_matrix = queries[query_rows] @ matrix.T
+
+            # 필드 벡터 max-sim (상품별 구간 최댓값을 reduceat 한 번으로)
+            multi = self.multi if rows is None else self.multi_partitions.get(category)
+            if multi is not None:
+                multi.apply(score_matrix, queries[query_rows])
+
+            for i, scores in zip(query_rows, score_matrix):
+                ranked, total_found = self._top_k(scores, available, limit, similarity_threshold)
+                if rows is not None:
+                    ranked = [(int(rows[pos]), score) for pos, score in ranked]
+                results[i] = (ranked, total_found)
+
+        return results
+
+    def _rescore(self, scores: np.ndarray, rows: Optional[np.ndarray], query: np.ndarray, limit: int) -> None:
+        """int8 근사 점수 상위 후보를 float 행렬로 다시 계산 (scores 를 제자리에서 수정)"""
+        count = min(rescore_count(limit), len(scores))
+        if count < len(scores):
+            candidates = np.argpartition(-scores, count - 1)[:count]
+        else:
+            candidates = np.arange(len(scores))
+
+        matrix_rows = candidates if rows is None else rows[candidates]
+        scores[candidates] = self.matrix[matrix_rows] @ query
+
+    @staticmethod
+    def _top_k(
+        scores: np.ndarray,
+        available: np.ndarray,
+        limit: int,
+        similarity_threshold: float
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """점수 벡터에서 재고가 있고 임계값 이상인 상위 limit개 선택"""
+        positions = np.flatnonzero((scores >= similarity_threshold) & available)
+        total_found = len(positions)
+        if total_found == 0 or limit <= 0:
+            return [], total_found
+
+        # 상위 k개만 부분 정렬
+        k = min(limit, total_found)
+        if k < total_found:
+            positions = positions[np.argpartition(-scores[positions], k - 1)[:k]]
+        positions = positions[np.argsort(-scores[positions], kind="stable")]
+
+        return [(int(pos), float(scores[pos])) for pos in positions], total_found
+
+
+def _load_field_vectors(
+    conn: sqlite3.Connection,
+    model: Optional[str],
+    row_by_id: Dict[str, int]
+) -> Optional[Tuple[List[np.ndarray], List[int]]]:
+    """Product_Vectors 의 필드 벡터 중 행렬에 있는 상품 + 같은 모델만 (벡터 목록, 행 번호 목록)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Product_Vectors'"
+    ).fetchone()
+    if not exists:
+        return None
+
+    vectors, owners = [], []
+    for product_id, embedding in conn.execute("SELECT product_id, embedding FROM Product_Vectors"):
+        row = row_by_id.get(product_id)
+        if row is None:
+            continue
+        vector, row_model = decode_embedding(embedding)
+        if model is not None and (row_model or LEGACY_EMBEDDING_MODEL) != model:
+            continue
+        vectors.append(vector)
+        owners.append(row)
+
+    return (vectors, owners) if vectors else None
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """각 행을 L2 정규화 (0 벡터는 그대로 0)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# (db_path, model) -> CatalogIndex 캐시
+_index_cache: Dict[Tuple[str, Optional[str]], CatalogIndex] = {}
+_index_lock = threading.Lock()
+_versioned_dbs = set()
+
+
+def get_catalog_index(db_path: str, model: Optional[str] = None) -> CatalogIndex:
+    """
+    db_path에 대한 카탈로그 인덱스 반환 (model 지정 시 해당 모델 임베딩만)
+
+    카탈로그 버전이 캐시된 인덱스와 같으면 그대로 재사용하고,
+    다르면 (Products 변경) 새로 로드한다. 재고 버전만 다르면 재고 마스크만 갱신한다.
+    """
+    conn = get_connection(db_path)
+    try:
+        if db_path not in _versioned_dbs:
+            ensure_catalog_version(conn)
+            ensure_synonym_table(conn)
+            _versioned_dbs.add(db_path)
+
+        version, stock_version = get_catalog_versions(conn)
+
+        with _index_lock:
+            index = _index_cache.get((db_path, model))
+            if index is None or index.version != version:
+                index = CatalogIndex.load(conn, model)
+                _index_cache[(db_path, model)] = index
+            elif index.stock_version != stock_version:
+                index.refresh_stock(conn, stock_version)
+            return index
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def invalidate_catalog_index(db_path: Optional[str] = None) -> None:
+    """캐시된 인덱스 제거 (db_path가 없으면 전체)"""
+    with _index_lock:
+        if db_path is None:
+            _index_cache.clear()
+        else:
+            for key in [key for key in _index_cache if key[0] == db_path]:
+                del _index_cache[key]
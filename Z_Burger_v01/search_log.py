@@ -0,0 +1,192 @@
+"""
+검색 쿼리 로그 (임계값 튜닝용)
+
+SEARCH_QUERY_LOG=1 로 설정하면 findProduct / findProducts 검색마다 Search_Log 에
+검색어, 임베딩 참조(Embedding_Cache 캐시 키), 결정 단계, 결과 상태, 후보 상품을 기록하고,
+이후 addToCart 로 후보 중 하나가 담기면 그 상품을 chosen_product_id 로 채운다.
+
+임베딩 벡터는 중복 저장하지 않고 쿼리 임베딩 캐시의 키만 남긴다.
+(캐시에 없으면 tune_thresholds.py 가 search_text 로 다시 생성)
+
+선택 상품은 최근 CHOICE_WINDOW_MINUTES 이내에 해당 상품을 후보로 반환한 같은 세션의
+가장 최근 검색에 연결한다. (findProduct / findProducts 에 session_id 를 넘긴 경우)
+세션 없이 기록된 검색은 같은 세션의 검색이 없을 때만 연결되므로 다른 세션의 선택이
+섞일 수 있다. (tune_thresholds.py 출력에 건수 표시)
+"""
+
+import os
+import json
+import sqlite3
+from typing import Dict, Any, Optional, List
+from embedding_cache import make_cache_key
+from db_connection import get_connection
+
+# 검색 후 이 시간(분) 안에 장바구니에 담긴 후보만 선택으로 연결
+CHOICE_WINDOW_MINUTES = 30
+# 선택 연결 시 살펴볼 최근 미확정 검색 수
+CHOICE_LOOKBACK = 20
+
+SEARCH_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Search_Log (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query_text TEXT NOT NULL,
+    search_text TEXT NOT NULL,
+    category TEXT,
+    model TEXT,
+    embedding_key TEXT,
+    search_mode TEXT,
+    resolved_by TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result_product_id TEXT,
+    candidate_ids TEXT NOT NULL,
+    chosen_product_id TEXT,
+    session_id TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_log_pending
+ON Search_Log(chosen_product_id, created_at);
+"""
+
+# session_id 컬럼이 없던 기존 테이블에 추가한 뒤 생성
+SEARCH_LOG_SESSION_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_search_log_session
+ON Search_Log(session_id, chosen_product_id, created_at)
+"""
+
+_ready_dbs = set()
+
+
+def is_search_log_enabled() -> bool:
+    """SEARCH_QUERY_LOG 환경변수 (1/true/yes 이면 기록)"""
+    return os.getenv("SEARCH_QUERY_LOG", "").strip().lower() in ("1", "true", "yes")
+
+
+def ensure_search_log(conn: sqlite3.Connection, db_path: Optional[str] = None) -> None:
+    """Search_Log 테이블 생성 (db_path 별로 한 번만)"""
+    if db_path is not None and db_path in _ready_dbs:
+        return
+    conn.executescript(SEARCH_LOG_SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(Search_Log)")}
+    if "session_id" not in columns:
+        conn.execute("ALTER TABLE Search_Log ADD COLUMN session_id TEXT")
+    conn.execute(SEARCH_LOG_SESSION_INDEX)
+    conn.commit()
+    if db_path is not None:
+        _ready_dbs.add(db_path)
+
+
+def record_searches(
+    db_path: str,
+    requests: List[tuple],
+    results: List[Dict[str, Any]],
+    resolutions: List[str],
+    model: Optional[str],
+    search_mode: Optional[str],
+    session_id: Optional[str] = None
+) -> None:
+    """
+    검색 결과 기록
+
+    Args:
+        requests: [(검색어, 카테고리), ...]
+        results: findProduct 결과 목록 (requests 와 같은 순서)
+        resolutions: 검색어별 결정 단계 ("choseong" | "exact" | "family" | 검색 모드)
+        session_id: 검색한 세션 (선택 상품 연결용, 없으면 None)
+    """
+    rows = []
+    for (query, category), result, resolved_by in zip(requests, results, resolutions):
+        search_text = result.get("corrected_query") or result.get("normalized_query") or query
+        product = result.get("product")
+        rows.append((
+            query, search_text, category, model,
+            make_cache_key(search_text, model) if model else None,
+            search_mode, resolved_by, result["status"],
+            product["product_id"] if product else None,
+            json.dumps([match["product_id"] for match in result.get("matches", [])]),
+            session_id
+        ))
+
+    conn = get_connection(db_path)
+    try:
+        ensure_search_log(conn, db_path)
+        conn.executemany("""
+        INSERT INTO Search_Log (
+            query_text, search_text, category, model, embedding_key,
+            search_mode, resolved_by, status, result_product_id, candidate_ids, session_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def record_choice(db_path: str, product_id: str, session_id: Optional[str] = None) -> Optional[int]:
+    """
+    장바구니에 담긴 상품을 최근 검색의 선택 상품으로 기록
+
+    session_id 가 있으면 같은 세션의 검색을 먼저, 없으면 세션 없이 기록된 검색만 살펴본다.
+    (다른 세션의 검색에는 연결하지 않음)
+
+    Returns:
+        연결된 log_id (후보로 반환한 최근 검색이 없으면 None)
+    """
+    conn = get_connection(db_path)
+    try:
+        ensure_search_log(conn, db_path)
+        rows = conn.execute("""
+        SELECT log_id, candidate_ids
+        FROM Search_Log
+        WHERE chosen_product_id IS NULL
+          AND (session_id = ? OR session_id IS NULL)
+          AND created_at >= datetime('now', ?)
+        ORDER BY session_id IS NULL, log_id DESC
+        LIMIT ?
+        """, (session_id, f"-{CHOICE_WINDOW_MINUTES} minutes", CHOICE_LOOKBACK)).fetchall()
+
+        for log_id, candidate_ids in rows:
+            if product_id in json.loads(candidate_ids):
+                conn.execute(
+                    "UPDATE Search_Log SET chosen_product_id = ? WHERE log_id = ?",
+                    (product_id, log_id)
+                )
+                conn.commit()
+                return log_id
+        return None
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def load_labeled_searches(
+    db_path: str,
+    model: Optional[str] = None,
+    resolved_by: tuple = ("semantic",)
+) -> List[Dict[str, Any]]:
+    """
+    선택 상품이 기록된 검색 목록 (임계값의 영향을 받는 단계로 결정된 검색만)
+
+    정확 일치 / 초성 / 패밀리 단계로 결정된 검색은 임계값과 무관하므로 제외한다.
+    """
+    conn = get_connection(db_path)
+    try:
+        ensure_search_log(conn, db_path)
+        placeholders = ", ".join("?" for _ in resolved_by)
+        sql = f"""
+        SELECT log_id, query_text, search_text, category, model, embedding_key, chosen_product_id, session_id
+        FROM Search_Log
+        WHERE chosen_product_id IS NOT NULL AND resolved_by IN ({placeholders})
+        """
+        params: list = list(resolved_by)
+        if model is not None:
+            sql += " AND model = ?"
+            params.append(model)
+        rows = conn.execute(sql + " ORDER BY log_id", params).fetchall()
+    except Exception:
+        conn.rollback()
+        raise
+
+    fields = ("log_id", "query_text", "search_text", "category", "model", "embedding_key", "chosen_product_id",
+              "session_id")
+    return [dict(zip(fields, row)) for row in rows]
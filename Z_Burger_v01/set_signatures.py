@@ -0,0 +1,133 @@
+"""
+세트 구성 시그니처 인덱스 (장바구니 세트 그룹 → 세트 상품 식별)
+
+장바구니에는 세트가 구성품 행(set_group_id 로 묶음)으로만 저장되므로, 어떤 세트인지는
+구성품 조합으로 찾아야 한다. 세트마다 Set_Items 를 조회해 비교하면 (세트 그룹 수 × 세트 수) 번의
+쿼리가 필요하므로, 기본 구성품 ID 의 frozenset → 세트 상품 ID 사전을 한 번에 만들어 둔다.
+
+- 구성품이 그대로면 사전 조회 한 번 (정확 일치)
+- 구성품을 교체한 세트는 구성품 → 세트 역색인으로 겹치는 구성품이 가장 많은 세트 (구성품 수가 같은 세트 중,
+  동점이면 먼저 등록된 세트)
+- Products / Set_Items 가 바뀌면 (Catalog_Version 'products' / 'sets') 다시 만든다
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Iterable
+from db_connection import get_connection
+from search_index import ensure_catalog_version
+
+# Set_Items 변경 감지용 버전 (마이그레이션 6번에서 트리거 생성)
+SETS_VERSION_NAME = "sets"
+
+
+class SetCompositionIndex:
+    """기본 구성품 조합 → 세트 상품"""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str]], version: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            rows: (세트 상품 ID, 세트 이름, 기본 구성품 ID) - 세트 등록 순서대로
+            version: (카탈로그 버전, 세트 버전)
+        """
+        self.version = version
+        self.sets: List[Tuple[str, str]] = []
+        components: List[set] = []
+        position: Dict[str, int] = {}
+        for set_product_id, set_name, component_product_id in rows:
+            pos = position.get(set_product_id)
+            if pos is None:
+                pos = position[set_product_id] = len(self.sets)
+                self.sets.append((set_product_id, set_name))
+                components.append(set())
+            components[pos].add(component_product_id)
+
+        self.sizes = [len(parts) for parts in components]
+        self.by_signature: Dict[frozenset, int] = {}
+        self.by_component: Dict[str, List[int]] = {}
+        for pos, parts in enumerate(components):
+            self.by_signature.setdefault(frozenset(parts), pos)
+            for component_product_id in parts:
+                self.by_component.setdefault(component_product_id, []).append(pos)
+
+    def __len__(self) -> int:
+        return len(self.sets)
+
+    def match(self, product_ids: Iterable[str]) -> Optional[Tuple[str, str]]:
+        """
+        장바구니 세트 그룹의 구성품 ID 로 세트 찾기
+
+        Returns:
+            (세트 상품 ID, 세트 이름) 또는 None (겹치는 세트 없음)
+        """
+        product_ids = frozenset(product_ids)
+        pos = self.by_signature.get(product_ids)
+        if pos is not None:
+            return self.sets[pos]
+
+        # 구성품 교체: 구성품 수가 같은 세트 중 가장 많이 겹치는 세트
+        overlap = Counter(
+            pos
+            for product_id in product_ids
+            for pos in self.by_component.get(product_id, ())
+            if self.sizes[pos] == len(product_ids)
+        )
+        if not overlap:
+            return None
+        best = min(overlap, key=lambda pos: (-overlap[pos], pos))
+        return self.sets[best]
+
+    @classmethod
+    def load(cls, conn, version: Optional[Tuple[int, int]] = None) -> "SetCompositionIndex":
+        """전체 세트의 기본 구성품을 쿼리 한 번으로 로드"""
+        rows = conn.execute("""
+        SELECT p.product_id, p.product_name, si.component_product_id
+        FROM Products p
+        JOIN Set_Items si ON si.set_product_id = p.product_id AND si.is_default = TRUE
+        WHERE p.product_type = 'set'
+        ORDER BY p.rowid
+        """).fetchall()
+        return cls(rows, version)
+
+
+# db_path -> SetCompositionIndex 캐시
+_index_cache: Dict[str, SetCompositionIndex] = {}
+_index_lock = threading.Lock()
+_versioned_dbs = set()
+
+
+def get_set_composition_index(db_path: str) -> SetCompositionIndex:
+    """
+    db_path 의 세트 구성 인덱스 반환
+
+    (카탈로그 버전, 세트 버전)이 캐시된 인덱스와 같으면 재사용하고, 다르면 새로 로드한다.
+    """
+    conn = get_connection(db_path)
+    try:
+        if db_path not in _versioned_dbs:
+            ensure_catalog_version(conn)
+            _versioned_dbs.add(db_path)
+
+        versions = dict(conn.execute(
+            "SELECT name, version FROM Catalog_Version WHERE name IN ('products', ?)", (SETS_VERSION_NAME,)
+        ))
+        version = (versions.get("products", 0), versions.get(SETS_VERSION_NAME, 0))
+
+        with _index_lock:
+            index = _index_cache.get(db_path)
+            if index is None or index.version != version:
+                index = SetCompositionIndex.load(conn, version)
+                _index_cache[db_path] = index
+            return index
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def invalidate_set_composition_index(db_path: Optional[str] = None) -> None:
+    """캐시된 인덱스 제거 (db_path가 없으면 전체)"""
+    with _index_lock:
+        if db_path is None:
+            _index_cache.clear()
+        else:
+            _index_cache.pop(db_path, None)
@@ -1,15 +1,26 @@
 """
 Task 3.1: 시맨틱 검색을 위한 임베딩 설정 스크립트
 1. Products 테이블에 embedding 컬럼 추가
-2. 모든 상품에 대한 임베딩 생성 및 저장
+2. 기존 JSON 임베딩을 바이너리(float32 BLOB) 포맷으로 변환
+3. 상품 임베딩 배치 생성 및 저장 (내용이 바뀐 상품만)
+4. 상품명/설명/별칭 필드별 임베딩 생성 (다중 벡터 max-sim 검색용)
+5. 상품 패밀리(맛/사이즈 변형 묶음) 다시 계산
+
+임베딩 제공자는 EMBEDDING_PROVIDER 환경변수로 선택한다. ("openai" | "local")
+제공자(모델)가 바뀌면 다른 모델로 생성된 임베딩도 다시 생성한다.
 """
 
 import sqlite3
-import json
-import os
-from openai import OpenAI
+import hashlib
+import time
 from dotenv import load_dotenv
 from db_functions import get_default_db_path
+from migrations import run_migrations
+from embedding_codec import encode_embedding, decode_embedding
+from embedding_providers import EmbeddingProvider, get_embedding_provider
+from search_index import LEGACY_EMBEDDING_MODEL, ensure_catalog_version
+from product_families import build_product_families
+from multi_vector import FIELD_NAME, FIELD_DESCRIPTION, FIELD_ALIAS, PRODUCT_VECTORS_SCHEMA
 import sys
 import io
 
@@ -20,96 +31,276 @@ if sys.platform == 'win32':
 # 환경변수 로드
 load_dotenv()
 
-# OpenAI 클라이언트 초기화
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# 한 번의 임베딩 API 요청에 담을 상품 수
+DEFAULT_BATCH_SIZE = 64
 
 
 def add_embedding_column(db_path: str):
-    """Products 테이블에 embedding 컬럼 추가"""
+    """Products 테이블에 embedding / embedding_hash 컬럼 추가 (스키마 마이그레이션 2번)"""
     print("Step 1: Products 테이블에 embedding 컬럼 추가 중...")
 
+    conn = sqlite3.connect(db_path)
+
+    try:
+        applied = run_migrations(conn)
+        if applied:
+            print(f"✅ 스키마 마이그레이션 적용 완료: {applied}")
+        else:
+            print("ℹ️  스키마가 이미 최신입니다.")
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+
+    finally:
+        conn.close()
+
+
+def migrate_embeddings_to_blob(db_path: str, model: str = LEGACY_EMBEDDING_MODEL):
+    """
+    기존 JSON 문자열 임베딩을 바이너리 BLOB 포맷으로 일괄 변환 (한 번만 실행되면 됨)
+
+    embedding_hash 가 비어 있으면 현재 상품 텍스트 + model 의 해시를 같이 기록한다.
+    (Step 3 에서 변환된 임베딩을 API 로 다시 생성하지 않도록)
+    """
+    print("\nStep 2: 기존 JSON 임베딩을 바이너리 포맷으로 변환 중...")
+
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     try:
-        # embedding 컬럼이 이미 있는지 확인
-        cursor.execute("PRAGMA table_info(Products)")
-        columns = [row[1] for row in cursor.fetchall()]
+        cursor.execute("""
+            SELECT product_id, product_name, description, product_type, embedding
+            FROM Products
+            WHERE typeof(embedding) = 'text'
+        """)
+        rows = cursor.fetchall()
 
-        if 'embedding' not in columns:
-            cursor.execute("ALTER TABLE Products ADD COLUMN embedding TEXT")
-            conn.commit()
-            print("✅ embedding 컬럼 추가 완료!")
-        else:
-            print("ℹ️  embedding 컬럼이 이미 존재합니다.")
+        if not rows:
+            print("ℹ️  변환할 JSON 임베딩이 없습니다.")
+            return
+
+        converted = []
+        for product_id, product_name, description, product_type, embedding_json in rows:
+            vector, _ = decode_embedding(embedding_json)
+            content_hash = compute_content_hash(build_embedding_text(product_name, description, product_type), model)
+            converted.append((encode_embedding(vector, model), content_hash, product_id))
+
+        # 하나의 트랜잭션으로 일괄 변환
+        cursor.executemany("""
+            UPDATE Products
+            SET embedding = ?, embedding_hash = COALESCE(embedding_hash, ?)
+            WHERE product_id = ?
+        """, converted)
+        conn.commit()
+
+        before = sum(len(row[-1].encode("utf-8")) for row in rows)
+        after = sum(len(blob) for blob, _, _ in converted)
+        print(f"✅ {len(converted)}개 임베딩 변환 완료! ({before:,} bytes → {after:,} bytes)")
 
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
+        conn.rollback()
 
     finally:
         conn.close()
 
 
-def get_embedding(text: str, model: str = "text-embedding-3-small") -> list:
-    """OpenAI API를 사용하여 텍스트의 임베딩 벡터 생성"""
+def get_embedding(text: str, provider: EmbeddingProvider = None) -> list:
+    """설정된 임베딩 제공자를 사용하여 텍스트의 임베딩 벡터 생성"""
+    provider = provider or get_embedding_provider()
     try:
-        response = client.embeddings.create(
-            input=text,
-            model=model
-        )
-        return response.data[0].embedding
+        return provider.embed_one(text)
     except Exception as e:
         print(f"❌ 임베딩 생성 오류: {e}")
         return None
 
 
-def generate_product_embeddings(db_path: str):
-    """모든 상품에 대한 임베딩 생성 및 저장"""
-    print("\nStep 2: 모든 상품에 대한 임베딩 생성 중...")
+def build_embedding_text(product_name: str, description: str, product_type: str) -> str:
+    """임베딩을 위한 텍스트 생성 (상품명 + 설명 + 타입)"""
+    return f"{product_name}. {description or ''} ({product_type})"
+
+
+def compute_content_hash(embedding_text: str, model: str) -> str:
+    """임베딩 텍스트 + 모델 이름의 해시 (바뀐 상품만 다시 임베딩하기 위함)"""
+    return hashlib.sha256(f"{model}\n{embedding_text}".encode("utf-8")).hexdigest()[:16]
+
+
+def generate_product_embeddings(
+    db_path: str,
+    provider: EmbeddingProvider = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+):
+    """
+    상품 임베딩 배치 생성 및 저장 (현재 제공자 모델 기준)
+
+    - 임베딩 텍스트의 해시(embedding_hash)가 바뀐 상품만 다시 생성
+      (설명 수정, 제공자/모델 변경 포함)
+    - 해시 없이 저장된 임베딩(JSON → BLOB 변환 등)은 모델이 같으면 최신으로 보고 해시만 기록
+    - batch_size개씩 한 번의 API 요청으로 임베딩하고, 배치 단위 트랜잭션으로 저장
+    - 중간에 실패해도 이미 저장된 배치는 해시가 일치하므로 다시 실행하면 이어서 진행
+    """
+    provider = provider or get_embedding_provider()
+    print(f"\nStep 3: 상품 임베딩 생성 중... (제공자: {provider.name}, 모델: {provider.model})")
 
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     try:
-        # embedding이 없는 상품들 조회
+        # 임베딩이 없거나 텍스트/모델이 바뀐 상품들 조회
+        # (해시가 없는 행만 모델 확인용으로 임베딩 값을 읽음)
         cursor.execute("""
-            SELECT product_id, product_name, description, product_type
+            SELECT product_id, product_name, description, product_type,
+                   embedding IS NOT NULL, embedding_hash,
+                   CASE WHEN embedding_hash IS NULL THEN embedding END
             FROM Products
-            WHERE embedding IS NULL
+            ORDER BY product_id
         """)
-        products = cursor.fetchall()
+        pending = []
+        backfill = []
+        for product_id, product_name, description, product_type, has_embedding, stored_hash, embedding in cursor.fetchall():
+            embedding_text = build_embedding_text(product_name, description, product_type)
+            content_hash = compute_content_hash(embedding_text, provider.model)
+            if has_embedding and stored_hash == content_hash:
+                continue
+            if embedding is not None and (decode_embedding(embedding)[1] or LEGACY_EMBEDDING_MODEL) == provider.model:
+                backfill.append((content_hash, product_id))
+                continue
+            pending.append((product_id, product_name, embedding_text, content_hash))
+
+        if backfill:
+            cursor.executemany("UPDATE Products SET embedding_hash = ? WHERE product_id = ?", backfill)
+            conn.commit()
+            print(f"ℹ️  해시가 없던 {len(backfill)}개 임베딩은 모델이 같아 해시만 기록했습니다.")
 
-        if not products:
-            print("ℹ️  모든 상품이 이미 임베딩을 가지고 있습니다.")
+        if not pending:
+            print("ℹ️  모든 상품의 임베딩이 최신 상태입니다.")
             return
 
-        print(f"📋 총 {len(products)}개 상품의 임베딩을 생성합니다...\n")
+        total_batches = (len(pending) + batch_size - 1) // batch_size
+        print(f"📋 총 {len(pending)}개 상품의 임베딩을 {total_batches}개 배치로 생성합니다...\n")
+
+        started = time.perf_counter()
+        saved = 0
+        failed = 0
+
+        for batch_no, offset in enumerate(range(0, len(pending), batch_size), 1):
+            batch = pending[offset:offset + batch_size]
+            print(f"[{batch_no}/{total_batches}] {len(batch)}개 ... ", end='')
+
+            try:
+                vectors = provider.embed([embedding_text for _, _, embedding_text, _ in batch])
+            except Exception as e:
+                failed += len(batch)
+                print(f"❌ 실패 ({e})")
+                continue
+
+            # 배치 전체를 하나의 트랜잭션으로 저장
+            cursor.executemany("""
+                UPDATE Products
+                SET embedding = ?, embedding_hash = ?
+                WHERE product_id = ?
+            """, [
+                (encode_embedding(vector, provider.model), content_hash, product_id)
+                for (product_id, _, _, content_hash), vector in zip(batch, vectors)
+            ])
+            conn.commit()
+
+            saved += len(batch)
+            print("✅")
+
+        elapsed = time.perf_counter() - started
+        throughput = saved / elapsed if elapsed > 0 else float(saved)
+        print(f"\n✅ {saved}개 상품의 임베딩 생성 완료! ({elapsed:.2f}초, {throughput:.1f}개/초)")
+        if failed:
+            print(f"⚠️  {failed}개 상품은 실패했습니다. 다시 실행하면 실패한 상품만 이어서 생성합니다.")
+
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        conn.rollback()
 
-        for idx, (product_id, product_name, description, product_type) in enumerate(products, 1):
-            # 임베딩을 위한 텍스트 생성 (상품명 + 설명 + 타입)
-            embedding_text = f"{product_name}. {description or ''} ({product_type})"
+    finally:
+        conn.close()
 
-            print(f"[{idx}/{len(products)}] {product_name} ... ", end='')
 
-            # 임베딩 생성
-            embedding_vector = get_embedding(embedding_text)
+def generate_field_embeddings(
+    db_path: str,
+    provider: EmbeddingProvider = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+):
+    """
+    상품명 / 설명 / 별칭을 각각 임베딩하여 Product_Vectors 에 저장 (현재 제공자 모델 기준)
 
-            if embedding_vector:
-                # JSON 문자열로 변환하여 저장
-                embedding_json = json.dumps(embedding_vector)
+    - (상품, 필드, 텍스트) 가 이미 같은 모델로 저장되어 있으면 건너뜀
+    - 상품/별칭이 바뀌어 더 이상 필요 없는 벡터와 다른 모델의 벡터는 삭제
+    """
+    provider = provider or get_embedding_provider()
+    print(f"\nStep 4: 필드별 임베딩 생성 중... (상품명/설명/별칭, 모델: {provider.model})")
 
-                cursor.execute("""
-                    UPDATE Products
-                    SET embedding = ?
-                    WHERE product_id = ?
-                """, (embedding_json, product_id))
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
 
-                conn.commit()
-                print("✅")
+    try:
+        ensure_catalog_version(conn)
+        cursor.executescript(PRODUCT_VECTORS_SCHEMA)
+
+        wanted = set()
+        for product_id, product_name, description in cursor.execute(
+            "SELECT product_id, product_name, description FROM Products"
+        ).fetchall():
+            wanted.add((product_id, FIELD_NAME, product_name))
+            if description and description.strip():
+                wanted.add((product_id, FIELD_DESCRIPTION, description.strip()))
+
+        aliases_exist = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Product_Aliases'"
+        ).fetchone()
+        if aliases_exist:
+            for alias, product_id in cursor.execute("SELECT alias, product_id FROM Product_Aliases").fetchall():
+                wanted.add((product_id, FIELD_ALIAS, alias))
+
+        stored = set()
+        stale = []
+        for product_id, field, text, embedding in cursor.execute(
+            "SELECT product_id, field, text, embedding FROM Product_Vectors"
+        ).fetchall():
+            key = (product_id, field, text)
+            if key in wanted and decode_embedding(embedding)[1] == provider.model:
+                stored.add(key)
             else:
-                print("❌ 실패")
+                stale.append(key)
 
-        print(f"\n✅ 총 {len(products)}개 상품의 임베딩 생성 완료!")
+        if stale:
+            cursor.executemany(
+                "DELETE FROM Product_Vectors WHERE product_id = ? AND field = ? AND text = ?", stale
+            )
+            conn.commit()
+            print(f"🗑️  더 이상 사용하지 않는 필드 임베딩 {len(stale)}개 삭제")
+
+        pending = sorted(wanted - stored)
+        if not pending:
+            print("ℹ️  모든 필드 임베딩이 최신 상태입니다.")
+            return
+
+        saved = 0
+        for offset in range(0, len(pending), batch_size):
+            batch = pending[offset:offset + batch_size]
+            try:
+                vectors = provider.embed([text for _, _, text in batch])
+            except Exception as e:
+                print(f"❌ {len(batch)}개 실패 ({e})")
+                continue
+
+            cursor.executemany(
+                "INSERT OR REPLACE INTO Product_Vectors (product_id, field, text, embedding) VALUES (?, ?, ?, ?)",
+                [
+                    (product_id, field, text, encode_embedding(vector, provider.model))
+                    for (product_id, field, text), vector in zip(batch, vectors)
+                ]
+            )
+            conn.commit()
+            saved += len(batch)
+
+        print(f"✅ {saved}개 필드 임베딩 생성 완료!")
 
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
@@ -121,7 +312,7 @@ def generate_product_embeddings(db_path: str):
 
 def verify_embeddings(db_path: str):
     """임베딩이 제대로 저장되었는지 확인"""
-    print("\nStep 3: 임베딩 저장 상태 확인 중...")
+    print("\nStep 5: 임베딩 저장 상태 확인 중...")
 
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -143,10 +334,19 @@ def verify_embeddings(db_path: str):
         else:
             print(f"⚠️  임베딩이 누락된 상품이 {total_count - embedded_count}개 있습니다.")
 
+        # 저장 포맷별 개수 / 용량
+        cursor.execute("""
+            SELECT typeof(embedding), COUNT(*), SUM(LENGTH(embedding))
+            FROM Products
+            WHERE embedding IS NOT NULL
+            GROUP BY typeof(embedding)
+        """)
+        for storage_type, count, total_bytes in cursor.fetchall():
+            print(f"📊 {storage_type} 포맷: {count}개 ({total_bytes:,} bytes)")
+
         # 샘플 임베딩 확인
         cursor.execute("""
-            SELECT product_id, product_name,
-                   SUBSTR(embedding, 1, 50) as embedding_preview
+            SELECT product_id, product_name, embedding
             FROM Products
             WHERE embedding IS NOT NULL
             LIMIT 3
@@ -154,8 +354,10 @@ def verify_embeddings(db_path: str):
         samples = cursor.fetchall()
 
         print("\n📋 임베딩 샘플:")
-        for product_id, product_name, embedding_preview in samples:
-            print(f"  - {product_name} ({product_id}): {embedding_preview}...")
+        for product_id, product_name, embedding in samples:
+            vector, model = decode_embedding(embedding)
+            preview = ", ".join(f"{v:.4f}" for v in vector[:3])
+            print(f"  - {product_name} ({product_id}): [{preview}, ...] dim={vector.size}, model={model}")
 
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
@@ -176,12 +378,23 @@ def main():
     # 1. 임베딩 컬럼 추가
     add_embedding_column(db_path)
 
-    # 2. 임베딩 생성 및 저장
+    # 2. 기존 JSON 임베딩 변환
+    migrate_embeddings_to_blob(db_path)
+
+    # 3. 임베딩 생성 및 저장
     generate_product_embeddings(db_path)
 
-    # 3. 검증
+    # 4. 필드별 임베딩 (상품명/설명/별칭)
+    generate_field_embeddings(db_path)
+
+    # 5. 검증
     verify_embeddings(db_path)
 
+    # 6. 상품 패밀리 계산 (임베딩 유사도 사용)
+    print("\nStep 6: 상품 패밀리 계산 중...")
+    family_result = build_product_families(db_path)
+    print(("✅ " if family_result["success"] else "❌ ") + family_result["message"])
+
     print("\n" + "=" * 60)
     print("🎉 임베딩 설정 완료!")
     print("=" * 60)
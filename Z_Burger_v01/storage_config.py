@@ -0,0 +1,159 @@
+"""
+SQLite 저장소 설정 (동시 쓰기 / 잠금 대기 처리)
+
+여러 Flask 워커가 같은 DB 파일에 동시에 쓰면 "database is locked" 가 발생한다.
+연결을 만들 때 아래 PRAGMA 를 적용하고 (connect / apply_pragmas), 쓰기 함수는 begin_write() 로
+BEGIN IMMEDIATE 트랜잭션을 시작하여 쓰기 잠금을 처음부터 잡는다.
+
+- journal_mode=WAL: 읽기와 쓰기가 서로 막지 않음 (DB 파일 단위로 유지됨)
+- synchronous=NORMAL: WAL 에서 안전한 수준으로 fsync 횟수 감소
+- busy_timeout: 잠금이 풀릴 때까지 SQLite 내부에서 기다리는 시간
+- cache_size / mmap_size: 페이지 캐시, 메모리 맵 읽기 크기
+
+busy_timeout 안에 잠금을 얻지 못하면 지터를 더한 지수 백오프로 BEGIN IMMEDIATE 를 다시 시도한다.
+잠금 대기 시간과 재시도 횟수는 get_lock_metrics() 로 조회한다. (db_functions.get_storage_metrics)
+
+환경변수:
+    SQLITE_JOURNAL_MODE (기본 WAL), SQLITE_SYNCHRONOUS (기본 NORMAL),
+    SQLITE_BUSY_TIMEOUT_MS (기본 5000), SQLITE_CACHE_SIZE_KB (기본 16384),
+    SQLITE_MMAP_SIZE (기본 268435456), SQLITE_LOCK_RETRIES (기본 5),
+    SQLITE_LOCK_BACKOFF_MS (기본 20, 재시도마다 2배, 최대 SQLITE_LOCK_BACKOFF_MAX_MS=1000)
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+JOURNAL_MODES = ("WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def get_storage_settings() -> Dict[str, Any]:
+    """환경변수에서 저장소 설정 읽기 (잘못된 모드는 기본값)"""
+    journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL").strip().upper()
+    synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+    return {
+        "journal_mode": journal_mode if journal_mode in JOURNAL_MODES else "WAL",
+        "synchronous": synchronous if synchronous in SYNCHRONOUS_MODES else "NORMAL",
+        "busy_timeout_ms": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "cache_size_kb": int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "lock_retries": int(os.getenv("SQLITE_LOCK_RETRIES", "5")),
+        "backoff_ms": float(os.getenv("SQLITE_LOCK_BACKOFF_MS", "20")),
+        "backoff_max_ms": float(os.getenv("SQLITE_LOCK_BACKOFF_MAX_MS", "1000")),
+    }
+
+
+@lru_cache(maxsize=1)
+def default_storage_settings() -> Dict[str, Any]:
+    """프로세스 기본 설정 (처음 사용할 때 한 번 읽음)"""
+    return get_storage_settings()
+
+
+def apply_pragmas(conn: sqlite3.Connection, settings: Optional[Dict[str, Any]] = None) -> None:
+    """연결에 저장소 PRAGMA 적용 (연결을 만들 때 한 번)"""
+    settings = settings or default_storage_settings()
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+    # 메모리 DB 등 WAL 을 쓸 수 없으면 SQLite 가 기존 모드를 유지한다
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {-int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def connect(db_path: str, settings: Optional[Dict[str, Any]] = None, **kwargs) -> sqlite3.Connection:
+    """
+    PRAGMA 를 적용한 새 연결 (busy_timeout 을 sqlite3 timeout 으로도 사용)
+
+    kwargs 는 sqlite3.connect 에 그대로 전달한다. (cached_statements 등)
+    """
+    settings = settings or default_storage_settings()
+    conn = sqlite3.connect(db_path, timeout=settings["busy_timeout_ms"] / 1000, **kwargs)
+    apply_pragmas(conn, settings)
+    return conn
+
+
+def is_lock_error(error: Exception) -> bool:
+    """잠금 경합 오류 여부 (database is locked / busy)"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+
+class LockMetrics:
+    """쓰기 트랜잭션 시작 시 잠금 대기 지표 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.transactions = 0
+            self.contended = 0
+            self.retries = 0
+            self.failures = 0
+            self.wait_ms = 0.0
+            self.max_wait_ms = 0.0
+
+    def record(self, wait_ms: float, retries: int, failed: bool) -> None:
+        with self._lock:
+            self.transactions += 1
+            self.retries += retries
+            self.failures += int(failed)
+            self.wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if retries:
+                self.contended += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "write_transactions": self.transactions,
+                "contended_transactions": self.contended,
+                "lock_retries": self.retries,
+                "lock_failures": self.failures,
+                "lock_wait_ms_total": round(self.wait_ms, 3),
+                "lock_wait_ms_max": round(self.max_wait_ms, 3),
+                "lock_wait_ms_avg": round(self.wait_ms / self.transactions, 3) if self.transactions else 0.0,
+            }
+
+
+lock_metrics = LockMetrics()
+
+
+def begin_write(conn: sqlite3.Connection, settings: Optional[Dict[str, Any]] = None) -> None:
+    """
+    BEGIN IMMEDIATE 로 쓰기 트랜잭션 시작 (잠금 경합 시 지터 백오프로 재시도)
+
+    이미 트랜잭션 안이면 아무것도 하지 않는다.
+    재시도를 모두 실패하면 마지막 잠금 오류를 그대로 발생시킨다.
+    """
+    if conn.in_transaction:
+        return
+
+    settings = settings or default_storage_settings()
+    started = time.perf_counter()
+    retries = 0
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            lock_metrics.record((time.perf_counter() - started) * 1000, retries, failed=False)
+            return
+        except sqlite3.OperationalError as e:
+            if not is_lock_error(e) or retries >= settings["lock_retries"]:
+                lock_metrics.record((time.perf_counter() - started) * 1000, retries, failed=is_lock_error(e))
+                raise
+            # 지수 백오프 + full jitter (워커들이 같은 시점에 다시 몰리지 않도록)
+            backoff = min(settings["backoff_max_ms"], settings["backoff_ms"] * (2 ** retries))
+            time.sleep(random.uniform(0, backoff) / 1000)
+            retries += 1
+
+
+def get_lock_metrics() -> Dict[str, Any]:
+    """잠금 대기 시간 / 재시도 횟수 지표"""
+    return lock_metrics.to_dict()
@@ -0,0 +1,161 @@
+"""
+IVF 근사 최근접 이웃 인덱스 단위 테스트
+
+테스트 대상:
+- ann_index.spherical_kmeans / IVFIndex (군집 검색, 재현율 측정)
+- search_index.CatalogIndex 의 IVF 사용 (VECTOR_INDEX=ivf, 필드 벡터 max-sim 포함)
+"""
+
+import numpy as np
+from ann_index import IVFIndex, spherical_kmeans
+from search_index import CatalogIndex
+
+
+def make_vectors(n: int = 2000, dim: int = 32, clusters: int = 20, seed: int = 0) -> np.ndarray:
+    """군집 구조가 있는 정규화 벡터 생성"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.3, size=(n, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def test_kmeans():
+    """모든 벡터가 군집에 할당되고 중심은 정규화됨"""
+    print("\n=== Test 1: 구면 k-means ===")
+    vectors = make_vectors()
+
+    centroids, labels = spherical_kmeans(vectors, 16)
+    print(f"군집 크기: {np.bincount(labels, minlength=16).tolist()}")
+
+    assert centroids.shape == (16, vectors.shape[1])
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0), "중심은 정규화되어야 함"
+    assert labels.min() >= 0 and labels.max() < 16 and len(labels) == len(vectors)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_recall():
+    """nprobe 가 커질수록 재현율 증가, 전체 군집 검색은 정확 검색과 동일"""
+    print("\n=== Test 2: 재현율 측정 ===")
+    vectors = make_vectors()
+    ivf = IVFIndex.build(vectors, n_lists=32, nprobe=4)
+
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), 50, replace=False)]
+    report = ivf.recall_report(vectors, queries, k=5, nprobes=[1, 4, 32])
+    for row in report:
+        print(row)
+
+    recalls = [row["recall"] for row in report]
+    assert recalls == sorted(recalls), "nprobe 가 클수록 재현율이 높아야 함"
+    assert recalls[-1] == 1.0, "모든 군집을 검색하면 정확 검색과 같아야 함"
+    assert recalls[1] >= 0.8, "군집 구조가 있는 데이터에서 nprobe=4 재현율이 너무 낮음"
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_catalog_index_with_ivf():
+    """CatalogIndex 가 IVF 로 검색해도 재고/카테고리 필터와 행 번호가 유지됨"""
+    print("\n=== Test 3: CatalogIndex IVF 검색 ===")
+    vectors = make_vectors(n=600)
+    products = [
+        {
+            "product_id": f"P{i:05d}",
+            "product_name": f"상품{i}",
+            "product_type": "burger" if i % 2 else "sides",
+            "price": 1000,
+            "description": "",
+            "stock_quantity": 0 if i % 10 == 0 else 5,
+            "category_id": "CAT"
+        }
+        for i in range(len(vectors))
+    ]
+
+    exact = CatalogIndex(products, vectors, version=0)
+    approx = CatalogIndex(products, vectors, version=0, ann_settings={"nprobe": 4, "min_size": 100})
+    assert set(approx.ann) == {None, "burger", "sides"}, "전체 + 파티션별 IVF 인덱스"
+
+    query = vectors[11]
+    for category in (None, "burger"):
+        exact_ranked, _ = exact.search(query, 5, 0.0, category)
+        approx_ranked, _ = approx.search(query, 5, 0.0, category, nprobe=approx.ann[category].n_lists)
+        assert approx_ranked == exact_ranked, "모든 군집을 검색하면 정확 검색과 같아야 함"
+
+    ranked, _ = approx.search(query, 5, 0.0, "burger")
+    assert ranked[0][0] == 11, "자기 자신이 최상위여야 함"
+    assert all(products[pos]["product_type"] == "burger" for pos, _ in ranked), "카테고리 필터 실패"
+
+    ranked, _ = approx.search(vectors[10], 20, 0.0)
+    assert all(products[pos]["stock_quantity"] > 0 for pos, _ in ranked), "품절 상품 제외 실패"
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def test_ivf_field_vectors():
+    """IVF 후보에도 필드 벡터 max-sim 적용 (전체 군집 검색은 정확 검색과 동일)"""
+    print("\n=== Test 4: IVF + 필드 벡터 ===")
+    vectors = make_vectors(n=400)
+    products = [
+        {
+            "product_id": f"P{i:05d}",
+            "product_name": f"상품{i}",
+            "product_type": "burger" if i % 2 else "sides",
+            "price": 1000,
+            "description": "",
+            "stock_quantity": 5,
+            "category_id": "CAT"
+        }
+        for i in range(len(vectors))
+    ]
+    # 13번 상품의 별칭 벡터만 쿼리와 같음 (대표 벡터는 다른 군집)
+    query = make_vectors(n=1, seed=1)[0]
+    field_vectors = ([vectors[13], query], [13, 13])
+
+    exact = CatalogIndex(products, vectors, version=0, field_vectors=field_vectors)
+    approx = CatalogIndex(products, vectors, version=0, field_vectors=field_vectors,
+                          ann_settings={"nprobe": 4, "min_size": 100})
+
+    for category in (None, "burger"):
+        exact_ranked, _ = exact.search(query, 5, 0.0, category)
+        approx_ranked, _ = approx.search(query, 5, 0.0, category, nprobe=approx.ann[category].n_lists)
+        print(f"{category}: {[(pos, round(score, 3)) for pos, score in approx_ranked[:3]]}")
+        assert approx_ranked[0][0] == 13 and abs(approx_ranked[0][1] - 1.0) < 1e-5, "별칭 벡터 일치"
+        assert [pos for pos, _ in approx_ranked] == [pos for pos, _ in exact_ranked], "정확 검색과 같은 순위"
+        assert np.allclose([score for _, score in approx_ranked], [score for _, score in exact_ranked], atol=1e-5)
+
+    print("\n✅ Test 4 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("IVF 근사 최근접 이웃 인덱스 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_kmeans()
+        test_recall()
+        test_catalog_index_with_ivf()
+        test_ivf_field_vectors()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
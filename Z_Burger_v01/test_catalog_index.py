@@ -0,0 +1,232 @@
+"""
+카탈로그 벡터 인덱스 단위 테스트
+
+테스트 대상:
+- search_index.CatalogIndex (정규화 행렬 + argpartition 상위 k)
+- search_index.get_catalog_index (Products 변경 시에만 재구성, 재고 변경은 마스크만 갱신)
+- embedding_codec (float32 BLOB 인코딩/디코딩)
+- search_index.LexicalIndex (상품명/별칭 정확 일치, 상품명 접두어 일치)
+"""
+
+import json
+import sqlite3
+import numpy as np
+from search_index import get_catalog_index, invalidate_catalog_index
+from embedding_codec import encode_embedding, decode_embedding
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "", [1.0, 0.0, 0.0]),
+    ("A00013", "CAT_BURGER", "데리버거", "burger", 3700, 10, "", [0.8, 0.6, 0.0]),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "", [0.0, 1.0, 0.0]),
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 0, "", [0.0, 0.0, 1.0]),
+]
+
+
+def test_index_load():
+    """전체 상품을 정규화된 행렬 + 재고 마스크 + 카테고리 파티션으로 로드"""
+    print("\n=== Test 1: 인덱스 로드 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    index = get_catalog_index(db_path)
+    print(f"로드된 상품 수: {len(index)}, 재고 있음: {int(index.available.sum())}")
+
+    assert len(index) == 4, "품절 상품도 행렬에 포함되어야 함"
+    assert int(index.available.sum()) == 3, "품절 상품(콜라)은 재고 마스크에서 제외되어야 함"
+    assert set(index.partitions) == {"burger", "sides", "beverage"}, "product_type 별 파티션"
+    rows, sub_matrix = index.partitions["burger"]
+    assert sub_matrix.shape == (2, 3) and np.array_equal(sub_matrix, index.matrix[rows]), "부분 행렬은 전체 행렬의 슬라이스"
+    assert index.matrix.dtype == np.float32, "행렬은 float32여야 함"
+    assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0), "각 행은 정규화되어야 함"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_search_top_k():
+    """상위 k개 검색, 카테고리 필터, 배치 검색"""
+    print("\n=== Test 2: 상위 k 검색 ===")
+    db_path = create_test_db(PRODUCTS)
+    index = get_catalog_index(db_path)
+
+    ranked, total_found = index.search([1.0, 0.1, 0.0], limit=1, similarity_threshold=0.5)
+    top = index.products[ranked[0][0]]
+    print(f"최상위: {top['product_name']} ({ranked[0][1]:.4f}), 전체: {total_found}")
+
+    assert top["product_id"] == "A00001", "가장 유사한 상품은 한우불고기버거여야 함"
+    assert total_found == 2, "임계값 이상 상품은 2개여야 함"
+    assert len(ranked) == 1, "limit 개수만 반환해야 함"
+
+    ranked, _ = index.search([1.0, 0.1, 0.0], limit=5, similarity_threshold=0.0, category="sides")
+    assert all(index.products[pos]["product_type"] == "sides" for pos, _ in ranked), "카테고리 필터 실패"
+
+    ranked, _ = index.search([0.0, 0.0, 1.0], limit=5, similarity_threshold=0.5, category="beverage")
+    assert ranked == [], "품절 상품은 검색되지 않아야 함"
+
+    batch = index.search_many(
+        [[1.0, 0.1, 0.0], [0.0, 1.0, 0.0]], limit=2, similarity_threshold=0.0,
+        categories=[None, "sides"]
+    )
+    assert batch[0] == index.search([1.0, 0.1, 0.0], limit=2, similarity_threshold=0.0), "배치 검색은 단건 검색과 같아야 함"
+    assert index.products[batch[1][0][0][0]]["product_id"] == "B00004", "쿼리별 카테고리 필터 적용"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_rebuild_on_change():
+    """Products 변경 시에만 인덱스 재구성, 재고 변경은 마스크만 갱신"""
+    print("\n=== Test 3: 변경 감지 재구성 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    first = get_catalog_index(db_path)
+    second = get_catalog_index(db_path)
+    assert first is second, "변경이 없으면 같은 인덱스를 재사용해야 함"
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Products SET stock_quantity = 5 WHERE product_id = 'C00001'")
+    conn.commit()
+
+    restocked = get_catalog_index(db_path)
+    assert restocked is first, "재고만 바뀌면 인덱스를 재구성하지 않아야 함"
+    assert int(restocked.available.sum()) == 4, "재입고된 콜라가 재고 마스크에 반영되어야 함"
+    assert restocked.lexical.lookup("콜라 미디움")["stock_quantity"] == 5, "상품 메타데이터의 재고도 갱신"
+
+    conn.execute("UPDATE Products SET price = 2100 WHERE product_id = 'C00001'")
+    conn.commit()
+    conn.close()
+
+    third = get_catalog_index(db_path)
+    print(f"재구성 전: {len(first)}개, 재구성 후: {len(third)}개")
+    assert third is not first, "Products 변경 후에는 인덱스가 재구성되어야 함"
+    assert len(third) == 4 and third.available.all(), "재입고된 콜라가 포함되어야 함"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def test_blob_embedding():
+    """BLOB 인코딩 라운드트립 및 JSON/BLOB 혼합 로드"""
+    print("\n=== Test 4: 바이너리 임베딩 포맷 ===")
+
+    vector = [0.25, -1.5, 3.0]
+    blob = encode_embedding(vector, "text-embedding-3-small")
+    decoded, model = decode_embedding(blob)
+    print(f"BLOB 크기: {len(blob)} bytes, 모델: {model}")
+
+    assert model == "text-embedding-3-small", "모델 이름이 헤더에 보존되어야 함"
+    assert np.array_equal(decoded, np.asarray(vector, dtype=np.float32)), "벡터 값이 보존되어야 함"
+
+    legacy, legacy_model = decode_embedding(json.dumps(vector))
+    assert legacy_model is None and np.allclose(legacy, vector), "기존 JSON 포맷도 읽을 수 있어야 함"
+
+    db_path = create_test_db(PRODUCTS)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "UPDATE Products SET embedding = ? WHERE product_id = 'A00001'",
+        (encode_embedding([1.0, 0.0, 0.0], "text-embedding-3-small"),)
+    )
+    conn.commit()
+    conn.close()
+
+    index = get_catalog_index(db_path)
+    ranked, _ = index.search([1.0, 0.0, 0.0], limit=1, similarity_threshold=0.5)
+    assert index.products[ranked[0][0]]["product_id"] == "A00001", "BLOB 행도 검색되어야 함"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 4 통과!")
+    return True
+
+
+def test_lexical_lookup():
+    """상품명/별칭 정확 일치, 유일한 상품명 접두어 일치 (별칭 접두어 / 다른 상품명에 포함된 검색어 제외)"""
+    print("\n=== Test 5: 어휘 인덱스 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE Product_Aliases (
+        alias TEXT NOT NULL,
+        product_id TEXT NOT NULL,
+        PRIMARY KEY (alias, product_id)
+    )
+    """)
+    conn.execute("INSERT INTO Product_Aliases (alias, product_id) VALUES ('한우버거', 'A00001')")
+    conn.commit()
+    conn.close()
+
+    lexical = get_catalog_index(db_path).lexical
+
+    assert lexical.lookup("한우불고기버거")["product_id"] == "A00001", "정확한 상품명 일치"
+    assert lexical.lookup(" 한우 불고기버거 ")["product_id"] == "A00001", "공백 무시 일치"
+    assert lexical.lookup("한우버거")["product_id"] == "A00001", "별칭 일치"
+    assert lexical.lookup("양념감자 칠리")["product_id"] == "B00004", "괄호 무시 일치"
+    assert lexical.lookup("데리")["product_id"] == "A00013", "유일한 접두어 일치"
+    assert lexical.lookup("한우버거", category="sides") is None, "카테고리가 다르면 매칭 안 됨"
+    assert lexical.lookup("콜라") is None, "품절 상품은 매칭 안 됨"
+    assert lexical.lookup("매콤한 감자") is None, "일치하지 않으면 None"
+    assert lexical.lookup("한우") is not None and lexical.lookup("한우")["product_id"] == "A00001"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+
+    # 별칭 접두어 / 다른 상품명 중간에 들어 있는 접두어는 유일한 상품이 아님
+    db_path = create_test_db([
+        ("A00021", "CAT_BURGER", "리아 새우버거", "burger", 4800, 10),
+        ("A00022", "CAT_BURGER", "리아 더블 사각새우버거", "burger", 6500, 10),
+        ("A00023", "CAT_BURGER", "리아 새우 베이컨버거", "burger", 5900, 10),
+        ("A00024", "CAT_BURGER", "불고기버거", "burger", 4500, 10),
+        ("A00025", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10),
+    ], extra_sql="""
+    CREATE TABLE Product_Aliases (alias TEXT NOT NULL, product_id TEXT NOT NULL, PRIMARY KEY (alias, product_id));
+    INSERT INTO Product_Aliases (alias, product_id) VALUES ('새우버거', 'A00021');
+    """)
+    lexical = get_catalog_index(db_path).lexical
+
+    assert lexical.lookup("새우버거")["product_id"] == "A00021", "별칭 정확 일치는 그대로"
+    assert lexical.lookup("새우") is None, "별칭 접두어로는 매칭하지 않음"
+    assert lexical.lookup("불고기") is None, "다른 상품명(한우불고기버거)에도 들어 있음"
+    assert lexical.lookup("리아 더블")["product_id"] == "A00022"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 5 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("카탈로그 벡터 인덱스 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_index_load()
+        test_search_top_k()
+        test_rebuild_on_change()
+        test_blob_embedding()
+        test_lexical_lookup()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
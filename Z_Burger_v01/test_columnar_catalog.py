@@ -0,0 +1,176 @@
+"""
+열 지향 카탈로그 조건 검색 단위 테스트
+
+테스트 대상:
+- catalog_columns.ColumnarCatalog (마스크 조합, 정렬, 시맨틱 점수 결합)
+- search_index.CatalogIndex 재고 갱신 시 열 배열 반영
+- db_functions.browseProducts (가격/카테고리 조건, 정렬, 오류 처리)
+"""
+
+import sqlite3
+import numpy as np
+from catalog_columns import ColumnarCatalog
+from search_index import CatalogIndex
+from db_functions import browseProducts
+from db_fixtures import create_test_db, remove_db
+
+
+def make_product(product_id: str, name: str, product_type: str, price: int,
+                 stock: int = 10, category_id: str = "CAT") -> dict:
+    return {
+        "product_id": product_id,
+        "product_name": name,
+        "product_type": product_type,
+        "price": price,
+        "description": "",
+        "stock_quantity": stock,
+        "category_id": category_id
+    }
+
+
+PRODUCTS = [
+    make_product("A00001", "한우불고기버거", "burger", 8900),
+    make_product("A00002", "데리버거", "burger", 3500),
+    make_product("A00003", "치킨버거", "burger", 4500, stock=0),
+    make_product("A00004", "새우버거", "burger", 4900),
+    make_product("C00001", "콜라 (미디움)", "beverage", 2000, category_id="CAT_BEVERAGE"),
+    make_product("C00013", "카페라떼", "beverage", 3000, category_id="CAT_COFFEE"),
+    make_product("C00014", "아메리카노", "beverage", 1500, category_id="CAT_COFFEE"),
+]
+
+
+def names(selected) -> list:
+    return [product["product_name"] for product, _ in selected]
+
+
+def test_filters_and_sort():
+    """가격/타입/카테고리 마스크와 정렬"""
+    print("\n=== Test 1: 조건 마스크 + 정렬 ===")
+    catalog = ColumnarCatalog(PRODUCTS)
+
+    selected, total_found = catalog.select(category="burger", max_price=5000)
+    print(f"5000원 이하 버거: {names(selected)}")
+    assert names(selected) == ["데리버거", "새우버거"], "품절(치킨버거) 제외, 가격 오름차순"
+    assert total_found == 2
+
+    selected, _ = catalog.select(category="beverage", limit=1)
+    assert names(selected) == ["아메리카노"], "제일 싼 음료"
+
+    selected, _ = catalog.select(category="burger", sort_by="price_desc", min_price=4000)
+    assert names(selected) == ["한우불고기버거", "새우버거"]
+
+    selected, _ = catalog.select(category_id="CAT_COFFEE", sort_by="name")
+    assert names(selected) == ["아메리카노", "카페라떼"]
+
+    selected, total_found = catalog.select(max_price=2000, limit=1)
+    assert total_found == 2 and len(selected) == 1, "total_found 는 limit 와 무관"
+
+    catalog.update_stock("A00003", 5)
+    selected, _ = catalog.select(category="burger", max_price=5000)
+    assert names(selected) == ["데리버거", "치킨버거", "새우버거"], "재고 갱신 반영"
+
+    try:
+        catalog.select(sort_by="relevance")
+        assert False, "검색어 없이 relevance 정렬은 오류"
+    except ValueError:
+        pass
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_relevance_with_vectors():
+    """조건을 만족하는 상품만 시맨틱 점수로 정렬"""
+    print("\n=== Test 2: 시맨틱 점수 결합 ===")
+    burgers = [p for p in PRODUCTS if p["product_type"] == "burger"]
+    with_vectors = [burgers[0], burgers[1], burgers[3]]  # 치킨버거는 임베딩 없음
+    matrix = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]], dtype=np.float32)
+    index = CatalogIndex(with_vectors, matrix, version=0, all_products={p["product_id"]: p for p in burgers})
+
+    query = [0.0, 1.0]
+    selected, total_found = index.columns.select(
+        sort_by="relevance", score_fn=lambda rows: index.row_scores(query, rows)
+    )
+    print(f"relevance: {[(name, score) for name, (_, score) in zip(names(selected), selected)]}")
+    assert names(selected) == ["새우버거", "데리버거", "한우불고기버거"], "품절 상품 제외"
+    assert total_found == 3
+
+    selected, total_found = index.columns.select(
+        max_price=5000, sort_by="relevance", limit=1,
+        score_fn=lambda rows: index.row_scores(query, rows)
+    )
+    assert names(selected) == ["새우버거"] and total_found == 2
+
+    selected, total_found = index.columns.select(
+        sort_by="price_asc", min_score=0.5,
+        score_fn=lambda rows: index.row_scores(query, rows)
+    )
+    assert names(selected) == ["데리버거", "새우버거"], "min_score 미만 제외 후 가격 정렬"
+    assert abs(selected[0][1] - 0.8) < 1e-6
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_browse_products():
+    """browseProducts: DB 카탈로그 조건 검색 + 재고 변경 반영"""
+    print("\n=== Test 3: browseProducts ===")
+    db_path = create_test_db(
+        [(p["product_id"], p["category_id"], p["product_name"], p["product_type"],
+          p["price"], p["stock_quantity"], p["description"]) for p in PRODUCTS],
+        extra_sql="CREATE TABLE Product_Aliases (alias TEXT PRIMARY KEY, product_id TEXT NOT NULL);"
+    )
+
+    result = browseProducts(category="burger", max_price=5000, db_path=db_path)
+    print(result["message"])
+    assert result["success"]
+    assert [p["product_id"] for p in result["products"]] == ["A00002", "A00004"]
+    assert "match_score" not in result["products"][0]
+
+    result = browseProducts(category="beverage", limit=1, db_path=db_path)
+    assert result["products"][0]["product_name"] == "아메리카노"
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Products SET stock_quantity = 0 WHERE product_id = 'C00014'")
+    conn.commit()
+    conn.close()
+    result = browseProducts(category="beverage", limit=1, db_path=db_path)
+    assert result["products"][0]["product_name"] == "콜라 (미디움)", "품절되면 다음으로 싼 음료"
+
+    assert browseProducts(max_price=1000, db_path=db_path)["total_found"] == 0
+    assert not browseProducts(sort_by="relevance", db_path=db_path)["success"]
+    assert not browseProducts(sort_by="cheapest", db_path=db_path)["success"]
+    assert not browseProducts(min_price=5000, max_price=1000, db_path=db_path)["success"]
+
+    remove_db(db_path)
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("열 지향 카탈로그 조건 검색 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_filters_and_sort()
+        test_relevance_with_vectors()
+        test_browse_products()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
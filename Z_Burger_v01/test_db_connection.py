@@ -0,0 +1,139 @@
+"""
+SQLite 연결 관리 단위 테스트
+
+테스트 대상:
+- db_connection.get_connection (스레드별 연결 재사용, PRAGMA 1회 적용, 파일 교체 시 재연결)
+- db_functions 장바구니 함수가 같은 연결을 재사용하고 오류 시 트랜잭션을 남기지 않음
+"""
+
+import os
+import sqlite3
+import threading
+import db_connection
+from db_connection import get_connection, close_connections
+from db_functions import addToCart, getCartDetails, updateCartItem, clearCart
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10),
+    ("B00001", "CAT_SIDES", "포테이토 (미디움)", "sides", 1800, 10),
+    ("G00001", "CAT_SET", "한우불고기버거 세트", "set", 10500, 10),
+]
+SET_ITEMS = [("G00001", "A00001", 1, 1), ("G00001", "B00001", 1, 1)]
+
+
+def test_connection_reuse():
+    """같은 스레드는 같은 연결, 다른 스레드는 다른 연결"""
+    print("\n=== Test 1: 스레드별 연결 재사용 ===")
+    db_path = create_test_db(PRODUCTS, SET_ITEMS)
+
+    try:
+        conn = get_connection(db_path)
+        assert get_connection(db_path) is conn, "같은 스레드에서 재사용"
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2, "PRAGMA 적용 (MEMORY)"
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_connection(db_path)))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn, "스레드별 연결"
+
+        close_connections(db_path)
+        assert get_connection(db_path) is not conn, "닫은 뒤에는 새 연결"
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_file_replaced():
+    """DB 파일이 지워지고 같은 경로에 새 파일이 생기면 새로 연결"""
+    print("\n=== Test 2: 파일 교체 시 재연결 ===")
+    db_path = create_test_db(PRODUCTS, SET_ITEMS)
+
+    try:
+        old = get_connection(db_path)
+        os.remove(db_path)
+        replacement = sqlite3.connect(db_path)
+        replacement.execute("CREATE TABLE Marker (x INTEGER)")
+        replacement.commit()
+        replacement.close()
+
+        conn = get_connection(db_path)
+        assert conn is not old
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'Marker'").fetchone(), "새 파일을 읽음"
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_cart_functions_share_connection():
+    """장바구니 함수는 연결을 새로 열지 않고, 실패해도 트랜잭션을 남기지 않음"""
+    print("\n=== Test 3: 장바구니 함수 연결 재사용 ===")
+    db_path = create_test_db(PRODUCTS, SET_ITEMS)
+    opened = []
+    original_open = db_connection._open
+
+    def counting_open(path):
+        opened.append(path)
+        return original_open(path)
+
+    db_connection._open = counting_open
+    try:
+        assert addToCart("session_1", "G00001", db_path=db_path)["success"], "세트 추가 (구성품 조회 포함)"
+        assert addToCart("session_1", "A00001", quantity=2, db_path=db_path)["success"]
+        cart = getCartDetails("session_1", db_path=db_path)
+        assert cart["total_items"] == 3
+        assert updateCartItem(cart["items"][0]["cart_item_id"], 3, db_path=db_path)["success"]
+        assert clearCart("session_1", db_path=db_path)["deleted_count"] == 3
+        assert opened == [db_path], f"연결은 한 번만 생성: {len(opened)}회"
+
+        conn = get_connection(db_path)
+        conn.execute("DROP TABLE Cart")
+        result = addToCart("session_1", "A00001", db_path=db_path)
+        assert not result["success"]
+        assert not conn.in_transaction, "오류 후 트랜잭션이 남지 않음"
+
+    finally:
+        db_connection._open = original_open
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("SQLite 연결 관리 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_connection_reuse()
+        test_file_replaced()
+        test_cart_functions_share_connection()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
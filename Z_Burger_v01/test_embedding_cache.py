@@ -0,0 +1,131 @@
+"""
+쿼리 임베딩 캐시 단위 테스트
+
+테스트 대상:
+- embedding_cache.EmbeddingCache (메모리 LRU + SQLite 영구 캐시)
+"""
+
+import time
+import threading
+import numpy as np
+from embedding_cache import EmbeddingCache, make_cache_key
+from db_fixtures import create_test_db, remove_db
+
+MODEL = "text-embedding-3-small"
+
+
+def test_normalized_key():
+    """공백/대소문자만 다른 검색어는 같은 캐시 키"""
+    print("\n=== Test 1: 캐시 키 정규화 ===")
+
+    assert make_cache_key(" 한우 불고기버거 ", MODEL) == make_cache_key("한우  불고기버거", MODEL)
+    assert make_cache_key("Coke", MODEL) == make_cache_key("coke", MODEL)
+    assert make_cache_key("콜라", MODEL) != make_cache_key("콜라", "other-model"), "모델이 다르면 키도 달라야 함"
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_lru_eviction_and_ttl():
+    """최대 크기 초과 시 가장 오래된 항목 제거, TTL 만료 시 미스"""
+    print("\n=== Test 2: LRU 제거 및 TTL ===")
+
+    cache = EmbeddingCache(max_size=2, ttl_seconds=60)
+    cache.put("콜라", MODEL, [1.0, 0.0])
+    cache.put("사이다", MODEL, [0.0, 1.0])
+    cache.get("콜라", MODEL)                  # 콜라를 최근 사용으로 갱신
+    cache.put("양념감자", MODEL, [0.5, 0.5])  # 사이다 제거
+
+    assert cache.get("콜라", MODEL) is not None, "최근 사용 항목은 남아 있어야 함"
+    assert cache.get("사이다", MODEL) is None, "가장 오래된 항목은 제거되어야 함"
+
+    short_cache = EmbeddingCache(max_size=10, ttl_seconds=0.01)
+    short_cache.put("콜라", MODEL, [1.0, 0.0])
+    time.sleep(0.02)
+    assert short_cache.get("콜라", MODEL) is None, "TTL이 지난 항목은 미스여야 함"
+
+    print(f"통계: {cache.stats()}")
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_persistent_cache():
+    """메모리 캐시를 비워도 SQLite 캐시에서 복원"""
+    print("\n=== Test 3: 영구 캐시 ===")
+    db_path = create_test_db()
+
+    cache = EmbeddingCache()
+    cache.put("한우불고기버거", MODEL, [0.1, 0.2, 0.3], db_path)
+
+    restarted = EmbeddingCache()  # 재시작된 프로세스 가정
+    vector = restarted.get("한우불고기버거 ", MODEL, db_path)
+    stats = restarted.stats()
+    print(f"통계: {stats}")
+
+    assert vector is not None, "SQLite 캐시에서 조회되어야 함"
+    assert np.allclose(vector, [0.1, 0.2, 0.3]), "저장된 벡터와 같아야 함"
+    assert stats["persistent_hits"] == 1 and stats["misses"] == 0
+
+    restarted.get("한우불고기버거", MODEL, db_path)
+    assert restarted.stats()["memory_hits"] == 1, "영구 캐시 적중 후에는 메모리에 올라와야 함"
+
+    remove_db(db_path)
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def test_concurrent_counters():
+    """여러 스레드가 동시에 조회해도 적중/미스 카운터가 빠지지 않음"""
+    print("\n=== Test 4: 동시 조회 카운터 ===")
+
+    cache = EmbeddingCache()
+    cache.put("콜라", MODEL, [1.0, 0.0])
+
+    def worker():
+        for _ in range(2000):
+            cache.get("콜라", MODEL)
+            cache.get("사이다", MODEL)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    print(f"통계: {stats}")
+    assert stats["memory_hits"] == 8 * 2000 and stats["misses"] == 8 * 2000
+    assert stats["hit_rate"] == 0.5
+
+    print("\n✅ Test 4 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("쿼리 임베딩 캐시 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_normalized_key()
+        test_lru_eviction_and_ttl()
+        test_persistent_cache()
+        test_concurrent_counters()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
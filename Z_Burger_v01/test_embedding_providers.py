@@ -0,0 +1,108 @@
+"""
+임베딩 제공자 단위 테스트
+
+테스트 대상:
+- embedding_providers.HashedNgramEmbeddingProvider (로컬 결정적 임베딩)
+- embedding_providers.create_embedding_provider (설정 기반 선택, 추상 인터페이스)
+- hangul.decompose_jamo
+"""
+
+import numpy as np
+from hangul import decompose_jamo
+from embedding_providers import (
+    EmbeddingProvider,
+    HashedNgramEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    create_embedding_provider
+)
+
+
+def cosine(a, b) -> float:
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_decompose_jamo():
+    """한글 음절 자모 분해"""
+    print("\n=== Test 1: 자모 분해 ===")
+
+    assert decompose_jamo("감자") == "ㄱㅏㅁㅈㅏ"
+    assert decompose_jamo("콜라 L") == "ㅋㅗㄹㄹㅏ L", "한글이 아닌 문자는 그대로 유지"
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_local_provider():
+    """로컬 제공자: 결정적, 띄어쓰기/오타에 강함"""
+    print("\n=== Test 2: 로컬 n-gram 임베딩 ===")
+
+    provider = HashedNgramEmbeddingProvider(dim=256)
+    first, second = provider.embed(["한우불고기버거", "한우불고기버거"])
+    spaced = provider.embed_one("한우 불고기 버거")
+    typo = provider.embed_one("양념감쟈")
+    target = provider.embed_one("양념감자")
+    other = provider.embed_one("아이스 아메리카노")
+
+    print(f"띄어쓰기 유사도: {cosine(first, spaced):.4f}")
+    print(f"오타 유사도: {cosine(typo, target):.4f}, 무관한 상품: {cosine(typo, other):.4f}")
+
+    assert len(first) == 256 and provider.model == "hashed-ngram-v1-256"
+    assert first == second, "같은 입력은 항상 같은 벡터여야 함"
+    assert cosine(first, spaced) > 0.99, "띄어쓰기만 다른 입력은 거의 같은 벡터여야 함"
+    assert cosine(typo, target) > cosine(typo, other), "오타 입력은 원래 단어에 더 가까워야 함"
+    assert not provider.cacheable, "로컬 제공자는 캐시가 필요 없음"
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_provider_selection():
+    """이름으로 제공자 선택"""
+    print("\n=== Test 3: 제공자 선택 ===")
+
+    assert isinstance(create_embedding_provider("local"), HashedNgramEmbeddingProvider)
+    assert isinstance(create_embedding_provider("openai"), OpenAIEmbeddingProvider)
+
+    try:
+        create_embedding_provider("unknown")
+        assert False, "알 수 없는 제공자는 ValueError여야 함"
+    except ValueError:
+        pass
+
+    try:
+        EmbeddingProvider()
+        assert False, "embed 를 구현하지 않은 제공자는 생성할 수 없어야 함"
+    except TypeError:
+        pass
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("임베딩 제공자 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_decompose_jamo()
+        test_local_provider()
+        test_provider_selection()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
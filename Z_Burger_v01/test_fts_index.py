@@ -0,0 +1,255 @@
+"""
+FTS5 어휘 검색 / 하이브리드 결합 단위 테스트
+
+테스트 대상:
+- fts_index.ensure_fts_index (기존 상품 색인 + 트리거 동기화)
+- fts_index.lexical_search (BM25 순위, 2글자 단어 LIKE 점수, 재고/카테고리 필터)
+- fts_index.reciprocal_rank_fusion (같은 BM25 점수는 같은 순위)
+- db_functions.findProduct(search_mode="lexical") (임베딩 호출 없이 검색)
+- db_functions.findProduct(search_mode="hybrid") (BM25 / 임베딩 순위가 다를 때 FOUND / AMBIGUOUS 판정,
+  2글자 검색어처럼 BM25 점수가 모두 같을 때)
+"""
+
+import sqlite3
+from fts_index import (
+    build_match_query, get_search_mode, invalidate_fts_cache, lexical_search, reciprocal_rank_fusion
+)
+from db_functions import findProduct
+from search_index import invalidate_catalog_index
+from embedding_providers import EmbeddingProvider, get_embedding_provider, set_embedding_provider
+from search_index import LEGACY_EMBEDDING_MODEL
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "국내산 한우 불고기 패티"),
+    ("A00002", "CAT_BURGER", "치즈버거", "burger", 4000, 10, "체다 치즈 한 장"),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "매콤한 칠리 시즈닝"),
+    ("B00005", "CAT_SIDES", "양념감자 (치즈)", "sides", 2600, 10, "고소한 치즈 시즈닝"),
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 0, "시원한 탄산음료"),
+]
+
+
+def ranked_ids(db_path: str, query: str, category: str = None, limit: int = 5):
+    return [product_id for product_id, _ in lexical_search(db_path, [(query, category)], limit)[0]]
+
+
+def test_match_query():
+    """검색어 → FTS5 MATCH 식 변환"""
+    print("\n=== Test 1: MATCH 식 변환 ===")
+
+    assert build_match_query("양념감자 칠리") == '"양념감자"', "3글자 미만 단어는 MATCH 식에서 제외"
+    assert build_match_query('불고기버거 "불고기버거"') == '"불고기버거"', "기호 제거 + 중복 제거"
+    assert build_match_query("콜라") is None
+    assert get_search_mode("HYBRID") == "hybrid"
+    try:
+        get_search_mode("fuzzy")
+        assert False, "알 수 없는 모드는 ValueError"
+    except ValueError:
+        pass
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_lexical_ranking():
+    """BM25 순위, 상품명 가중치, 2글자 단어, 필터"""
+    print("\n=== Test 2: BM25 순위 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    assert ranked_ids(db_path, "불고기버거") == ["A00001"]
+    assert ranked_ids(db_path, "양념감자 칠리")[0] == "B00004", "2글자 단어(칠리) 일치가 순위에 반영"
+    assert set(ranked_ids(db_path, "치즈")) == {"A00002", "B00005"}, "상품명/설명 LIKE 일치"
+    assert ranked_ids(db_path, "치즈", category="sides") == ["B00005"], "카테고리 필터"
+    assert ranked_ids(db_path, "콜라") == [], "품절 상품 제외"
+    assert ranked_ids(db_path, "피자") == []
+
+    invalidate_fts_cache(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_trigger_sync():
+    """Products INSERT / UPDATE / DELETE 가 FTS 테이블에 반영"""
+    print("\n=== Test 3: 트리거 동기화 ===")
+    db_path = create_test_db(PRODUCTS)
+    assert ranked_ids(db_path, "불고기버거") == ["A00001"], "기존 상품은 처음 생성 시 색인"
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    INSERT INTO Products (product_id, category_id, product_name, product_type, price, stock_quantity, description)
+    VALUES ('A00003', 'CAT_BURGER', '불고기버거', 'burger', 3500, 10, '')
+    """)
+    conn.execute("UPDATE Products SET product_name = '한우버거' WHERE product_id = 'A00001'")
+    conn.commit()
+    assert ranked_ids(db_path, "불고기버거") == ["A00003"], "INSERT/UPDATE 반영"
+
+    conn.execute("DELETE FROM Products WHERE product_id = 'A00003'")
+    conn.commit()
+    conn.close()
+    assert ranked_ids(db_path, "불고기버거") == [], "DELETE 반영"
+    assert ranked_ids(db_path, "한우버거") == ["A00001"]
+
+    invalidate_fts_cache(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def test_rrf():
+    """두 순위 목록에 모두 상위인 항목이 1위"""
+    print("\n=== Test 4: Reciprocal Rank Fusion ===")
+
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a", "d"]], k=60)
+    print(f"결합 결과: {fused}")
+    assert [key for key, _ in fused[:2]] == ["a", "b"], "동점이면 먼저 나온 순서"
+    assert fused[0][1] == 1 / 61 + 1 / 62
+    assert [key for key, _ in fused[2:]] == ["c", "d"]
+
+    tied = reciprocal_rank_fusion([["a", "b"], ["b", "a", "c"]], k=60, scores=[None, [-11.0, -11.0, -1.0]])
+    print(f"동점 결합 결과: {tied}")
+    assert tied[0] == ("a", 1 / 61 + 1 / 61), "같은 점수는 같은 순위"
+    assert dict(tied)["c"] == 1 / 63
+
+    print("\n✅ Test 4 통과!")
+    return True
+
+
+def test_find_product_lexical():
+    """findProduct(search_mode='lexical'): 결과 구조 유지, 임베딩 없이 검색"""
+    print("\n=== Test 5: findProduct 어휘 검색 모드 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    result = findProduct("양념감자", db_path=db_path, search_mode="lexical")
+    print(f"양념감자 → {result['status']} {[(m['product_name'], m['match_score']) for m in result['matches']]}")
+    assert result["status"] == "AMBIGUOUS" and result["total_found"] == 2
+
+    result = findProduct("매콤한 칠리 감자", db_path=db_path, search_mode="lexical")
+    print(f"매콤한 칠리 감자 → {result['status']} {result['product'] and result['product']['product_name']}")
+    assert result["status"] == "FOUND" and result["product"]["product_id"] == "B00004"
+    assert result["product"]["match_score"] == 1.0, "최상위 결과의 점수는 1.0"
+
+    assert findProduct("피자", db_path=db_path, search_mode="lexical")["status"] == "NOT_FOUND"
+
+    invalidate_catalog_index(db_path)
+    invalidate_fts_cache(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 5 통과!")
+    return True
+
+
+class FixedQueryProvider(EmbeddingProvider):
+    """모든 검색어를 같은 벡터로 임베딩하는 테스트용 제공자"""
+
+    name = "fixed"
+    model = LEGACY_EMBEDDING_MODEL
+    cacheable = False
+
+    def embed(self, texts):
+        return [[1.0, 0.0, 0.0] for _ in texts]
+
+
+def test_hybrid_disagreement():
+    """BM25 1위와 임베딩 1위가 다르면 반환 순서(RRF)의 점수 차이로 판정"""
+    print("\n=== Test 6: 하이브리드 판정 (BM25 / 임베딩 불일치) ===")
+    db_path = create_test_db([
+        # 어휘 1위 + 임베딩 2위
+        ("A00002", "CAT_BURGER", "클래식 치즈버거", "burger", 5500, 10, "체다 치즈가 들어간 버거", [0.6, 0.8, 0.0]),
+        # 임베딩 1위, 어휘 검색에는 없음
+        ("A00001", "CAT_BURGER", "한우불고기 스페셜", "burger", 9000, 10, "달콤한 소스", [0.95, 0.31, 0.0]),
+        ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 10, "시원한 탄산음료", [0.0, 0.0, 1.0]),
+    ])
+    previous = get_embedding_provider()
+    set_embedding_provider(FixedQueryProvider())
+
+    try:
+        result = findProduct("치즈가 들어간", db_path=db_path, search_mode="hybrid")
+        print(f"{result['status']} {[(m['product_name'], m['match_score'], m['rrf_score']) for m in result['matches']]}")
+        top, second = result["matches"][:2]
+        assert top["product_id"] == "A00002" and top["match_score"] < second["match_score"], "RRF 순서 ≠ 유사도 순서"
+        assert result["status"] == "FOUND" and result["product"]["product_id"] == "A00002", \
+            "유사도 차이가 음수여도 RRF 로 분명한 1위는 FOUND"
+
+        # 두 검색기가 1, 2위를 서로 바꿔 꼽으면 RRF 동점 → AMBIGUOUS
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE Products SET description = '치즈가 들어간 달콤한 소스' WHERE product_id = 'A00001'")
+        conn.commit()
+        conn.close()
+        invalidate_fts_cache(db_path)
+        result = findProduct("치즈가 들어간", db_path=db_path, search_mode="hybrid")
+        print(f"{result['status']} {[(m['product_name'], m['match_score'], m['rrf_score']) for m in result['matches']]}")
+        assert result["status"] == "AMBIGUOUS"
+
+    finally:
+        set_embedding_provider(previous)
+        invalidate_catalog_index(db_path)
+        invalidate_fts_cache(db_path)
+        remove_db(db_path)
+
+    print("\n✅ Test 6 통과!")
+    return True
+
+
+def test_hybrid_flat_short_query():
+    """2글자 검색어: LIKE 일치 상품이 모두 같은 BM25 점수이면 상품 번호 순서가 순위가 되지 않음"""
+    print("\n=== Test 7: 하이브리드 2글자 검색어 (BM25 동점) ===")
+    db_path = create_test_db([
+        ("A00002", "CAT_BURGER", "클래식 치즈버거", "burger", 5500, 10, "", [0.8, 0.6, 0.0]),
+        ("A00003", "CAT_BURGER", "더블 치즈버거", "burger", 6500, 10, "", [0.7, 0.71, 0.0]),
+        ("B00005", "CAT_SIDES", "양념감자 (치즈)", "sides", 2600, 10, "", [0.6, 0.8, 0.0]),
+        ("D00001", "CAT_TOPPING", "체다 치즈 토핑", "topping", 500, 10, "", [0.9, 0.43, 0.0]),
+        ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 10, "", [0.0, 0.0, 1.0]),
+    ])
+    previous = get_embedding_provider()
+    set_embedding_provider(FixedQueryProvider())
+
+    try:
+        lexical = lexical_search(db_path, [("치즈", None)], 10)[0]
+        assert len({score for _, score in lexical}) == 1, f"2글자 단어는 모두 같은 점수: {lexical}"
+
+        result = findProduct("치즈", db_path=db_path, search_mode="hybrid")
+        print(f"{result['status']} {[(m['product_name'], m['match_score'], m['rrf_score']) for m in result['matches']]}")
+        assert result["status"] == "AMBIGUOUS", "동점 BM25 순서로 FOUND 판정하지 않음"
+        assert result["matches"][0]["product_id"] == "D00001", "동점이면 임베딩 순위가 순서를 정함"
+
+    finally:
+        set_embedding_provider(previous)
+        invalidate_catalog_index(db_path)
+        invalidate_fts_cache(db_path)
+        remove_db(db_path)
+
+    print("\n✅ Test 7 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("FTS5 어휘 검색 / 하이브리드 결합 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_match_query()
+        test_lexical_ranking()
+        test_trigger_sync()
+        test_rrf()
+        test_find_product_lexical()
+        test_hybrid_disagreement()
+        test_hybrid_flat_short_query()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+스키마 마이그레이션 단위 테스트
+
+테스트 대상:
+- migrations.run_migrations (번호 순서 적용, 반복 실행 시 건너뜀, 필요한 테이블이 없으면 보류)
+- db_connection.get_connection (연결 시 자동 적용)
+- migrations.explain_hot_queries (인덱스 적용 전후 EXPLAIN QUERY PLAN)
+"""
+
+import sqlite3
+from migrations import run_migrations, get_schema_version, explain_hot_queries, LATEST_VERSION
+from db_connection import get_connection, close_connections
+from db_fixtures import create_test_db, remove_db
+
+
+def test_run_migrations():
+    """번호 순서대로 한 번만 적용"""
+    print("\n=== Test 1: 마이그레이션 적용 ===")
+    db_path = create_test_db(set_items=[])
+
+    try:
+        conn = sqlite3.connect(db_path)
+        before = {entry["name"]: entry for entry in explain_hot_queries(conn)}
+        assert before["set_default_components"]["full_scan"], "인덱스 적용 전에는 전체 스캔"
+        assert before["cart_by_session"].get("error"), "Cart 테이블 없음"
+
+        assert run_migrations(conn) == list(range(1, LATEST_VERSION + 1))
+        assert run_migrations(conn) == [], "반복 실행 시 건너뜀"
+        assert get_schema_version(conn) == {"applied": list(range(1, LATEST_VERSION + 1)), "pending": [], "latest": LATEST_VERSION}
+
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(Products)")}
+        assert {"embedding", "embedding_hash"} <= columns, "임베딩 컬럼 추가"
+
+        report = explain_hot_queries(conn)
+        for entry in report:
+            print(f"{entry['name']}: {entry['plan']}")
+            assert not entry["full_scan"] and not entry.get("error"), entry["name"]
+        conn.close()
+
+    finally:
+        remove_db(db_path)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_deferred_and_connection():
+    """필요한 테이블이 없으면 보류했다가 테이블이 생긴 뒤 연결에서 적용"""
+    print("\n=== Test 2: 보류 / 연결 시 자동 적용 ===")
+    db_path = create_test_db()
+
+    try:
+        conn = get_connection(db_path)
+        version = get_schema_version(conn)
+        assert version["pending"] == [5, 6], f"Set_Items 마이그레이션만 보류: {version}"
+        assert conn.execute("SELECT COUNT(*) FROM Cart").fetchone()[0] == 0, "장바구니 테이블 생성"
+        close_connections()
+
+        raw = sqlite3.connect(db_path)
+        raw.execute("CREATE TABLE Set_Items (set_product_id TEXT, component_product_id TEXT, is_default BOOLEAN, quantity INTEGER)")
+        raw.commit()
+        raw.close()
+
+        conn = get_connection(db_path)
+        assert get_schema_version(conn)["pending"] == [], "새 연결에서 보류된 마이그레이션 적용"
+        assert conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_set_items_set_default'"
+        ).fetchone()
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("스키마 마이그레이션 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_run_migrations()
+        test_deferred_and_connection()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
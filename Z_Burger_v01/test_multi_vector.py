@@ -0,0 +1,119 @@
+"""
+다중 벡터 max-sim 점수 단위 테스트
+
+테스트 대상:
+- multi_vector.MultiVectorIndex (owner 정렬, reduceat 구간 최댓값, 파티션 부분 인덱스)
+- search_index.CatalogIndex 필드 벡터 max-sim 검색 (전체 / 카테고리 / similarities)
+"""
+
+import numpy as np
+from multi_vector import MultiVectorIndex
+from search_index import CatalogIndex
+
+
+def make_product(product_id: str, name: str, product_type: str) -> dict:
+    return {
+        "product_id": product_id,
+        "product_name": name,
+        "product_type": product_type,
+        "price": 1000,
+        "description": "",
+        "stock_quantity": 10,
+        "category_id": "CAT"
+    }
+
+
+def test_reduceat_max():
+    """구간 최댓값이 상품별 루프 결과와 같음"""
+    print("\n=== Test 1: reduceat 구간 최댓값 ===")
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(9, 4)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    owners = np.array([3, 0, 3, 1, 0, 3, 5, 1, 5])
+    index = MultiVectorIndex(vectors, owners)
+
+    assert list(index.owners) == sorted(owners), "owner 순으로 정렬"
+    assert list(index.segment_rows) == [0, 1, 3, 5]
+
+    queries = rng.normal(size=(2, 4)).astype(np.float32)
+    expected = np.array([
+        [max(float(vectors[m] @ q) for m in np.flatnonzero(owners == owner)) for owner in (0, 1, 3, 5)]
+        for q in queries
+    ])
+    assert np.allclose(index.max_scores(queries), expected, atol=1e-6)
+
+    scores = np.full((2, 6), -1.0, dtype=np.float32)
+    index.apply(scores, queries)
+    assert np.allclose(scores[:, [0, 1, 3, 5]], np.maximum(-1.0, expected), atol=1e-6)
+    assert np.all(scores[:, [2, 4]] == -1.0), "필드 벡터가 없는 상품은 그대로"
+
+    part = index.subset(np.array([1, 3, 4]))
+    assert list(part.segment_rows) == [0, 1], "파티션 안의 위치로 번호를 다시 매김"
+    assert np.allclose(part.max_scores(queries), expected[:, [1, 2]], atol=1e-6)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_catalog_max_sim():
+    """대표 벡터가 설명에 희석돼도 상품명 필드 벡터로 1위"""
+    print("\n=== Test 2: CatalogIndex max-sim 검색 ===")
+
+    products = [
+        make_product("A00001", "한우불고기버거", "burger"),
+        make_product("A00013", "데리버거", "burger"),
+        make_product("B00004", "양념감자 (칠리)", "sides"),
+    ]
+    # 대표 벡터: 한우불고기버거는 긴 설명 때문에 [0, 1, 0] 방향에 가까움
+    matrix = np.array([[0.3, 0.95, 0.0], [0.7, 0.7, 0.0], [0.0, 0.0, 1.0]], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = [1.0, 0.0, 0.0]
+
+    plain = CatalogIndex(products, matrix, version=0)
+    assert plain.products[plain.search(query, 1, 0.0)[0][0][0]]["product_id"] == "A00013"
+
+    field_vectors = ([np.array([1.0, 0.0, 0.0]), np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.2, 1.0])], [0, 0, 2])
+    index = CatalogIndex(products, matrix, version=0, field_vectors=field_vectors)
+
+    ranked, total_found = index.search(query, 3, 0.0)
+    print(f"전체: {[(index.products[pos]['product_name'], round(score, 3)) for pos, score in ranked]}")
+    assert index.products[ranked[0][0]]["product_id"] == "A00001" and abs(ranked[0][1] - 1.0) < 1e-6
+
+    ranked, _ = index.search(query, 3, 0.0, category="burger")
+    assert index.products[ranked[0][0]]["product_id"] == "A00001", "카테고리 파티션에도 적용"
+
+    similarities = index.similarities(query, ["A00001", "A00013", "Z99999"])
+    assert abs(similarities[0] - 1.0) < 1e-6 and similarities[2] is None
+    assert abs(similarities[1] - float(matrix[1] @ np.array(query))) < 1e-6
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("다중 벡터 max-sim 점수 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_reduceat_max()
+        test_catalog_max_sim()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
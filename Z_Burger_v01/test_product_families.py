@@ -0,0 +1,130 @@
+"""
+상품 패밀리 사전 계산 단위 테스트
+
+테스트 대상:
+- product_families.split_variant / compute_product_families (이름 구조 + 임베딩 유사도)
+- product_families.build_product_families (Product_Families 테이블 저장)
+- db_functions.findProduct 패밀리 이름 검색 (구성원을 바로 AMBIGUOUS 후보로 반환)
+"""
+
+import sqlite3
+import numpy as np
+from product_families import split_variant, compute_product_families, build_product_families
+from search_index import LEGACY_EMBEDDING_MODEL, invalidate_catalog_index
+from db_functions import findProduct
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("B00003", "CAT_SIDES", "양념감자 (어니언)", "sides", 2600, 10, "", [0.9, 0.1, 0.0]),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "", [1.0, 0.0, 0.1]),
+    ("B00005", "CAT_SIDES", "양념감자 (치즈)", "sides", 2600, 0, "", [0.9, 0.0, 0.2]),
+    ("B00011", "CAT_SIDES", "양념너겟(튀김)", "sides", 3000, 10, "", [0.0, 1.0, 0.0]),
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 10, "", [0.0, 0.0, 1.0]),
+    ("C00002", "CAT_BEVERAGE", "콜라 (라지)", "beverage", 2500, 10, "", [0.0, 0.1, 1.0]),
+    ("C00099", "CAT_BEVERAGE", "콜라 (굿즈 컵)", "beverage", 9000, 10, "", [-1.0, 0.0, 0.0]),
+]
+
+
+def test_split_variant():
+    """상품명 → (기본 이름, 변형)"""
+    print("\n=== Test 1: 이름 구조 분리 ===")
+
+    assert split_variant("양념감자 (칠리)") == ("양념감자", "칠리")
+    assert split_variant("양념너겟(튀김)") == ("양념너겟", "튀김")
+    assert split_variant("지파이 (고소한 맛)") == ("지파이", "고소한 맛")
+    assert split_variant("한우불고기버거") == ("한우불고기버거", None)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_compute_families():
+    """같은 타입/기본 이름끼리 묶고, 중심 벡터에서 먼 상품은 제외"""
+    print("\n=== Test 2: 패밀리 계산 ===")
+
+    products = [
+        {"product_id": "S1", "product_name": "포테이토 (미디움)", "product_type": "sides"},
+        {"product_id": "S2", "product_name": "포테이토 (라지)", "product_type": "sides"},
+        {"product_id": "S3", "product_name": "포테이토 (라지)", "product_type": "set"},
+        {"product_id": "X1", "product_name": "쉐이크 (딸기)", "product_type": "beverage"},
+        {"product_id": "X2", "product_name": "쉐이크 (바닐라)", "product_type": "beverage"},
+        {"product_id": "X3", "product_name": "쉐이크 (굿즈)", "product_type": "beverage"},
+    ]
+    vectors = {
+        "X1": np.array([1.0, 0.0]), "X2": np.array([0.96, 0.28]), "X3": np.array([-0.6, 0.8])
+    }
+
+    families = compute_product_families(products, vectors, min_similarity=0.5)
+    print(f"패밀리: {families}")
+    assert [f["family_name"] for f in families] == ["쉐이크", "포테이토"], "다른 타입은 묶지 않음 (set 단독 제외)"
+    assert [pid for pid, _ in families[0]["members"]] == ["X1", "X2"], "유사도가 낮은 X3 제외"
+    assert families[1]["members"] == [("S1", None), ("S2", None)], "임베딩이 없으면 이름 구조만 사용"
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_family_search():
+    """패밀리 저장 후 패밀리 이름 검색은 구성원을 바로 반환"""
+    print("\n=== Test 3: 패밀리 이름 검색 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    result = build_product_families(db_path, model=LEGACY_EMBEDDING_MODEL)
+    print(result["message"])
+    assert result["success"] and result["family_count"] == 2, "양념감자, 콜라 (양념너겟은 단독)"
+
+    conn = sqlite3.connect(db_path)
+    stored = conn.execute("SELECT product_id FROM Product_Families ORDER BY product_id").fetchall()
+    conn.close()
+    assert [row[0] for row in stored] == ["B00003", "B00004", "B00005", "C00001", "C00002"], "굿즈 컵은 제외"
+
+    result = findProduct("양념 감자", db_path=db_path)
+    print(f"양념 감자 → {result['status']} {[m['product_name'] for m in result['matches']]}")
+    assert result["status"] == "AMBIGUOUS"
+    assert [m["product_id"] for m in result["matches"]] == ["B00003", "B00004"], "품절 구성원 제외"
+    assert all(m["match_score"] == 1.0 for m in result["matches"])
+
+    assert findProduct("콜라", category="beverage", db_path=db_path, limit=1)["total_found"] == 2
+    assert findProduct("양념감자", category="burger", db_path=db_path, search_mode="lexical")["status"] == "NOT_FOUND", "카테고리 필터"
+
+    # 구성원이 하나만 남으면 FOUND
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Products SET stock_quantity = 0 WHERE product_id = 'B00003'")
+    conn.commit()
+    conn.close()
+    result = findProduct("양념감자", db_path=db_path)
+    assert result["status"] == "FOUND" and result["product"]["product_id"] == "B00004"
+
+    invalidate_catalog_index(db_path)
+    remove_db(db_path)
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("상품 패밀리 사전 계산 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_split_variant()
+        test_compute_families()
+        test_family_search()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
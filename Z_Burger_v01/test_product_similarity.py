@@ -0,0 +1,145 @@
+"""
+상품 간 유사도 테이블 / 대체 메뉴 추천 단위 테스트
+
+테스트 대상:
+- product_similarity.refresh_similarity_table (전체 계산, 점진 갱신, 최신이면 건너뜀)
+- db_functions.findSubstitutes (같은 타입, 재고 있는 상품만, 유사도 순)
+"""
+
+import json
+import sqlite3
+from product_similarity import refresh_similarity_table
+from search_index import LEGACY_EMBEDDING_MODEL
+from db_functions import findSubstitutes
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 0, "", [1.0, 0.0, 0.0]),
+    ("C00002", "CAT_BEVERAGE", "콜라 (라지)", "beverage", 2500, 10, "", [0.95, 0.3, 0.0]),
+    ("C00005", "CAT_BEVERAGE", "제로슈거콜라 (미디움)", "beverage", 2000, 10, "", [0.9, 0.0, 0.4]),
+    ("C00003", "CAT_BEVERAGE", "사이다 (미디움)", "beverage", 2000, 10, "", [0.5, 0.0, 0.85]),
+    ("C00013", "CAT_COFFEE", "카페라떼", "beverage", 3000, 10, "", [0.0, 0.0, 1.0]),
+    ("B00001", "CAT_SIDES", "포테이토 (미디움)", "sides", 2000, 10, "", [1.0, 0.0, 0.0]),
+]
+
+
+def read_table(db_path: str):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT product_id, rank, similar_product_id, round(score, 4) FROM Product_Similarity ORDER BY product_id, rank"
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_full_build():
+    """같은 product_type 안에서 유사도 + 카테고리 가산점 순"""
+    print("\n=== Test 1: 유사도 테이블 생성 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    result = refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL)
+    print(result["message"])
+    assert result["refreshed"] == 6
+
+    neighbours = [row[2] for row in read_table(db_path) if row[0] == "C00001"]
+    print(f"C00001 이웃: {neighbours}")
+    assert neighbours == ["C00002", "C00005", "C00003", "C00013"], "다른 타입(B00001)과 자기 자신 제외"
+    assert [row for row in read_table(db_path) if row[0] == "B00001"] == [], "같은 타입 상품이 없으면 빈 목록"
+
+    assert refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL)["refreshed"] == 0, "버전이 같으면 건너뜀"
+
+    remove_db(db_path)
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_incremental_refresh():
+    """바뀐 상품과 영향받는 상품만 다시 계산하고, 결과는 전체 계산과 같음"""
+    print("\n=== Test 2: 점진 갱신 ===")
+    db_path = create_test_db(PRODUCTS)
+    refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Products SET price = 2100 WHERE product_id = 'C00003'")
+    conn.commit()
+    result = refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL, top_k=2)
+    assert result["refreshed"] == 6, "top_k 가 바뀌면 전체 계산"
+
+    conn.execute("UPDATE Products SET price = 2200 WHERE product_id = 'C00003'")
+    conn.commit()
+    assert refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL, top_k=2)["refreshed"] == 0, \
+        "임베딩/타입/카테고리가 그대로면 다시 계산하지 않음"
+
+    conn.execute("UPDATE Products SET embedding = ? WHERE product_id = 'C00013'", (json.dumps([1.0, 0.05, 0.0]),))
+    conn.execute("DELETE FROM Products WHERE product_id = 'C00002'")
+    conn.commit()
+    conn.close()
+
+    result = refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL, top_k=2)
+    print(result["message"])
+    assert 0 < result["refreshed"] < 5
+    incremental = read_table(db_path)
+
+    refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL, top_k=2, force=True)
+    assert incremental == read_table(db_path), "점진 갱신 결과가 전체 계산과 같아야 함"
+    assert all("C00002" not in (row[0], row[2]) for row in incremental), "삭제된 상품 제거"
+
+    remove_db(db_path)
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_find_substitutes():
+    """findSubstitutes: 재고 있는 같은 타입 상품을 유사도 순으로"""
+    print("\n=== Test 3: 대체 메뉴 추천 ===")
+    db_path = create_test_db(PRODUCTS)
+    refresh_similarity_table(db_path, LEGACY_EMBEDDING_MODEL)
+
+    result = findSubstitutes("C00001", limit=2, db_path=db_path)
+    print(result["message"])
+    assert result["success"] and result["product"]["product_name"] == "콜라 (미디움)"
+    assert [s["product_id"] for s in result["substitutes"]] == ["C00002", "C00005"]
+    assert result["substitutes"][0]["similarity"] > result["substitutes"][1]["similarity"]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE Products SET stock_quantity = 0 WHERE product_id = 'C00002'")
+    conn.commit()
+    conn.close()
+    result = findSubstitutes("C00001", limit=2, db_path=db_path)
+    assert [s["product_id"] for s in result["substitutes"]] == ["C00005", "C00003"], "품절 상품 제외"
+
+    assert findSubstitutes("B00001", db_path=db_path)["total_found"] == 0
+    assert not findSubstitutes("Z99999", db_path=db_path)["success"]
+
+    remove_db(db_path)
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("상품 간 유사도 테이블 / 대체 메뉴 추천 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_full_build()
+        test_incremental_refresh()
+        test_find_substitutes()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
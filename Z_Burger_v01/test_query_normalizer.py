@@ -0,0 +1,119 @@
+"""
+검색어 정규화 단위 테스트
+
+테스트 대상:
+- query_normalizer.QueryNormalizer (요청 표현/수량/조사 제거, 동의어, 띄어쓰기 표준화)
+- Query_Synonyms 테이블 (기본 동의어, 변경 시 인덱스 재구성)
+- db_functions.findProduct (정규화된 검색어로 정확 일치, normalized_query / requested_quantity)
+"""
+
+import sqlite3
+from query_normalizer import QueryNormalizer
+from db_functions import findProduct, findProducts
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "국내산 한우 불고기 패티"),
+    ("A00002", "CAT_BURGER", "클래식 치즈버거", "burger", 5500, 10, "고소한 체다 치즈가 들어간 버거"),
+    ("B00001", "CAT_SIDES", "포테이토 (미디움)", "sides", 1800, 10, "바삭한 감자"),
+    ("B00002", "CAT_SIDES", "포테이토 (라지)", "sides", 2300, 10, "바삭한 감자"),
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 10, "시원한 콜라"),
+]
+
+
+def test_normalizer():
+    """요청 표현/수량/조사 제거, 동의어, 띄어쓰기 표준화"""
+    print("\n=== Test 1: QueryNormalizer ===")
+    names = ["한우불고기버거", "클래식 치즈버거", "포테이토 (미디움)", "콜라 (미디움)", "코크"]
+    normalizer = QueryNormalizer(
+        names, names + ["체다 치즈가 들어간 버거", "고소한 체다 치즈"],
+        {"감튀": "포테이토", "감자튀김": "포테이토", "코크": "콜라"}
+    )
+
+    cases = [
+        ("감튀 두 개 주세요", ("포테이토", 2)),
+        ("감자튀김 하나", ("포테이토", 1)),
+        ("포테이토", ("포테이토", None)),
+        ("한우 불고기 버거 2개요", ("한우불고기버거", 2)),
+        ("치즈가 들어간 버거", ("치즈 들어간 버거", None)),
+        ("콜라랑요", ("콜라", None)),
+        ("포테이토 미디움 좀 주세요", ("포테이토미디움", None)),
+        ("코크", ("코크", None)),          # 별칭 자체는 동의어보다 우선
+        ("하나 주세요", ("하나 주세요", 1)),  # 남는 말이 없으면 원래 검색어
+        ("세트", ("세트", None)),
+        ("불고기버거 2개랑 콜라 하나", ("불고기버거 콜라", 2)),  # 수량 뒤 조사, 첫 수량
+        ("콜라 하나랑 감튀 두 개", ("콜라 포테이토", 1)),
+    ]
+    for query, expected in cases:
+        actual = normalizer.normalize(query)
+        print(f"{query!r} → {actual}")
+        assert actual == expected, f"{query}: {actual} != {expected}"
+
+    assert QueryNormalizer().normalize("  양념감자  ") == ("양념감자", None), "빈 정규화기"
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_find_product_normalized():
+    """정규화된 검색어로 정확 일치 / 동의어 테이블 변경 반영"""
+    print("\n=== Test 2: findProduct 검색어 정규화 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    try:
+        result = findProduct("한우 불고기 버거 하나 주세요", db_path=db_path, explain=True)
+        print(result["message"])
+        assert result["status"] == "FOUND" and result["product"]["product_id"] == "A00001"
+        assert result["normalized_query"] == "한우불고기버거" and result["requested_quantity"] == 1
+        assert result["diagnostics"]["resolved_by"] == ["exact"], "임베딩 호출 없이 정확 일치"
+        assert "normalize" in result["diagnostics"]["timings_ms"]
+
+        results = findProducts(["감튀 두 개", "감자튀김", "포테이토"], db_path=db_path, search_mode="lexical")["results"]
+        assert [r["status"] for r in results] == ["AMBIGUOUS"] * 3, "기본 동의어"
+        assert {r.get("normalized_query", "포테이토") for r in results} == {"포테이토"}
+        assert results[0]["requested_quantity"] == 2
+
+        result = findProduct("한우불고기버거", db_path=db_path)
+        assert "normalized_query" not in result and "requested_quantity" not in result, "바뀌지 않으면 키 없음"
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO Query_Synonyms (term, canonical) VALUES ('한불버', '한우불고기버거')")
+        conn.commit()
+        conn.close()
+        result = findProduct("한불버 주세요", db_path=db_path)
+        assert result["status"] == "FOUND" and result["product"]["product_id"] == "A00001", \
+            "동의어 추가 시 인덱스 재구성"
+
+    finally:
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("검색어 정규화 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_normalizer()
+        test_find_product_normalized()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
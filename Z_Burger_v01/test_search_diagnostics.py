@@ -0,0 +1,133 @@
+"""
+검색 진단(explain) 모드 단위 테스트
+
+테스트 대상:
+- search_diagnostics.SearchDiagnostics (단계 시간 누적, 점수 분포 요약)
+- search_diagnostics.log_diagnostics (SEARCH_DIAGNOSTICS_LOG 순환 로그 파일)
+- db_functions.findProduct(explain=True) (단계별 시간, 후보 수, 캐시 적중, 기본값은 진단 없음)
+"""
+
+import os
+import json
+import sqlite3
+import tempfile
+from search_diagnostics import SearchDiagnostics, log_diagnostics
+from db_functions import findProduct
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "국내산 한우 불고기 패티"),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "매콤한 칠리 시즈닝"),
+    ("B00005", "CAT_SIDES", "양념감자 (치즈)", "sides", 2600, 10, "고소한 치즈 시즈닝"),
+]
+
+
+def test_diagnostics_object():
+    """단계 시간 누적과 점수 분포 요약"""
+    print("\n=== Test 1: SearchDiagnostics ===")
+    diagnostics = SearchDiagnostics()
+
+    with diagnostics.stage("scoring"):
+        pass
+    with diagnostics.stage("scoring"):
+        pass
+    diagnostics.count("candidates", 3)
+    diagnostics.count("candidates", 2)
+    diagnostics.record_scores("semantic", [0.9, 0.85, 0.2, float("-inf")], threshold=0.5)
+
+    result = diagnostics.to_dict()
+    print(json.dumps(result, ensure_ascii=False))
+    assert list(result["timings_ms"]) == ["scoring"], "같은 단계는 누적"
+    assert result["counts"]["candidates"] == 5
+    semantic = result["scores"]["semantic"]
+    assert semantic["count"] == 3, "-inf (벡터 없는 상품) 제외"
+    assert semantic["max"] == 0.9 and semantic["top_gap"] == 0.05 and semantic["above_threshold"] == 2
+
+    diagnostics.record_scores("bm25", [])
+    assert diagnostics.to_dict()["scores"]["bm25"] == {"count": 0}
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_find_product_explain():
+    """findProduct(explain=True): 단계 시간 / 후보 수 / 캐시 적중 + 로그 파일 기록"""
+    print("\n=== Test 2: findProduct explain ===")
+    db_path = create_test_db(PRODUCTS)
+    fd, log_path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    os.environ["SEARCH_DIAGNOSTICS_LOG"] = log_path
+
+    try:
+        result = findProduct("한우불고기버거", db_path=db_path, explain=True)
+        diagnostics = result["diagnostics"]
+        print(json.dumps(diagnostics, ensure_ascii=False))
+        assert result["status"] == "FOUND"
+        assert diagnostics["cache"]["catalog_index"] == "rebuilt", "처음 검색은 인덱스 생성"
+        assert set(diagnostics["index_load_ms"]) == {"fetch_ms", "decode_ms", "field_vectors_ms", "build_ms"}
+        assert diagnostics["resolved_by"] == ["exact"]
+        assert diagnostics["counts"] == {"catalog_size": 0, "returned": 1}, "임베딩 없는 DB"
+
+        result = findProduct("매콤한 시즈닝", db_path=db_path, search_mode="lexical", explain=True)
+        diagnostics = result["diagnostics"]
+        assert diagnostics["cache"]["catalog_index"] == "hit"
+        assert "index_load_ms" not in diagnostics
+        assert diagnostics["resolved_by"] == ["lexical"]
+        assert {"index", "lexical", "fts"} <= set(diagnostics["timings_ms"])
+        assert diagnostics["counts"]["candidates"] == diagnostics["scores"]["bm25"]["count"] >= 1
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE Products SET stock_quantity = 0 WHERE product_id = 'B00005'")
+        conn.commit()
+        conn.close()
+        result = findProduct("양념감자 칠리", db_path=db_path, search_mode="lexical", explain=True)
+        assert result["diagnostics"]["cache"]["catalog_index"] == "stock_refreshed"
+
+        assert "diagnostics" not in findProduct("한우불고기버거", db_path=db_path), "기본값은 진단 없음"
+
+        with open(log_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert [record["query"] for record in records] == ["한우불고기버거", "매콤한 시즈닝", "양념감자 칠리"]
+        assert records[0]["product_id"] == "A00001" and records[1]["search_mode"] == "lexical"
+
+        log_diagnostics("무시", "FOUND", {})
+        del os.environ["SEARCH_DIAGNOSTICS_LOG"]
+        log_diagnostics("기록 안 됨", "FOUND", {})
+        with open(log_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 4, "환경변수가 없으면 기록하지 않음"
+
+    finally:
+        os.environ.pop("SEARCH_DIAGNOSTICS_LOG", None)
+        remove_db(db_path)
+        os.remove(log_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("검색 진단(explain) 모드 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_diagnostics_object()
+        test_find_product_explain()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
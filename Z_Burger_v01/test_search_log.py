@@ -0,0 +1,194 @@
+"""
+검색 로그 / 임계값 튜닝 단위 테스트
+
+테스트 대상:
+- search_log (SEARCH_QUERY_LOG 기록, addToCart 선택 상품 연결, 세션별 연결, 학습용 검색 조회)
+- tune_thresholds.evaluate_grid (격자 전체 판정이 findProduct 판정 규칙과 일치)
+- tune_thresholds.rank_settings
+"""
+
+import os
+import sqlite3
+import numpy as np
+from db_functions import findProduct, findProducts, addToCart
+from search_log import load_labeled_searches, ensure_search_log
+from tune_thresholds import evaluate_grid, rank_settings
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "국내산 한우 불고기 패티"),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "매콤한 칠리 시즈닝"),
+    ("B00005", "CAT_SIDES", "양념감자 (치즈)", "sides", 2600, 10, "고소한 치즈 시즈닝"),
+]
+
+
+def test_search_log():
+    """검색 기록 + 장바구니 담기로 선택 상품 연결"""
+    print("\n=== Test 1: 검색 로그 기록 ===")
+    db_path = create_test_db(PRODUCTS)
+    os.environ["SEARCH_QUERY_LOG"] = "1"
+
+    try:
+        findProduct("한우불고기버거", db_path=db_path)
+        findProduct("시즈닝 감자", db_path=db_path, search_mode="lexical")
+        findProducts(["양념감자 칠리", "피자"], db_path=db_path, search_mode="lexical")
+
+        result = addToCart("session_1", "B00005", db_path=db_path)
+        assert result["success"]
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("""
+        SELECT query_text, resolved_by, status, result_product_id, chosen_product_id, embedding_key
+        FROM Search_Log ORDER BY log_id
+        """).fetchall()
+        conn.close()
+        for row in rows:
+            print(row)
+
+        assert [row[0] for row in rows] == ["한우불고기버거", "시즈닝 감자", "양념감자 칠리", "피자"]
+        assert rows[0][1] == "exact" and rows[0][3] == "A00001"
+        assert rows[1][1] == "lexical" and rows[1][2] == "AMBIGUOUS"
+        assert rows[3][2] == "NOT_FOUND"
+        assert rows[2][4] is None, "선택 상품이 후보에 없던 검색에는 연결하지 않음"
+        assert rows[1][4] == "B00005", "선택 상품은 후보로 반환한 가장 최근 검색에 연결"
+        assert rows[0][5].endswith(":한우불고기버거"), "임베딩 참조 = 쿼리 임베딩 캐시 키"
+
+        assert [entry["query_text"] for entry in load_labeled_searches(db_path, resolved_by=("lexical",))] \
+            == ["시즈닝 감자"]
+        assert load_labeled_searches(db_path) == [], "시맨틱 검색만 튜닝 대상"
+
+        del os.environ["SEARCH_QUERY_LOG"]
+        findProduct("한우불고기버거", db_path=db_path)
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM Search_Log").fetchone()[0] == 4, "기본값은 기록하지 않음"
+        conn.close()
+
+    finally:
+        os.environ.pop("SEARCH_QUERY_LOG", None)
+        remove_db(db_path)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_session_choice():
+    """선택 상품은 같은 세션의 검색에만 연결 (다른 세션의 더 최근 검색은 건너뜀)"""
+    print("\n=== Test 2: 세션별 선택 상품 연결 ===")
+    db_path = create_test_db(PRODUCTS)
+    os.environ["SEARCH_QUERY_LOG"] = "1"
+
+    try:
+        # session_id 컬럼이 없던 이전 테이블
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+        CREATE TABLE Search_Log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            query_text TEXT NOT NULL, search_text TEXT NOT NULL, category TEXT, model TEXT,
+            embedding_key TEXT, search_mode TEXT, resolved_by TEXT NOT NULL, status TEXT NOT NULL,
+            result_product_id TEXT, candidate_ids TEXT NOT NULL, chosen_product_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        ensure_search_log(conn)
+        assert "session_id" in {row[1] for row in conn.execute("PRAGMA table_info(Search_Log)")}
+        conn.close()
+
+        findProduct("양념감자", db_path=db_path, search_mode="lexical", session_id="session_1")
+        findProducts(["양념감자"], db_path=db_path, search_mode="lexical", session_id="session_2")
+        findProduct("감자", db_path=db_path, search_mode="lexical")
+
+        assert addToCart("session_1", "B00004", db_path=db_path)["success"]
+        assert addToCart("session_2", "B00005", db_path=db_path)["success"]
+        assert addToCart("session_3", "B00004", db_path=db_path)["success"]
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT session_id, chosen_product_id FROM Search_Log ORDER BY log_id").fetchall()
+        conn.close()
+        print(rows)
+
+        assert rows == [("session_1", "B00004"), ("session_2", "B00005"), (None, "B00004")], \
+            "같은 세션 검색 우선, 다른 세션의 검색에는 연결하지 않음"
+
+    finally:
+        os.environ.pop("SEARCH_QUERY_LOG", None)
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def judge(scores, similarity_threshold, ambiguity_threshold):
+    """findProduct 판정 규칙 (검증용 스칼라 구현)"""
+    above = [score for score in scores if score >= similarity_threshold]
+    if not above:
+        return "NOT_FOUND"
+    if len(above) >= 2 and above[0] - above[1] <= ambiguity_threshold:
+        return "AMBIGUOUS"
+    return "FOUND"
+
+
+def test_evaluate_grid():
+    """격자 판정이 쿼리별 스칼라 판정과 같음"""
+    print("\n=== Test 3: 임계값 격자 판정 ===")
+    rng = np.random.default_rng(0)
+    scores = -np.sort(-rng.uniform(0.2, 0.9, size=(40, 5)), axis=1).astype(np.float32)
+    scores[3, 2:] = -np.inf  # 후보가 부족한 쿼리
+    chosen_rank = rng.integers(-1, 5, size=40)
+    chosen_rank[3] = 0
+
+    similarity_grid = np.array([0.3, 0.5, 0.7], dtype=np.float32)
+    ambiguity_grid = np.array([0.0, 0.05, 0.1], dtype=np.float32)
+    metrics = evaluate_grid(scores, chosen_rank, similarity_grid, ambiguity_grid)
+
+    for s, similarity in enumerate(similarity_grid):
+        for a, ambiguity in enumerate(ambiguity_grid):
+            statuses = [judge(list(row), similarity, ambiguity) for row in scores]
+            found_correct = [st == "FOUND" and rank == 0 for st, rank in zip(statuses, chosen_rank)]
+            assert np.isclose(metrics["clarification_rate"][s, a], statuses.count("AMBIGUOUS") / 40)
+            assert np.isclose(metrics["not_found_rate"][s, a], statuses.count("NOT_FOUND") / 40)
+            assert np.isclose(metrics["accuracy"][s, a], sum(found_correct) / 40)
+            assert np.isclose(
+                metrics["found_rate"][s, a], metrics["accuracy"][s, a] + metrics["wrong_rate"][s, a]
+            )
+            assert metrics["resolved_rate"][s, a] >= metrics["accuracy"][s, a]
+
+    rows = rank_settings(metrics, similarity_grid, ambiguity_grid)
+    assert len(rows) == 9
+    assert rows[0]["extra_llm_calls"] == min(row["extra_llm_calls"] for row in rows)
+    print(f"추천: {rows[0]}")
+
+    empty = evaluate_grid(np.zeros((0, 5), dtype=np.float32), np.zeros(0, dtype=np.int64),
+                          similarity_grid, ambiguity_grid)
+    assert empty["accuracy"].shape == (3, 3) and not empty["accuracy"].any()
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("검색 로그 / 임계값 튜닝 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_search_log()
+        test_session_choice()
+        test_evaluate_grid()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
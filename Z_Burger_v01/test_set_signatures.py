@@ -0,0 +1,123 @@
+"""
+세트 구성 시그니처 인덱스 단위 테스트
+
+테스트 대상:
+- set_signatures.SetCompositionIndex (정확 일치, 구성품 교체 시 가장 많이 겹치는 세트, 동점 순서)
+- set_signatures.get_set_composition_index (Set_Items 변경 시 재구성)
+- db_functions.getSetMenusInCart (세트 수와 무관한 쿼리 수)
+"""
+
+import sqlite3
+from set_signatures import SetCompositionIndex, get_set_composition_index
+from db_connection import get_connection, close_connections
+from db_functions import addToCart, getSetMenusInCart, updateSetItem
+from db_fixtures import create_test_db, remove_db
+
+
+def make_set_catalog(set_count: int = 6) -> tuple:
+    """버거 set_count 개와 각 버거 세트, 공통 사이드/음료 (상품 행, 세트 구성 행)"""
+    products = [
+        ("B00001", "CAT_SIDES", "포테이토 (미디움)", "sides", 1800, 50),
+        ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 50),
+        ("C00002", "CAT_BEVERAGE", "사이다 (미디움)", "beverage", 2000, 50),
+    ]
+    set_items = []
+    for i in range(1, set_count + 1):
+        burger_id, set_id = f"A0000{i}", f"G0000{i}"
+        products.append((burger_id, "CAT_BURGER", f"버거{i}", "burger", 6000, 50))
+        products.append((set_id, "CAT_SET", f"버거{i} 세트", "set", 8000, 50))
+        set_items += [(set_id, burger_id, 1, 1), (set_id, "B00001", 1, 1), (set_id, "C00001", 1, 1)]
+    return products, set_items
+
+
+def test_composition_index():
+    """정확 일치 / 구성품 교체 / 동점 순서"""
+    print("\n=== Test 1: SetCompositionIndex ===")
+    index = SetCompositionIndex([
+        ("G00001", "불고기 세트", "A00001"), ("G00001", "불고기 세트", "B00001"), ("G00001", "불고기 세트", "C00001"),
+        ("G00002", "치즈 세트", "A00002"), ("G00002", "치즈 세트", "B00001"), ("G00002", "치즈 세트", "C00001"),
+        ("G00003", "콤보", "A00001"), ("G00003", "콤보", "A00002"),
+    ])
+
+    assert len(index) == 3
+    assert index.match(["C00001", "A00002", "B00001"]) == ("G00002", "치즈 세트"), "정확 일치 (순서 무관)"
+    assert index.match(["A00002", "B00001", "C00002"]) == ("G00002", "치즈 세트"), "음료 교체"
+    assert index.match(["A00009", "B00001", "C00001"]) == ("G00001", "불고기 세트"), "동점이면 먼저 등록된 세트"
+    assert index.match(["A00001", "A00002"]) == ("G00003", "콤보"), "구성품 수가 같은 세트만"
+    assert index.match(["Z00001", "Z00002", "Z00003"]) is None
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_get_set_menus_in_cart():
+    """세트 수와 무관하게 일정한 쿼리 수 / Set_Items 변경 반영"""
+    print("\n=== Test 2: getSetMenusInCart 쿼리 수 ===")
+    db_path = create_test_db(*make_set_catalog())
+
+    try:
+        for set_id in ("G00001", "G00003", "G00006"):
+            assert addToCart("session_1", set_id, db_path=db_path)["success"]
+        first_group = getSetMenusInCart("session_1", db_path=db_path)["sets"][0]["set_group_id"]
+        assert updateSetItem("session_1", "C00001", "C00002", set_group_id=first_group, db_path=db_path)["success"]
+
+        statements = []
+        conn = get_connection(db_path)
+        conn.set_trace_callback(statements.append)
+        result = getSetMenusInCart("session_1", db_path=db_path)
+        conn.set_trace_callback(None)
+
+        print([(s["set_product_id"], s["set_name"]) for s in result["sets"]])
+        assert sorted(s["set_product_id"] for s in result["sets"]) == ["G00001", "G00003", "G00006"], "교체된 세트 포함"
+        swapped = next(s for s in result["sets"] if s["set_group_id"] == first_group)
+        assert {item["product_id"] for item in swapped["items"]} >= {"C00002"}
+        assert swapped["total_price"] == 6000 + 1800 + 2000
+        queries = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        print(f"SELECT {len(queries)}회")
+        assert len(queries) <= 2, f"세트 그룹 × 세트 수 만큼 조회하지 않음: {len(queries)}"
+
+        filtered = getSetMenusInCart("session_1", set_product_id="G00003", db_path=db_path)
+        assert [s["set_product_id"] for s in filtered["sets"]] == ["G00003"]
+
+        before = get_set_composition_index(db_path)
+        raw = sqlite3.connect(db_path)
+        raw.execute("UPDATE Set_Items SET component_product_id = 'C00002' WHERE set_product_id = 'G00006' AND component_product_id = 'C00001'")
+        raw.commit()
+        raw.close()
+        assert get_set_composition_index(db_path) is not before, "Set_Items 변경 시 재구성"
+        assert get_set_composition_index(db_path).match(["A00006", "B00001", "C00002"]) == ("G00006", "버거6 세트")
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("세트 구성 시그니처 인덱스 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_composition_index()
+        test_get_set_menus_in_cart()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+임베딩 설정 스크립트 단위 테스트
+
+테스트 대상:
+- setup_embeddings.migrate_embeddings_to_blob (BLOB 변환 시 embedding_hash 기록)
+- setup_embeddings.generate_product_embeddings (해시가 같거나, 해시 없이 같은 모델이면 다시 임베딩하지 않음)
+"""
+
+import sqlite3
+from typing import List
+from embedding_providers import EmbeddingProvider
+from embedding_codec import decode_embedding
+from search_index import LEGACY_EMBEDDING_MODEL
+from setup_embeddings import add_embedding_column, migrate_embeddings_to_blob, generate_product_embeddings
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10, "국내산 한우 불고기 패티", [1.0, 0.0, 0.0]),
+    ("B00004", "CAT_SIDES", "양념감자 (칠리)", "sides", 2600, 10, "매콤한 칠리 시즈닝", [0.0, 1.0, 0.0]),
+    ("C00001", "CAT_BEVERAGE", "콜라 (미디움)", "beverage", 2000, 10, "시원한 탄산음료", [0.0, 0.0, 1.0]),
+]
+
+
+class CountingProvider(EmbeddingProvider):
+    """임베딩 요청한 텍스트를 기록하는 테스트용 제공자"""
+
+    name = "counting"
+
+    def __init__(self, model: str):
+        self.model = model
+        self.texts = []
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        self.texts.extend(texts)
+        return [[0.5, 0.5, 0.0] for _ in texts]
+
+
+def test_migrated_embeddings_not_regenerated():
+    """JSON → BLOB 변환한 임베딩은 같은 모델이면 다시 생성하지 않음"""
+    print("\n=== Test 1: 변환된 임베딩 재사용 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    try:
+        add_embedding_column(db_path)
+        migrate_embeddings_to_blob(db_path)
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT typeof(embedding), embedding_hash FROM Products").fetchall()
+        conn.close()
+        assert all(storage == "blob" and stored_hash for storage, stored_hash in rows), rows
+
+        provider = CountingProvider(LEGACY_EMBEDDING_MODEL)
+        generate_product_embeddings(db_path, provider=provider)
+        assert provider.texts == [], f"API 호출 없음: {provider.texts}"
+
+        # 이전 버전으로 변환되어 해시가 비어 있는 경우: 해시만 기록
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE Products SET embedding_hash = NULL")
+        conn.execute("UPDATE Products SET description = '두툼한 한우 패티' WHERE product_id = 'A00001'")
+        conn.commit()
+        conn.close()
+        generate_product_embeddings(db_path, provider=provider)
+        assert provider.texts == []
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM Products WHERE embedding_hash IS NULL").fetchone()[0] == 0
+        conn.execute("UPDATE Products SET description = '칠리 양념' WHERE product_id = 'B00004'")
+        conn.commit()
+        conn.close()
+        generate_product_embeddings(db_path, provider=provider)
+        assert len(provider.texts) == 1 and "칠리 양념" in provider.texts[0], "설명이 바뀐 상품만 다시 생성"
+
+    finally:
+        remove_db(db_path)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_model_change_regenerates():
+    """제공자 모델이 바뀌면 해시가 없어도 전부 다시 생성"""
+    print("\n=== Test 2: 모델 변경 ===")
+    db_path = create_test_db(PRODUCTS)
+
+    try:
+        add_embedding_column(db_path)
+        migrate_embeddings_to_blob(db_path)
+
+        provider = CountingProvider("other-model")
+        generate_product_embeddings(db_path, provider=provider)
+        assert len(provider.texts) == len(PRODUCTS)
+
+        conn = sqlite3.connect(db_path)
+        models = {decode_embedding(row[0])[1] for row in conn.execute("SELECT embedding FROM Products")}
+        conn.close()
+        assert models == {"other-model"}
+
+    finally:
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("임베딩 설정 스크립트 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_migrated_embeddings_not_regenerated()
+        test_model_change_regenerates()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+SQLite 저장소 설정 단위 테스트
+
+테스트 대상:
+- storage_config.connect / apply_pragmas (WAL, synchronous, busy_timeout, cache_size, mmap_size)
+- storage_config.begin_write (BEGIN IMMEDIATE, 잠금 경합 시 재시도, 지표 기록)
+- db_functions 쓰기 함수의 동시 실행 (addToCart / updateCartItem / processOrder)
+- db_functions.processOrder 단일 트랜잭션 (SQL 합계, 주문 항목 일괄 복사, 단계별 시간)
+"""
+
+import sqlite3
+import threading
+import storage_config
+from storage_config import apply_pragmas, begin_write, connect, get_storage_settings, lock_metrics
+from db_connection import get_connection, close_connections
+from db_functions import addToCart, getCartDetails, updateCartItem, processOrder, get_storage_metrics
+from db_fixtures import create_test_db, remove_db
+
+PRODUCTS = [
+    ("A00001", "CAT_BURGER", "한우불고기버거", "burger", 9000, 10),
+    ("B00001", "CAT_SIDES", "포테이토 (미디움)", "sides", 1800, 10),
+]
+
+
+def test_pragmas():
+    """연결 PRAGMA 적용"""
+    print("\n=== Test 1: 저장소 PRAGMA ===")
+    db_path = create_test_db(PRODUCTS, set_items=[])
+
+    try:
+        conn = get_connection(db_path)
+        settings = get_storage_settings()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1, "NORMAL"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == settings["busy_timeout_ms"]
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -settings["cache_size_kb"]
+        print(f"settings: {settings}")
+
+        direct = connect(db_path)
+        assert direct.execute("PRAGMA busy_timeout").fetchone()[0] == settings["busy_timeout_ms"], "connect() 도 동일"
+        direct.close()
+
+        memory = sqlite3.connect(":memory:")
+        apply_pragmas(memory)
+        assert memory.execute("PRAGMA journal_mode").fetchone()[0] == "memory", "메모리 DB 는 WAL 불가"
+        memory.close()
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_lock_retry():
+    """다른 연결이 쓰기 잠금을 잡고 있으면 재시도 후 성공 / 재시도 소진 시 실패"""
+    print("\n=== Test 2: 잠금 경합 재시도 ===")
+    db_path = create_test_db(PRODUCTS, set_items=[])
+    settings = dict(get_storage_settings(), busy_timeout_ms=0, lock_retries=8, backoff_ms=5, backoff_max_ms=20)
+
+    try:
+        holder = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        holder.execute("PRAGMA journal_mode = WAL")
+        holder.execute("BEGIN IMMEDIATE")
+
+        conn = sqlite3.connect(db_path, timeout=0)
+        lock_metrics.reset()
+        try:
+            begin_write(conn, dict(settings, lock_retries=2))
+            assert False, "재시도 소진 시 잠금 오류"
+        except sqlite3.OperationalError as e:
+            assert storage_config.is_lock_error(e)
+        metrics = get_storage_metrics()
+        assert metrics["lock_failures"] == 1 and metrics["lock_retries"] == 2, metrics
+
+        timer = threading.Timer(0.03, holder.rollback)
+        timer.start()
+        begin_write(conn, dict(settings, lock_retries=50))
+        timer.join()
+        assert conn.in_transaction
+        conn.rollback()
+
+        metrics = get_storage_metrics()
+        print(f"metrics: {metrics}")
+        assert metrics["write_transactions"] == 2 and metrics["contended_transactions"] == 2
+        assert metrics["lock_retries"] > 2 and metrics["lock_wait_ms_max"] > 0
+        conn.close()
+        holder.close()
+
+    finally:
+        remove_db(db_path)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_concurrent_writes():
+    """여러 스레드가 동시에 장바구니 추가/수정/주문 (잠금 오류 없이 모두 성공)"""
+    print("\n=== Test 3: 동시 쓰기 ===")
+    db_path = create_test_db(PRODUCTS, set_items=[])
+    errors = []
+    orders = []
+
+    def worker(index):
+        session_id = f"session_{index}"
+        try:
+            for _ in range(5):
+                result = addToCart(session_id, "A00001", db_path=db_path)
+                assert result["success"], result
+            cart_item_id = getCartDetails(session_id, db_path=db_path)["items"][0]["cart_item_id"]
+            result = updateCartItem(cart_item_id, 2, db_path=db_path)
+            assert result["success"], result
+            result = processOrder(session_id, db_path=db_path)
+            assert result["success"], result
+            orders.append(result["order_number"])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            close_connections()
+
+    try:
+        lock_metrics.reset()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors, errors
+        assert sorted(orders) == list(range(1, 9)), f"주문 번호 중복 없음: {sorted(orders)}"
+        metrics = get_storage_metrics()
+        print(f"metrics: {metrics}")
+        assert metrics["lock_failures"] == 0
+        assert metrics["write_transactions"] >= 8 * 7
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def test_process_order_transaction():
+    """주문 생성: 결과 형식 유지, 주문 항목 일괄 복사, explain 단계별 시간"""
+    print("\n=== Test 4: processOrder 단일 트랜잭션 ===")
+    db_path = create_test_db(PRODUCTS, set_items=[])
+
+    try:
+        assert addToCart("session_1", "A00001", quantity=2, db_path=db_path)["success"]
+        assert addToCart("session_1", "B00001", db_path=db_path)["success"]
+
+        result = processOrder("session_1", customer_name="홍길동", db_path=db_path)
+        assert set(result) == {
+            "success", "order_id", "order_number", "total_items", "total_price", "created_at", "message"
+        }, "기본 결과 형식 유지"
+        assert result["success"] and result["total_items"] == 2 and result["total_price"] == 9000 * 2 + 1800
+
+        conn = get_connection(db_path)
+        items = conn.execute(
+            "SELECT order_item_id, product_id, quantity, line_total, special_requests FROM Order_Items "
+            "WHERE order_id = ? ORDER BY product_id", (result["order_id"],)
+        ).fetchall()
+        assert [(row[1], row[2], row[3]) for row in items] == [("A00001", 2, 18000), ("B00001", 1, 1800)]
+        assert all(row[0].startswith("OITEM_") and len(row[0]) == 14 for row in items)
+        assert all(row[4] == "" for row in items)
+        assert conn.execute("SELECT total_amount FROM Orders WHERE order_id = ?", (result["order_id"],)).fetchone()[0] == 19800
+        assert conn.execute("SELECT COUNT(*) FROM Cart WHERE session_id = 'session_1'").fetchone()[0] == 0
+        assert not conn.in_transaction
+
+        empty = processOrder("session_1", db_path=db_path)
+        assert not empty["success"] and empty["total_items"] == 0 and not conn.in_transaction, "빈 장바구니"
+
+        assert addToCart("session_2", "A00001", db_path=db_path)["success"]
+        result = processOrder("session_2", db_path=db_path, explain=True)
+        print(f"diagnostics: {result['diagnostics']}")
+        assert result["success"] and result["order_number"] == 2
+        assert set(result["diagnostics"]["timings_ms"]) == {
+            "lock", "cart", "order_number", "order", "items", "clear_cart", "commit"
+        }
+        assert result["diagnostics"]["counts"]["items"] == 1
+        assert set(result["diagnostics"]) == {"timings_ms", "total_ms", "counts"}, "검색용 scores/cache 키 없음"
+
+        conn.execute("DROP TABLE Order_Items")
+        assert addToCart("session_3", "A00001", db_path=db_path)["success"]
+        failed = processOrder("session_3", db_path=db_path)
+        assert not failed["success"] and not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM Cart WHERE session_id = 'session_3'").fetchone()[0] == 1, \
+            "실패 시 주문/장바구니 모두 롤백"
+        assert conn.execute("SELECT COUNT(*) FROM Orders").fetchone()[0] == 2
+
+    finally:
+        close_connections()
+        remove_db(db_path)
+
+    print("\n✅ Test 4 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("SQLite 저장소 설정 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_pragmas()
+        test_lock_retry()
+        test_concurrent_writes()
+        test_process_order_transaction()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
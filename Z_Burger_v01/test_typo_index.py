@@ -0,0 +1,120 @@
+"""
+오타/초성 교정 인덱스 단위 테스트
+
+테스트 대상:
+- hangul.extract_choseong / is_choseong_text
+- typo_index.edit_distance / SymSpellIndex (대칭 삭제 사전)
+- typo_index.TypoIndex (자모 오타 교정, 초성 접두어 검색)
+"""
+
+from hangul import decompose_jamo, extract_choseong, is_choseong_text
+from typo_index import SymSpellIndex, TypoIndex, edit_distance
+
+
+def make_product(product_id: str, name: str, product_type: str, stock: int = 10) -> dict:
+    return {
+        "product_id": product_id,
+        "product_name": name,
+        "product_type": product_type,
+        "price": 1000,
+        "description": "",
+        "stock_quantity": stock,
+        "category_id": "CAT"
+    }
+
+
+PRODUCTS = [
+    make_product("A00001", "한우불고기버거", "burger"),
+    make_product("D00001", "한우불고기버거 세트", "set"),
+    make_product("B00004", "양념감자 (칠리)", "sides"),
+    make_product("B00005", "양념감자 (치즈)", "sides"),
+    make_product("C00012", "아이스 아메리카노", "beverage"),
+    make_product("C00001", "콜라 (미디움)", "beverage", stock=0),
+]
+
+
+def test_choseong():
+    """초성 추출 및 초성 문자열 판별"""
+    print("\n=== Test 1: 초성 추출 ===")
+
+    assert extract_choseong("한우불고기버거") == "ㅎㅇㅂㄱㄱㅂㄱ"
+    assert is_choseong_text("ㅎㅇㅂㄱㄱ")
+    assert not is_choseong_text("한우") and not is_choseong_text("")
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_symspell():
+    """편집 거리 이내 단어만, 거리 오름차순으로 반환"""
+    print("\n=== Test 2: 대칭 삭제 사전 ===")
+
+    assert edit_distance("abcd", "abdc", 2) == 1, "인접 교환은 거리 1"
+    assert edit_distance("abc", "xyz12", 1) == 2, "max_distance 초과 시 max_distance + 1"
+
+    symspell = SymSpellIndex(max_distance=2)
+    for word in ("양념감자", "양념너겟", "감자튀김"):
+        symspell.add(decompose_jamo(word))
+
+    matches = symspell.lookup(decompose_jamo("양념감쟈"))
+    print(f"양념감쟈 → {matches}")
+    assert matches[0] == (decompose_jamo("양념감자"), 1), "모음 하나 오타는 자모 거리 1"
+    assert all(distance <= 2 for _, distance in matches)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_typo_index():
+    """상품명/단어 교정, 초성 접두어 검색 (재고/카테고리 필터)"""
+    print("\n=== Test 3: 오타/초성 인덱스 ===")
+
+    entries = [(p["product_name"], p) for p in PRODUCTS] + [("아아", PRODUCTS[4])]
+    index = TypoIndex(entries)
+
+    assert index.correct("한우불고기버가") == "한우불고기버거", "전체 상품명 교정"
+    assert index.correct("양념감쟈") == "양념감자", "상품명 단어 교정"
+    assert index.correct("아이스 아메리까노") == "아이스아메리카노", "공백 무시 교정"
+    assert index.correct("한우불고기버거") is None, "사전에 있는 단어는 교정하지 않음"
+    assert index.correct("콜랴") == "콜라", "짧은 단어는 거리 1까지 교정"
+    assert index.correct("콜") is None, "자모 4개 미만 검색어는 교정하지 않음"
+    assert index.correct("불닭볶음면") is None, "가까운 단어가 없으면 None"
+
+    matches = index.choseong_matches("ㅎㅇㅂㄱㄱ")
+    print(f"ㅎㅇㅂㄱㄱ → {[(p['product_name'], round(s, 2)) for p, s in matches]}")
+    assert [p["product_id"] for p, _ in matches] == ["A00001", "D00001"], "짧은 이름이 더 높은 점수"
+    assert [p["product_id"] for p, _ in index.choseong_matches("ㅎㅇㅂㄱㄱ", category="set")] == ["D00001"]
+    assert index.choseong_matches("ㅋㄹ") == [], "품절 상품 제외"
+    assert index.choseong_matches("한우") == [], "초성이 아니면 빈 목록"
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("오타/초성 교정 인덱스 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_choseong()
+        test_symspell()
+        test_typo_index()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+임베딩 압축 표현 단위 테스트
+
+테스트 대상:
+- vector_compression.truncate_embeddings (Matryoshka 차원 축소)
+- vector_compression.Int8Matrix (행별 scale int8 양자화)
+- search_index.CatalogIndex 의 압축 모드 (차원 축소 쿼리, int8 + float 재계산)
+"""
+
+import numpy as np
+from vector_compression import Int8Matrix, truncate_embeddings
+from search_index import CatalogIndex
+
+
+def make_catalog(n: int = 300, dim: int = 64, seed: int = 0):
+    """정규화된 임의 벡터 + 상품 메타데이터"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    products = [
+        {
+            "product_id": f"P{i:05d}",
+            "product_name": f"상품{i}",
+            "product_type": "burger" if i % 3 else "sides",
+            "price": 1000,
+            "description": "",
+            "stock_quantity": 5,
+            "category_id": "CAT"
+        }
+        for i in range(n)
+    ]
+    return products, vectors
+
+
+def test_truncate():
+    """앞쪽 차원만 남기고 재정규화"""
+    print("\n=== Test 1: 차원 축소 ===")
+    _, vectors = make_catalog()
+
+    truncated = truncate_embeddings(vectors, 16)
+    assert truncated.shape == (len(vectors), 16)
+    assert np.allclose(np.linalg.norm(truncated, axis=1), 1.0), "재정규화되어야 함"
+    assert np.allclose(truncated[0] * np.linalg.norm(vectors[0, :16]), vectors[0, :16], atol=1e-6), "앞쪽 차원 방향 유지"
+
+    print("\n✅ Test 1 통과!")
+    return True
+
+
+def test_int8_quantization():
+    """int8 코드 + scale 로 복원 오차가 작고 메모리는 1/4 수준"""
+    print("\n=== Test 2: int8 양자화 ===")
+    _, vectors = make_catalog()
+
+    quantized = Int8Matrix(vectors)
+    error = np.abs(quantized.dequantize() - vectors).max()
+    print(f"최대 복원 오차: {error:.5f}, 메모리: {vectors.nbytes} → {quantized.nbytes} bytes")
+
+    assert quantized.codes.dtype == np.int8
+    assert error < 0.01, "복원 오차가 너무 큼"
+    assert quantized.nbytes < vectors.nbytes / 3, "메모리가 충분히 줄어야 함"
+    assert np.allclose(quantized.scores(vectors[:3]), vectors[:3] @ quantized.dequantize().T, atol=1e-5)
+
+    print("\n✅ Test 2 통과!")
+    return True
+
+
+def test_compressed_index():
+    """int8 인덱스는 상위 후보를 float 로 재계산해 정확 검색과 같은 점수를 반환"""
+    print("\n=== Test 3: 압축 인덱스 검색 ===")
+    products, vectors = make_catalog()
+    query = vectors[7] + 0.01
+
+    exact = CatalogIndex(products, vectors, version=0)
+    int8 = CatalogIndex(products, vectors, version=0, compression={"quantization": "int8"})
+    ranked_exact, _ = exact.search(query, 5, 0.0)
+    ranked_int8, _ = int8.search(query, 5, 0.0)
+    assert [pos for pos, _ in ranked_int8] == [pos for pos, _ in ranked_exact], "상위 순위가 같아야 함"
+    assert np.allclose([s for _, s in ranked_int8], [s for _, s in ranked_exact], atol=1e-6), "재계산된 점수는 float 점수"
+
+    ranked, _ = int8.search(query, 3, 0.0, category="sides")
+    assert all(products[pos]["product_type"] == "sides" for pos, _ in ranked), "int8 파티션 카테고리 필터"
+
+    truncated = CatalogIndex(products, vectors, version=0, compression={"dims": 32})
+    ranked, _ = truncated.search(vectors[7], 1, 0.0)
+    assert truncated.matrix.shape[1] == 32, "인덱스 행렬이 축소되어야 함"
+    assert ranked[0][0] == 7, "전체 차원 쿼리도 잘라서 검색해야 함"
+    print(f"메모리: float32 {exact.vector_nbytes}, int8 {int8.vector_nbytes}, 32차원 {truncated.vector_nbytes} bytes")
+
+    print("\n✅ Test 3 통과!")
+    return True
+
+
+def main():
+    """모든 테스트 실행"""
+    print("=" * 60)
+    print("임베딩 압축 표현 단위 테스트")
+    print("=" * 60)
+
+    try:
+        test_truncate()
+        test_int8_quantization()
+        test_compressed_index()
+
+        print("\n" + "=" * 60)
+        print("🎉 모든 테스트 통과!")
+        print("=" * 60)
+
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ 예상치 못한 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+검색 임계값 오프라인 튜닝 (Search_Log 재생)
+
+findProduct 의 similarity_threshold / ambiguity_threshold 조합별로
+기록된 검색(search_log.Search_Log, 선택 상품이 있는 시맨틱 검색)을 다시 판정하여
+되묻기(AMBIGUOUS) 비율, 정확도, 예상 추가 LLM 호출 수를 출력한다.
+
+1. 기록된 임베딩 참조(Embedding_Cache 키)로 쿼리 벡터를 읽고, 없으면 search_text 로 다시 생성
+2. 현재 카탈로그 인덱스로 모든 쿼리를 한 번에 검색 (임계값 없이 상위 limit 개 점수)
+3. (유사도 임계값 × 모호성 임계값 × 쿼리) 불리언 배열로 전체 격자를 한 번에 판정
+
+판정 (findProduct 와 동일):
+    NOT_FOUND: 임계값 이상인 후보가 없음
+    AMBIGUOUS: 임계값 이상 후보가 2개 이상이고 1-2위 점수 차이가 ambiguity_threshold 이하
+    FOUND: 그 외 (1위가 선택 상품이면 정답)
+
+예상 추가 LLM 호출 수 = 되묻기 × 2 + 잘못된 FOUND × WRONG_FOUND_LLM_CALLS + NOT_FOUND × NOT_FOUND_LLM_CALLS
+
+세션 없이 기록된 검색(session_id 없이 findProduct 호출)은 선택 상품이 다른 세션의
+장바구니 추가와 연결되었을 수 있으므로 건수를 따로 출력한다.
+
+사용법:
+    SEARCH_QUERY_LOG=1 로 운영하며 로그를 쌓은 뒤
+    python tune_thresholds.py              # 기본 DB
+    python tune_thresholds.py <db_path>
+"""
+
+import sys
+import io
+import sqlite3
+import numpy as np
+from typing import Dict, Any, List, Optional
+from db_functions import get_default_db_path
+from embedding_cache import normalize_query_text
+from embedding_codec import decode_embedding
+from embedding_providers import get_embedding_provider
+from search_index import get_catalog_index
+from search_log import load_labeled_searches
+
+# Windows 인코딩 문제 해결
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+# 현재 findProduct 기본값
+CURRENT_SIMILARITY_THRESHOLD = 0.50
+CURRENT_AMBIGUITY_THRESHOLD = 0.08
+
+# 탐색 격자
+SIMILARITY_GRID = np.round(np.arange(0.20, 0.8001, 0.02), 2)
+AMBIGUITY_GRID = np.round(np.arange(0.00, 0.1601, 0.01), 2)
+
+# 결과별 추가 LLM 호출 수 (되묻기: 선택지 안내 + 고객 답변 처리)
+CLARIFICATION_LLM_CALLS = 2
+WRONG_FOUND_LLM_CALLS = 4
+NOT_FOUND_LLM_CALLS = 2
+
+# 재생 시 쿼리별로 가져올 후보 수 (findProduct 기본 limit)
+REPLAY_LIMIT = 5
+
+# 출력할 상위 조합 수
+TOP_SETTINGS = 10
+
+
+def load_replay(db_path: str, model: Optional[str] = None, limit: int = REPLAY_LIMIT) -> Dict[str, Any]:
+    """
+    기록된 검색을 현재 인덱스로 다시 검색
+
+    Returns:
+        {
+            "scores": (Q, limit) 내림차순 유사도 (후보가 부족하면 -inf),
+            "chosen_rank": (Q,) 선택 상품의 순위 (후보에 없으면 -1),
+            "queries": [검색어, ...],
+            "skipped": 임베딩을 만들 수 없어 제외한 검색 수,
+            "sessionless": 재생한 검색 중 세션 없이 기록된 검색 수 (선택 상품 연결이 부정확할 수 있음)
+        }
+    """
+    provider = get_embedding_provider()
+    model = model or provider.model
+    entries = load_labeled_searches(db_path, model)
+
+    # 1. 임베딩 참조로 쿼리 벡터 조회 (쿼리 임베딩 캐시)
+    vectors: Dict[str, np.ndarray] = {}
+    keys = sorted({entry["embedding_key"] for entry in entries if entry["embedding_key"]})
+    if keys:
+        conn = sqlite3.connect(db_path)
+        try:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Embedding_Cache'"
+            ).fetchone()
+            if exists:
+                placeholders = ", ".join("?" for _ in keys)
+                for key, blob in conn.execute(
+                    f"SELECT cache_key, embedding FROM Embedding_Cache WHERE cache_key IN ({placeholders})", keys
+                ):
+                    vectors[key] = decode_embedding(blob)[0]
+        finally:
+            conn.close()
+
+    # 캐시에 없는 검색어는 한 번의 요청으로 다시 생성 (같은 모델일 때만)
+    missing = sorted({entry["search_text"] for entry in entries if entry["embedding_key"] not in vectors})
+    created: Dict[str, np.ndarray] = {}
+    if missing and provider.model == model:
+        for text, embedding in zip(missing, provider.embed([normalize_query_text(t) for t in missing])):
+            created[text] = np.asarray(embedding, dtype=np.float32)
+
+    usable, embeddings = [], []
+    for entry in entries:
+        vector = vectors.get(entry["embedding_key"])
+        if vector is None:
+            vector = created.get(entry["search_text"])
+        if vector is not None:
+            usable.append(entry)
+            embeddings.append(vector)
+
+    # 2. 임계값 없이 상위 limit 개 점수 (행렬-행렬 곱 1회)
+    scores = np.full((len(usable), limit), -np.inf, dtype=np.float32)
+    chosen_rank = np.full(len(usable), -1, dtype=np.int64)
+    if usable:
+        index = get_catalog_index(db_path, model)
+        ranked_list = index.search_many(
+            embeddings, limit=limit, similarity_threshold=-1.0,
+            categories=[entry["category"] for entry in usable]
+        )
+        for q, (entry, (ranked, _)) in enumerate(zip(usable, ranked_list)):
+            for rank, (pos, score) in enumerate(ranked):
+                scores[q, rank] = score
+                if index.products[pos]["product_id"] == entry["chosen_product_id"]:
+                    chosen_rank[q] = rank
+
+    return {
+        "scores": scores,
+        "chosen_rank": chosen_rank,
+        "queries": [entry["query_text"] for entry in usable],
+        "skipped": len(entries) - len(usable),
+        "sessionless": sum(1 for entry in usable if entry["session_id"] is None)
+    }
+
+
+def evaluate_grid(
+    scores: np.ndarray,
+    chosen_rank: np.ndarray,
+    similarity_grid: np.ndarray = SIMILARITY_GRID,
+    ambiguity_grid: np.ndarray = AMBIGUITY_GRID
+) -> Dict[str, np.ndarray]:
+    """
+    모든 (유사도 임계값, 모호성 임계값) 조합을 한 번에 판정
+
+    Args:
+        scores: (Q, L) 쿼리별 내림차순 후보 점수
+        chosen_rank: (Q,) 선택 상품 순위 (-1 = 후보에 없음)
+
+    Returns:
+        지표 이름 -> (len(similarity_grid), len(ambiguity_grid)) 배열
+        (found_rate, clarification_rate, not_found_rate, accuracy, wrong_rate,
+         resolved_rate, extra_llm_calls)
+    """
+    similarity_grid = np.asarray(similarity_grid, dtype=np.float32)
+    ambiguity_grid = np.asarray(ambiguity_grid, dtype=np.float32)
+    query_count, candidate_count = scores.shape
+
+    # (S, Q, L) 임계값 이상 후보
+    above = scores[None, :, :] >= similarity_grid[:, None, None]
+    above_count = above.sum(axis=2)                                  # (S, Q)
+    not_found = above_count == 0                                     # (S, Q)
+
+    gap = scores[:, 0] - scores[:, 1] if candidate_count >= 2 else np.full(query_count, np.inf)
+    close = gap[None, :] <= ambiguity_grid[:, None]                  # (A, Q)
+    ambiguous = (above_count >= 2)[:, None, :] & close[None, :, :]   # (S, A, Q)
+    found = ~not_found[:, None, :] & ~ambiguous                      # (S, A, Q)
+
+    correct_top = chosen_rank == 0                                   # (Q,)
+    # 되묻기 후보(임계값 이상) 안에 선택 상품이 있으면 한 번 더 물어서 해결 가능
+    safe_rank = np.clip(chosen_rank, 0, candidate_count - 1)
+    chosen_listed = (chosen_rank >= 0)[None, :] & np.take_along_axis(
+        above, np.broadcast_to(safe_rank[None, :, None], (len(similarity_grid), query_count, 1)), axis=2
+    )[:, :, 0]                                                        # (S, Q)
+
+    def rate(mask: np.ndarray) -> np.ndarray:
+        return mask.mean(axis=-1) if query_count else np.zeros(mask.shape[:-1])
+
+    found_rate = rate(found)
+    clarification_rate = rate(ambiguous)
+    not_found_rate = rate(np.broadcast_to(not_found[:, None, :], ambiguous.shape))
+    accuracy = rate(found & correct_top[None, None, :])
+    wrong_rate = rate(found & ~correct_top[None, None, :])
+    resolved_rate = accuracy + rate(ambiguous & chosen_listed[:, None, :])
+    extra_llm_calls = (
+        clarification_rate * CLARIFICATION_LLM_CALLS
+        + wrong_rate * WRONG_FOUND_LLM_CALLS
+        + not_found_rate * NOT_FOUND_LLM_CALLS
+    )
+
+    return {
+        "found_rate": found_rate,
+        "clarification_rate": clarification_rate,
+        "not_found_rate": not_found_rate,
+        "accuracy": accuracy,
+        "wrong_rate": wrong_rate,
+        "resolved_rate": resolved_rate,
+        "extra_llm_calls": extra_llm_calls
+    }
+
+
+def rank_settings(
+    metrics: Dict[str, np.ndarray],
+    similarity_grid: np.ndarray = SIMILARITY_GRID,
+    ambiguity_grid: np.ndarray = AMBIGUITY_GRID
+) -> List[Dict[str, float]]:
+    """조합별 지표 목록 (예상 추가 LLM 호출 수 오름차순, 같으면 정확도 내림차순)"""
+    rows = []
+    for s, similarity in enumerate(similarity_grid):
+        for a, ambiguity in enumerate(ambiguity_grid):
+            row = {
+                "similarity_threshold": round(float(similarity), 4),
+                "ambiguity_threshold": round(float(ambiguity), 4)
+            }
+            row.update({name: float(values[s, a]) for name, values in metrics.items()})
+            rows.append(row)
+
+    rows.sort(key=lambda row: (round(row["extra_llm_calls"], 6), -row["accuracy"], -row["similarity_threshold"]))
+    return rows
+
+
+def _format_row(row: Dict[str, float]) -> str:
+    return (f"{row['similarity_threshold']:>6.2f} {row['ambiguity_threshold']:>6.2f} "
+            f"{row['accuracy']:>8.0%} {row['clarification_rate']:>8.0%} {row['wrong_rate']:>8.0%} "
+            f"{row['not_found_rate']:>10.0%} {row['resolved_rate']:>8.0%} {row['extra_llm_calls']:>10.2f}")
+
+
+def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else get_default_db_path()
+    print(f"DB 경로: {db_path}")
+
+    replay = load_replay(db_path)
+    query_count = len(replay["queries"])
+    print(f"재생한 검색: {query_count}개 (임베딩 없음으로 제외: {replay['skipped']}개)")
+    if query_count == 0:
+        print("선택 상품이 기록된 시맨틱 검색이 없습니다. SEARCH_QUERY_LOG=1 로 로그를 먼저 쌓아주세요.")
+        return
+    if replay["sessionless"]:
+        print(f"⚠️  세션 없이 기록된 검색 {replay['sessionless']}개: 선택 상품이 다른 세션의 장바구니 추가와 "
+              f"연결되었을 수 있습니다. (findProduct 에 session_id 를 넘기면 같은 세션 안에서만 연결)")
+
+    metrics = evaluate_grid(replay["scores"], replay["chosen_rank"])
+    rows = rank_settings(metrics)
+
+    header = (f"{'유사도':>6} {'모호성':>6} {'정확도':>8} {'되묻기':>8} {'오답':>8} "
+              f"{'NOT_FOUND':>10} {'해결률':>8} {'추가LLM':>10}")
+    print(f"\n예상 추가 LLM 호출 수 기준 상위 {TOP_SETTINGS}개 조합")
+    print(header)
+    print("-" * 80)
+    for row in rows[:TOP_SETTINGS]:
+        print(_format_row(row))
+
+    current = next(
+        row for row in rows
+        if np.isclose(row["similarity_threshold"], CURRENT_SIMILARITY_THRESHOLD)
+        and np.isclose(row["ambiguity_threshold"], CURRENT_AMBIGUITY_THRESHOLD)
+    )
+    print("\n현재 설정")
+    print(_format_row(current))
+    best = rows[0]
+    print(f"\n추천: similarity_threshold={best['similarity_threshold']:.2f}, "
+          f"ambiguity_threshold={best['ambiguity_threshold']:.2f} "
+          f"(검색 100회당 추가 LLM 호출 {current['extra_llm_calls'] * 100:.0f} → {best['extra_llm_calls'] * 100:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+오타/초성 교정 인덱스 (임베딩 호출 전 단계)
+
+키오스크 터치 키보드와 음성 인식에서 나오는 입력을 API 호출 없이 교정한다.
+
+- "한우불고기버가", "양념감쟈": 자모 단위로 분해한 뒤 SymSpell(대칭 삭제) 사전에서
+  편집 거리 2 이내의 상품명/단어를 찾아 교정한다.
+  (모음 하나 오타 = 자모 편집 거리 1)
+- "ㅎㅇㅂㄱㄱ": 초성만 입력하면 상품명 초성 인덱스에서 접두어 일치로 찾는다.
+
+SymSpell 은 사전 단어마다 삭제 변형을 미리 만들어 두므로, 검색 시에는 검색어의
+삭제 변형만 조회하면 되어 사전 크기와 무관하게 거의 일정한 시간에 교정된다.
+"""
+
+import re
+import bisect
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Any, Optional, List, Tuple, Set
+from hangul import decompose_jamo, extract_choseong, is_choseong_text
+
+# 삭제 변형을 만들 앞부분 길이 (자모 기준). 나머지 부분은 후보 검증 시 비교
+DEFAULT_PREFIX_LENGTH = 12
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def _normalize_key(text: str) -> str:
+    """NFC, 소문자, 공백/기호 제거 (search_index.normalize_product_key 와 동일)"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFC", text).lower())
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    인접 문자 교환을 포함한 편집 거리 (Optimal String Alignment)
+
+    max_distance 를 넘으면 max_distance + 1 을 반환한다.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+
+    return min(previous[-1], max_distance + 1)
+
+
+class SymSpellIndex:
+    """
+    대칭 삭제(Symmetric Delete) 사전
+
+    사전 단어와 검색어 모두에서 최대 max_distance 개 문자를 삭제한 변형을 만들고,
+    변형이 겹치는 사전 단어만 실제 편집 거리로 검증한다.
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = DEFAULT_PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+        self._terms: Set[str] = set()
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def _delete_variants(self, word: str, max_distance: int) -> Set[str]:
+        """word 에서 0~max_distance 개 문자를 삭제한 모든 변형"""
+        variants = {word}
+        frontier = {word}
+        for _ in range(max_distance):
+            next_frontier = set()
+            for variant in frontier:
+                for i in range(len(variant)):
+                    next_frontier.add(variant[:i] + variant[i + 1:])
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    def add(self, term: str) -> None:
+        """사전에 단어 추가"""
+        if not term or term in self._terms:
+            return
+        self._terms.add(term)
+        for variant in self._delete_variants(term[:self.prefix_length], self.max_distance):
+            self._deletes[variant].add(term)
+
+    def lookup(self, term: str, max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        편집 거리 max_distance 이내의 사전 단어
+
+        Returns:
+            [(사전 단어, 편집 거리), ...] 거리 오름차순
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        candidates: Set[str] = set()
+        for variant in self._delete_variants(term[:self.prefix_length], max_distance):
+            candidates |= self._deletes.get(variant, set())
+
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(term, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+
+        matches.sort(key=lambda item: (item[1], item[0]))
+        return matches
+
+
+class TypoIndex:
+    """
+    상품명/별칭 기반 오타 교정 + 초성 검색 인덱스
+
+    - 자모 SymSpell 사전: 정규화된 상품명/별칭 전체와 상품명의 단어(2글자 이상)
+    - 초성 인덱스: 정규화된 상품명/별칭의 초성 문자열 -> 상품 목록 (정렬된 키로 접두어 탐색)
+    """
+
+    # 자모 수가 이보다 적은 검색어는 교정하지 않음 (짧은 단어 오교정 방지)
+    MIN_JAMO_LENGTH = 4
+    # 자모 수가 이보다 적으면 편집 거리 1까지만 허용
+    LONG_TERM_LENGTH = 8
+    # 초성 검색 최소 길이
+    MIN_CHOSEONG_LENGTH = 2
+
+    def __init__(self, entries: List[Tuple[str, Dict[str, Any]]]):
+        self._symspell = SymSpellIndex(max_distance=2)
+        self._surface: Dict[str, str] = {}
+        self._products_by_choseong: Dict[str, List[Dict[str, Any]]] = {}
+
+        for text, product in entries:
+            key = _normalize_key(text)
+            if not key:
+                continue
+
+            words = [word for word in _NON_WORD.split(unicodedata.normalize("NFC", text).lower()) if len(word) >= 2]
+            for term in [key] + words:
+                jamo = decompose_jamo(term)
+                self._surface.setdefault(jamo, term)
+                self._symspell.add(jamo)
+
+            bucket = self._products_by_choseong.setdefault(extract_choseong(key), [])
+            if all(p["product_id"] != product["product_id"] for p in bucket):
+                bucket.append(product)
+
+        self._choseong_keys = sorted(self._products_by_choseong)
+
+    def correct(self, query: str) -> Optional[str]:
+        """
+        사전에 없는 검색어를 가장 가까운 상품명/단어로 교정
+
+        가장 가까운 후보가 하나뿐일 때만 교정한 문자열을 반환하고,
+        이미 사전에 있거나 후보가 없거나 여러 개면 None
+        """
+        key = _normalize_key(query)
+        if not key or is_choseong_text(key):
+            return None
+
+        jamo = decompose_jamo(key)
+        if len(jamo) < self.MIN_JAMO_LENGTH or jamo in self._symspell:
+            return None
+
+        max_distance = 1 if len(jamo) < self.LONG_TERM_LENGTH else 2
+        matches = self._symspell.lookup(jamo, max_distance)
+        if not matches:
+            return None
+
+        best_distance = matches[0][1]
+        best = [term for term, distance in matches if distance == best_distance]
+        if len(best) != 1:
+            return None
+        return self._surface[best[0]]
+
+    def choseong_matches(self, query: str, category: Optional[str] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        초성 검색어와 접두어가 일치하는 재고 있는 상품
+
+        Returns:
+            [(상품, 점수), ...] 점수 = 검색어 초성 수 / 상품명 초성 수, 내림차순
+        """
+        key = _normalize_key(query)
+        if len(key) < self.MIN_CHOSEONG_LENGTH or not is_choseong_text(key):
+            return []
+
+        best: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        start = bisect.bisect_left(self._choseong_keys, key)
+        for choseong_key in self._choseong_keys[start:]:
+            if not choseong_key.startswith(key):
+                break
+
+            score = len(key) / len(choseong_key)
+            for product in self._products_by_choseong[choseong_key]:
+                if product["stock_quantity"] <= 0 or (category and product["product_type"] != category):
+                    continue
+                if score > best.get(product["product_id"], (None, 0.0))[1]:
+                    best[product["product_id"]] = (product, score)
+
+        return sorted(best.values(), key=lambda item: item[1], reverse=True)
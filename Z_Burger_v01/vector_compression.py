@@ -0,0 +1,92 @@
+"""
+임베딩 압축 표현 (차원 축소 / int8 양자화)
+
+text-embedding-3-small 벡터는 1536 차원 float 이다. 카탈로그 인덱스를 만들 때
+아래 압축 표현을 선택할 수 있다.
+
+- Matryoshka 차원 축소: 앞쪽 256/512 차원만 남기고 다시 L2 정규화
+  (text-embedding-3 계열은 앞쪽 차원에 정보가 몰리도록 학습되어 있음)
+- int8 스칼라 양자화: 벡터마다 scale = max|x| / 127 로 int8 코드 저장.
+  점수는 int8 코드로 계산하고, 상위 후보만 float 벡터로 다시 계산(re-scoring)한다.
+
+환경변수 설정:
+    EMBEDDING_DIMS      = 남길 차원 수 (기본값: 0 = 전체)
+    VECTOR_QUANTIZATION = "float32" (기본값) | "int8"
+"""
+
+import os
+import numpy as np
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# int8 점수로 고른 뒤 float 로 다시 계산할 후보 수 = max(limit * 배수, 최소값)
+RESCORE_MULTIPLIER = 4
+RESCORE_MIN_CANDIDATES = 32
+
+# int8 → float32 변환을 한 번에 처리할 행 수 (임시 메모리 제한)
+_SCORE_CHUNK = 4096
+
+
+def get_compression_settings() -> Dict[str, Any]:
+    """환경변수로 압축 설정 조회"""
+    dims = int(os.getenv('EMBEDDING_DIMS', '0'))
+    return {
+        "dims": dims or None,
+        "quantization": os.getenv('VECTOR_QUANTIZATION', 'float32').lower()
+    }
+
+
+def truncate_embeddings(vectors: np.ndarray, dims: Optional[int]) -> np.ndarray:
+    """앞쪽 dims 차원만 남기고 행별 L2 재정규화 (dims 가 없거나 더 크면 정규화만)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dims and vectors.shape[-1] > dims:
+        vectors = vectors[..., :dims]
+
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+def rescore_count(limit: int) -> int:
+    """float 로 다시 계산할 상위 후보 수"""
+    return max(limit * RESCORE_MULTIPLIER, RESCORE_MIN_CANDIDATES)
+
+
+class Int8Matrix:
+    """
+    행별 scale 을 가진 int8 양자화 행렬
+
+    - codes: (N, D) int8, x ≈ codes * scale
+    - scales: (N,) float32
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0, np.float32)
+        scales[scales == 0] = 1.0
+
+        self.codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        self.scales = scales.astype(np.float32)
+        self.shape = matrix.shape
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    def dequantize(self) -> np.ndarray:
+        """float32 근사 행렬 복원"""
+        return self.codes.astype(np.float32) * self.scales[:, None]
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """(Q, D) 쿼리와의 근사 내적 (Q, N)"""
+        queries = np.asarray(queries, dtype=np.float32)
+        result = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), _SCORE_CHUNK):
+            chunk = self.codes[start:start + _SCORE_CHUNK].astype(np.float32)
+            result[:, start:start + len(chunk)] = queries @ chunk.T
+        return result * self.scales